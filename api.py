@@ -0,0 +1,279 @@
+# api.py
+#
+# Jednoduché JSON API na čítanie dát ligy (výsledkové tabule, boty) – bez
+# Streamlit session. Beží na stdlib ThreadingHTTPServer, DB otvára len na
+# čítanie (každé vlákno vlastné spojenie); schému raz zmigruje pri štarte.
+#
+# Každá odpoveď má ETag odvodený z verzie dát (db.data_version): klient pošle
+# If-None-Match a kým sa dáta nezmenia, dostane 304 bez tela. Hotové odpovede
+# (zakódovaný JSON) sa držia v LRU cache pre aktuálnu verziu dát, takže
+# opakované čítanie je jeden malý dotaz na verziu + vyhľadanie v slovníku.
+#
+# Endpointy (všetko GET):
+#   /leagues
+#   /leagues/<id>/seasons
+#   /leagues/<id>/teams
+#   /seasons/<id>/standings?scope=ALL|M|V&detailed=1
+#   /seasons/<id>/elo
+#   /seasons/<id>/elo/history
+#   /seasons/<id>/h2h
+#   /seasons/<id>/matches?round=3&team=FIN
+#
+# Použitie:
+#   python api.py
+#   python api.py --db hockey_league_fixed.db --port 8502
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from config import DB_DEFAULT
+from db import (
+    data_version,
+    fetch_matches,
+    get_readonly_conn,
+    load_leagues,
+    load_seasons,
+    load_teams,
+    migrate,
+    season_league,
+)
+from loaders import season_elo, season_h2h, season_standings, thread_conn
+from snapshots import load_snapshot
+from stats import SeasonIndex, load_team_set
+
+# pri zmene tvaru odpovedí zvýšiť – mení ETag, klienti si stiahnu nové telá
+API_FORMAT = 1
+
+SCOPES = ("ALL", "M", "V")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _frame(df: pd.DataFrame) -> list[dict]:
+    """DataFrame ako zoznam záznamov s natívnymi Python hodnotami (NaN -> null)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _season(conn: sqlite3.Connection, season_id: str) -> tuple[SeasonIndex, dict | None]:
+    league_id = season_league(conn, int(season_id))
+    if league_id is None:
+        raise ApiError(404, f"Sezóna {season_id} neexistuje.")
+    idx = SeasonIndex(fetch_matches(conn, int(season_id)), load_team_set(conn, league_id))
+    return idx, load_snapshot(conn, int(season_id))
+
+
+def _one(query: dict, name: str, default: str | None = None) -> str | None:
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _standings(conn, season_id, query):
+    scope = (_one(query, "scope", "ALL") or "ALL").upper()
+    if scope not in SCOPES:
+        raise ApiError(400, f"scope musí byť jedno z {', '.join(SCOPES)}.")
+    detailed = _one(query, "detailed", "0") in ("1", "true")
+    if detailed and scope != "ALL":
+        raise ApiError(400, "Detailná tabuľka je len pre scope=ALL.")
+    idx, snap = _season(conn, season_id)
+    return _frame(season_standings(idx, snap, scope, detailed))
+
+
+def _elo(conn, season_id, query):
+    idx, snap = _season(conn, season_id)
+    return _frame(season_elo(idx, snap)[0])
+
+
+def _elo_history(conn, season_id, query):
+    idx, snap = _season(conn, season_id)
+    return _frame(season_elo(idx, snap)[1])
+
+
+def _h2h(conn, season_id, query):
+    idx, snap = _season(conn, season_id)
+    return _frame(season_h2h(idx, snap))
+
+
+def _matches(conn, season_id, query):
+    idx, _ = _season(conn, season_id)
+    df = idx.frame
+    rnd = _one(query, "round")
+    if rnd is not None:
+        if not rnd.isdigit():
+            raise ApiError(400, "round musí byť celé číslo.")
+        df = df[df["round"] == int(rnd)]
+    team = _one(query, "team")
+    if team:
+        df = df[(df["home_team"] == team) | (df["away_team"] == team)]
+    return _frame(df)
+
+
+ROUTES = [
+    (re.compile(r"^/leagues$"), lambda conn, query: _frame(load_leagues(conn))),
+    (re.compile(r"^/leagues/(\d+)/seasons$"), lambda conn, lid, query: _frame(load_seasons(conn, int(lid)))),
+    (re.compile(r"^/leagues/(\d+)/teams$"), lambda conn, lid, query: _frame(load_teams(conn, int(lid)))),
+    (re.compile(r"^/seasons/(\d+)/standings$"), _standings),
+    (re.compile(r"^/seasons/(\d+)/elo$"), _elo),
+    (re.compile(r"^/seasons/(\d+)/elo/history$"), _elo_history),
+    (re.compile(r"^/seasons/(\d+)/h2h$"), _h2h),
+    (re.compile(r"^/seasons/(\d+)/matches$"), _matches),
+]
+
+
+def handle(conn: sqlite3.Connection, target: str) -> object:
+    """Dáta pre cestu s query stringom (bez obálky); ApiError pri chybe."""
+    parts = urlsplit(target)
+    query = parse_qs(parts.query)
+    for pattern, fn in ROUTES:
+        m = pattern.match(parts.path.rstrip("/") or "/")
+        if m:
+            return fn(conn, *m.groups(), query)
+    raise ApiError(404, f"Neznámy endpoint {parts.path}.")
+
+
+def render(conn: sqlite3.Connection, version: int, target: str) -> tuple[int, bytes]:
+    """Odpoveď (status, zakódované JSON telo) pre cestu pri verzii dát version."""
+    try:
+        body = {"version": version, "data": handle(conn, target)}
+        return 200, json.dumps(body, ensure_ascii=False).encode("utf-8")
+    except ApiError as exc:
+        return exc.status, json.dumps({"error": str(exc)}, ensure_ascii=False).encode("utf-8")
+
+
+def etag_for(version: int) -> str:
+    return f'"{API_FORMAT}-{version}"'
+
+
+def not_modified(version: int, status: int, if_none_match: str | None) -> bool:
+    """Klient už má aktuálne telo (If-None-Match obsahuje ETag verzie)."""
+    return status == 200 and etag_for(version) in (if_none_match or "")
+
+
+class ResponseCache:
+    """
+    LRU hotových odpovedí (status, telo) pre jednu verziu dát. Pri zmene
+    verzie sa celá vyprázdni – staré odpovede už nikto nedostane.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._items: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+
+    def get(self, version: int, key: str) -> tuple[int, bytes] | None:
+        with self._lock:
+            if version != self._version:
+                return None
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, version: int, key: str, item: tuple[int, bytes]) -> None:
+        with self._lock:
+            if version != self._version:
+                if self._version is not None and version < self._version:
+                    return
+                self._items.clear()
+                self._version = version
+            self._items[key] = item
+            if len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], db_path: str, cache_entries: int = 1024, verbose: bool = False
+    ):
+        super().__init__(address, ApiHandler)
+        # spojenia sú len na čítanie – nemigrovaná DB by nemala change_seq
+        migrate(db_path)
+        self.db_path = db_path
+        self.cache = ResponseCache(cache_entries)
+        self.verbose = verbose
+
+    def conn(self) -> sqlite3.Connection:
+        return thread_conn(self.db_path, get_readonly_conn)
+
+    def respond(self, target: str) -> tuple[int, int, bytes]:
+        """(verzia dát, status, telo) – z cache alebo novo vypočítané."""
+        conn = self.conn()
+        version = data_version(conn)
+        item = self.cache.get(version, target)
+        if item is None:
+            item = render(conn, version, target)
+            self.cache.put(version, target, item)
+        return version, item[0], item[1]
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # hlavičky a telo idú samostatnými zápismi – bez TCP_NODELAY by keep-alive
+    # klient čakal na oneskorené ACK (~40 ms na odpoveď)
+    disable_nagle_algorithm = True
+    server: ApiServer
+
+    def do_GET(self) -> None:
+        try:
+            version, status, body = self.server.respond(self.path)
+        except Exception as exc:  # chyba DB a pod. – klient dostane 500, server beží ďalej
+            self._send(500, json.dumps({"error": str(exc)}).encode("utf-8"))
+            return
+        etag = etag_for(version)
+        if not_modified(version, status, self.headers.get("If-None-Match")):
+            self._send(304, b"", etag)
+        else:
+            self._send(status, body, etag if status == 200 else None)
+
+    def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="JSON API na čítanie dát ligy.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--cache-entries", type=int, default=1024, help="veľkosť cache odpovedí")
+    parser.add_argument("--verbose", action="store_true", help="logovať každú požiadavku")
+    args = parser.parse_args(argv)
+
+    server = ApiServer((args.host, args.port), args.db, args.cache_entries, args.verbose)
+    print(f"API beží na http://{args.host}:{args.port} (DB: {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,958 +1,1225 @@
 # app.py
 
 import io
+import os
+import sys
+import tempfile
 from datetime import datetime
+from functools import partial
 
 import pandas as pd
 import streamlit as st
 
-from config import M_TEAMS, V_TEAMS, DB_DEFAULT
+from config import DB_DEFAULT
 from db import (
     get_conn as _get_conn,
+    get_readonly_conn,
+    read_snapshot,
     ensure_schema,
+    migrate,
+    load_leagues,
+    create_league,
     load_seasons,
     get_or_create_season,
     fetch_matches,
+    pending_rounds,
+    season_rounds,
+    fetch_matches_page,
+    count_matches_filtered,
     fetch_match_by_id,
+    data_version,
     insert_match,
     update_match,
+    update_matches,
     delete_match,
 )
 
 from stats import (
-    compute_standings,
-    generate_bipartite_schedule,
-    schedule_to_df,
-    result_points,
-    compute_elo_ratings,
+    DEFAULT_SCORING,
+    compute_clinch,
+    team_progression,
+    points_progression,
+    compute_season_records,
+    MatchStore,
+    Scenario,
+    SeasonIndex,
+    TeamSet,
+    load_team_set,
+)
+from archive import archive_seasons
+from schedule import check_schedule, league_schedule
+from schedule_opt import STRENGTH_SOURCES, optimize_schedule, team_strengths
+from export import export_file, EXPORT_FORMATS
+from loaders import (
+    Warmup,
+    thread_conn,
+    season_standings,
+    season_elo,
+    season_h2h,
+    league_history,
+    league_season_standings,
+)
+from integrity import check_integrity, match_tables, summarize as summarize_integrity
+from snapshots import close_season, load_snapshot
+import tracing
+from validation import (
+    RoundOccupancy,
+    validate_match,
+    validate_round_batch,
+    ERR_DRAW_EDIT,
 )
 
 st.set_page_config(page_title="Stolný hokej – štatistiky", layout="wide")
 
+# režim náhľadu (len čítanie): streamlit run app.py -- --viewer
+# – bez zapisovacích sekcií, čítanie z kópie DB obnovenej pri zmene verzie dát
+VIEWER_MODE = "--viewer" in sys.argv[1:]
+VIEWER_DIR = os.path.join(tempfile.gettempdir(), "hokej_viewer")
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "hokej_export")
+
+# živé obnovenie čítacích sekcií: interval kontroly verzie dát (sekundy)
+LIVE_REFRESH_SECONDS = 5
+
 
 @st.cache_resource
 def get_conn_cached(db_path: str):
+    if VIEWER_MODE:
+        # db_path je tu kópia z read_snapshot – nemenná, bez zámkov
+        return get_readonly_conn(db_path, immutable=True)
     conn = _get_conn(db_path)
     ensure_schema(conn)
     return conn
 
 
-st.title("Stolný hokej – štatistiky (M doma vs V vonku)")
+@st.cache_resource
+def live_conn_cached(db_path: str):
+    """
+    Náhľad: spojenie len na čítanie na živú DB, len na zistenie verzie dát.
+    Predtým raz (na cestu k DB) migrácia schémy – inak by nemigrovaná DB nemala change_seq.
+    """
+    migrate(db_path)
+    return get_readonly_conn(db_path)
 
-# --- výber DB + záloha ---
-db_path = st.sidebar.text_input("Cesta k databáze (SQLite)", DB_DEFAULT)
-conn = get_conn_cached(db_path)
 
-# ZÁLOHA DB – download button v sidebare
-try:
-    with open(db_path, "rb") as f:
-        db_bytes = f.read()
-    backup_name = f"hockey_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-    st.sidebar.download_button(
-        "Stiahnuť zálohu DB",
-        data=db_bytes,
-        file_name=backup_name,
-        mime="application/octet-stream",
-    )
-except FileNotFoundError:
-    st.sidebar.warning("Súbor DB sa nenašiel. Skontroluj cestu k databáze.")
+@st.cache_resource(max_entries=2)
+def read_snapshot_cached(db_path: str, version: int) -> str:
+    return read_snapshot(db_path, version, VIEWER_DIR)
 
-tab = st.sidebar.radio(
-    "Sekcia",
-    ["Sezóny", "Zadávanie zápasov", "Rozpis", "Prehľad zápasov", "Tabuľky", "Grafy", "Viac sezón", "Head-to-Head"],
-)
 
-# --- Sezóny ---
-if tab == "Sezóny":
-    st.subheader("Sezóny")
-    seasons = load_seasons(conn)
-    st.dataframe(seasons, use_container_width=True)
-
-    with st.form("add_season"):
-        new_label = st.text_input("Názov (napr. 2022/23, Sezóna 4)", value="Sezóna 4")
-        submit = st.form_submit_button("Pridať sezónu")
-        if submit and new_label.strip():
-            sid = get_or_create_season(conn, new_label.strip())
-            st.success(f"Sezóna vytvorená / existuje (ID: {sid}).")
-            st.rerun()
-
-    st.divider()
-    st.subheader("Zmena názvu sezóny")
-    seasons = load_seasons(conn)
-    if not seasons.empty:
-        season_to_edit = st.selectbox(
-            "Vyber sezónu na zmenu",
-            seasons["label"],
-            index=max(0, len(seasons) - 1),
-        )
-        new_name = st.text_input(
-            "Nový názov sezóny", value=season_to_edit, key="edit_season_name"
+def _open_conn(db_path: str):
+    return get_readonly_conn(db_path, immutable=True) if VIEWER_MODE else _get_conn(db_path)
+
+
+def read_conn(db_path: str):
+    """Spojenie aktuálneho vlákna – cache funkcie bežia aj vo vláknach warm-upu."""
+    return thread_conn(db_path, _open_conn)
+
+
+# Cache sú kľúčované verziou dát; vrátené objekty sú zdieľané medzi reruns
+# a vláknami, preto sa v UI nemenia na mieste.
+
+@st.cache_resource(max_entries=64)
+def season_index_cached(db_path: str, league_id: int, season_id: int, version: int) -> SeasonIndex:
+    """Index zápasov sezóny – staví sa raz pre (sezóna, verzia dát), zdieľaný medzi reruns."""
+    conn = read_conn(db_path)
+    return SeasonIndex(fetch_matches(conn, season_id), load_team_set(conn, league_id))
+
+
+@st.cache_resource(max_entries=64)
+def team_set_cached(db_path: str, league_id: int, version: int) -> TeamSet:
+    """Tímy ligy z tabuľky teams (M/V), načítané raz na verziu dát."""
+    return load_team_set(read_conn(db_path), league_id)
+
+
+@st.cache_resource(max_entries=64)
+def snapshot_cached(db_path: str, season_id: int, version: int) -> dict | None:
+    """Uložené výsledky uzavretej sezóny – jeden riadok zo season_snapshots."""
+    return load_snapshot(read_conn(db_path), season_id)
+
+
+@st.cache_resource(max_entries=256)
+def standings_cached(
+    db_path: str, league_id: int, season_id: int, version: int, scope: str, detailed: bool
+) -> pd.DataFrame:
+    idx = season_index_cached(db_path, league_id, season_id, version)
+    return season_standings(idx, snapshot_cached(db_path, season_id, version), scope, detailed)
+
+
+@st.cache_resource(max_entries=64)
+def elo_cached(db_path: str, league_id: int, season_id: int, version: int):
+    idx = season_index_cached(db_path, league_id, season_id, version)
+    return season_elo(idx, snapshot_cached(db_path, season_id, version))
+
+
+@st.cache_resource(max_entries=64)
+def h2h_cached(db_path: str, league_id: int, season_id: int, version: int) -> pd.DataFrame:
+    idx = season_index_cached(db_path, league_id, season_id, version)
+    return season_h2h(idx, snapshot_cached(db_path, season_id, version))
+
+
+@st.cache_resource(max_entries=64)
+def clinch_cached(
+    db_path: str, league_id: int, season_id: int, version: int, scope: str, thresholds: tuple[int, ...]
+) -> pd.DataFrame:
+    """Istota postupu / vyradenie zo zvyšku rozpisu – počíta sa raz na verziu dát."""
+    idx = season_index_cached(db_path, league_id, season_id, version)
+    return compute_clinch(idx.store, scope, thresholds, team_set=idx.teams)
+
+
+@st.cache_resource(max_entries=16)
+def scenario_cached(db_path: str, league_id: int, season_id: int, version: int) -> Scenario:
+    """Základ scenárov „čo ak“ (tabuľka + Elo stav po kolách) – úpravy sú len delty k nemu."""
+    idx = season_index_cached(db_path, league_id, season_id, version)
+    return Scenario(idx.store, team_set=idx.teams)
+
+
+@st.cache_resource(max_entries=16)
+def history_cached(db_path: str, league_id: int, version: int) -> MatchStore:
+    """Celá história ligy ako kompaktné polia (Viac sezón)."""
+    team_set = team_set_cached(db_path, league_id, version)
+    return league_history(read_conn(db_path), league_id, team_set)
+
+
+@st.cache_resource(max_entries=16)
+def league_standings_cached(db_path: str, league_id: int, version: int) -> dict:
+    """Základná tabuľka každej sezóny ligy: season_id -> DataFrame."""
+    history = history_cached(db_path, league_id, version)
+    team_set = team_set_cached(db_path, league_id, version)
+    return league_season_standings(read_conn(db_path), league_id, history, team_set)
+
+
+def warmup_jobs(db_path: str, version: int) -> list:
+    """
+    Úlohy warm-upu: pre každú ligu tímy, história a tabuľky všetkých sezón
+    a pre aktuálnu (poslednú) sezónu všetky pohľady, ktoré UI otvára predvolene.
+    Argumenty sú rovnaké ako pri volaní z UI (rovnaký kľúč cache).
+    """
+    conn = read_conn(db_path)
+    jobs = []
+    for lid in load_leagues(conn)["id"].astype(int):
+        jobs.append((f"liga {lid}: tímy", partial(team_set_cached, db_path, lid, version)))
+        jobs.append((f"liga {lid}: história", partial(league_standings_cached, db_path, lid, version)))
+        seasons = load_seasons(conn, lid)
+        if seasons.empty:
+            continue
+        sid = int(seasons["id"].iloc[-1])
+        for scope, detailed in (("ALL", False), ("ALL", True), ("M", False), ("V", False)):
+            jobs.append((
+                f"liga {lid}: tabuľka {scope}",
+                partial(standings_cached, db_path, lid, sid, version, scope, detailed),
+            ))
+        jobs.append((f"liga {lid}: Elo", partial(elo_cached, db_path, lid, sid, version)))
+        jobs.append((f"liga {lid}: H2H", partial(h2h_cached, db_path, lid, sid, version)))
+    return jobs
+
+
+@st.cache_resource
+def warmup_cached(db_path: str) -> Warmup:
+    """Predvýpočet cache po štarte servera (raz na DB) – beží na pozadí, UI neblokuje."""
+    return Warmup(
+        lambda: data_version(read_conn(db_path)),
+        lambda version: warmup_jobs(db_path, version),
+    ).start()
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_refresh(source_path: str, shown_version: int) -> None:
+    """
+    Živé obnovenie: fragment bez prvkov, ktorý každý interval pošle jediný
+    dotaz na verziu dát živej DB. Stránka sa prekreslí len keď sa verzia
+    zmení (niekto uložil výsledky); nezmenené pohľady idú z cache.
+    """
+    conn = live_conn_cached(source_path) if VIEWER_MODE else get_conn_cached(source_path)
+    if data_version(conn) != shown_version:
+        st.rerun(scope="app")
+
+
+@st.cache_resource
+def occupancy_cached(db_path: str) -> RoundOccupancy:
+    """Obsadenosť kôl (bitmapy tímov) – zdieľaná, udržiavaná pri zápisoch."""
+    return RoundOccupancy()
+
+
+def read_file(path: str) -> bytes:
+    """Obsah súboru (záloha DB, export ligy) – volá ho download_button až pri stiahnutí."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def render_page() -> None:
+    """Celá stránka okrem ladiaceho panela (beží v meraní rerunu, pozri nižšie)."""
+    # --- výber DB + záloha ---
+    source_path = db_path = st.sidebar.text_input("Cesta k databáze (SQLite)", DB_DEFAULT)
+    if VIEWER_MODE:
+        # ďalej sa pracuje s kópiou pre aktuálnu verziu dát (aj cache sú kľúčované jej cestou)
+        shown_version = data_version(live_conn_cached(source_path))
+        db_path = read_snapshot_cached(source_path, shown_version)
+        st.sidebar.caption("Režim náhľadu – len na čítanie.")
+    conn = get_conn_cached(db_path)
+    if not VIEWER_MODE:
+        shown_version = data_version(conn)
+    occupancy = occupancy_cached(db_path)
+
+    warmup = warmup_cached(db_path)
+    if not warmup.finished:
+        st.sidebar.progress(warmup.progress(), text=f"Predpočítavanie ({warmup.done}/{warmup.total})…")
+    elif warmup.errors:
+        st.sidebar.warning("Predpočítanie: " + "; ".join(warmup.errors[:3]))
+
+    # výber ligy – všetky sekcie pracujú len so sezónami a tímami zvolenej ligy
+    leagues = load_leagues(conn)
+    league_name = st.sidebar.selectbox("Liga", leagues["name"], index=0, key="league")
+    league_id = int(leagues.loc[leagues["name"] == league_name, "id"].iloc[0])
+    team_set = team_set_cached(db_path, league_id, data_version(conn))
+    M_TEAMS, V_TEAMS = team_set.m, team_set.v
+
+    # ZÁLOHA DB – download button v sidebare; súbor sa číta až po kliknutí,
+    # takže rerun (aj živé obnovenie po zápise v inom sedení) DB nečíta celú
+    if os.path.exists(db_path):
+        backup_name = f"hockey_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        st.sidebar.download_button(
+            "Stiahnuť zálohu DB",
+            data=partial(read_file, db_path),
+            file_name=backup_name,
+            mime="application/octet-stream",
         )
-        if st.button("Uložiť nový názov"):
-            try:
-                conn.execute(
-                    "UPDATE seasons SET label=? WHERE label=?",
-                    (new_name.strip(), season_to_edit),
-                )
-                conn.commit()
-                st.success(
-                    f"Názov sezóny '{season_to_edit}' bol zmenený na '{new_name}'."
-                )
-                st.rerun()
-            except Exception:
-                st.error("Takýto názov už existuje, zvoľ iný.")
-
-# --- Zadávanie zápasov ---
-elif tab == "Zadávanie zápasov":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
     else:
-        season_label = st.selectbox(
-            "Sezóna", seasons["label"], index=max(0, len(seasons) - 1)
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
+        st.sidebar.warning("Súbor DB sa nenašiel. Skontroluj cestu k databáze.")
 
-        # --- Jednotlivé zadanie zápasu ---
-        st.subheader("Jednotlivé zadanie zápasu")
+    SECTIONS = ["Sezóny", "Zadávanie zápasov", "Rozpis", "Prehľad zápasov", "Tabuľky", "Grafy", "Viac sezón", "Head-to-Head"]
+    WRITE_SECTIONS = {"Sezóny", "Zadávanie zápasov", "Rozpis"}
 
-        colA, colB, colC, colD = st.columns(4)
-        with colA:
-            home = st.selectbox(
-                "Domáci (len M tímy)", M_TEAMS, index=0, key="home_sel_M_only"
+    tab = st.sidebar.radio(
+        "Sekcia",
+        [t for t in SECTIONS if not (VIEWER_MODE and t in WRITE_SECTIONS)],
+    )
+
+    # čítacie sekcie sa obnovia samé, keď iný používateľ uloží výsledky
+    # (v zapisovacích sekciách nie – prekreslenie by rušilo rozpísaný formulár)
+    if tab not in WRITE_SECTIONS and st.sidebar.toggle(
+        "Živé obnovovanie", value=True, help=f"Kontrola zmien každých {LIVE_REFRESH_SECONDS} s."
+    ):
+        with st.sidebar:
+            live_refresh(source_path, shown_version)
+
+    # --- Sezóny ---
+    if tab == "Sezóny":
+        st.subheader("Sezóny")
+        seasons = load_seasons(conn, league_id)
+        st.dataframe(seasons[["id", "label", "closed", "archived"]], use_container_width=True)
+
+        with st.form("add_season"):
+            new_label = st.text_input("Názov (napr. 2022/23, Sezóna 4)", value="Sezóna 4")
+            submit = st.form_submit_button("Pridať sezónu")
+            if submit and new_label.strip():
+                sid = get_or_create_season(conn, new_label.strip(), league_id)
+                st.success(f"Sezóna vytvorená / existuje (ID: {sid}).")
+                st.rerun()
+
+        st.divider()
+        st.subheader("Zmena názvu sezóny")
+        seasons = load_seasons(conn, league_id)
+        if not seasons.empty:
+            season_to_edit = st.selectbox(
+                "Vyber sezónu na zmenu",
+                seasons["label"],
+                index=max(0, len(seasons) - 1),
             )
-        with colB:
-            away = st.selectbox(
-                "Hostia (len V tímy)", V_TEAMS, index=0, key="away_sel_V_only"
+            new_name = st.text_input(
+                "Nový názov sezóny", value=season_to_edit, key="edit_season_name"
             )
-        with colC:
-            hg = st.number_input("Góly domáci", 0, 99, 0)
-            ot = st.checkbox("Po predĺžení?")
-        with colD:
-            ag = st.number_input("Góly hostia", 0, 99, 0)
-            rnd = st.number_input("Kolo", 1, 100, 1)
-        is_po = st.checkbox("Play-off zápas", value=False)
-
-        if st.button("Uložiť zápas"):
-            round_int = int(rnd)
-
-            # 1) základné kontroly
-            if home == away:
-                st.error("Domáci a hostia nemôžu byť ten istý tím.")
-            elif home not in M_TEAMS:
-                st.error("Domáci tím musí byť z M skupiny.")
-            elif away not in V_TEAMS:
-                st.error("Hosťujúci tím musí byť z V skupiny.")
-            elif hg == ag:
-                st.error(
-                    "Remízy nie sú povolené. Uprav výsledok alebo označ OT a uprav góly."
-                )
-            else:
-                # 2) kontrola, či tím už nehrá v tomto kole
-                df_round = fetch_matches(conn, season_id)
-                df_round = df_round[df_round["round"] == round_int]
-
-                conflict_home = df_round[
-                    (df_round["home_team"] == home)
-                    | (df_round["away_team"] == home)
-                ]
-                conflict_away = df_round[
-                    (df_round["home_team"] == away)
-                    | (df_round["away_team"] == away)
-                ]
-
-                if not conflict_home.empty:
-                    st.error(
-                        f"V kole {round_int} už hrá tím {home} "
-                        f"({conflict_home.iloc[0]['home_team']} {conflict_home.iloc[0]['home_goals']} : "
-                        f"{conflict_home.iloc[0]['away_goals']} {conflict_home.iloc[0]['away_team']})."
+            if st.button("Uložiť nový názov"):
+                try:
+                    conn.execute(
+                        "UPDATE seasons SET label=? WHERE league_id=? AND label=?",
+                        (new_name.strip(), league_id, season_to_edit),
                     )
-                elif not conflict_away.empty:
-                    st.error(
-                        f"V kole {round_int} už hrá tím {away} "
-                        f"({conflict_away.iloc[0]['home_team']} {conflict_away.iloc[0]['home_goals']} : "
-                        f"{conflict_away.iloc[0]['away_goals']} {conflict_away.iloc[0]['away_team']})."
+                    conn.commit()
+                    st.success(
+                        f"Názov sezóny '{season_to_edit}' bol zmenený na '{new_name}'."
                     )
-                else:
-                    row = {
-                        "home_team": home,
-                        "away_team": away,
-                        "home_goals": int(hg),
-                        "away_goals": int(ag),
-                        "overtime": 1 if ot else 0,
-                        "round": round_int,
-                        "season": season_id,
-                        "is_playoff": 1 if is_po else 0,
-                    }
-                    insert_match(conn, row)
-                    st.success("Zápas uložený.")
+                    st.rerun()
+                except Exception:
+                    st.error("Takýto názov už existuje, zvoľ iný.")
 
         st.divider()
-        st.subheader("Posledné zápasy (aktuálna sezóna)")
-        df = fetch_matches(conn, season_id)
-        st.dataframe(df.tail(20), use_container_width=True)
-
-        # UNDO POSLEDNÉHO ZÁPASU
-        if not df.empty:
-            last_match = df.iloc[-1]
-            st.markdown("#### Vrátiť posledný zápas (undo)")
-            st.write(
-                f"Posledný zápis: ID {last_match['id']} – "
-                f"{last_match['home_team']} {last_match['home_goals']} : "
-                f"{last_match['away_goals']} {last_match['away_team']} "
-                f"(kolo {last_match['round']})"
-            )
-            if st.button("Vymazať posledný zápas v tejto sezóne"):
-                delete_match(conn, int(last_match["id"]))
-                st.success("Posledný zápas bol vymazaný.")
+        st.subheader("Uzavretie sezóny")
+        st.write(
+            "Uzavretá sezóna je nemenná: zápasy sa už nedajú pridať, upraviť ani vymazať. "
+            "Tabuľky, Elo, H2H a rekordy sa vypočítajú raz a ďalej sa len čítajú."
+        )
+        open_seasons = seasons[seasons["closed"] == 0]
+        if open_seasons.empty:
+            st.info("Všetky sezóny sú uzavreté.")
+        else:
+            season_to_close = st.selectbox("Sezóna na uzavretie", open_seasons["label"], index=0)
+            confirm_close = st.checkbox("Rozumiem, uzavretie sa nedá vrátiť.", key="confirm_close")
+            if st.button("Uzavrieť sezónu", disabled=not confirm_close):
+                close_id = int(open_seasons.loc[open_seasons["label"] == season_to_close, "id"].iloc[0])
+                close_season(conn, close_id)
+                st.success(f"Sezóna '{season_to_close}' je uzavretá.")
                 st.rerun()
 
-        # --- Zápis výsledkov podľa rozpisu ---
         st.divider()
-        st.subheader("Zápis výsledkov podľa rozpisu (celé kolo)")
-
-        all_matches = fetch_matches(conn, season_id)
-        if all_matches.empty:
-            st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy (rozpis nebol vygenerovaný).")
+        st.subheader("Archív starých sezón")
+        st.write(
+            "Zápasy uzavretých sezón sa presunú do samostatného archívneho súboru. "
+            "Hlavná databáza ostane malá; historické pohľady čítajú archív automaticky."
+        )
+        to_archive = seasons[(seasons["closed"] == 1) & (seasons["archived"] == 0)]
+        if to_archive.empty:
+            st.info("Žiadna uzavretá sezóna nečaká na archiváciu.")
         else:
-            # kolá, kde je aspoň jeden zápas bez výsledku (0:0)
-            unplayed = all_matches[
-                (all_matches["home_goals"] == 0) & (all_matches["away_goals"] == 0)
-            ]
-            only_unplayed = False
-            if not unplayed.empty:
-                only_unplayed = st.checkbox(
-                    "Zobraziť len kolá s nevyplnenými výsledkami (0:0)",
-                    value=True,
-                )
+            archive_labels = st.multiselect("Sezóny na archiváciu", to_archive["label"])
+            if st.button("Archivovať", disabled=not archive_labels):
+                archive_ids = to_archive.loc[to_archive["label"].isin(archive_labels), "id"].tolist()
+                moved = archive_seasons(db_path, archive_ids)
+                st.success(f"Archivovaných zápasov: {moved}.")
+                st.rerun()
 
-            if only_unplayed and not unplayed.empty:
-                rounds_list = sorted(unplayed["round"].unique())
-            else:
-                rounds_list = sorted(all_matches["round"].unique())
+        st.divider()
+        st.subheader("Nová liga")
+        st.write(
+            "Každá liga má vlastné tímy, sezóny a zápasy. Kódy tímov oddeľ čiarkou; "
+            "M tímy hrajú doma, V tímy vonku."
+        )
+        with st.form("add_league"):
+            league_new = st.text_input("Názov ligy")
+            m_codes = st.text_input("M tímy (domáci)", placeholder="AAA, BBB, CCC")
+            v_codes = st.text_input("V tímy (hostia)", placeholder="XXX, YYY, ZZZ")
+            if st.form_submit_button("Vytvoriť ligu"):
+                m_list = [c.strip().upper() for c in m_codes.split(",") if c.strip()]
+                v_list = [c.strip().upper() for c in v_codes.split(",") if c.strip()]
+                if not league_new.strip() or not m_list or not v_list:
+                    st.error("Zadaj názov ligy aj aspoň jeden M a jeden V tím.")
+                elif set(m_list) & set(v_list):
+                    st.error("Tím nemôže byť zároveň v M aj vo V skupine.")
+                elif league_new.strip() in set(leagues["name"]):
+                    st.error("Liga s týmto názvom už existuje.")
+                else:
+                    lid = create_league(conn, league_new.strip(), m_list, v_list)
+                    st.success(f"Liga vytvorená (ID: {lid}). Vyber ju v bočnom paneli.")
+                    st.rerun()
 
-            if not rounds_list:
-                st.info("Nie sú žiadne kolá, v ktorých by sa dali doplniť výsledky.")
+        st.divider()
+        st.subheader("Kontrola integrity dát")
+        st.write(
+            "Overí uložené zápasy voči pravidlám formulára: žiadne remízy, tím najviac raz v kole, "
+            "M doma / V vonku, žiadne zápasy bez sezóny."
+        )
+        tables = match_tables(conn)
+        check_table = st.selectbox("Tabuľka", tables, index=0, key="integrity_table")
+        if st.button("Spustiť kontrolu"):
+            report = check_integrity(conn, check_table)
+            st.dataframe(summarize_integrity(report), use_container_width=True, hide_index=True)
+            if report.empty:
+                st.success(f"Tabuľka {check_table}: žiadne porušenia.")
             else:
-                sel_round = st.selectbox(
-                    "Kolo podľa rozpisu",
-                    rounds_list,
-                    index=0,
-                )
+                st.warning(f"Tabuľka {check_table}: {len(report)} porušení.")
+                st.dataframe(report, use_container_width=True, hide_index=True)
+
+    # --- Zadávanie zápasov ---
+    elif tab == "Zadávanie zápasov":
+        seasons = load_seasons(conn, league_id)
+        # do uzavretých sezón sa už nezapisuje
+        seasons = seasons[seasons["closed"] == 0].reset_index(drop=True)
+        if seasons.empty:
+            st.info("Najprv vytvor (otvorenú) sezónu v sekcii 'Sezóny'.")
+        else:
+            season_label = st.selectbox(
+                "Sezóna", seasons["label"], index=max(0, len(seasons) - 1)
+            )
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
+            )
 
-                df_round = all_matches[all_matches["round"] == int(sel_round)].copy()
-                df_round = df_round.sort_values(["id"])
+            # --- Jednotlivé zadanie zápasu ---
+            st.subheader("Jednotlivé zadanie zápasu")
 
-                if df_round.empty:
-                    st.info(
-                        f"V kole {sel_round} nie sú žiadne zápasy. "
-                        f"Najprv vygeneruj a zapíš rozpis v sekcii 'Rozpis'."
-                    )
+            colA, colB, colC, colD = st.columns(4)
+            with colA:
+                home = st.selectbox(
+                    "Domáci (len M tímy)", M_TEAMS, index=0, key="home_sel_M_only"
+                )
+            with colB:
+                away = st.selectbox(
+                    "Hostia (len V tímy)", V_TEAMS, index=0, key="away_sel_V_only"
+                )
+            with colC:
+                hg = st.number_input("Góly domáci", 0, 99, 0)
+                ot = st.checkbox("Po predĺžení?")
+            with colD:
+                ag = st.number_input("Góly hostia", 0, 99, 0)
+                rnd = st.number_input("Kolo", 1, 100, 1)
+            is_po = st.checkbox("Play-off zápas", value=False)
+
+            if st.button("Uložiť zápas"):
+                row = {
+                    "home_team": home,
+                    "away_team": away,
+                    "home_goals": int(hg),
+                    "away_goals": int(ag),
+                    "overtime": 1 if ot else 0,
+                    "round": int(rnd),
+                    "season": season_id,
+                    "is_playoff": 1 if is_po else 0,
+                }
+                # orientácia M/V, remíza, tím už hrá v kole – O(1) cez bitmapu kola
+                err = validate_match(conn, occupancy, row, team_set=team_set)
+                if err:
+                    st.error(err)
                 else:
-                    st.markdown(f"**Zápasy v kole {int(sel_round)}:**")
-
-                    # mapovanie id -> pôvodný riadok
-                    round_data = {
-                        int(row["id"]): row for _, row in df_round.iterrows()
-                    }
+                    row["id"] = insert_match(conn, row)
+                    occupancy.add(row)
+                    occupancy.mark_written(conn, 1)
+                    st.success("Zápas uložený.")
 
-                    with st.form(f"round_results_form_{season_id}_{sel_round}"):
-                        inputs = []
-                        for _, row in df_round.iterrows():
-                            mid = int(row["id"])
-                            c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
-                            with c1:
-                                st.write(
-                                    f"{row['home_team']} vs {row['away_team']}"
-                                )
-                            with c2:
-                                hg_val = st.number_input(
-                                    "Góly dom.",
-                                    0,
-                                    99,
-                                    int(row["home_goals"]),
-                                    key=f"hg_round{sel_round}_id{mid}",
-                                )
-                            with c3:
-                                ag_val = st.number_input(
-                                    "Góly hosť.",
-                                    0,
-                                    99,
-                                    int(row["away_goals"]),
-                                    key=f"ag_round{sel_round}_id{mid}",
-                                )
-                            with c4:
-                                ot_val = st.checkbox(
-                                    "OT",
-                                    value=bool(row["overtime"]),
-                                    key=f"ot_round{sel_round}_id{mid}",
-                                )
-                            inputs.append((mid, hg_val, ag_val, ot_val))
-
-                        submit_round = st.form_submit_button("Uložiť výsledky kola")
-
-                        if submit_round:
-                            any_error = False
-                            for mid, hg_val, ag_val, ot_val in inputs:
-                                orig = round_data[mid]
-                                hg_int = int(hg_val)
-                                ag_int = int(ag_val)
-                                ot_int = 1 if ot_val else 0
-
-                                # ak sa nič nezmenilo, preskočíme
-                                if (
-                                    hg_int == int(orig["home_goals"])
-                                    and ag_int == int(orig["away_goals"])
-                                    and ot_int == int(orig["overtime"])
-                                ):
-                                    continue
-
-                                if hg_int == ag_int:
-                                    st.error(
-                                        f"Zápas {orig['home_team']} – {orig['away_team']}: "
-                                        f"remíza nie je povolená."
-                                    )
-                                    any_error = True
-                                    continue
+            st.divider()
+            st.subheader("Posledné zápasy (aktuálna sezóna)")
+            df = fetch_matches(conn, season_id)
+            st.dataframe(df.tail(20), use_container_width=True)
+
+            # UNDO POSLEDNÉHO ZÁPASU
+            if not df.empty:
+                last_match = df.iloc[-1]
+                st.markdown("#### Vrátiť posledný zápas (undo)")
+                st.write(
+                    f"Posledný zápis: ID {last_match['id']} – "
+                    f"{last_match['home_team']} {last_match['home_goals']} : "
+                    f"{last_match['away_goals']} {last_match['away_team']} "
+                    f"(kolo {last_match['round']})"
+                )
+                if st.button("Vymazať posledný zápas v tejto sezóne"):
+                    delete_match(conn, int(last_match["id"]))
+                    st.success("Posledný zápas bol vymazaný.")
+                    st.rerun()
 
-                                new_row = orig.to_dict()
-                                new_row["home_goals"] = hg_int
-                                new_row["away_goals"] = ag_int
-                                new_row["overtime"] = ot_int
-                                # kolo, sezóna, is_playoff nemeníme
+            # --- Zápis výsledkov podľa rozpisu ---
+            st.divider()
+            st.subheader("Zápis výsledkov podľa rozpisu (celé kolo)")
 
-                                update_match(conn, new_row)
+            all_rounds = season_rounds(conn, season_id)
+            if not all_rounds:
+                st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy (rozpis nebol vygenerovaný).")
+            else:
+                # kolá, kde je aspoň jeden zápas bez výsledku (status='scheduled', čiastočný index)
+                open_rounds = pending_rounds(conn, season_id)
+                only_unplayed = False
+                if open_rounds:
+                    only_unplayed = st.checkbox(
+                        "Zobraziť len kolá s nevyplnenými výsledkami (0:0)",
+                        value=True,
+                    )
 
-                            if not any_error:
-                                st.success(
-                                    f"Výsledky pre kolo {int(sel_round)} boli uložené."
-                                )
-                                st.rerun()
+                if only_unplayed and open_rounds:
+                    rounds_list = open_rounds
+                else:
+                    rounds_list = all_rounds
 
+                if not rounds_list:
+                    st.info("Nie sú žiadne kolá, v ktorých by sa dali doplniť výsledky.")
+                else:
+                    sel_round = st.selectbox(
+                        "Kolo podľa rozpisu",
+                        rounds_list,
+                        index=0,
+                    )
 
+                    idx = season_index_cached(db_path, league_id, season_id, data_version(conn))
+                    df_round = idx.round_frame(int(sel_round)).sort_values(["id"])
 
-# --- Rozpis ---
-elif tab == "Rozpis":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
-    else:
-        season_label = st.selectbox(
-            "Sezóna",
-            seasons["label"],
-            key="sch_season",
-            index=max(0, len(seasons) - 1),
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
+                    if df_round.empty:
+                        st.info(
+                            f"V kole {sel_round} nie sú žiadne zápasy. "
+                            f"Najprv vygeneruj a zapíš rozpis v sekcii 'Rozpis'."
+                        )
+                    else:
+                        st.markdown(f"**Zápasy v kole {int(sel_round)}:**")
 
-        st.write("Generuje sa 32 kôl, v každom 8 zápasov (domáci M, hostia V).")
-        if st.button("Vygenerovať rozpis (náhľad)"):
-            schedule = generate_bipartite_schedule(32)
-            dft = schedule_to_df(schedule, season_id)
-            st.session_state["schedule_preview"] = dft
-            st.success("Rozpis vygenerovaný – skontroluj nižšie.")
+                        # mapovanie id -> pôvodný riadok
+                        round_data = {
+                            int(row["id"]): row for _, row in df_round.iterrows()
+                        }
 
-        if "schedule_preview" in st.session_state:
-            st.dataframe(
-                st.session_state["schedule_preview"],
-                use_container_width=True,
-                height=500,
-            )
-            if st.button("Zapísať rozpis do DB (s nulovými výsledkami)"):
-                dfp = st.session_state["schedule_preview"]
-                cur = conn.cursor()
-                added = 0
-                for _, r in dfp.iterrows():
-                    exists = cur.execute(
-                        """
-                        SELECT 1 FROM matches
-                        WHERE season=? AND round=? AND home_team=? AND away_team=?;
-                        """,
-                        (
-                            int(r["season"]),
-                            int(r["round"]),
-                            r["home_team"],
-                            r["away_team"],
-                        ),
-                    ).fetchone()
-                    if not exists:
-                        insert_match(conn, r.to_dict())
-                        added += 1
-                st.success(f"Zapísaných {added} zápasov.")
-                st.rerun()
+                        with st.form(f"round_results_form_{season_id}_{sel_round}"):
+                            inputs = []
+                            for _, row in df_round.iterrows():
+                                mid = int(row["id"])
+                                c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+                                with c1:
+                                    st.write(
+                                        f"{row['home_team']} vs {row['away_team']}"
+                                    )
+                                with c2:
+                                    hg_val = st.number_input(
+                                        "Góly dom.",
+                                        0,
+                                        99,
+                                        int(row["home_goals"]),
+                                        key=f"hg_round{sel_round}_id{mid}",
+                                    )
+                                with c3:
+                                    ag_val = st.number_input(
+                                        "Góly hosť.",
+                                        0,
+                                        99,
+                                        int(row["away_goals"]),
+                                        key=f"ag_round{sel_round}_id{mid}",
+                                    )
+                                with c4:
+                                    ot_val = st.checkbox(
+                                        "OT",
+                                        value=bool(row["overtime"]),
+                                        key=f"ot_round{sel_round}_id{mid}",
+                                    )
+                                inputs.append((mid, hg_val, ag_val, ot_val))
+
+                            submit_round = st.form_submit_button("Uložiť výsledky kola")
+
+                            if submit_round:
+                                changed = []
+                                for mid, hg_val, ag_val, ot_val in inputs:
+                                    orig = round_data[mid]
+                                    hg_int = int(hg_val)
+                                    ag_int = int(ag_val)
+                                    ot_int = 1 if ot_val else 0
+
+                                    # ak sa nič nezmenilo, preskočíme
+                                    if (
+                                        hg_int == int(orig["home_goals"])
+                                        and ag_int == int(orig["away_goals"])
+                                        and ot_int == int(orig["overtime"])
+                                    ):
+                                        continue
+
+                                    # tímy berieme z DB – cache sezóny nemá mená tímov mimo ligy (None)
+                                    new_row = fetch_match_by_id(conn, mid)
+                                    if new_row is None:
+                                        continue
+                                    new_row["home_goals"] = hg_int
+                                    new_row["away_goals"] = ag_int
+                                    new_row["overtime"] = ot_int
+                                    # kolo, sezóna, is_playoff nemeníme
+                                    changed.append(new_row)
+
+                                # celé kolo naraz: remízy, duplicity, orientácia M/V
+                                errors = validate_round_batch(conn, occupancy, changed, team_set=team_set)
+                                if errors:
+                                    for _, msg in errors:
+                                        st.error(msg)
+                                else:
+                                    if changed:
+                                        update_matches(conn, changed)
+                                        for new_row in changed:
+                                            occupancy.remove(new_row)
+                                            occupancy.add(new_row)
+                                        occupancy.mark_written(conn, len(changed))
+                                    st.success(
+                                        f"Výsledky pre kolo {int(sel_round)} boli uložené."
+                                    )
+                                    st.rerun()
 
-# --- Prehľad zápasov ---
-elif tab == "Prehľad zápasov":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
-    else:
-        season_label = st.selectbox(
-            "Sezóna",
-            seasons["label"],
-            key="list_season",
-            index=max(0, len(seasons) - 1),
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
 
-        df_all = fetch_matches(conn, season_id)
 
-        if df_all.empty:
-            st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+    # --- Rozpis ---
+    elif tab == "Rozpis":
+        seasons = load_seasons(conn, league_id)
+        # do uzavretých sezón sa už nezapisuje
+        seasons = seasons[seasons["closed"] == 0].reset_index(drop=True)
+        if seasons.empty:
+            st.info("Najprv vytvor (otvorenú) sezónu v sekcii 'Sezóny'.")
         else:
-            st.subheader("Filtrovanie zápasov")
-
-            all_teams = M_TEAMS + V_TEAMS
-            team_filter = st.selectbox(
-                "Filtrovať podľa tímu (voliteľné)",
-                ["(všetky tímy)"] + all_teams,
-                index=0,
-            )
-
-            type_filter = st.multiselect(
-                "Filter typu zápasu (voliteľné)",
-                [
-                    "Po predĺžení",
-                    "Rozdiel 1 gól",
-                    "Rozdiel ≥3 góly",
-                    "10+ gólov jedného tímu",
-                ],
+            season_label = st.selectbox(
+                "Sezóna",
+                seasons["label"],
+                key="sch_season",
+                index=max(0, len(seasons) - 1),
             )
-
-            df = df_all.copy()
-            df["home_goals"] = df["home_goals"].astype(int)
-            df["away_goals"] = df["away_goals"].astype(int)
-            df["diff"] = (df["home_goals"] - df["away_goals"]).abs()
-            df["is_ot"] = df["overtime"].astype(bool)
-            df["is_one_goal"] = df["diff"] == 1
-            df["is_blowout"] = df["diff"] >= 3
-            df["is_ten_plus"] = (df["home_goals"] >= 10) | (
-                df["away_goals"] >= 10
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
             )
 
-            # Info stĺpec – krátke značky typu zápasu
-            def flags_row(row):
-                flags = []
-                if row["is_ot"]:
-                    flags.append("OT")
-                if row["is_one_goal"]:
-                    flags.append("1G")
-                elif row["is_blowout"]:
-                    flags.append("BLOW")
-                if row["is_ten_plus"]:
-                    flags.append("10+")
-                return ", ".join(flags)
-
-            df["Info"] = df.apply(flags_row, axis=1)
-
-            # filter podľa tímu
-            if team_filter != "(všetky tímy)":
-                df = df[
-                    (df["home_team"] == team_filter)
-                    | (df["away_team"] == team_filter)
-                ]
-
-            # filter podľa typu zápasu
-            if type_filter:
-                mask = pd.Series(False, index=df.index)
-                for t in type_filter:
-                    if t == "Po predĺžení":
-                        mask |= df["is_ot"]
-                    elif t == "Rozdiel 1 gól":
-                        mask |= df["is_one_goal"]
-                    elif t == "Rozdiel ≥3 góly":
-                        mask |= df["is_blowout"]
-                    elif t == "10+ gólov jedného tímu":
-                        mask |= df["is_ten_plus"]
-                df = df[mask]
-
-            st.subheader("Zápasy v sezóne (podľa filtra)")
             st.write(
-                f"Zobrazených zápasov: **{len(df)}** z celkových **{len(df_all)}** v sezóne."
+                f"Generuje sa 32 kôl, v každom {min(len(M_TEAMS), len(V_TEAMS))} zápasov "
+                "(domáci M, hostia V)."
             )
+            optimize = st.checkbox(
+                "Optimalizovať podľa sily tímov",
+                key="sch_optimize",
+                help=(
+                    "Namiesto pevnej rotácie sa hľadá rozpis, v ktorom tímy nedostanú silných "
+                    "súperov v niekoľkých kolách za sebou a priebežná sila súperov je "
+                    "vyrovnaná. Počty stretnutí dvojíc ostanú rovnaké."
+                ),
+            )
+            if optimize:
+                c1, c2 = st.columns(2)
+                source = c1.radio(
+                    "Sila tímov",
+                    list(STRENGTH_SOURCES),
+                    format_func=STRENGTH_SOURCES.get,
+                    horizontal=True,
+                    key="sch_source",
+                )
+                seconds = c2.slider("Časový limit hľadania (s)", 1, 30, 5, key="sch_seconds")
+            if st.button("Vygenerovať rozpis (náhľad)"):
+                schedule = league_schedule(team_set, 32)
+                if optimize:
+                    history = history_cached(db_path, league_id, data_version(conn))
+                    strengths = team_strengths(history, team_set, source)
+                    with st.spinner("Hľadá sa vyváženejší rozpis…"), tracing.span("optimalizácia rozpisu"):
+                        result = optimize_schedule(schedule, strengths, seconds)
+                    schedule = result.schedule
+                    st.caption(
+                        f"Cena rozpisu {result.initial_cost:.3f} → {result.cost:.3f} "
+                        f"({result.iterations} iterácií, {result.workers} procesov)."
+                    )
+                problems = check_schedule(schedule)
+                st.session_state["schedule_preview"] = schedule.to_frame(season_id)
+                if problems:
+                    st.warning("Rozpis porušuje obmedzenia:\n\n" + "\n".join(f"- {p}" for p in problems))
+                else:
+                    st.success("Rozpis vygenerovaný – skontroluj nižšie.")
 
-            # zobrazíme bez pomocných boolean stĺpcov, necháme Info
-            display_cols = [
-                c
-                for c in df.columns
-                if c
-                not in [
-                    "diff",
-                    "is_ot",
-                    "is_one_goal",
-                    "is_blowout",
-                    "is_ten_plus",
-                ]
-            ]
-            st.dataframe(df[display_cols], use_container_width=True, height=480)
-
-            # EXPORT ZÁPASOV DO EXCELU – stále všetky zápasy sezóny
-            excel_buf_matches = io.BytesIO()
-            with pd.ExcelWriter(excel_buf_matches, engine="xlsxwriter") as writer:
-                df_all.to_excel(writer, sheet_name="Zápasy", index=False)
-            excel_buf_matches.seek(0)
-
-            st.download_button(
-                "Exportovať všetky zápasy sezóny do Excelu",
-                data=excel_buf_matches,
-                file_name=f"zapasy_{season_label.replace('/', '-')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            if "schedule_preview" in st.session_state:
+                st.dataframe(
+                    st.session_state["schedule_preview"],
+                    use_container_width=True,
+                    height=500,
+                )
+                if st.button("Zapísať rozpis do DB (s nulovými výsledkami)"):
+                    dfp = st.session_state["schedule_preview"]
+                    cur = conn.cursor()
+                    added = 0
+                    for _, r in dfp.iterrows():
+                        exists = cur.execute(
+                            """
+                        SELECT 1 FROM matches
+                        WHERE season=? AND round=? AND home_team=? AND away_team=?;
+                        """,
+                            (
+                                int(r["season"]),
+                                int(r["round"]),
+                                r["home_team"],
+                                r["away_team"],
+                            ),
+                        ).fetchone()
+                        if not exists:
+                            insert_match(conn, r.to_dict())
+                            added += 1
+                    st.success(f"Zapísaných {added} zápasov.")
+                    st.rerun()
+
+    # --- Prehľad zápasov ---
+    elif tab == "Prehľad zápasov":
+        seasons = load_seasons(conn, league_id)
+        if seasons.empty:
+            st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
+        else:
+            season_label = st.selectbox(
+                "Sezóna",
+                seasons["label"],
+                key="list_season",
+                index=max(0, len(seasons) - 1),
             )
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
+            )
+            season_closed = bool(seasons.loc[seasons["label"] == season_label, "closed"].iloc[0])
 
-            st.divider()
-            st.subheader("Editácia zápasu")
+            season_total = count_matches_filtered(conn, season_id)
 
-            if df_all.empty:
+            if season_total == 0:
                 st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
             else:
-                edit_id = st.selectbox(
-                    "Vyber ID zápasu na editáciu", df_all["id"].tolist()
+                st.subheader("Filtrovanie zápasov")
+
+                all_teams = M_TEAMS + V_TEAMS
+                team_filter = st.selectbox(
+                    "Filtrovať podľa tímu (voliteľné)",
+                    ["(všetky tímy)"] + all_teams,
+                    index=0,
+                )
+
+                type_labels = {
+                    "Po predĺžení": "ot",
+                    "Rozdiel 1 gól": "one_goal",
+                    "Rozdiel ≥3 góly": "blowout",
+                    "10+ gólov jedného tímu": "ten_plus",
+                }
+                type_filter = st.multiselect(
+                    "Filter typu zápasu (voliteľné)",
+                    list(type_labels),
                 )
-                match = fetch_match_by_id(conn, int(edit_id))
 
-                if match is None:
-                    st.warning("Zápas sa nenašiel.")
+                page_size = st.selectbox("Zápasov na stranu", [25, 50, 100, 200], index=1)
+
+                team_arg = None if team_filter == "(všetky tímy)" else team_filter
+                types_arg = [type_labels[t] for t in type_filter]
+
+                # keyset stránkovanie – zásobník kurzorov (round, id); pri zmene filtra sa resetuje
+                filter_key = (season_id, team_arg, tuple(types_arg), page_size)
+                if st.session_state.get("list_filter_key") != filter_key:
+                    st.session_state["list_filter_key"] = filter_key
+                    st.session_state["list_cursors"] = [None]
+                cursors = st.session_state["list_cursors"]
+
+                filtered_total = count_matches_filtered(conn, season_id, team_arg, types_arg)
+                df = fetch_matches_page(
+                    conn, season_id, team_arg, types_arg, after=cursors[-1], limit=page_size
+                )
+
+                st.subheader("Zápasy v sezóne (podľa filtra)")
+                st.write(
+                    f"Zobrazených zápasov: **{filtered_total}** z celkových **{season_total}** v sezóne "
+                    f"(strana {len(cursors)}, {len(df)} zápasov)."
+                )
+                st.dataframe(df, use_container_width=True, height=480)
+
+                col_prev, col_next = st.columns(2)
+                with col_prev:
+                    if st.button("◀ Predchádzajúca strana", disabled=len(cursors) <= 1):
+                        cursors.pop()
+                        st.rerun()
+                with col_next:
+                    has_next = len(df) == page_size and (
+                        (len(cursors) - 1) * page_size + len(df) < filtered_total
+                    )
+                    if st.button("Ďalšia strana ▶", disabled=not has_next):
+                        last = df.iloc[-1]
+                        cursors.append((int(last["round"]), int(last["id"])))
+                        st.rerun()
+
+                # EXPORT ZÁPASOV DO EXCELU – stále všetky zápasy sezóny (načítané až na požiadanie)
+                if st.button("Pripraviť export všetkých zápasov sezóny"):
+                    excel_buf_matches = io.BytesIO()
+                    with tracing.span("Excel: zápasy sezóny") as span:
+                        with pd.ExcelWriter(excel_buf_matches, engine="xlsxwriter") as writer:
+                            fetch_matches(conn, season_id).to_excel(writer, sheet_name="Zápasy", index=False)
+                        if span:
+                            span.nbytes = excel_buf_matches.tell()
+                    excel_buf_matches.seek(0)
+
+                    st.download_button(
+                        "Exportovať všetky zápasy sezóny do Excelu",
+                        data=excel_buf_matches,
+                        file_name=f"zapasy_{season_label.replace('/', '-')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    )
+
+                page_ids = df["id"].tolist()
+
+                if VIEWER_MODE:
+                    pass  # náhľad – bez editácie a mazania
+                elif season_closed:
+                    st.divider()
+                    st.info("Sezóna je uzavretá – zápasy sa nedajú upravovať ani mazať.")
                 else:
-                    with st.form(
-                        "edit_match_form", clear_on_submit=False
-                    ):
-                        cA, cB, cC, cD = st.columns(4)
-                        with cA:
-                            home = st.selectbox(
-                                "Domáci (len M)",
-                                M_TEAMS,
-                                index=max(
-                                    0,
-                                    M_TEAMS.index(match["home_team"])
-                                    if match["home_team"] in M_TEAMS
-                                    else 0,
-                                ),
-                            )
-                            rnd = st.number_input(
-                                "Kolo", 1, 100, int(match["round"])
-                            )
-                        with cB:
-                            away = st.selectbox(
-                                "Hostia (len V)",
-                                V_TEAMS,
-                                index=max(
-                                    0,
-                                    V_TEAMS.index(match["away_team"])
-                                    if match["away_team"] in V_TEAMS
-                                    else 0,
-                                ),
-                            )
-                            ot = st.checkbox(
-                                "Po predĺžení?",
-                                value=bool(match["overtime"]),
-                            )
-                        with cC:
-                            hg = st.number_input(
-                                "Góly domáci",
-                                0,
-                                99,
-                                int(match["home_goals"]),
-                            )
-                            is_po = st.checkbox(
-                                "Play-off zápas",
-                                value=bool(match["is_playoff"]),
-                            )
-                        with cD:
-                            ag = st.number_input(
-                                "Góly hostia",
-                                0,
-                                99,
-                                int(match["away_goals"]),
-                            )
-                            seasons_now = load_seasons(conn)
-                            if match["season"] in seasons_now["id"].values:
-                                default_idx = int(
-                                    seasons_now.index[
-                                        seasons_now["id"] == match["season"]
-                                    ][0]
-                                )
-                            else:
-                                default_idx = max(
-                                    0, len(seasons_now) - 1
-                                )
-                            season_label_edit = st.selectbox(
-                                "Sezóna (pre zápis)",
-                                seasons_now["label"],
-                                index=default_idx,
-                            )
-                            season_id_edit = int(
-                                seasons_now.loc[
-                                    seasons_now["label"]
-                                    == season_label_edit,
-                                    "id",
-                                ].iloc[0]
-                            )
+                    st.divider()
+                    st.subheader("Editácia zápasu")
 
-                        save = st.form_submit_button("Uložiť zmeny")
-                        if save:
-                            round_int = int(rnd)
+                    if not page_ids:
+                        st.info("Na tejto strane nie sú žiadne zápasy.")
+                    else:
+                        edit_id = st.selectbox(
+                            "Vyber ID zápasu na editáciu (aktuálna strana)", page_ids
+                        )
+                        match = fetch_match_by_id(conn, int(edit_id))
 
-                            if home == away:
-                                st.error(
-                                    "Domáci a hostia nemôžu byť ten istý tím."
-                                )
-                            elif home not in M_TEAMS:
-                                st.error(
-                                    "Domáci tím musí byť z M skupiny."
-                                )
-                            elif away not in V_TEAMS:
-                                st.error(
-                                    "Hosťujúci tím musí byť z V skupiny."
-                                )
-                            elif hg == ag:
-                                st.error(
-                                    "Remízy nie sú povolené. Uprav góly."
-                                )
-                            else:
-                                # kontrola konfliktov v danom kole + sezóne pri editácii
-                                df_round = fetch_matches(
-                                    conn, season_id_edit
-                                )
-                                df_round = df_round[
-                                    (df_round["round"] == round_int)
-                                    & (df_round["id"] != match["id"])
-                                ]
-
-                                conflict_home = df_round[
-                                    (df_round["home_team"] == home)
-                                    | (df_round["away_team"] == home)
-                                ]
-                                conflict_away = df_round[
-                                    (df_round["home_team"] == away)
-                                    | (df_round["away_team"] == away)
-                                ]
-
-                                if not conflict_home.empty:
-                                    st.error(
-                                        f"V kole {round_int} už hrá tím {home} "
-                                        f"({conflict_home.iloc[0]['home_team']} {conflict_home.iloc[0]['home_goals']} : "
-                                        f"{conflict_home.iloc[0]['away_goals']} {conflict_home.iloc[0]['away_team']})."
+                        if match is None:
+                            st.warning("Zápas sa nenašiel.")
+                        else:
+                            with st.form(
+                                "edit_match_form", clear_on_submit=False
+                            ):
+                                cA, cB, cC, cD = st.columns(4)
+                                with cA:
+                                    home = st.selectbox(
+                                        "Domáci (len M)",
+                                        M_TEAMS,
+                                        index=max(
+                                            0,
+                                            M_TEAMS.index(match["home_team"])
+                                            if match["home_team"] in M_TEAMS
+                                            else 0,
+                                        ),
                                     )
-                                elif not conflict_away.empty:
-                                    st.error(
-                                        f"V kole {round_int} už hrá tím {away} "
-                                        f"({conflict_away.iloc[0]['home_team']} {conflict_away.iloc[0]['home_goals']} : "
-                                        f"{conflict_away.iloc[0]['away_goals']} {conflict_away.iloc[0]['away_team']})."
+                                    rnd = st.number_input(
+                                        "Kolo", 1, 100, int(match["round"])
                                     )
-                                else:
+                                with cB:
+                                    away = st.selectbox(
+                                        "Hostia (len V)",
+                                        V_TEAMS,
+                                        index=max(
+                                            0,
+                                            V_TEAMS.index(match["away_team"])
+                                            if match["away_team"] in V_TEAMS
+                                            else 0,
+                                        ),
+                                    )
+                                    ot = st.checkbox(
+                                        "Po predĺžení?",
+                                        value=bool(match["overtime"]),
+                                    )
+                                with cC:
+                                    hg = st.number_input(
+                                        "Góly domáci",
+                                        0,
+                                        99,
+                                        int(match["home_goals"]),
+                                    )
+                                    is_po = st.checkbox(
+                                        "Play-off zápas",
+                                        value=bool(match["is_playoff"]),
+                                    )
+                                with cD:
+                                    ag = st.number_input(
+                                        "Góly hostia",
+                                        0,
+                                        99,
+                                        int(match["away_goals"]),
+                                    )
+                                    seasons_now = load_seasons(conn, league_id)
+                                    seasons_now = seasons_now[seasons_now["closed"] == 0].reset_index(drop=True)
+                                    if match["season"] in seasons_now["id"].values:
+                                        default_idx = int(
+                                            seasons_now.index[
+                                                seasons_now["id"] == match["season"]
+                                            ][0]
+                                        )
+                                    else:
+                                        default_idx = max(
+                                            0, len(seasons_now) - 1
+                                        )
+                                    season_label_edit = st.selectbox(
+                                        "Sezóna (pre zápis)",
+                                        seasons_now["label"],
+                                        index=default_idx,
+                                    )
+                                    season_id_edit = int(
+                                        seasons_now.loc[
+                                            seasons_now["label"]
+                                            == season_label_edit,
+                                            "id",
+                                        ].iloc[0]
+                                    )
+
+                                save = st.form_submit_button("Uložiť zmeny")
+                                if save:
                                     new_row = {
                                         "id": int(match["id"]),
                                         "home_team": home,
                                         "away_team": away,
                                         "home_goals": int(hg),
                                         "away_goals": int(ag),
-                                        "overtime": 1
-                                        if ot
-                                        else 0,
-                                        "round": round_int,
+                                        "overtime": 1 if ot else 0,
+                                        "round": int(rnd),
                                         "season": int(season_id_edit),
-                                        "is_playoff": 1
-                                        if is_po
-                                        else 0,
+                                        "is_playoff": 1 if is_po else 0,
                                     }
-                                    update_match(conn, new_row)
-                                    st.success(
-                                        f"Zápas ID {match['id']} bol aktualizovaný."
+                                    # kontrola konfliktov v danom kole + sezóne pri editácii
+                                    err = validate_match(
+                                        conn,
+                                        occupancy,
+                                        new_row,
+                                        exclude_id=int(match["id"]),
+                                        draw_error=ERR_DRAW_EDIT,
+                                        team_set=team_set,
                                     )
-                                    st.rerun()
-
-            st.divider()
-            st.subheader("Hromadné mazanie (voliteľné)")
-            sel = st.multiselect(
-                "Označ zápasy na vymazanie podľa ID",
-                df_all["id"].tolist(),
+                                    if err:
+                                        st.error(err)
+                                    else:
+                                        update_match(conn, new_row)
+                                        occupancy.remove(match)
+                                        occupancy.add(new_row)
+                                        occupancy.mark_written(conn, 1)
+                                        st.success(
+                                            f"Zápas ID {match['id']} bol aktualizovaný."
+                                        )
+                                        st.rerun()
+
+                    st.divider()
+                    st.subheader("Hromadné mazanie (voliteľné)")
+                    sel = st.multiselect(
+                        "Označ zápasy na vymazanie podľa ID (aktuálna strana)",
+                        page_ids,
+                    )
+                    if st.button("Vymazať označené"):
+                        for mid in sel:
+                            delete_match(conn, int(mid))
+                        st.success(f"Vymazané: {len(sel)} záznamov.")
+                        st.rerun()
+
+    # --- Tabuľky ---
+    elif tab == "Tabuľky":
+        seasons = load_seasons(conn, league_id)
+        if seasons.empty:
+            st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
+        else:
+            season_label = st.selectbox(
+                "Sezóna",
+                seasons["label"],
+                key="tbl_season",
+                index=max(0, len(seasons) - 1),
+            )
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
             )
-            if st.button("Vymazať označené"):
-                for mid in sel:
-                    delete_match(conn, int(mid))
-                st.success(f"Vymazané: {len(sel)} záznamov.")
-                st.rerun()
-
-# --- Tabuľky ---
-elif tab == "Tabuľky":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
-    else:
-        season_label = st.selectbox(
-            "Sezóna",
-            seasons["label"],
-            key="tbl_season",
-            index=max(0, len(seasons) - 1),
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
-
-        df_matches = fetch_matches(conn, season_id)
 
-        mode = st.radio(
-            "Režim",
-            ["Klasická tabuľka", "Power ranking (Elo)"],
-            horizontal=True,
-        )
+            idx = season_index_cached(db_path, league_id, season_id, data_version(conn))
+            df_matches = idx.frame
+            # uzavretá sezóna: tabuľky, Elo a rekordy sa čítajú zo snapshotu
+            season_closed = bool(seasons.loc[seasons["label"] == season_label, "closed"].iloc[0])
+            snap = snapshot_cached(db_path, season_id, data_version(conn)) if season_closed else None
 
-        # --- KLASICKÁ TABUĽKA ---
-        if mode == "Klasická tabuľka":
-            scope = st.radio(
-                "Zobraziť",
-                ["Všetky tímy", "Len M tímy", "Len V tímy"],
+            mode = st.radio(
+                "Režim",
+                ["Klasická tabuľka", "Power ranking (Elo)", "Postup a vypadnutie", "Scenár (čo ak)"],
                 horizontal=True,
             )
-            detailed = False
-            if scope == "Všetky tímy":
-                detailed = st.checkbox("Zobraziť detailné metriky", value=False)
-
-            # pomocná funkcia: súhrny Spolu M / V / ALL
-            def build_totals(df_all: pd.DataFrame, detailed_mode: bool) -> pd.DataFrame:
-                if "Side" in df_all.columns:
-                    df_M = df_all[df_all["Side"] == "M"].copy()
-                    df_V = df_all[df_all["Side"] == "V"].copy()
-                else:
-                    df_M = df_all[df_all["Team"].isin(M_TEAMS)].copy()
-                    df_V = df_all[df_all["Team"].isin(V_TEAMS)].copy()
-
-                base_numeric = ["GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "PTS", "GD"]
-                extra_counts = (
-                    ["1G W", "1G L", "Blowout W", "Blowout L", "SO For", "SO Against", "10+ For", "10+ Against"]
-                    if detailed_mode
-                    else []
+
+            # --- KLASICKÁ TABUĽKA ---
+            if mode == "Klasická tabuľka":
+                scope = st.radio(
+                    "Zobraziť",
+                    ["Všetky tímy", "Len M tímy", "Len V tímy"],
+                    horizontal=True,
                 )
+                detailed = False
+                if scope == "Všetky tímy":
+                    detailed = st.checkbox("Zobraziť detailné metriky", value=False)
 
-                def make_total_row(sub: pd.DataFrame, label: str, side_val: str | None):
-                    row: dict = {}
-                    for col in df_all.columns:
-                        if pd.api.types.is_numeric_dtype(df_all[col]):
-                            row[col] = 0
-                        else:
-                            row[col] = "-"
-                    row["Team"] = label
+                # pomocná funkcia: súhrny Spolu M / V / ALL
+                def build_totals(df_all: pd.DataFrame, detailed_mode: bool) -> pd.DataFrame:
                     if "Side" in df_all.columns:
-                        row["Side"] = side_val if side_val else "-"
+                        df_M = df_all[df_all["Side"] == "M"].copy()
+                        df_V = df_all[df_all["Side"] == "V"].copy()
+                    else:
+                        df_M = df_all[df_all["Team"].isin(M_TEAMS)].copy()
+                        df_V = df_all[df_all["Team"].isin(V_TEAMS)].copy()
+
+                    base_numeric = ["GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "PTS", "GD"]
+                    extra_counts = (
+                        ["1G W", "1G L", "Blowout W", "Blowout L", "SO For", "SO Against", "10+ For", "10+ Against"]
+                        if detailed_mode
+                        else []
+                    )
 
-                    for c in base_numeric:
-                        if c in sub.columns:
-                            row[c] = int(sub[c].sum())
-                    row["GD"] = row["GF"] - row["GA"]
-                    row["P/GP"] = round((row["PTS"] / row["GP"]), 3) if row["GP"] else 0.0
+                    def make_total_row(sub: pd.DataFrame, label: str, side_val: str | None):
+                        row: dict = {}
+                        for col in df_all.columns:
+                            if pd.api.types.is_numeric_dtype(df_all[col]):
+                                row[col] = 0
+                            else:
+                                row[col] = "-"
+                        row["Team"] = label
+                        if "Side" in df_all.columns:
+                            row["Side"] = side_val if side_val else "-"
 
-                    if detailed_mode:
-                        for c in extra_counts:
+                        for c in base_numeric:
                             if c in sub.columns:
                                 row[c] = int(sub[c].sum())
-                        row["PTS%"] = round(
-                            (row["PTS"] / (row["GP"] * 3) * 100), 1
-                        ) if row["GP"] else 0.0
-                        row["GF/GP"] = round(
-                            (row["GF"] / row["GP"]), 3
-                        ) if row["GP"] else 0.0
-                        row["GA/GP"] = round(
-                            (row["GA"] / row["GP"]), 3
-                        ) if row["GP"] else 0.0
-                        row["AVG GD"] = round(
-                            (row["GD"] / row["GP"]), 3
-                        ) if row["GP"] else 0.0
-                        ot_games = row["W-OT"] + row["L-OT"]
-                        row["OT body"] = 2 * row["W-OT"] + 1 * row["L-OT"]
-                        row["OT%"] = round(
-                            ((ot_games / row["GP"]) * 100), 1
-                        ) if row["GP"] else 0.0
-                        if "Last5" in row:
-                            row["Last5"] = "-"
-                        if "Streak" in row:
-                            row["Streak"] = "-"
-
-                    return row
-
-                totals_M = make_total_row(df_M, "Spolu M", "M")
-                totals_V = make_total_row(df_V, "Spolu V", "V")
-                totals_ALL = make_total_row(df_all, "Spolu ALL", None)
-
-                totals_df = pd.DataFrame([totals_M, totals_V, totals_ALL])
-                totals_df.index = range(1, len(totals_df) + 1)
-                return totals_df
-
-            if scope == "Len M tímy":
-                tbl = compute_standings(df_matches, "M")
-                st.dataframe(tbl, use_container_width=True)
-
-            elif scope == "Len V tímy":
-                tbl = compute_standings(df_matches, "V")
-                st.dataframe(tbl, use_container_width=True)
+                        row["GD"] = row["GF"] - row["GA"]
+                        row["P/GP"] = round((row["PTS"] / row["GP"]), 3) if row["GP"] else 0.0
+
+                        if detailed_mode:
+                            for c in extra_counts:
+                                if c in sub.columns:
+                                    row[c] = int(sub[c].sum())
+                            row["PTS%"] = round(
+                                (row["PTS"] / (row["GP"] * DEFAULT_SCORING.max_points) * 100), 1
+                            ) if row["GP"] else 0.0
+                            row["GF/GP"] = round(
+                                (row["GF"] / row["GP"]), 3
+                            ) if row["GP"] else 0.0
+                            row["GA/GP"] = round(
+                                (row["GA"] / row["GP"]), 3
+                            ) if row["GP"] else 0.0
+                            row["AVG GD"] = round(
+                                (row["GD"] / row["GP"]), 3
+                            ) if row["GP"] else 0.0
+                            ot_games = row["W-OT"] + row["L-OT"]
+                            row["OT body"] = (
+                                DEFAULT_SCORING.ot_win * row["W-OT"] + DEFAULT_SCORING.ot_loss * row["L-OT"]
+                            )
+                            row["OT%"] = round(
+                                ((ot_games / row["GP"]) * 100), 1
+                            ) if row["GP"] else 0.0
+                            if "Last5" in row:
+                                row["Last5"] = "-"
+                            if "Streak" in row:
+                                row["Streak"] = "-"
 
-            else:
-                table_df = compute_standings(df_matches, "ALL", detailed=detailed)
-                table_df.index = range(1, len(table_df) + 1)
+                        return row
 
-                totals_df = build_totals(table_df, detailed_mode=detailed)
+                    totals_M = make_total_row(df_M, "Spolu M", "M")
+                    totals_V = make_total_row(df_V, "Spolu V", "V")
+                    totals_ALL = make_total_row(df_all, "Spolu ALL", None)
 
-                st.dataframe(
-                    table_df,
-                    use_container_width=True,
-                    hide_index=False,
-                    column_config={
-                        "Team": st.column_config.TextColumn("Team", pinned=True)
-                    },
-                )
+                    totals_df = pd.DataFrame([totals_M, totals_V, totals_ALL])
+                    totals_df.index = range(1, len(totals_df) + 1)
+                    return totals_df
 
-                st.markdown("#### Súhrny – Spolu M / Spolu V / Spolu ALL")
-                st.dataframe(totals_df, use_container_width=True)
+                if scope == "Len M tímy":
+                    tbl = standings_cached(db_path, league_id, season_id, data_version(conn), "M", False)
+                    st.dataframe(tbl, use_container_width=True)
 
-                # EXPORT DO EXCELU
-                excel_buffer = io.BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
-                    table_df.to_excel(
-                        writer, sheet_name="Tabulka", index=True
-                    )
-                    totals_df.to_excel(
-                        writer, sheet_name="Súhrny", index=True
+                elif scope == "Len V tímy":
+                    tbl = standings_cached(db_path, league_id, season_id, data_version(conn), "V", False)
+                    st.dataframe(tbl, use_container_width=True)
+
+                else:
+                    table_df = standings_cached(
+                        db_path, league_id, season_id, data_version(conn), "ALL", detailed
                     )
-                excel_buffer.seek(0)
-
-                st.download_button(
-                    "Exportovať tabuľku + súhrny do Excelu",
-                    data=excel_buffer,
-                    file_name=f"standings_{season_label.replace('/', '-')}.xlsx",
-                    mime=(
-                        "application/vnd.openxmlformats-officedocument."
-                        "spreadsheetml.sheet"
-                    ),
-                )
 
-                # Rekordy + Awards (ako predtým)
-                if not df_matches.empty:
-                    df_rec = df_matches.copy()
-                    df_rec["total_goals"] = df_rec["home_goals"] + df_rec["away_goals"]
-                    df_rec["diff_abs"] = (df_rec["home_goals"] - df_rec["away_goals"]).abs()
-                    df_rec["max_single"] = df_rec[["home_goals", "away_goals"]].max(axis=1)
-
-                    biggest_win = df_rec.sort_values("diff_abs", ascending=False).iloc[0]
-                    most_goals = df_rec.sort_values("total_goals", ascending=False).iloc[0]
-                    most_single = df_rec.sort_values("max_single", ascending=False).iloc[0]
-
-                    def fmt_match(row):
-                        return (
-                            f"{row['home_team']} {row['home_goals']} : "
-                            f"{row['away_goals']} {row['away_team']} (kolo {row['round']})"
-                        )
+                    totals_df = build_totals(table_df, detailed_mode=detailed)
 
-                    st.markdown("#### Rekordy sezóny")
-                    st.write(f"**Najvyššia výhra (najväčší gólový rozdiel):** {fmt_match(biggest_win)}")
-                    st.write(
-                        f"**Zápas s najviac gólmi spolu:** {fmt_match(most_goals)} – "
-                        f"{int(most_goals['total_goals'])} gólov"
-                    )
-                    if most_single["home_goals"] >= most_single["away_goals"]:
-                        tmax = most_single["home_team"]
-                        goals_max = int(most_single["home_goals"])
-                    else:
-                        tmax = most_single["away_team"]
-                        goals_max = int(most_single["away_goals"])
-                    st.write(
-                        f"**Najviac gólov jedného tímu v zápase:** {tmax} – "
-                        f"{goals_max} gólov ({fmt_match(most_single)})"
+                    st.dataframe(
+                        table_df,
+                        use_container_width=True,
+                        hide_index=False,
+                        column_config={
+                            "Team": st.column_config.TextColumn("Team", pinned=True)
+                        },
                     )
 
-                    st.markdown("### Prehľad sezóny – Awards")
+                    st.markdown("#### Súhrny – Spolu M / Spolu V / Spolu ALL")
+                    st.dataframe(totals_df, use_container_width=True)
 
-                    played = df_matches[
-                        (df_matches["home_goals"] != 0)
-                        | (df_matches["away_goals"] != 0)
-                    ].copy()
-
-                    if played.empty:
-                        st.info(
-                            "Zatiaľ nie sú odohrané žiadne zápasy v tejto sezóne – prehľad sezóny nie je k dispozícii."
-                        )
-                    else:
-                        total_games = len(played)
-                        hg = played["home_goals"].astype(int)
-                        ag = played["away_goals"].astype(int)
-                        diff = (hg - ag).abs()
+                    # EXPORT DO EXCELU
+                    excel_buffer = io.BytesIO()
+                    with tracing.span("Excel: tabuľka + súhrny") as span:
+                        with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
+                            table_df.to_excel(
+                                writer, sheet_name="Tabulka", index=True
+                            )
+                            totals_df.to_excel(
+                                writer, sheet_name="Súhrny", index=True
+                            )
+                        if span:
+                            span.nbytes = excel_buffer.tell()
+                    excel_buffer.seek(0)
+
+                    st.download_button(
+                        "Exportovať tabuľku + súhrny do Excelu",
+                        data=excel_buffer,
+                        file_name=f"standings_{season_label.replace('/', '-')}.xlsx",
+                        mime=(
+                            "application/vnd.openxmlformats-officedocument."
+                            "spreadsheetml.sheet"
+                        ),
+                    )
 
-                        ot_games = played["overtime"].astype(bool).sum()
-                        one_goal = (diff == 1).sum()
-                        blowouts = (diff >= 3).sum()
-                        ten_plus = ((hg >= 10) | (ag >= 10)).sum()
+                    # Rekordy + Awards (ako predtým)
+                    records = snap["records"] if snap else compute_season_records(df_matches)
+                    if records is not None:
+                        biggest_win = records["biggest_win"]
+                        most_goals = records["most_goals"]
+                        most_single = records["most_single"]
+
+                        def fmt_match(row):
+                            return (
+                                f"{row['home_team']} {row['home_goals']} : "
+                                f"{row['away_goals']} {row['away_team']} (kolo {row['round']})"
+                            )
 
-                        st.markdown(
-                            f"- Odohratých zápasov: **{total_games}**  \n"
-                            f"- Zápasy po predĺžení: **{ot_games}** ({ot_games / total_games * 100:.1f} %)  \n"
-                            f"- Zápasy rozdielom 1 gólu: **{one_goal}** ({one_goal / total_games * 100:.1f} %)  \n"
-                            f"- Zápasy rozdielom ≥3 góly: **{blowouts}** ({blowouts / total_games * 100:.1f} %)  \n"
-                            f"- Zápasy s aspoň 10 gólmi jedného tímu: **{ten_plus}** ({ten_plus / total_games * 100:.1f} %)"
+                        st.markdown("#### Rekordy sezóny")
+                        st.write(f"**Najvyššia výhra (najväčší gólový rozdiel):** {fmt_match(biggest_win)}")
+                        st.write(
+                            f"**Zápas s najviac gólmi spolu:** {fmt_match(most_goals)} – "
+                            f"{records['most_goals_total']} gólov"
+                        )
+                        tmax = records["most_single_team"]
+                        goals_max = records["most_single_goals"]
+                        st.write(
+                            f"**Najviac gólov jedného tímu v zápase:** {tmax} – "
+                            f"{goals_max} gólov ({fmt_match(most_single)})"
                         )
 
-                        tbl = table_df.copy()
-                        if "Side" in tbl.columns:
-                            tbl_M = tbl[tbl["Side"] == "M"].copy()
-                            tbl_V = tbl[tbl["Side"] == "V"].copy()
-                        else:
-                            tbl_M = tbl[tbl["Team"].isin(M_TEAMS)].copy()
-                            tbl_V = tbl[tbl["Team"].isin(V_TEAMS)].copy()
-
-                        def pick_best(df_teams: pd.DataFrame):
-                            if df_teams.empty:
-                                return None
-                            return df_teams.sort_values(
-                                by=["PTS", "P/GP", "GD", "GF"],
-                                ascending=[False, False, False, False],
-                            ).iloc[0]
+                        st.markdown("### Prehľad sezóny – Awards")
 
-                        best_M = pick_best(tbl_M)
-                        best_V = pick_best(tbl_V)
+                        summary = records["summary"]
 
-                        if best_M is not None:
-                            st.markdown(
-                                f"**Najlepší tím Matúša (M):** {best_M['Team']} – "
-                                f"{int(best_M['PTS'])} bodov, P/GP {best_M['P/GP']}, "
-                                f"skóre {int(best_M['GF'])}:{int(best_M['GA'])} (GD {int(best_M['GD'])})."
+                        if summary["games"] == 0:
+                            st.info(
+                                "Zatiaľ nie sú odohrané žiadne zápasy v tejto sezóne – prehľad sezóny nie je k dispozícii."
                             )
+                        else:
+                            total_games = summary["games"]
+                            ot_games = summary["ot"]
+                            one_goal = summary["one_goal"]
+                            blowouts = summary["blowout"]
+                            ten_plus = summary["ten_plus"]
 
-                        if best_V is not None:
                             st.markdown(
-                                f"**Najlepší tím Vlada (V):** {best_V['Team']} – "
-                                f"{int(best_V['PTS'])} bodov, P/GP {best_V['P/GP']}, "
-                                f"skóre {int(best_V['GF'])}:{int(best_V['GA'])} (GD {int(best_V['GD'])})."
+                                f"- Odohratých zápasov: **{total_games}**  \n"
+                                f"- Zápasy po predĺžení: **{ot_games}** ({ot_games / total_games * 100:.1f} %)  \n"
+                                f"- Zápasy rozdielom 1 gólu: **{one_goal}** ({one_goal / total_games * 100:.1f} %)  \n"
+                                f"- Zápasy rozdielom ≥3 góly: **{blowouts}** ({blowouts / total_games * 100:.1f} %)  \n"
+                                f"- Zápasy s aspoň 10 gólmi jedného tímu: **{ten_plus}** ({ten_plus / total_games * 100:.1f} %)"
                             )
 
-                        best_off = tbl.sort_values(
-                            by=["GF", "PTS", "GD"], ascending=[False, False, False]
-                        ).iloc[0]
-                        best_def = tbl.sort_values(
-                            by=["GA", "PTS", "GD"], ascending=[True, False, False]
-                        ).iloc[0]
+                            tbl = table_df.copy()
+                            if "Side" in tbl.columns:
+                                tbl_M = tbl[tbl["Side"] == "M"].copy()
+                                tbl_V = tbl[tbl["Side"] == "V"].copy()
+                            else:
+                                tbl_M = tbl[tbl["Team"].isin(M_TEAMS)].copy()
+                                tbl_V = tbl[tbl["Team"].isin(V_TEAMS)].copy()
+
+                            def pick_best(df_teams: pd.DataFrame):
+                                if df_teams.empty:
+                                    return None
+                                return df_teams.sort_values(
+                                    by=["PTS", "P/GP", "GD", "GF"],
+                                    ascending=[False, False, False, False],
+                                ).iloc[0]
+
+                            best_M = pick_best(tbl_M)
+                            best_V = pick_best(tbl_V)
+
+                            if best_M is not None:
+                                st.markdown(
+                                    f"**Najlepší tím Matúša (M):** {best_M['Team']} – "
+                                    f"{int(best_M['PTS'])} bodov, P/GP {best_M['P/GP']}, "
+                                    f"skóre {int(best_M['GF'])}:{int(best_M['GA'])} (GD {int(best_M['GD'])})."
+                                )
 
-                        st.markdown(
-                            f"**Najlepšia ofenzíva:** {best_off['Team']} – "
-                            f"{int(best_off['GF'])} strelených gólov."
-                        )
-                        st.markdown(
-                            f"**Najlepšia defenzíva:** {best_def['Team']} – "
-                            f"{int(best_def['GA'])} inkasovaných gólov."
-                        )
+                            if best_V is not None:
+                                st.markdown(
+                                    f"**Najlepší tím Vlada (V):** {best_V['Team']} – "
+                                    f"{int(best_V['PTS'])} bodov, P/GP {best_V['P/GP']}, "
+                                    f"skóre {int(best_V['GF'])}:{int(best_V['GA'])} (GD {int(best_V['GD'])})."
+                                )
 
-            if scope == "Všetky tímy" and detailed:
-                st.markdown(
-                    """
+                            best_off = tbl.sort_values(
+                                by=["GF", "PTS", "GD"], ascending=[False, False, False]
+                            ).iloc[0]
+                            best_def = tbl.sort_values(
+                                by=["GA", "PTS", "GD"], ascending=[True, False, False]
+                            ).iloc[0]
+
+                            st.markdown(
+                                f"**Najlepšia ofenzíva:** {best_off['Team']} – "
+                                f"{int(best_off['GF'])} strelených gólov."
+                            )
+                            st.markdown(
+                                f"**Najlepšia defenzíva:** {best_def['Team']} – "
+                                f"{int(best_def['GA'])} inkasovaných gólov."
+                            )
+
+                if scope == "Všetky tímy" and detailed:
+                    st.markdown(
+                        f"""
                 ### Vysvetlivky stĺpcov
                 - **Side** – M = tímy Matúša, V = tímy Vlada  
-                - **PTS%** – percento získaných bodov z maxima (PTS / (GP*3))  
+                - **PTS%** – percento získaných bodov z maxima (PTS / (GP*{DEFAULT_SCORING.max_points}))  
                 - **GF/GP**, **GA/GP** – priemer strelených a inkasovaných gólov na zápas  
                 - **AVG GD** – priemerný gólový rozdiel na zápas  
                 - **OT%** – percento zápasov, ktoré šli do predĺženia  
-                - **OT body** – body získané v predĺžení (2 za výhru, 1 za prehru)  
+                - **OT body** – body získané v predĺžení ({DEFAULT_SCORING.ot_win} za výhru, {DEFAULT_SCORING.ot_loss} za prehru)  
                 - **1G W/L** – výhry/prehry rozdielom 1 gólu  
                 - **Blowout W/L** – výhry/prehry rozdielom ≥3 góly  
                 - **SO For/Against** – koľkokrát tím udržal nulu / koľkokrát nedal gól  
@@ -960,52 +1227,59 @@ elif tab == "Tabuľky":
                 - **Last5** – posledných 5 výsledkov (W / W-OT / L-OT / L)  
                 - **Streak** – aktuálna šnúra (napr. W3, L-OT2)  
                 """
-                )
-
-        # --- POWER RANKING (ELO) ---
-        else:
-            if df_matches.empty:
-                st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
-            else:
-                scope_elo = st.radio(
-                    "Tímy",
-                    ["Všetky tímy", "Len M tímy", "Len V tímy"],
-                    horizontal=True,
-                )
+                    )
 
-                standings_all = compute_standings(
-                    df_matches, "ALL", detailed=False
-                )
-                elo_df = compute_elo_ratings(df_matches)
+            # --- POWER RANKING (ELO) ---
+            elif mode == "Power ranking (Elo)":
+                if df_matches.empty:
+                    st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+                else:
+                    scope_elo = st.radio(
+                        "Tímy",
+                        ["Všetky tímy", "Len M tímy", "Len V tímy"],
+                        horizontal=True,
+                    )
 
-                merged = standings_all.merge(
-                    elo_df[["Team", "Rating", "Games"]],
-                    on="Team",
-                    how="left",
-                )
+                    standings_all = standings_cached(
+                        db_path, league_id, season_id, data_version(conn), "ALL", False
+                    )
+                    elo_df, elo_hist = elo_cached(db_path, league_id, season_id, data_version(conn))
 
-                if scope_elo == "Len M tímy":
-                    merged = merged[merged["Side"] == "M"].copy()
-                elif scope_elo == "Len V tímy":
-                    merged = merged[merged["Side"] == "V"].copy()
+                    merged = standings_all.merge(
+                        elo_df[["Team", "Rating", "Games"]],
+                        on="Team",
+                        how="left",
+                    )
 
-                merged = merged.sort_values(
-                    by=["Rating", "PTS", "GD", "GF"],
-                    ascending=[False, False, False, False],
-                ).reset_index(drop=True)
-                merged.index = merged.index + 1
+                    if scope_elo == "Len M tímy":
+                        merged = merged[merged["Side"] == "M"].copy()
+                    elif scope_elo == "Len V tímy":
+                        merged = merged[merged["Side"] == "V"].copy()
+
+                    merged = merged.sort_values(
+                        by=["Rating", "PTS", "GD", "GF"],
+                        ascending=[False, False, False, False],
+                    ).reset_index(drop=True)
+                    merged.index = merged.index + 1
+
+                    st.dataframe(
+                        merged,
+                        use_container_width=True,
+                        hide_index=False,
+                        column_config={
+                            "Team": st.column_config.TextColumn("Team", pinned=True)
+                        },
+                    )
 
-                st.dataframe(
-                    merged,
-                    use_container_width=True,
-                    hide_index=False,
-                    column_config={
-                        "Team": st.column_config.TextColumn("Team", pinned=True)
-                    },
-                )
+                    if not elo_hist.empty:
+                        st.markdown("**Vývoj Elo ratingu po kolách**")
+                        st.line_chart(
+                            elo_hist.pivot(index="Round", columns="Team", values="Rating"),
+                            use_container_width=True,
+                        )
 
-                st.markdown(
-    """
+                    st.markdown(
+        """
 ### Ako funguje Elo (jednoduché vysvetlenie)
 
 - Každý tím začína na **1500 bodoch**.
@@ -1059,579 +1333,630 @@ a naopak: keď silný tím prehrá so slabým, stratí veľa.
 - Tím môže mať menej bodov ako iný, ale vyšší Elo (porazil silnejších).  
 - Reaguje na výsledky priebežne počas sezóny.  
 """
-                )
+                    )
 
+            # --- POSTUP A VYPADNUTIE (istota / vyradenie zo zvyšku rozpisu) ---
+            elif mode == "Postup a vypadnutie":
+                if df_matches.empty:
+                    st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+                else:
+                    scope_cl = st.radio(
+                        "Tímy",
+                        ["Všetky tímy", "Len M tímy", "Len V tímy"],
+                        horizontal=True,
+                        key="clinch_scope",
+                    )
+                    scope_code = {"Všetky tímy": "ALL", "Len M tímy": "M", "Len V tímy": "V"}[scope_cl]
+                    n_teams = len({"ALL": idx.teams.all, "M": idx.teams.m, "V": idx.teams.v}[scope_code])
+                    line = int(
+                        st.number_input(
+                            "Hranica postupu (prvých k tímov)",
+                            min_value=1,
+                            max_value=max(1, n_teams),
+                            value=min(4, max(1, n_teams)),
+                            key="clinch_k",
+                        )
+                    )
+                    thresholds = tuple(sorted({1, line}))
+                    clinch_df = clinch_cached(
+                        db_path, league_id, season_id, data_version(conn), scope_code, thresholds
+                    )
 
-        # --- PREKLIK: zápasy vybraného tímu (bez zásahu do iných tabov) ---
-        st.divider()
-        st.subheader("Zápasy vybraného tímu v tejto sezóne")
+                    remaining = int((df_matches["status"] != "played").sum())
+                    if not remaining:
+                        st.caption("Sezóna je dohraná – poradie je konečné.")
+                    st.dataframe(
+                        clinch_df,
+                        use_container_width=True,
+                        hide_index=False,
+                        column_config={
+                            "Team": st.column_config.TextColumn("Team", pinned=True)
+                        },
+                    )
+                    st.markdown(
+                        f"""
+**Vysvetlivky** (zvyšok sezóny = nevyplnené zápasy z rozpisu, body {DEFAULT_SCORING.label}):
+- **Zostáva** – zápasy tímu, ktoré sa ešte nehrali  
+- **Max / Min** – body po dohraní, ak tím všetko vyhrá / všetko prehrá  
+- **Top k** – *istý*: tím skončí medzi prvými k pri akýchkoľvek výsledkoch (aj pri rovnosti bodov), *vyradený*: nedostane sa tam ani pri najlepšom vývoji, *otvorené*: rozhodnú zvyšné zápasy, *?*: výpočet prekročil limit  
+- **Magic k** – koľko bodov musí tím ešte získať, aby mal prvých k istých bez ohľadu na ostatné výsledky (0 = už je istý); prázdne – nestačí ani vyhrať všetko  
+"""
+                    )
 
-        if df_matches.empty:
-            st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
-        else:
-            all_teams = M_TEAMS + V_TEAMS
-            team_sel = st.selectbox(
-                "Tím na zobrazenie zápasov",
-                all_teams,
-                index=0,
-                key="tbl_team_matches",
-            )
+            # --- SCENÁR (hypotetické výsledky zvyšných zápasov, bez zápisu do DB) ---
+            else:
+                fixtures = df_matches[df_matches["status"] != "played"]
+                if snap is not None:
+                    st.info("Sezóna je uzavretá – scenáre sa robia len pre rozohranú sezónu.")
+                elif fixtures.empty:
+                    st.info("V tejto sezóne už nie sú žiadne nevyplnené zápasy.")
+                else:
+                    scope_sc = st.radio(
+                        "Tímy",
+                        ["Všetky tímy", "Len M tímy", "Len V tímy"],
+                        horizontal=True,
+                        key="scenario_scope",
+                    )
+                    scope_code = {"Všetky tímy": "ALL", "Len M tímy": "M", "Len V tímy": "V"}[scope_sc]
+                    st.caption(
+                        "Zadaj hypotetické výsledky zvyšných zápasov – tabuľka a Elo sa prepočítajú "
+                        "hneď, do databázy sa nič nezapisuje. 0:0 = zápas sa neráta."
+                    )
+                    edited = st.data_editor(
+                        pd.DataFrame(
+                            {
+                                "id": fixtures["id"].to_numpy(),
+                                "Kolo": fixtures["round"].to_numpy(),
+                                "Domáci": fixtures["home_team"].to_numpy(),
+                                "Hostia": fixtures["away_team"].to_numpy(),
+                                "Góly D": 0,
+                                "Góly H": 0,
+                                "OT": False,
+                            }
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
+                        disabled=["Kolo", "Domáci", "Hostia"],
+                        column_config={
+                            "id": None,
+                            "Góly D": st.column_config.NumberColumn("Góly D", min_value=0, max_value=99, step=1),
+                            "Góly H": st.column_config.NumberColumn("Góly H", min_value=0, max_value=99, step=1),
+                            "OT": st.column_config.CheckboxColumn("OT"),
+                        },
+                        key=f"scenario_editor_{season_id}",
+                    )
 
-            df_team = df_matches[
-                (df_matches["home_team"] == team_sel)
-                | (df_matches["away_team"] == team_sel)
-            ].copy()
+                    overrides, draws = {}, []
+                    for mid, hg, ag, ot, home, away in zip(
+                        edited["id"], edited["Góly D"].fillna(0), edited["Góly H"].fillna(0),
+                        edited["OT"].fillna(False), edited["Domáci"], edited["Hostia"],
+                    ):
+                        hg, ag = int(hg), int(ag)
+                        if hg == ag:
+                            if hg:
+                                draws.append(f"{home} – {away} {hg}:{ag}")
+                            continue
+                        overrides[int(mid)] = (hg, ag, bool(ot))
+                    if draws:
+                        st.warning("Remízy nie sú povolené, tieto zápasy sa nerátajú: " + ", ".join(draws))
+
+                    scenario = scenario_cached(db_path, league_id, season_id, data_version(conn))
+                    now = scenario.apply(scope=scope_code).standings
+                    result = scenario.apply(overrides, scope=scope_code)
+                    table = result.standings.merge(result.elo[["Team", "Rating"]], on="Team", how="left")
+                    table.index = result.standings.index
+                    table.insert(1, "Teraz", pd.Index(now["Team"]).get_indexer(table["Team"]) + 1)
+
+                    st.markdown(f"**Tabuľka po scenári** ({len(overrides)} zadaných výsledkov)")
+                    st.dataframe(
+                        table,
+                        use_container_width=True,
+                        hide_index=False,
+                        column_config={
+                            "Team": st.column_config.TextColumn("Team", pinned=True)
+                        },
+                    )
+                    st.caption("**Teraz** – aktuálne poradie tímu, **Rating** – Elo po scenári.")
 
-            if df_team.empty:
-                st.info("Tento tím zatiaľ v sezóne neodohral žiadny zápas.")
+            # --- PREKLIK: zápasy vybraného tímu (bez zásahu do iných tabov) ---
+            st.divider()
+            st.subheader("Zápasy vybraného tímu v tejto sezóne")
+
+            if df_matches.empty:
+                st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
             else:
-                df_team["home_goals"] = df_team["home_goals"].astype(int)
-                df_team["away_goals"] = df_team["away_goals"].astype(int)
-                df_team["diff"] = (df_team["home_goals"] - df_team["away_goals"]).abs()
-                df_team["is_ot"] = df_team["overtime"].astype(bool)
-                df_team["is_one_goal"] = df_team["diff"] == 1
-                df_team["is_blowout"] = df_team["diff"] >= 3
-                df_team["is_ten_plus"] = (df_team["home_goals"] >= 10) | (
-                    df_team["away_goals"] >= 10
+                all_teams = M_TEAMS + V_TEAMS
+                team_sel = st.selectbox(
+                    "Tím na zobrazenie zápasov",
+                    all_teams,
+                    index=0,
+                    key="tbl_team_matches",
                 )
 
-                def flags_row_team(row):
-                    flags = []
-                    if row["is_ot"]:
-                        flags.append("OT")
-                    if row["is_one_goal"]:
-                        flags.append("1G")
-                    elif row["is_blowout"]:
-                        flags.append("BLOW")
-                    if row["is_ten_plus"]:
-                        flags.append("10+")
-                    return ", ".join(flags)
-
-                df_team["Info"] = df_team.apply(flags_row_team, axis=1)
-                df_team = df_team.sort_values(["round", "id"])
-
-                display_cols_team = [
-                    c
-                    for c in df_team.columns
-                    if c
-                    not in [
-                        "diff",
-                        "is_ot",
-                        "is_one_goal",
-                        "is_blowout",
-                        "is_ten_plus",
-                    ]
-                ]
-
-                st.dataframe(df_team[display_cols_team], use_container_width=True)
-
-# --- Grafy ---
-elif tab == "Grafy":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
-    else:
-        season_label = st.selectbox(
-            "Sezóna",
-            seasons["label"],
-            key="graph_season",
-            index=max(0, len(seasons) - 1),
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
+                df_team = idx.team_frame(team_sel).copy()
 
-        df = fetch_matches(conn, season_id)
+                if df_team.empty:
+                    st.info("Tento tím zatiaľ v sezóne neodohral žiadny zápas.")
+                else:
+                    df_team["home_goals"] = df_team["home_goals"].astype(int)
+                    df_team["away_goals"] = df_team["away_goals"].astype(int)
+                    df_team["diff"] = (df_team["home_goals"] - df_team["away_goals"]).abs()
+                    df_team["is_ot"] = df_team["overtime"].astype(bool)
+                    df_team["is_one_goal"] = df_team["diff"] == 1
+                    df_team["is_blowout"] = df_team["diff"] >= 3
+                    df_team["is_ten_plus"] = (df_team["home_goals"] >= 10) | (
+                        df_team["away_goals"] >= 10
+                    )
 
-        mode = st.radio(
-            "Režim",
-            ["Jeden tím", "Porovnanie viacerých tímov"],
-            horizontal=True,
-        )
+                    def flags_row_team(row):
+                        flags = []
+                        if row["is_ot"]:
+                            flags.append("OT")
+                        if row["is_one_goal"]:
+                            flags.append("1G")
+                        elif row["is_blowout"]:
+                            flags.append("BLOW")
+                        if row["is_ten_plus"]:
+                            flags.append("10+")
+                        return ", ".join(flags)
+
+                    df_team["Info"] = df_team.apply(flags_row_team, axis=1)
+                    df_team = df_team.sort_values(["round", "id"])
+
+                    display_cols_team = [
+                        c
+                        for c in df_team.columns
+                        if c
+                        not in [
+                            "diff",
+                            "is_ot",
+                            "is_one_goal",
+                            "is_blowout",
+                            "is_ten_plus",
+                        ]
+                    ]
 
-        all_teams = M_TEAMS + V_TEAMS
+                    st.dataframe(df_team[display_cols_team], use_container_width=True)
 
-        # --- Režim: jeden tím (ako doteraz) ---
-        if mode == "Jeden tím":
-            team = st.selectbox("Tím", all_teams, index=0)
+    # --- Grafy ---
+    elif tab == "Grafy":
+        seasons = load_seasons(conn, league_id)
+        if seasons.empty:
+            st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
+        else:
+            season_label = st.selectbox(
+                "Sezóna",
+                seasons["label"],
+                key="graph_season",
+                index=max(0, len(seasons) - 1),
+            )
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
+            )
 
-            team_df = df[(df["home_team"] == team) | (df["away_team"] == team)].copy()
+            idx = season_index_cached(db_path, league_id, season_id, data_version(conn))
+            df = idx.frame
 
-            if team_df.empty:
-                st.info("Tento tím zatiaľ v sezóne neodohral žiadny zápas.")
-            else:
-                # zoradíme zápasy podľa kola a ID
-                team_df = team_df.sort_values(["round", "id"])
-
-                rows = []
-                pts_cum = 0
-                games = 0
-
-                for _, m in team_df.iterrows():
-                    h = m["home_team"]
-                    a = m["away_team"]
-                    hg = int(m["home_goals"])
-                    ag = int(m["away_goals"])
-                    ot = bool(m["overtime"])
-
-                    # z pohľadu vybraného tímu
-                    if h == team:
-                        gf, ga = hg, ag
-                        opp = a
-                        pts_team, pts_opp = result_points(hg, ag, ot)
-                        pts_this = pts_team
-                        ha = "D"  # domáci
-                    else:
-                        gf, ga = ag, hg
-                        opp = h
-                        pts_team, pts_opp = result_points(hg, ag, ot)
-                        pts_this = pts_opp
-                        ha = "V"  # vonku
-
-                    if gf == ga:
-                        result_code = "?"
-                    elif gf > ga:
-                        result_code = "W-OT" if ot else "W"
-                    else:
-                        result_code = "L-OT" if ot else "L"
+            mode = st.radio(
+                "Režim",
+                ["Jeden tím", "Porovnanie viacerých tímov"],
+                horizontal=True,
+            )
 
-                    games += 1
-                    pts_cum += pts_this
-                    pts_per_game = round(pts_cum / games, 3)
+            all_teams = M_TEAMS + V_TEAMS
 
-                    rows.append(
-                        {
-                            "Round": int(m["round"]),
-                            "Opponent": opp,
-                            "H/V": ha,
-                            "GF": gf,
-                            "GA": ga,
-                            "Result": result_code,
-                            "Points": pts_this,
-                            "GP": games,
-                            "PTS_total": pts_cum,
-                            "PTS_per_game": pts_per_game,
-                        }
-                    )
+            # --- Režim: jeden tím (ako doteraz) ---
+            if mode == "Jeden tím":
+                team = st.selectbox("Tím", all_teams, index=0)
 
-                prog_df = pd.DataFrame(rows).sort_values("Round")
-                prog_df.reset_index(drop=True, inplace=True)
+                team_df = idx.team_frame(team)
 
-                st.subheader(f"Vývoj bodov – {team}")
-                st.dataframe(prog_df, use_container_width=True)
+                if team_df.empty:
+                    st.info("Tento tím zatiaľ v sezóne neodohral žiadny zápas.")
+                else:
+                    # index vracia zápasy už zoradené podľa kola a ID
+                    prog_df = team_progression(team_df, team)
 
-                chart_pts = prog_df.set_index("Round")[["PTS_total"]]
-                chart_ppg = prog_df.set_index("Round")[["PTS_per_game"]]
+                    st.subheader(f"Vývoj bodov – {team}")
+                    st.dataframe(prog_df, use_container_width=True)
 
-                st.markdown("**Kumulatívne body (PTS_total)**")
-                st.line_chart(chart_pts, use_container_width=True)
+                    chart_pts = prog_df.set_index("Round")[["PTS_total"]]
+                    chart_ppg = prog_df.set_index("Round")[["PTS_per_game"]]
 
-                st.markdown("**Priemerné body na zápas (PTS_per_game)**")
-                st.line_chart(chart_ppg, use_container_width=True)
+                    st.markdown("**Kumulatívne body (PTS_total)**")
+                    st.line_chart(chart_pts, use_container_width=True)
 
-        # --- Režim: porovnanie viacerých tímov ---
-        else:
-            teams_sel = st.multiselect(
-                "Vyber tímy na porovnanie",
-                all_teams,
-                default=[M_TEAMS[0], V_TEAMS[0]],
-            )
+                    st.markdown("**Priemerné body na zápas (PTS_per_game)**")
+                    st.line_chart(chart_ppg, use_container_width=True)
 
-            if len(teams_sel) < 2:
-                st.info("Vyber aspoň dva tímy.")
-            elif df.empty:
-                st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+            # --- Režim: porovnanie viacerých tímov ---
             else:
-                pts_total_by_team = {}
-                ppg_by_team = {}
-
-                for team in teams_sel:
-                    team_df = df[
-                        (df["home_team"] == team) | (df["away_team"] == team)
-                    ].copy()
-                    if team_df.empty:
-                        continue
-
-                    team_df = team_df.sort_values(["round", "id"])
-
-                    pts_cum = 0
-                    games = 0
-                    rows = []
+                teams_sel = st.multiselect(
+                    "Vyber tímy na porovnanie",
+                    all_teams,
+                    default=[M_TEAMS[0], V_TEAMS[0]],
+                )
 
-                    for _, m in team_df.iterrows():
-                        h = m["home_team"]
-                        a = m["away_team"]
-                        hg = int(m["home_goals"])
-                        ag = int(m["away_goals"])
-                        ot = bool(m["overtime"])
+                if len(teams_sel) < 2:
+                    st.info("Vyber aspoň dva tímy.")
+                elif df.empty:
+                    st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+                else:
+                    pts_total_by_team = {}
+                    ppg_by_team = {}
 
-                        if h == team:
-                            pts_team, pts_opp = result_points(hg, ag, ot)
-                            pts_this = pts_team
-                        else:
-                            pts_team, pts_opp = result_points(hg, ag, ot)
-                            pts_this = pts_opp
+                    for team in teams_sel:
+                        team_df = idx.team_frame(team)
+                        if team_df.empty:
+                            continue
 
-                        # remízy by nemali byť, ale pre istotu:
-                        if hg == ag:
+                        tdf = points_progression(team_df, team)
+                        if tdf.empty:
                             continue
 
-                        games += 1
-                        pts_cum += pts_this
-                        pts_per_game = pts_cum / games
+                        pts_total_by_team[team] = tdf["PTS_total"]
+                        ppg_by_team[team] = tdf["PTS_per_game"]
 
-                        rows.append(
-                            {
-                                "Round": int(m["round"]),
-                                "PTS_total": pts_cum,
-                                "PTS_per_game": round(pts_per_game, 3),
-                            }
+                    if not pts_total_by_team:
+                        st.info(
+                            "Žiadny z vybraných tímov zatiaľ neodohral zápas v tejto sezóne."
+                        )
+                    else:
+                        chart_pts = (
+                            pd.DataFrame(pts_total_by_team)
+                            .sort_index()
+                            .astype(float)
+                        )
+                        chart_ppg = (
+                            pd.DataFrame(ppg_by_team).sort_index().astype(float)
                         )
 
-                    if not rows:
-                        continue
-
-                    tdf = pd.DataFrame(rows).drop_duplicates("Round").set_index(
-                        "Round"
-                    )
-
-                    pts_total_by_team[team] = tdf["PTS_total"]
-                    ppg_by_team[team] = tdf["PTS_per_game"]
-
-                if not pts_total_by_team:
-                    st.info(
-                        "Žiadny z vybraných tímov zatiaľ neodohral zápas v tejto sezóne."
-                    )
-                else:
-                    chart_pts = (
-                        pd.DataFrame(pts_total_by_team)
-                        .sort_index()
-                        .astype(float)
-                    )
-                    chart_ppg = (
-                        pd.DataFrame(ppg_by_team).sort_index().astype(float)
-                    )
-
-                    st.subheader("Porovnanie – kumulatívne body (PTS_total)")
-                    st.line_chart(chart_pts, use_container_width=True)
+                        st.subheader("Porovnanie – kumulatívne body (PTS_total)")
+                        st.line_chart(chart_pts, use_container_width=True)
 
-                    st.subheader("Porovnanie – priemerné body na zápas (PTS_per_game)")
-                    st.line_chart(chart_ppg, use_container_width=True)
+                        st.subheader("Porovnanie – priemerné body na zápas (PTS_per_game)")
+                        st.line_chart(chart_ppg, use_container_width=True)
 
-                    st.markdown(
-                        """
+                        st.markdown(
+                            """
                         - Osa X = kolo (Round)  
                         - Kumulatívne body = suma bodov tímu po jednotlivých kolách  
                         - PTS_per_game = priemerný počet bodov na zápas v danom bode sezóny  
                         """
-                    )
+                        )
 
-# --- Head-to-Head ---
-elif tab == "Head-to-Head":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
-    else:
-        season_label = st.selectbox(
-            "Sezóna",
-            seasons["label"],
-            key="h2h_season",
-            index=max(0, len(seasons) - 1),
-        )
-        season_id = int(
-            seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
-        )
-        df = fetch_matches(conn, season_id)
-
-        # --- Pair head-to-head (single M vs single V) ---
-        st.subheader("Head-to-Head dvojíc")
-
-        c1, c2 = st.columns(2)
-        with c1:
-            t1 = st.selectbox("Tím 1 (M)", M_TEAMS, index=0)
-        with c2:
-            t2 = st.selectbox("Tím 2 (V)", V_TEAMS, index=0)
-
-        h2h = df[
-            ((df.home_team == t1) & (df.away_team == t2))
-            | ((df.home_team == t2) & (df.away_team == t1))
-        ].copy()
-        st.dataframe(h2h, use_container_width=True)
-
-        if not h2h.empty:
-            w1 = otw1 = otl1 = 0
-            g1 = g2 = 0
-            for _, m in h2h.iterrows():
-                if m.home_team == t1:
-                    g1 += m.home_goals
-                    g2 += m.away_goals
-                    if m.home_goals > m.away_goals:
-                        if m.overtime:
-                            otw1 += 1
+    # --- Head-to-Head ---
+    elif tab == "Head-to-Head":
+        seasons = load_seasons(conn, league_id)
+        if seasons.empty:
+            st.info("Najprv vytvor sezónu v sekcii 'Sezóny'.")
+        else:
+            season_label = st.selectbox(
+                "Sezóna",
+                seasons["label"],
+                key="h2h_season",
+                index=max(0, len(seasons) - 1),
+            )
+            season_id = int(
+                seasons.loc[seasons["label"] == season_label, "id"].iloc[0]
+            )
+            idx = season_index_cached(db_path, league_id, season_id, data_version(conn))
+            df = idx.frame
+
+            # --- Pair head-to-head (single M vs single V) ---
+            st.subheader("Head-to-Head dvojíc")
+
+            c1, c2 = st.columns(2)
+            with c1:
+                t1 = st.selectbox("Tím 1 (M)", M_TEAMS, index=0)
+            with c2:
+                t2 = st.selectbox("Tím 2 (V)", V_TEAMS, index=0)
+
+            h2h = idx.pair_frame(t1, t2)
+            st.dataframe(h2h, use_container_width=True)
+
+            if not h2h.empty:
+                w1 = otw1 = otl1 = 0
+                g1 = g2 = 0
+                for _, m in h2h.iterrows():
+                    if m.home_team == t1:
+                        g1 += m.home_goals
+                        g2 += m.away_goals
+                        if m.home_goals > m.away_goals:
+                            if m.overtime:
+                                otw1 += 1
+                            else:
+                                w1 += 1
                         else:
-                            w1 += 1
-                    else:
-                        if m.overtime:
-                            otl1 += 1
-                elif m.away_team == t1:
-                    g1 += m.away_goals
-                    g2 += m.home_goals
-                    if m.away_goals > m.home_goals:
-                        if m.overtime:
-                            otw1 += 1
+                            if m.overtime:
+                                otl1 += 1
+                    elif m.away_team == t1:
+                        g1 += m.away_goals
+                        g2 += m.home_goals
+                        if m.away_goals > m.home_goals:
+                            if m.overtime:
+                                otw1 += 1
+                            else:
+                                w1 += 1
                         else:
-                            w1 += 1
-                    else:
-                        if m.overtime:
-                            otl1 += 1
-            st.write(
-                f"**Súhrn {t1} vs {t2}:** "
-                f"Víťazstvá v riadnom čase {w1}, po predĺžení {otw1}; "
-                f"prehry po predĺžení {otl1}. "
-                f"Góly {t1}:{t2} = {g1}:{g2}."
-            )
+                            if m.overtime:
+                                otl1 += 1
+                st.write(
+                    f"**Súhrn {t1} vs {t2}:** "
+                    f"Víťazstvá v riadnom čase {w1}, po predĺžení {otw1}; "
+                    f"prehry po predĺžení {otl1}. "
+                    f"Góly {t1}:{t2} = {g1}:{g2}."
+                )
 
-        st.divider()
+            st.divider()
 
-        # --- Season M×V matrix ---
-        st.subheader("Sezónny matrix M × V")
+            # --- Season M×V matrix ---
+            st.subheader("Sezónny matrix M × V")
 
-        if df.empty:
-            st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
-        else:
-            # prepare base structure: for each M-V pair
-            matrix = {
-                (m, v): {
-                    "GP": 0,
-                    "PTS_M": 0,
-                    "PTS_V": 0,
-                    "GF_M": 0,
-                    "GA_M": 0,
+            if df.empty:
+                st.info("V tejto sezóne zatiaľ nie sú žiadne zápasy.")
+            else:
+                h2h_df = h2h_cached(db_path, league_id, season_id, data_version(conn))
+                matrix = {
+                    (r["M"], r["V"]): r for r in h2h_df.to_dict("records")
                 }
-                for m in M_TEAMS
-                for v in V_TEAMS
-            }
 
-            # aggregate all matches in season
-            for _, mrow in df.iterrows():
-                h = mrow["home_team"]
-                a = mrow["away_team"]
-                hg = int(mrow["home_goals"])
-                ag = int(mrow["away_goals"])
-                ot = bool(mrow["overtime"])
-
-                # ignore remízy, rovnako ako v standings (nemali by byť)
-                if hg == ag:
-                    continue
-
-                # match between some M and some V
-                if h in M_TEAMS and a in V_TEAMS:
-                    m_team = h
-                    v_team = a
-                    pts_home, pts_away = result_points(hg, ag, ot)
-                    key = (m_team, v_team)
-                    matrix[key]["GP"] += 1
-                    matrix[key]["PTS_M"] += pts_home
-                    matrix[key]["PTS_V"] += pts_away
-                    matrix[key]["GF_M"] += hg
-                    matrix[key]["GA_M"] += ag
-
-                elif h in V_TEAMS and a in M_TEAMS:
-                    m_team = a
-                    v_team = h
-                    pts_home, pts_away = result_points(hg, ag, ot)
-                    key = (m_team, v_team)
-                    matrix[key]["GP"] += 1
-                    # home is V, away is M
-                    matrix[key]["PTS_M"] += pts_away
-                    matrix[key]["PTS_V"] += pts_home
-                    matrix[key]["GF_M"] += ag
-                    matrix[key]["GA_M"] += hg
-
-            view_mode = st.radio(
-                "Zobraziť v matici",
-                ["Body M:V", "Góly M:V"],
-                horizontal=True,
-            )
+                view_mode = st.radio(
+                    "Zobraziť v matici",
+                    ["Body M:V", "Góly M:V"],
+                    horizontal=True,
+                )
 
-            rows_pts = []
-            rows_goals = []
-
-            for m_team in M_TEAMS:
-                row_pts = {"M\\V": m_team}
-                row_goals = {"M\\V": m_team}
-                for v_team in V_TEAMS:
-                    cell = matrix[(m_team, v_team)]
-                    if cell["GP"] == 0:
-                        row_pts[v_team] = ""
-                        row_goals[v_team] = ""
-                    else:
-                        row_pts[v_team] = f"{cell['PTS_M']}:{cell['PTS_V']}"
-                        row_goals[v_team] = f"{cell['GF_M']}:{cell['GA_M']}"
-                rows_pts.append(row_pts)
-                rows_goals.append(row_goals)
+                rows_pts = []
+                rows_goals = []
+
+                for m_team in M_TEAMS:
+                    row_pts = {"M\\V": m_team}
+                    row_goals = {"M\\V": m_team}
+                    for v_team in V_TEAMS:
+                        cell = matrix[(m_team, v_team)]
+                        if cell["GP"] == 0:
+                            row_pts[v_team] = ""
+                            row_goals[v_team] = ""
+                        else:
+                            row_pts[v_team] = f"{cell['PTS_M']}:{cell['PTS_V']}"
+                            row_goals[v_team] = f"{cell['GF_M']}:{cell['GA_M']}"
+                    rows_pts.append(row_pts)
+                    rows_goals.append(row_goals)
 
-            df_pts = pd.DataFrame(rows_pts).set_index("M\\V")
-            df_goals = pd.DataFrame(rows_goals).set_index("M\\V")
+                df_pts = pd.DataFrame(rows_pts).set_index("M\\V")
+                df_goals = pd.DataFrame(rows_goals).set_index("M\\V")
 
-            if view_mode == "Body M:V":
-                st.write("**Body M:V za vzájomné zápasy v sezóne**")
-                st.dataframe(df_pts, use_container_width=True)
-            else:
-                st.write("**Góly M:V za vzájomné zápasy v sezóne**")
-                st.dataframe(df_goals, use_container_width=True)
+                if view_mode == "Body M:V":
+                    st.write("**Body M:V za vzájomné zápasy v sezóne**")
+                    st.dataframe(df_pts, use_container_width=True)
+                else:
+                    st.write("**Góly M:V za vzájomné zápasy v sezóne**")
+                    st.dataframe(df_goals, use_container_width=True)
 
-            st.markdown(
-                """
+                st.markdown(
+                    """
                 - Riadky = M tímy (Matus)  
                 - Stĺpce = V tímy (Vlado)  
                 - Hodnoty:
                   - pri režime *Body M:V* je to súčet bodov M a V vo vzájomných zápasoch v sezóne
                   - pri režime *Góly M:V* je to súčet gólov M a V vo vzájomných zápasoch v sezóne
                 """
-            )
+                )
 
-# --- Viac sezón ---
-elif tab == "Viac sezón":
-    seasons = load_seasons(conn)
-    if seasons.empty:
-        st.info("Najprv vytvor sezóny v sekcii 'Sezóny'.")
-    else:
-        st.subheader("Vývoj jedného tímu naprieč sezónami")
+    # --- Viac sezón ---
+    elif tab == "Viac sezón":
+        seasons = load_seasons(conn, league_id)
+        if seasons.empty:
+            st.info("Najprv vytvor sezóny v sekcii 'Sezóny'.")
+        else:
+            st.subheader("Vývoj jedného tímu naprieč sezónami")
 
-        seasons_sorted = seasons.sort_values("id")
-        all_teams = M_TEAMS + V_TEAMS
+            seasons_sorted = seasons.sort_values("id")
+            all_teams = M_TEAMS + V_TEAMS
 
-        team = st.selectbox("Tím", all_teams, index=0)
+            team = st.selectbox("Tím", all_teams, index=0)
 
-        rows_team = []
-        for _, srow in seasons_sorted.iterrows():
-            sid = int(srow["id"])
-            slabel = srow["label"]
-            matches_season = fetch_matches(conn, sid)
+            # celá história raz, ako kompaktné polia; sezóny sú len view do nich
+            history = history_cached(db_path, league_id, data_version(conn))
+            # tabuľky sezón: uzavreté zo snapshotov, otvorené z histórie (pozri loaders)
+            season_tables = league_standings_cached(db_path, league_id, data_version(conn))
 
-            if matches_season.empty:
-                rows_team.append(
-                    {
-                        "Sezóna": slabel,
-                        "GP": 0,
-                        "PTS": 0,
-                        "P/GP": 0.0,
-                        "GF": 0,
-                        "GA": 0,
-                        "GD": 0,
-                    }
-                )
-                continue
+            rows_team = []
+            for _, srow in seasons_sorted.iterrows():
+                sid = int(srow["id"])
+                slabel = srow["label"]
+                matches_season = history.season_view(sid)
 
-            standings_all = compute_standings(matches_season, "ALL", detailed=False)
-            row_team = standings_all[standings_all["Team"] == team]
+                if matches_season.empty:
+                    rows_team.append(
+                        {
+                            "Sezóna": slabel,
+                            "GP": 0,
+                            "PTS": 0,
+                            "P/GP": 0.0,
+                            "GF": 0,
+                            "GA": 0,
+                            "GD": 0,
+                        }
+                    )
+                    continue
 
-            if row_team.empty:
-                rows_team.append(
-                    {
-                        "Sezóna": slabel,
-                        "GP": 0,
-                        "PTS": 0,
-                        "P/GP": 0.0,
-                        "GF": 0,
-                        "GA": 0,
-                        "GD": 0,
-                    }
-                )
-            else:
-                r = row_team.iloc[0]
-                rows_team.append(
-                    {
-                        "Sezóna": slabel,
-                        "GP": int(r["GP"]),
-                        "PTS": int(r["PTS"]),
-                        "P/GP": float(r["P/GP"]),
-                        "GF": int(r["GF"]),
-                        "GA": int(r["GA"]),
-                        "GD": int(r["GD"]),
-                    }
-                )
+                standings_all = season_tables[sid]
+                row_team = standings_all[standings_all["Team"] == team]
+
+                if row_team.empty:
+                    rows_team.append(
+                        {
+                            "Sezóna": slabel,
+                            "GP": 0,
+                            "PTS": 0,
+                            "P/GP": 0.0,
+                            "GF": 0,
+                            "GA": 0,
+                            "GD": 0,
+                        }
+                    )
+                else:
+                    r = row_team.iloc[0]
+                    rows_team.append(
+                        {
+                            "Sezóna": slabel,
+                            "GP": int(r["GP"]),
+                            "PTS": int(r["PTS"]),
+                            "P/GP": float(r["P/GP"]),
+                            "GF": int(r["GF"]),
+                            "GA": int(r["GA"]),
+                            "GD": int(r["GD"]),
+                        }
+                    )
 
-        df_team_multi = pd.DataFrame(rows_team)
+            df_team_multi = pd.DataFrame(rows_team)
 
-        st.dataframe(df_team_multi, use_container_width=True)
+            st.dataframe(df_team_multi, use_container_width=True)
 
-        if not df_team_multi.empty:
-            chart_pts = df_team_multi.set_index("Sezóna")[["PTS"]]
-            st.markdown("**PTS podľa sezón**")
-            st.line_chart(chart_pts, use_container_width=True)
+            if not df_team_multi.empty:
+                chart_pts = df_team_multi.set_index("Sezóna")[["PTS"]]
+                st.markdown("**PTS podľa sezón**")
+                st.line_chart(chart_pts, use_container_width=True)
 
-        st.divider()
-        st.subheader("Historická tabuľka všetkých tímov (všetky sezóny)")
-
-        # agregované štatistiky cez všetky sezóny
-        stats_hist = {
-            t: {"Team": t, "GP": 0, "PTS": 0, "GF": 0, "GA": 0}
-            for t in all_teams
-        }
-
-        for _, srow in seasons_sorted.iterrows():
-            sid = int(srow["id"])
-            matches_season = fetch_matches(conn, sid)
-            if matches_season.empty:
-                continue
-
-            standings_all = compute_standings(matches_season, "ALL", detailed=False)
-            for _, r in standings_all.iterrows():
-                t = r["Team"]
-                if t not in stats_hist:
+            st.divider()
+            st.subheader("Historická tabuľka všetkých tímov (všetky sezóny)")
+
+            # agregované štatistiky cez všetky sezóny
+            stats_hist = {
+                t: {"Team": t, "GP": 0, "PTS": 0, "GF": 0, "GA": 0}
+                for t in all_teams
+            }
+
+            for _, srow in seasons_sorted.iterrows():
+                sid = int(srow["id"])
+                matches_season = history.season_view(sid)
+                if matches_season.empty:
                     continue
-                stats_hist[t]["GP"] += int(r["GP"])
-                stats_hist[t]["PTS"] += int(r["PTS"])
-                stats_hist[t]["GF"] += int(r["GF"])
-                stats_hist[t]["GA"] += int(r["GA"])
-
-        hist_rows = []
-        for t, vals in stats_hist.items():
-            gp = vals["GP"]
-            pts = vals["PTS"]
-            gf = vals["GF"]
-            ga = vals["GA"]
-            gd = gf - ga
-            ppg = round(pts / gp, 3) if gp > 0 else 0.0
-            hist_rows.append(
-                {
-                    "Team": t,
-                    "Side": "M" if t in M_TEAMS else "V",
-                    "GP": gp,
-                    "PTS": pts,
-                    "P/GP": ppg,
-                    "GF": gf,
-                    "GA": ga,
-                    "GD": gd,
-                }
-            )
 
-        df_hist = pd.DataFrame(hist_rows)
-        df_hist = df_hist.sort_values(
-            by=["PTS", "P/GP", "GD", "GF"],
-            ascending=[False, False, False, False],
-        ).reset_index(drop=True)
-        df_hist.index = df_hist.index + 1
-
-        st.dataframe(
-            df_hist,
-            use_container_width=True,
-            hide_index=False,
-            column_config={
-                "Team": st.column_config.TextColumn("Team", pinned=True)
-            },
-        )
+                standings_all = season_tables[sid]
+                for _, r in standings_all.iterrows():
+                    t = r["Team"]
+                    if t not in stats_hist:
+                        continue
+                    stats_hist[t]["GP"] += int(r["GP"])
+                    stats_hist[t]["PTS"] += int(r["PTS"])
+                    stats_hist[t]["GF"] += int(r["GF"])
+                    stats_hist[t]["GA"] += int(r["GA"])
+
+            hist_rows = []
+            for t, vals in stats_hist.items():
+                gp = vals["GP"]
+                pts = vals["PTS"]
+                gf = vals["GF"]
+                ga = vals["GA"]
+                gd = gf - ga
+                ppg = round(pts / gp, 3) if gp > 0 else 0.0
+                hist_rows.append(
+                    {
+                        "Team": t,
+                        "Side": team_set.side(t),
+                        "GP": gp,
+                        "PTS": pts,
+                        "P/GP": ppg,
+                        "GF": gf,
+                        "GA": ga,
+                        "GD": gd,
+                    }
+                )
 
-        st.markdown(
-            """
+            df_hist = pd.DataFrame(hist_rows)
+            df_hist = df_hist.sort_values(
+                by=["PTS", "P/GP", "GD", "GF"],
+                ascending=[False, False, False, False],
+            ).reset_index(drop=True)
+            df_hist.index = df_hist.index + 1
+
+            st.dataframe(
+                df_hist,
+                use_container_width=True,
+                hide_index=False,
+                column_config={
+                    "Team": st.column_config.TextColumn("Team", pinned=True)
+                },
+            )
+
+            st.markdown(
+                """
             - **Vývoj jedného tímu**: vidíš, ako sa menia štatistiky (GP, PTS, P/GP, GF, GA, GD) medzi sezónami.  
             - **Historická tabuľka**: všetky sezóny dokopy – celkové GP, PTS, P/GP, GF, GA, GD pre každý tím.  
             """
-        )
+            )
 
-st.caption(
-    "M tímy = FIN, SWE, USA, NEM, DAN, FRA, RAK, MAD; "
-    "V tímy = KAN, CES, SVK, SUI, LOT, NOR, KAZ, SLO. Body: 3/2/1/0."
-)
+            st.divider()
+            st.subheader("Export celej ligy (všetky sezóny)")
+            st.write(
+                "Zápasy, tabuľky, Elo a H2H matice všetkých sezón. "
+                "Export sa zapisuje priebežne po dávkach, pamäť nerastie s počtom sezón."
+            )
+            export_fmt = st.radio(
+                "Formát exportu", list(EXPORT_FORMATS), horizontal=True, key="league_export_fmt"
+            )
+            if st.button("Pripraviť export"):
+                # súbor v EXPORT_DIR (liga + verzia dát), v session_state je len cesta
+                try:
+                    with tracing.span("export ligy") as span:
+                        export_path = export_file(
+                            conn, source_path, data_version(conn), EXPORT_DIR, export_fmt, league_id
+                        )
+                        if span:
+                            span.nbytes = os.path.getsize(export_path)
+                    st.session_state["league_export"] = (export_path, export_fmt, league_id)
+                except RuntimeError as e:
+                    st.error(str(e))
+
+            if "league_export" in st.session_state:
+                export_path, exported_fmt, exported_league = st.session_state["league_export"]
+                if exported_league == league_id and os.path.exists(export_path):
+                    suffix = ".xlsx" if exported_fmt == "xlsx" else f"_{exported_fmt}.zip"
+                    st.download_button(
+                        f"Stiahnuť export ({exported_fmt})",
+                        data=partial(read_file, export_path),
+                        file_name=f"liga_vsetky_sezony{suffix}",
+                        mime=(
+                            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                            if exported_fmt == "xlsx"
+                            else "application/zip"
+                        ),
+                    )
+
+    st.caption(
+        f"M tímy = {', '.join(M_TEAMS)}; "
+        f"V tímy = {', '.join(V_TEAMS)}. Body: {DEFAULT_SCORING.label}."
+    )
+
+
+st.title("Stolný hokej – štatistiky (M doma vs V vonku)")
+
+# meranie úsekov tohto rerunu pre ladiaci panel (prepínač je na konci sidebaru);
+# try/finally – meranie sa ukončí aj pri st.rerun() (výnimka)
+tracing.begin(st.session_state.get("trace_panel", False))
+try:
+    render_page()
+finally:
+    trace = tracing.end()
+
+# --- ladiaci panel: časy úsekov tohto rerunu ---
+with st.sidebar:
+    if st.toggle("Ladiaci panel (časy)", key="trace_panel", help="Meranie db.py / stats.py / Excelu počas rerunu."):
+        if trace is None:
+            st.caption("Merania sa zobrazia po ďalšom prekreslení.")
+        else:
+            st.caption(f"Rerun {trace.total_ms:.0f} ms, {len(trace.spans)} úsekov.")
+            st.dataframe(trace.frame(), hide_index=True, use_container_width=True)
+            for span in trace.slow_spans():
+                with st.expander(f"Pomalý dotaz: {span.name} ({span.ms:.0f} ms)"):
+                    for sql, plan in span.plans:
+                        st.code(f"{sql}\n\n{plan}", language="sql")
+            st.download_button(
+                "Exportovať úseky (JSON)",
+                data=trace.to_json(),
+                file_name="trace.json",
+                mime="application/json",
+            )
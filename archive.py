@@ -0,0 +1,172 @@
+# archive.py
+#
+# Archív starých sezón: zápasy uzavretých sezón sa presunú z hlavnej DB do
+# samostatného súboru <db>_archive.db vedľa nej. Hlavná DB ostane malá (bežné
+# záložky, zálohy a page cache pracujú len s aktuálnymi sezónami), archív sa
+# pripája len na čítanie (ATTACH, immutable, mmap) vtedy, keď ho historický
+# pohľad potrebuje – db.fetch_matches / iter_matches ho čítajú transparentne.
+#
+# Archivovať sa dajú len uzavreté sezóny (nemenné, výsledky majú v snapshote),
+# sezóna ostáva v tabuľke seasons s príznakom archived = 1.
+#
+# Použitie bez UI:
+#   python archive.py --season 1 --season 2
+#   python archive.py --db hockey_league_fixed.db --season 3
+
+import argparse
+import os
+import shutil
+import sqlite3
+
+from config import DB_DEFAULT
+from db import (
+    GENERATED_COLUMNS,
+    MATCH_COLUMNS,
+    archive_path,
+    ensure_schema,
+    get_conn,
+)
+
+_COPY_COLUMNS = ", ".join(MATCH_COLUMNS + ["home_team_id", "away_team_id"])
+
+# rovnaké stĺpce ako matches (vrátane generovaných pre filtre v Prehľade),
+# bez cudzích kľúčov – sezóny a tímy sú v hlavnej DB; jediný index (season, round, id)
+_ARCHIVE_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY,
+        home_team TEXT NOT NULL,
+        away_team TEXT NOT NULL,
+        home_goals INTEGER NOT NULL,
+        away_goals INTEGER NOT NULL,
+        overtime INTEGER NOT NULL,
+        round INTEGER NOT NULL,
+        season INTEGER NOT NULL,
+        is_playoff INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        home_team_id INTEGER,
+        away_team_id INTEGER,
+        {", ".join(f"{name} INTEGER GENERATED ALWAYS AS ({expr}) VIRTUAL" for name, expr in GENERATED_COLUMNS.items())}
+    );""",
+    "CREATE INDEX IF NOT EXISTS idx_matches_season_round_id ON matches(season, round, id);",
+    """CREATE TABLE IF NOT EXISTS archive_meta (
+        id INTEGER PRIMARY KEY CHECK(id = 1),
+        generation INTEGER NOT NULL
+    );""",
+]
+
+
+def archive_seasons(db_path: str, season_ids: list[int]) -> int:
+    """
+    Presunie zápasy uzavretých sezón do archívu a vráti počet presunutých zápasov.
+
+    Archív sa pripraví v dočasnej kópii a atomicky vymení (os.replace), takže
+    spojenia s pripojenou staršou verziou čítajú ďalej konzistentné dáta a
+    pri ďalšom dotaze sa pripoja k novej generácii. Až potom sa v hlavnej DB
+    sezóny označia ako archivované a ich riadky sa zmažú (jedna transakcia)
+    a hlavná DB sa zmenší cez VACUUM.
+
+    Medzi výmenou archívu a commitom (alebo keď commit zlyhá) sú riadky
+    sezón v oboch súboroch; čítanie sa riadi príznakom archived (db._match_tables),
+    takže sa sezóna číta stále len z hlavnej DB. Opakované spustenie
+    archiváciu dokončí – riadky v archíve sa prepíšu (INSERT OR REPLACE).
+    """
+    conn = get_conn(db_path)
+    ensure_schema(conn)
+    ids = sorted({int(s) for s in season_ids})
+    if not ids:
+        return 0
+    marks = ", ".join("?" for _ in ids)
+    rows = conn.execute(
+        f"SELECT id, closed, archived FROM seasons WHERE id IN ({marks});", ids
+    ).fetchall()
+    found = {r[0]: r for r in rows}
+    missing = [s for s in ids if s not in found]
+    if missing:
+        raise ValueError(f"Sezóny neexistujú: {missing}")
+    not_closed = [s for s in ids if not found[s][1]]
+    if not_closed:
+        raise ValueError(f"Archivovať sa dajú len uzavreté sezóny: {not_closed}")
+    ids = [s for s in ids if not found[s][2]]
+    if not ids:
+        return 0
+    marks = ", ".join("?" for _ in ids)
+
+    row = conn.execute("SELECT generation FROM archive_state WHERE id = 1;").fetchone()
+    generation = (row[0] if row else 0) + 1
+
+    # 1) nový archív v dočasnom súbore: doterajší obsah + presúvané sezóny
+    path = archive_path(db_path)
+    tmp = path + ".tmp"
+    if os.path.exists(path):
+        shutil.copyfile(path, tmp)
+    elif os.path.exists(tmp):
+        os.remove(tmp)
+    arch = sqlite3.connect(tmp)
+    try:
+        for ddl in _ARCHIVE_DDL:
+            arch.execute(ddl)
+        arch.execute("ATTACH DATABASE ? AS hot;", (db_path,))
+        arch.execute(
+            f"INSERT OR REPLACE INTO matches({_COPY_COLUMNS}) "
+            f"SELECT {_COPY_COLUMNS} FROM hot.matches WHERE season IN ({marks});",
+            ids,
+        )
+        arch.execute(
+            "INSERT OR REPLACE INTO archive_meta(id, generation) VALUES(1, ?);", (generation,)
+        )
+        arch.commit()
+        arch.execute("DETACH DATABASE hot;")
+        moved = arch.execute(
+            f"SELECT COUNT(*) FROM matches WHERE season IN ({marks});", ids
+        ).fetchone()[0]
+        arch.execute("VACUUM;")
+    finally:
+        arch.close()
+
+    hot_count = conn.execute(
+        f"SELECT COUNT(*) FROM matches WHERE season IN ({marks});", ids
+    ).fetchone()[0]
+    if moved != hot_count:
+        os.remove(tmp)
+        raise RuntimeError(f"Archív má {moved} zápasov, hlavná DB {hot_count} – archivácia zrušená.")
+    os.replace(tmp, path)
+
+    # 2) hlavná DB: príznak archived + zmazanie presunutých riadkov (trigger to povolí)
+    try:
+        _mark_archived(conn, ids, generation)
+    finally:
+        conn.close()
+    return moved
+
+
+def _mark_archived(conn: sqlite3.Connection, ids: list[int], generation: int) -> None:
+    """Jedna transakcia: archived = 1, zmazanie riadkov sezón a nová generácia archívu."""
+    marks = ", ".join("?" for _ in ids)
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        conn.execute(f"UPDATE seasons SET archived = 1 WHERE id IN ({marks});", ids)
+        conn.execute(f"DELETE FROM matches WHERE season IN ({marks});", ids)
+        conn.execute(
+            "INSERT OR REPLACE INTO archive_state(id, generation) VALUES(1, ?);", (generation,)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    conn.execute("VACUUM;")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Presun uzavretých sezón do archívnej DB.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--season", type=int, action="append", default=[], metavar="SEASON_ID",
+                        help="sezóna na archiváciu (dá sa zopakovať)")
+    args = parser.parse_args(argv)
+
+    moved = archive_seasons(args.db, args.season)
+    print(f"Archivovaných zápasov: {moved} -> {archive_path(args.db)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,259 @@
 # db.py
 
+import glob
+import os
+import re
+import shutil
 import sqlite3
+import time
+from typing import Iterator
+from urllib.request import pathname2url
+
 import pandas as pd
 
+from config import M_TEAMS, V_TEAMS
+from tracing import traced
+
+
+# stĺpce tabuľky matches, ktoré vracajú fetch funkcie (bez generovaných stĺpcov)
+MATCH_COLUMNS = [
+    "id", "home_team", "away_team", "home_goals", "away_goals",
+    "overtime", "round", "season", "is_playoff", "status",
+]
+_MATCH_SELECT = ", ".join(MATCH_COLUMNS)
+
+GENERATED_COLUMNS = {
+    "goal_diff": "abs(home_goals - away_goals)",
+    "total_goals": "home_goals + away_goals",
+    "is_one_goal": "abs(home_goals - away_goals) = 1",
+    "is_blowout": "abs(home_goals - away_goals) >= 3",
+    "is_ten_plus": "home_goals >= 10 OR away_goals >= 10",
+}
+
+# filtre typu zápasu pre fetch_matches_page (kombinujú sa cez OR)
+MATCH_TYPE_FILTERS = {
+    "ot": "overtime = 1",
+    "one_goal": "is_one_goal = 1",
+    "blowout": "is_blowout = 1",
+    "ten_plus": "is_ten_plus = 1",
+}
+
+# krátke značky typu zápasu (OT, 1G / BLOW, 10+) – rovnaké ako predtým v pandas
+_INFO_SQL = (
+    "rtrim("
+    "CASE WHEN overtime = 1 THEN 'OT, ' ELSE '' END || "
+    "CASE WHEN is_one_goal = 1 THEN '1G, ' WHEN is_blowout = 1 THEN 'BLOW, ' ELSE '' END || "
+    "CASE WHEN is_ten_plus = 1 THEN '10+' ELSE '' END, ', ')"
+)
+
+
+def match_status(row: dict) -> str:
+    """Stav zápasu podľa výsledku: 0:0 je nevyplnený rozpis (remízy sa nepovoľujú)."""
+    if int(row["home_goals"]) == 0 and int(row["away_goals"]) == 0:
+        return "scheduled"
+    return "played"
+
 
+@traced
 def get_conn(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
 
 
-def ensure_schema(conn: sqlite3.Connection):
-    conn.execute("""CREATE TABLE IF NOT EXISTS seasons (
+# mmap pre spojenia len na čítanie (archív, náhľad) – stránky číta priamo z page cache OS
+READ_MMAP_SIZE = 256 * 1024 * 1024
+
+# kópie pre náhľad (read_snapshot): koľko posledných generácií ostáva a koľko
+# sekúnd sa nemaže ani staršia kópia – iné sedenie ju môže práve otvárať
+SNAPSHOT_KEEP = 3
+SNAPSHOT_MIN_AGE = 60.0
+
+
+def _file_uri(path: str, **params: str) -> str:
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    return f"file:{pathname2url(os.path.abspath(path))}" + (f"?{query}" if query else "")
+
+
+@traced
+def get_readonly_conn(db_path: str, immutable: bool = False) -> sqlite3.Connection:
+    """
+    Spojenie len na čítanie (URI mode=ro, veľký mmap). immutable=True len pre
+    súbory, ktoré sa už nikdy nezmenia (kópie pre náhľad) – SQLite potom
+    nepoužíva zámky ani nekontroluje zmeny súboru.
+    """
+    params = {"mode": "ro", "immutable": "1"} if immutable else {"mode": "ro"}
+    conn = sqlite3.connect(_file_uri(db_path, **params), uri=True, check_same_thread=False)
+    conn.execute(f"PRAGMA mmap_size = {READ_MMAP_SIZE};")
+    return conn
+
+
+@traced
+def read_snapshot(db_path: str, version: int, directory: str) -> str:
+    """
+    Konzistentná kópia DB pre verziu dát version (sqlite backup API) v adresári
+    directory, vedľa nej aktuálny archív (hard link na nemennú generáciu, inak
+    kópia). Kópia sa už nemení, takže sa číta cez get_readonly_conn(immutable=True)
+    bez zdieľania zámkov so zápisom. Staršie kópie tej istej DB sa mažú, až keď
+    sú za poslednými SNAPSHOT_KEEP generáciami a staršie ako SNAPSHOT_MIN_AGE s.
+    Vracia cestu ku kópii.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    path = os.path.join(directory, f"{stem}.v{version}.db")
+    if os.path.exists(path):
+        return path
+
+    tmp = path + ".tmp"
+    src = get_readonly_conn(db_path)
+    dst = sqlite3.connect(tmp)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    archive = archive_path(db_path)
+    if os.path.exists(archive):
+        try:
+            os.link(archive, archive_path(path))
+        except OSError:
+            shutil.copyfile(archive, archive_path(path))
+    os.replace(tmp, path)
+
+    # otvorené spojenia na staršie kópie čítajú ďalej (súbor zmizne až po zatvorení);
+    # predchádzajúce generácie ostávajú pre sedenia, ktoré ich práve otvárajú
+    copies = re.compile(rf"{re.escape(stem)}\.v(\d+)(?:_archive)?\.db")
+    generations: dict[int, list[str]] = {}
+    for old in glob.glob(os.path.join(directory, f"{glob.escape(stem)}.v*.db")):
+        m = copies.fullmatch(os.path.basename(old))
+        if m:
+            generations.setdefault(int(m.group(1)), []).append(old)
+    cutoff = time.time() - SNAPSHOT_MIN_AGE
+    for gen in sorted(generations)[:-SNAPSHOT_KEEP]:
+        for old in generations[gen]:
+            try:
+                if os.path.getmtime(old) < cutoff:
+                    os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+SEASON_CLOSED_ERROR = "Sezóna je uzavretá – jej zápasy sa nedajú meniť."
+
+# liga, do ktorej patria dáta zo starších DB (pred zavedením tabuľky leagues)
+DEFAULT_LEAGUE_ID = 1
+
+
+def _team_id_sql(season: str, code: str) -> str:
+    """ID tímu podľa kódu v lige danej sezóny (tímy sú unikátne len v rámci ligy)."""
+    return (
+        "(SELECT t.id FROM teams AS t JOIN seasons AS s ON s.league_id = t.league_id "
+        f"WHERE s.id = {season} AND t.code = {code})"
+    )
+
+
+# pri zápise sa popri textovom kóde ukladá aj cudzí kľúč; parametre (season, code)
+_TEAM_ID_SQL = _team_id_sql("?", "?")
+
+_LEAGUES_DDL = """CREATE TABLE IF NOT EXISTS leagues (
         id INTEGER PRIMARY KEY,
-        label TEXT UNIQUE NOT NULL
-    );""")
+        name TEXT UNIQUE NOT NULL
+    );"""
+
+_SEASONS_DDL = """CREATE TABLE IF NOT EXISTS seasons (
+        id INTEGER PRIMARY KEY,
+        league_id INTEGER NOT NULL DEFAULT 1 REFERENCES leagues(id),
+        label TEXT NOT NULL,
+        closed INTEGER NOT NULL DEFAULT 0 CHECK(closed IN (0,1)),
+        archived INTEGER NOT NULL DEFAULT 0 CHECK(archived IN (0,1)),
+        UNIQUE(league_id, label)
+    );"""
+
+_TEAMS_DDL = """CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        league_id INTEGER NOT NULL DEFAULT 1 REFERENCES leagues(id),
+        code TEXT NOT NULL,
+        name TEXT NOT NULL,
+        side TEXT NOT NULL CHECK(side IN ('M','V')),
+        UNIQUE(league_id, code)
+    );"""
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, ddl: str, select_sql: str) -> None:
+    """
+    Prestavba tabuľky na novú schému (iné UNIQUE obmedzenia sa nedajú pridať
+    cez ALTER TABLE): nová tabuľka, prenos riadkov, výmena – v jednej transakcii,
+    s vypnutými cudzími kľúčmi (matches na tabuľku odkazuje). ID riadkov sa
+    zachovávajú. Triggre tabuľky vytvorí znova ensure_schema.
+    """
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        conn.execute("BEGIN;")
+        conn.execute(ddl.replace(f"IF NOT EXISTS {table} ", f"{table}_new "))
+        conn.execute(f"INSERT INTO {table}_new {select_sql};")
+        conn.execute(f"DROP TABLE {table};")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table};")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+
+def _ensure_leagues(conn: sqlite3.Connection) -> None:
+    """
+    Ligy a tabuľky s kľúčom ligy: seasons (league_id, label) a teams
+    (league_id, code). Staršie DB (sezóny bez ligy, teams so stĺpcom owner
+    namiesto side) sa prestavia a všetko pôvodné patrí do predvolenej ligy.
+    Predvolená liga bez tímov sa naplní tímami z config.
+    """
+    conn.execute(_LEAGUES_DDL)
+    conn.execute(
+        "INSERT OR IGNORE INTO leagues(id, name) VALUES(?, 'Stolný hokej');",
+        (DEFAULT_LEAGUE_ID,),
+    )
+    conn.commit()
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(seasons);")}
+    if cols and "league_id" not in cols:
+        _rebuild_table(
+            conn, "seasons", _SEASONS_DDL,
+            f"(id, league_id, label) SELECT id, {DEFAULT_LEAGUE_ID}, label FROM seasons ORDER BY id",
+        )
+    conn.execute(_SEASONS_DDL)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(seasons);")}
+    for col in ("closed", "archived"):
+        if col not in cols:
+            conn.execute(
+                f"ALTER TABLE seasons ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0 CHECK({col} IN (0,1));"
+            )
+
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(teams);")}
+    if cols and "league_id" not in cols:
+        if "side" in cols:
+            side = "side"
+        else:
+            m_list = ", ".join(f"'{t}'" for t in M_TEAMS)
+            side = f"CASE WHEN code IN ({m_list}) THEN 'M' ELSE 'V' END"
+        _rebuild_table(
+            conn, "teams", _TEAMS_DDL,
+            f"(id, league_id, code, name, side) SELECT id, {DEFAULT_LEAGUE_ID}, code, name, {side} "
+            "FROM teams ORDER BY id",
+        )
+    conn.execute(_TEAMS_DDL)
+
+    if not conn.execute(
+        "SELECT 1 FROM teams WHERE league_id=? LIMIT 1;", (DEFAULT_LEAGUE_ID,)
+    ).fetchone():
+        set_league_teams(conn, DEFAULT_LEAGUE_ID, M_TEAMS, V_TEAMS, commit=False)
+
+
+@traced
+def ensure_schema(conn: sqlite3.Connection):
+    _ensure_leagues(conn)
     conn.execute("""CREATE TABLE IF NOT EXISTS matches (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         home_team TEXT NOT NULL,
@@ -25,64 +264,458 @@ def ensure_schema(conn: sqlite3.Connection):
         round INTEGER NOT NULL CHECK(round >= 1),
         season INTEGER NOT NULL,
         is_playoff INTEGER NOT NULL CHECK(is_playoff IN (0,1)),
+        status TEXT NOT NULL DEFAULT 'played' CHECK(status IN ('scheduled','played')),
+        home_team_id INTEGER REFERENCES teams(id),
+        away_team_id INTEGER REFERENCES teams(id),
         FOREIGN KEY (season) REFERENCES seasons(id) ON UPDATE CASCADE ON DELETE RESTRICT
     );""")
+
+    # odvodené stĺpce pre filtre typu zápasu – počíta ich SQLite, nie pandas
+    # (ALTER TABLE vie pridať len VIRTUAL stĺpce; hodnoty sa materializujú v indexoch)
+    existing = {r[1] for r in conn.execute("PRAGMA table_xinfo(matches);")}
+
+    # explicitný stav zápasu namiesto odvodzovania z 0:0 (migrácia starších DB)
+    if "status" not in existing:
+        conn.execute(
+            "ALTER TABLE matches ADD COLUMN status TEXT NOT NULL DEFAULT 'played' "
+            "CHECK(status IN ('scheduled','played'));"
+        )
+        conn.execute(
+            "UPDATE matches SET status='scheduled' WHERE home_goals = 0 AND away_goals = 0;"
+        )
+    # čiastočný index len nad nevyplneným rozpisom – malý, rýchly pending_rounds
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_matches_pending ON matches(season, round) "
+        "WHERE status = 'scheduled';"
+    )
+
+    # celočíselné cudzie kľúče na teams (migrácia z textových kódov tímov)
+    for col in ("home_team_id", "away_team_id"):
+        if col not in existing:
+            conn.execute(f"ALTER TABLE matches ADD COLUMN {col} INTEGER REFERENCES teams(id);")
+    home_id = _team_id_sql("matches.season", "matches.home_team")
+    away_id = _team_id_sql("matches.season", "matches.away_team")
+    conn.execute(
+        f"""UPDATE matches
+            SET home_team_id = {home_id}, away_team_id = {away_id}
+            WHERE ((home_team_id IS NULL AND {home_id} IS NOT NULL)
+                   OR (away_team_id IS NULL AND {away_id} IS NOT NULL))
+              AND season NOT IN (SELECT id FROM seasons WHERE closed = 1);"""
+    )
+
+    for name, expr in GENERATED_COLUMNS.items():
+        if name not in existing:
+            conn.execute(
+                f"ALTER TABLE matches ADD COLUMN {name} INTEGER GENERATED ALWAYS AS ({expr}) VIRTUAL;"
+            )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_round_id ON matches(season, round, id);")
+    # indexy podľa tímu idú cez celočíselné ID (pôvodné textové indexy sa rušia)
+    conn.execute("DROP INDEX IF EXISTS idx_matches_season_home;")
+    conn.execute("DROP INDEX IF EXISTS idx_matches_season_away;")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_home_id ON matches(season, home_team_id, round, id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_away_id ON matches(season, away_team_id, round, id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_goal_diff ON matches(season, goal_diff);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_total_goals ON matches(season, total_goals);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_one_goal ON matches(season, is_one_goal);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_blowout ON matches(season, is_blowout);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_season_ten_plus ON matches(season, is_ten_plus);")
+
+    # uzavretá sezóna je nemenná – zápisy do jej zápasov zablokujú triggre;
+    # vypočítané výsledky sú uložené v season_snapshots (pozri snapshots.py).
+    # Jediné povolené mazanie je presun archivovanej sezóny do archívu (archive.py).
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='trigger' AND name='trg_matches_delete_closed';"
+    ).fetchone()
+    if row and "archived" not in row[0]:
+        conn.execute("DROP TRIGGER trg_matches_delete_closed;")
+    closed = "(SELECT closed FROM seasons WHERE id = {}) = 1"
+    for event, when in (
+        ("INSERT", closed.format("NEW.season")),
+        ("DELETE", "(SELECT closed AND NOT archived FROM seasons WHERE id = OLD.season) = 1"),
+        ("UPDATE", closed.format("OLD.season") + " OR " + closed.format("NEW.season")),
+    ):
+        conn.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_matches_{event.lower()}_closed
+                BEFORE {event} ON matches
+                WHEN {when}
+                BEGIN SELECT RAISE(ABORT, '{SEASON_CLOSED_ERROR}'); END;"""
+        )
+    conn.execute(
+        """CREATE TRIGGER IF NOT EXISTS trg_seasons_reopen_closed
+            BEFORE UPDATE OF closed ON seasons
+            WHEN OLD.closed = 1 AND NEW.closed = 0
+            BEGIN SELECT RAISE(ABORT, 'Uzavretú sezónu nie je možné znovu otvoriť.'); END;"""
+    )
+    conn.execute(
+        """CREATE TRIGGER IF NOT EXISTS trg_seasons_archived
+            BEFORE UPDATE OF archived ON seasons
+            WHEN NEW.archived <> OLD.archived
+             AND (OLD.archived = 1 OR NEW.closed = 0)
+            BEGIN SELECT RAISE(ABORT, 'Archivovať sa dá len uzavretá sezóna, a to natrvalo.'); END;"""
+    )
+    # generácia archívu (archive.py ju zvýši pri každom presune sezón)
+    conn.execute("""CREATE TABLE IF NOT EXISTS archive_state (
+        id INTEGER PRIMARY KEY CHECK(id = 1),
+        generation INTEGER NOT NULL
+    );""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS season_snapshots (
+        season_id INTEGER PRIMARY KEY REFERENCES seasons(id),
+        format INTEGER NOT NULL,
+        created TEXT NOT NULL,
+        data BLOB NOT NULL
+    );""")
+
+    # počítadlo zmien dát – každý zápis do matches/seasons/teams/leagues ho zvýši (kľúč pre cache)
+    conn.execute("""CREATE TABLE IF NOT EXISTS change_seq (
+        id INTEGER PRIMARY KEY CHECK(id = 1),
+        seq INTEGER NOT NULL
+    );""")
+    conn.execute("INSERT OR IGNORE INTO change_seq(id, seq) VALUES(1, 0);")
+    for table in ("matches", "seasons", "teams", "leagues"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_seq
+                    AFTER {event} ON {table}
+                    BEGIN UPDATE change_seq SET seq = seq + 1 WHERE id = 1; END;"""
+            )
     conn.commit()
 
 
-def load_seasons(conn: sqlite3.Connection) -> pd.DataFrame:
-    return pd.read_sql_query("SELECT id, label FROM seasons ORDER BY id;", conn)
+# --- archív starých sezón (pozri archive.py) ---
+
+def migrate(db_path: str) -> None:
+    """
+    Jednorazová migrácia schémy krátkym zapisovacím spojením – pre procesy,
+    ktoré inak otvárajú DB len na čítanie (náhľad, API, služba) a ensure_schema
+    by nikdy nespustili.
+    """
+    conn = get_conn(db_path)
+    try:
+        ensure_schema(conn)
+    finally:
+        conn.close()
+
+
+ARCHIVE_SCHEMA = "archive"
+
+
+def archive_path(db_path: str) -> str:
+    """Súbor archívu k hlavnej DB: liga.db -> liga_archive.db v tom istom adresári."""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}_archive{ext or '.db'}"
+
+
+@traced
+def attach_archive(conn: sqlite3.Connection) -> bool:
+    """
+    Pripojí archív (ATTACH ... AS archive) len na čítanie: immutable=1 (bez
+    zámkov a kontroly zmien súboru) a mmap. Ak archive.py medzičasom súbor
+    vymenil za novšiu generáciu, pripojí sa znova. False = nič nie je archivované.
+    """
+    row = conn.execute("SELECT generation FROM archive_state WHERE id = 1;").fetchone()
+    if not row:
+        return False
+    dbs = {name: path for _, name, path in conn.execute("PRAGMA database_list;")}
+    if ARCHIVE_SCHEMA in dbs:
+        attached = conn.execute(
+            f"SELECT generation FROM {ARCHIVE_SCHEMA}.archive_meta WHERE id = 1;"
+        ).fetchone()
+        if attached and attached[0] >= row[0]:
+            return True
+        conn.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA};")
+    path = archive_path(dbs["main"]) if dbs.get("main") else ""
+    if not path or not os.path.exists(path):
+        return False
+    conn.execute(
+        f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA};", (_file_uri(path, mode="ro", immutable="1"),)
+    )
+    conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.mmap_size = {READ_MMAP_SIZE};")
+    return True
+
+
+def _season_table(conn: sqlite3.Connection, season_id: int) -> str:
+    """Tabuľka so zápasmi sezóny – archivovaná sezóna je v archive.matches."""
+    row = conn.execute("SELECT archived FROM seasons WHERE id=?;", (season_id,)).fetchone()
+    if row and row[0] and attach_archive(conn):
+        return f"{ARCHIVE_SCHEMA}.matches"
+    return "matches"
+
 
+# Príznak seasons.archived rozhoduje, z ktorého zdroja sa sezóna číta. Počas
+# archivácie (a po jej zlyhaní medzi výmenou archívu a commitom v hlavnej DB)
+# môžu byť riadky sezóny v oboch súboroch – vetvy UNION ALL sa preto obmedzia
+# na „svoje“ sezóny a nič sa nezapočíta dvakrát.
+_HOT_SEASONS = "season NOT IN (SELECT id FROM main.seasons WHERE archived=1)"
+_ARCHIVED_SEASONS = "season IN (SELECT id FROM main.seasons WHERE archived=1)"
 
-def get_or_create_season(conn: sqlite3.Connection, label: str) -> int:
+
+def _match_tables(conn: sqlite3.Connection, season_id: int | None) -> list[tuple[str, str | None]]:
+    """
+    Zdroje zápasov pre dotaz ako (tabuľka, podmienka zdroja): jedna sezóna je buď
+    v hlavnej DB, alebo v archíve; liga / všetko sa číta z oboch (archív sa
+    pripojí, len keď existuje), každá sezóna len z jedného z nich.
+    """
+    if season_id:
+        return [(_season_table(conn, season_id), None)]
+    if attach_archive(conn):
+        return [("matches", _HOT_SEASONS), (f"{ARCHIVE_SCHEMA}.matches", _ARCHIVED_SEASONS)]
+    return [("matches", None)]
+
+
+def _select_matches(
+    tables: list[tuple[str, str | None]], where: list[str], params: list
+) -> tuple[str, list]:
+    """SELECT zápasov cez všetky zdroje (UNION ALL) v poradí season, round, id."""
+    parts = []
+    for table, source in tables:
+        conds = where + [source] if source else where
+        cond = " WHERE " + " AND ".join(conds) if conds else ""
+        parts.append(f"SELECT {_MATCH_SELECT} FROM {table}{cond}")
+    return " UNION ALL ".join(parts) + " ORDER BY season, round, id", params * len(tables)
+
+
+@traced
+def data_version(conn: sqlite3.Connection) -> int:
+    """Aktuálna verzia dát (mení sa pri každej zmene zápasov, sezón, tímov alebo líg)."""
+    row = conn.execute("SELECT seq FROM change_seq WHERE id = 1;").fetchone()
+    return row[0] if row else 0
+
+
+@traced
+def load_leagues(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query("SELECT id, name FROM leagues ORDER BY id;", conn)
+
+
+@traced
+def create_league(conn: sqlite3.Connection, name: str, m_teams: list[str], v_teams: list[str]) -> int:
+    """Nová liga s vlastnými tímami (m_teams hrajú doma, v_teams vonku)."""
+    with conn:
+        cur = conn.execute("INSERT INTO leagues(name) VALUES(?);", (name,))
+        league_id = cur.lastrowid
+        set_league_teams(conn, league_id, m_teams, v_teams, commit=False)
+    return league_id
+
+
+@traced
+def set_league_teams(
+    conn: sqlite3.Connection,
+    league_id: int,
+    m_teams: list[str],
+    v_teams: list[str],
+    commit: bool = True,
+) -> None:
+    """Doplní do ligy tímy s chýbajúcimi kódmi (existujúce tímy a ich ID ostávajú)."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO teams(league_id, code, name, side) VALUES(?,?,?,?);",
+        [(league_id, t, t, "M") for t in m_teams] + [(league_id, t, t, "V") for t in v_teams],
+    )
+    if commit:
+        conn.commit()
+
+
+@traced
+def load_teams(conn: sqlite3.Connection, league_id: int = DEFAULT_LEAGUE_ID) -> pd.DataFrame:
+    """Tímy ligy (id, code, name, side) v poradí podľa id."""
+    return pd.read_sql_query(
+        "SELECT id, code, name, side FROM teams WHERE league_id=? ORDER BY id;",
+        conn,
+        params=(league_id,),
+    )
+
+
+@traced
+def load_seasons(conn: sqlite3.Connection, league_id: int | None = None) -> pd.DataFrame:
+    """Sezóny ligy (league_id=None -> sezóny všetkých líg)."""
+    if league_id is None:
+        return pd.read_sql_query(
+            "SELECT id, league_id, label, closed, archived FROM seasons ORDER BY id;", conn
+        )
+    return pd.read_sql_query(
+        "SELECT id, league_id, label, closed, archived FROM seasons WHERE league_id=? ORDER BY id;",
+        conn,
+        params=(league_id,),
+    )
+
+
+@traced
+def is_season_closed(conn: sqlite3.Connection, season_id: int) -> bool:
+    row = conn.execute("SELECT closed FROM seasons WHERE id=?;", (season_id,)).fetchone()
+    return bool(row and row[0])
+
+
+@traced
+def season_league(conn: sqlite3.Connection, season_id: int) -> int | None:
+    row = conn.execute("SELECT league_id FROM seasons WHERE id=?;", (season_id,)).fetchone()
+    return row[0] if row else None
+
+
+@traced
+def get_or_create_season(
+    conn: sqlite3.Connection, label: str, league_id: int = DEFAULT_LEAGUE_ID
+) -> int:
     cur = conn.cursor()
-    cur.execute("SELECT id FROM seasons WHERE label=?;", (label,))
+    cur.execute("SELECT id FROM seasons WHERE league_id=? AND label=?;", (league_id, label))
     row = cur.fetchone()
     if row:
         return row[0]
-    cur.execute("INSERT INTO seasons(label) VALUES(?);", (label,))
+    cur.execute("INSERT INTO seasons(league_id, label) VALUES(?, ?);", (league_id, label))
     conn.commit()
     return cur.lastrowid
 
 
-def fetch_matches(conn: sqlite3.Connection, season_id: int | None = None) -> pd.DataFrame:
-    q = "SELECT * FROM matches"
-    params: list = []
+def _scope_clause(season_id: int | None, league_id: int | None) -> tuple[list[str], list]:
+    """
+    Podmienka na sezónu alebo celú ligu. Liga sa filtruje cez svoje sezóny
+    (index seasons(league_id, ...) + matches(season, ...)), takže dotaz na jednu
+    ligu číta len jej riadky bez ohľadu na počet líg v súbore.
+    """
     if season_id:
-        q += " WHERE season=?"
-        params.append(season_id)
-    q += " ORDER BY season, round, id"
+        return ["season=?"], [season_id]
+    if league_id is not None:
+        return ["season IN (SELECT id FROM seasons WHERE league_id=?)"], [league_id]
+    return [], []
+
+
+@traced
+def fetch_matches(
+    conn: sqlite3.Connection, season_id: int | None = None, league_id: int | None = None
+) -> pd.DataFrame:
+    where, params = _scope_clause(season_id, league_id)
+    q, params = _select_matches(_match_tables(conn, season_id), where, params)
+    return pd.read_sql_query(q, conn, params=params)
+
+
+@traced
+def played_matches(
+    conn: sqlite3.Connection, season_id: int | None = None, league_id: int | None = None
+) -> pd.DataFrame:
+    """Len odohrané zápasy (status='played') – bez nevyplneného rozpisu."""
+    where, params = _scope_clause(season_id, league_id)
+    q, params = _select_matches(_match_tables(conn, season_id), ["status='played'"] + where, params)
+    return pd.read_sql_query(q, conn, params=params)
+
+
+@traced
+def pending_rounds(conn: sqlite3.Connection, season_id: int) -> list[int]:
+    """Kolá sezóny, v ktorých je aspoň jeden nevyplnený zápas (čiastočný index)."""
+    rows = conn.execute(
+        "SELECT DISTINCT round FROM matches WHERE season=? AND status='scheduled' ORDER BY round;",
+        (season_id,),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+@traced
+def season_rounds(conn: sqlite3.Connection, season_id: int) -> list[int]:
+    table = _season_table(conn, season_id)
+    rows = conn.execute(
+        f"SELECT DISTINCT round FROM {table} WHERE season=? ORDER BY round;", (season_id,)
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def iter_matches(
+    conn: sqlite3.Connection,
+    season_id: int | None = None,
+    batch_size: int = 1000,
+    league_id: int | None = None,
+) -> Iterator[tuple[list[str], list[tuple]]]:
+    """
+    Streamuje zápasy po dávkach cez cursor.fetchmany – celá tabuľka sa nikdy
+    nenačíta do pamäte naraz. Yielduje (názvy stĺpcov, riadky dávky).
+    """
+    where, params = _scope_clause(season_id, league_id)
+    q, params = _select_matches(_match_tables(conn, season_id), where, params)
+    cur = conn.execute(q, params)
+    columns = [d[0] for d in cur.description]
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        yield columns, rows
+
+
+def _filter_clause(season_id: int, team: str | None, types) -> tuple[str, list]:
+    where = ["season=?"]
+    params: list = [season_id]
+    if team:
+        where.append(f"(home_team_id={_TEAM_ID_SQL} OR away_team_id={_TEAM_ID_SQL})")
+        params += [season_id, team, season_id, team]
+    if types:
+        where.append("(" + " OR ".join(MATCH_TYPE_FILTERS[t] for t in types) + ")")
+    return " AND ".join(where), params
+
+
+@traced
+def count_matches_filtered(
+    conn: sqlite3.Connection, season_id: int, team: str | None = None, types=()
+) -> int:
+    where, params = _filter_clause(season_id, team, types)
+    table = _season_table(conn, season_id)
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where};", params).fetchone()[0]
+
+
+@traced
+def fetch_matches_page(
+    conn: sqlite3.Connection,
+    season_id: int,
+    team: str | None = None,
+    types=(),
+    after: tuple[int, int] | None = None,
+    limit: int = 50,
+) -> pd.DataFrame:
+    """
+    Jedna strana zápasov sezóny s filtrom podľa tímu a typu zápasu (v SQL).
+    Keyset stránkovanie: after = (round, id) posledného riadku predchádzajúcej strany.
+    Vracia stĺpce MATCH_COLUMNS + Info (OT, 1G / BLOW, 10+).
+    """
+    where, params = _filter_clause(season_id, team, types)
+    if after is not None:
+        where += " AND (round, id) > (?, ?)"
+        params += [int(after[0]), int(after[1])]
+    q = (
+        f"SELECT {_MATCH_SELECT}, {_INFO_SQL} AS Info FROM {_season_table(conn, season_id)} "
+        f"WHERE {where} ORDER BY round, id LIMIT ?"
+    )
+    params.append(int(limit))
     return pd.read_sql_query(q, conn, params=params)
 
 
+@traced
 def fetch_match_by_id(conn: sqlite3.Connection, match_id: int) -> dict | None:
-    q = "SELECT * FROM matches WHERE id=?"
+    q = f"SELECT {_MATCH_SELECT} FROM matches WHERE id=?"
     df = pd.read_sql_query(q, conn, params=(match_id,))
     return df.iloc[0].to_dict() if not df.empty else None
 
 
+@traced
 def insert_match(conn: sqlite3.Connection, row: dict) -> int:
     cur = conn.cursor()
     cur.execute(
-        """INSERT INTO matches(home_team, away_team, home_goals, away_goals, overtime, round, season, is_playoff)
-           VALUES(?,?,?,?,?,?,?,?);""",
+        f"""INSERT INTO matches(home_team, away_team, home_goals, away_goals, overtime, round, season,
+                                is_playoff, status, home_team_id, away_team_id)
+            VALUES(?,?,?,?,?,?,?,?,?,{_TEAM_ID_SQL},{_TEAM_ID_SQL});""",
         (
             row["home_team"], row["away_team"],
             row["home_goals"], row["away_goals"],
             row["overtime"], row["round"],
             row["season"], row["is_playoff"],
+            match_status(row),
+            row["season"], row["home_team"], row["season"], row["away_team"],
         )
     )
     conn.commit()
     return cur.lastrowid
 
 
+@traced
 def update_match(conn: sqlite3.Connection, row: dict) -> None:
     conn.execute(
-        """
+        f"""
         UPDATE matches
         SET home_team=?, away_team=?, home_goals=?, away_goals=?,
-            overtime=?, round=?, season=?, is_playoff=?
+            overtime=?, round=?, season=?, is_playoff=?, status=?,
+            home_team_id={_TEAM_ID_SQL}, away_team_id={_TEAM_ID_SQL}
         WHERE id=?
         """,
         (
@@ -90,12 +723,45 @@ def update_match(conn: sqlite3.Connection, row: dict) -> None:
             int(row["home_goals"]), int(row["away_goals"]),
             int(row["overtime"]), int(row["round"]),
             int(row["season"]), int(row["is_playoff"]),
+            match_status(row),
+            int(row["season"]), row["home_team"], int(row["season"]), row["away_team"],
             int(row["id"]),
         )
     )
     conn.commit()
 
 
+@traced
+def update_matches(conn: sqlite3.Connection, rows: list[dict]) -> None:
+    """Hromadný update viacerých zápasov v jednej transakcii (napr. výsledky celého kola)."""
+    for row in rows:
+        if row["home_team"] is None or row["away_team"] is None:
+            raise ValueError(f"Zápas {row['id']}: chýba domáci alebo hosťujúci tím.")
+    with conn:
+        conn.executemany(
+            f"""
+            UPDATE matches
+            SET home_team=?, away_team=?, home_goals=?, away_goals=?,
+                overtime=?, round=?, season=?, is_playoff=?, status=?,
+                home_team_id={_TEAM_ID_SQL}, away_team_id={_TEAM_ID_SQL}
+            WHERE id=?
+            """,
+            [
+                (
+                    row["home_team"], row["away_team"],
+                    int(row["home_goals"]), int(row["away_goals"]),
+                    int(row["overtime"]), int(row["round"]),
+                    int(row["season"]), int(row["is_playoff"]),
+                    match_status(row),
+                    int(row["season"]), row["home_team"], int(row["season"]), row["away_team"],
+                    int(row["id"]),
+                )
+                for row in rows
+            ],
+        )
+
+
+@traced
 def delete_match(conn: sqlite3.Connection, match_id: int) -> None:
     conn.execute("DELETE FROM matches WHERE id=?;", (match_id,))
     conn.commit()
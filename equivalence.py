@@ -0,0 +1,397 @@
+# equivalence.py
+#
+# Fuzz / property test ekvivalencie: optimalizované výpočty zo stats.py musia
+# dávať bunku po bunke rovnaký výsledok ako referenčné orákulá z reference.py
+# (čistý Python, iterrows). Generuje náhodné, ale platné sezóny (domáci z M,
+# hostia z V, bez remíz okrem nevyplnených 0:0) vrátane okrajových prípadov:
+#   empty          – sezóna bez zápasov
+#   schedule_only  – len rozpis 0:0, nič odohrané
+#   ot_only        – všetky zápasy po predĺžení
+#   sparse         – hrá len časť tímov (tímy bez zápasov)
+#   blowouts       – vysoké skóre (10+, shutouty)
+#   mixed          – všetko dokopy, aj rozpis 0:0 medzi výsledkami
+# Veľkosť ligy (počet M a V tímov) je tiež náhodná. Riadky sú zamiešané,
+# takže sa overuje aj triedenie podľa (round, id). Sezóny sa striedajú aj
+# v bodovaní (SCORING_VARIANTS) – každý druh prípadu prejde každé pravidlá.
+#
+# Každá optimalizovaná funkcia beží nad DataFrame, nad MatchStore aj nad
+# SeasonIndex.played (vstupy, ktoré používa aplikácia). Istota postupu
+# a vyradenie (compute_clinch) sa porovnávajú s prechodom všetkých dokončení
+# sezóny, so zvyškom rozpisu skráteným na pár zápasov. Scenáre „čo ak“
+# (Scenario.apply: prepísané výsledky a nové zápasy ako delty k základu) sa
+# porovnávajú s tabuľkou a Elo orákula nad upravenou sezónou. Meria sa čas oboch
+# strán. Pri rozdiele sa vstup zmenší (odoberajú sa riadky, kým rozdiel
+# trvá) a vypíše sa minimálny prípad; skript potom skončí s kódom 1.
+#
+# Použitie:
+#   python equivalence.py
+#   python equivalence.py --cases 500 --seed 7 --max-rounds 60
+
+import argparse
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+import reference
+from config import M_TEAMS, V_TEAMS
+from db import MATCH_COLUMNS, match_status
+from stats import (
+    DEFAULT_SCORING,
+    MatchStore,
+    Scenario,
+    ScoringRules,
+    SeasonIndex,
+    TeamSet,
+    compute_elo_history,
+    compute_clinch,
+    compute_elo_ratings,
+    compute_h2h_matrix,
+    compute_standings,
+    points_progression,
+    team_progression,
+)
+
+CASE_KINDS = ("empty", "schedule_only", "ot_only", "sparse", "blowouts", "mixed")
+
+# 3/2/1/0, 2/2/1/0 (výhra vždy 2, prehra po predĺžení 1) a liga bez predĺženia
+SCORING_VARIANTS = (
+    DEFAULT_SCORING,
+    ScoringRules(win=2, ot_win=2, ot_loss=1, loss=0),
+    ScoringRules(win=3, ot_win=3, ot_loss=0, loss=0, overtime=False),
+)
+
+# najviac vypísaných rozdielnych buniek na jednu kontrolu
+MAX_REPORTED_CELLS = 10
+
+# istota / vyradenie: orákulum prechádza všetky dokončenia sezóny (4^zápasy),
+# preto sa zo zvyšku rozpisu nechá len pár zápasov
+CLINCH_MAX_REMAINING = 5
+CLINCH_THRESHOLDS = (1, 2, 3)
+
+# scenáre: najviac prepísaných a pridaných zápasov na sezónu
+SCENARIO_OVERRIDES = 6
+SCENARIO_ADDITIONS = 3
+
+
+# --- generátor sezón ---
+
+def random_team_set(rng: np.random.Generator) -> TeamSet:
+    if rng.random() < 0.5:
+        return TeamSet(list(M_TEAMS), list(V_TEAMS))
+    m = int(rng.integers(1, len(M_TEAMS) + 1))
+    v = int(rng.integers(1, len(V_TEAMS) + 1))
+    return TeamSet(list(M_TEAMS[:m]), list(V_TEAMS[:v]))
+
+
+def _score(rng: np.random.Generator, kind: str) -> tuple[int, int, int]:
+    """(domáci, hostia, OT) bez remízy; rozpis 0:0 vracia len pre schedule_only / mixed."""
+    if kind == "schedule_only" or (kind == "mixed" and rng.random() < 0.2):
+        return 0, 0, 0
+    if kind == "ot_only" or (kind == "mixed" and rng.random() < 0.25):
+        loser = int(rng.integers(0, 6))
+        return (loser + 1, loser, 1) if rng.random() < 0.5 else (loser, loser + 1, 1)
+    top = 16 if kind == "blowouts" else 9
+    hg, ag = (int(g) for g in rng.integers(0, top, size=2))
+    while hg == ag:
+        hg, ag = (int(g) for g in rng.integers(0, top, size=2))
+    return hg, ag, 0
+
+
+def random_season(rng: np.random.Generator, team_set: TeamSet, kind: str, max_rounds: int) -> pd.DataFrame:
+    rows = []
+    if kind != "empty":
+        m_teams, v_teams = list(team_set.m), list(team_set.v)
+        if kind == "sparse":
+            m_teams = m_teams[: max(1, len(m_teams) // 2)]
+            v_teams = list(rng.permutation(v_teams)[: max(1, len(v_teams) // 2)])
+        n_rounds = int(rng.integers(1, max_rounds + 1))
+        for rnd in range(1, n_rounds + 1):
+            v_order = rng.permutation(v_teams)
+            for home, away in zip(m_teams, v_order):
+                hg, ag, ot = _score(rng, kind)
+                rows.append({
+                    "home_team": home, "away_team": str(away),
+                    "home_goals": hg, "away_goals": ag, "overtime": ot,
+                    "round": rnd, "season": 1, "is_playoff": int(rng.random() < 0.1),
+                })
+    ids = rng.choice(10 * len(rows) + 10, size=len(rows), replace=False) + 1
+    for row, mid in zip(rows, ids):
+        row["id"] = int(mid)
+        row["status"] = match_status(row)
+    df = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    if len(df):
+        df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+    return df.astype({c: "int64" for c in MATCH_COLUMNS if c not in ("home_team", "away_team", "status")})
+
+
+def random_edits(rng: np.random.Generator, df: pd.DataFrame, team_set: TeamSet) -> tuple[dict, dict]:
+    """
+    Úpravy pre Scenario: prepísané výsledky (odohraných aj nevyplnených zápasov,
+    aj späť na 0:0) a nové zápasy s novými id v ľubovoľnom kole.
+    """
+    overrides = {}
+    n = int(rng.integers(0, SCENARIO_OVERRIDES + 1))
+    for mid in rng.permutation(df["id"].to_numpy())[:n].tolist():
+        overrides[mid] = (0, 0, False) if rng.random() < 0.2 else _score(rng, "mixed")
+    additions = {}
+    last_round = int(df["round"].max()) if len(df) else 0
+    first_id = int(df["id"].max()) + 1 if len(df) else 1
+    for i in range(int(rng.integers(0, SCENARIO_ADDITIONS + 1))):
+        hg, ag, ot = _score(rng, "mixed")
+        additions[first_id + i] = {
+            "home_team": str(rng.choice(team_set.m)), "away_team": str(rng.choice(team_set.v)),
+            "home_goals": hg, "away_goals": ag, "overtime": ot,
+            "round": int(rng.integers(1, last_round + 3)),
+        }
+    return overrides, additions
+
+
+def edited_season(df: pd.DataFrame, overrides: dict, additions: dict) -> pd.DataFrame:
+    """Sezóna s úpravami zapísanými priamo do riadkov (vstup orákula)."""
+    rows = df.to_dict("records")
+    for row in rows:
+        if row["id"] in overrides:
+            row["home_goals"], row["away_goals"], row["overtime"] = (int(v) for v in overrides[row["id"]])
+            row["status"] = match_status(row)
+    for mid, add in additions.items():
+        row = {**add, "id": mid, "season": 1, "is_playoff": 0}
+        row["status"] = match_status(row)
+        rows.append(row)
+    out = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    return out.astype({c: "int64" for c in MATCH_COLUMNS if c not in ("home_team", "away_team", "status")})
+
+
+# --- porovnanie ---
+
+def diff_frames(expected: pd.DataFrame, actual: pd.DataFrame) -> list[str]:
+    """Rozdiely tvaru, indexu, typov a buniek (NaN / NA == NaN / NA)."""
+    if list(expected.columns) != list(actual.columns):
+        return [f"stĺpce: {list(expected.columns)} != {list(actual.columns)}"]
+    if len(expected) != len(actual):
+        return [f"počet riadkov: {len(expected)} != {len(actual)}"]
+    out = []
+    if not expected.index.equals(actual.index):
+        out.append(f"index: {list(expected.index)[:10]} != {list(actual.index)[:10]}")
+    for col in expected.columns:
+        if expected[col].dtype != actual[col].dtype:
+            out.append(f"typ {col}: {expected[col].dtype} != {actual[col].dtype}")
+        a = expected[col].to_numpy(dtype=object)
+        b = actual[col].to_numpy(dtype=object)
+        for i in range(len(a)):
+            na_a, na_b = pd.isna(a[i]), pd.isna(b[i])
+            if (na_a and na_b) or (not na_a and not na_b and a[i] == b[i]):
+                continue
+            out.append(f"riadok {expected.index[i]}, {col}: {a[i]!r} != {b[i]!r}")
+            if len(out) >= MAX_REPORTED_CELLS:
+                return out
+    return out
+
+
+def _inputs(df: pd.DataFrame, team_set: TeamSet) -> list[tuple[str, object]]:
+    return [
+        ("frame", df),
+        ("store", MatchStore.from_frame(df, team_set.all)),
+        ("index", SeasonIndex(df, team_set).played),
+    ]
+
+
+def season_checks(
+    team_set: TeamSet, scoring: ScoringRules = DEFAULT_SCORING
+) -> list[tuple[str, Callable, Callable]]:
+    """(názov, orákulum(df), optimalizovaná(vstup)) pre výpočty nad celou sezónou."""
+    ts, sc = team_set, scoring
+    checks = []
+    for scope in ("ALL", "M", "V"):
+        for detailed in (False, True):
+            checks.append((
+                f"standings[{scope}{', detailed' if detailed else ''}]",
+                lambda df, s=scope, d=detailed: reference.standings(df, s, d, team_set=ts, scoring=sc),
+                lambda m, s=scope, d=detailed: compute_standings(m, s, d, team_set=ts, scoring=sc),
+            ))
+    checks += [
+        ("elo_ratings", lambda df: reference.elo_ratings(df, team_set=ts),
+         lambda m: compute_elo_ratings(m, team_set=ts)),
+        ("elo_history", lambda df: reference.elo_history(df, team_set=ts),
+         lambda m: compute_elo_history(m, team_set=ts)),
+        ("h2h_matrix", lambda df: reference.h2h_matrix(df, team_set=ts, scoring=sc),
+         lambda m: compute_h2h_matrix(m, team_set=ts, scoring=sc)),
+    ]
+    return checks
+
+
+class Report:
+    def __init__(self):
+        self.times: dict[tuple[str, str], list[float]] = {}
+        self.failures: list[tuple[str, str, list[str], pd.DataFrame]] = []
+        self._failed_keys: set[tuple[str, str]] = set()
+
+    def time(self, name: str, variant: str, fn: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        t0 = time.perf_counter()
+        out = fn()
+        row = self.times.setdefault((name, variant), [0, 0.0, 0.0, 0])
+        row[1 if variant == "oracle" else 2] += time.perf_counter() - t0
+        row[0] += 1
+        return out
+
+    def record(self, name: str, variant: str, diffs: list[str], df: pd.DataFrame) -> None:
+        self.times[(name, variant)][3] += 1
+        if (name, variant) not in self._failed_keys:
+            self._failed_keys.add((name, variant))
+            self.failures.append((name, variant, diffs, df))
+
+    def table(self) -> pd.DataFrame:
+        oracle = {name: t[1] for (name, v), t in self.times.items() if v == "oracle"}
+        rows = []
+        for (name, variant), (calls, _, opt_s, diffs) in sorted(self.times.items()):
+            if variant == "oracle":
+                continue
+            rows.append({
+                "kontrola": name,
+                "vstup": variant,
+                "volania": calls,
+                "orákulum [ms]": round(oracle.get(name, 0.0) * 1000, 1),
+                "optimalizované [ms]": round(opt_s * 1000, 1),
+                "zrýchlenie": round(oracle.get(name, 0.0) / opt_s, 1) if opt_s else None,
+                "rozdiely": diffs,
+            })
+        return pd.DataFrame(rows)
+
+
+def shrink(df: pd.DataFrame, fails: Callable[[pd.DataFrame], bool]) -> pd.DataFrame:
+    """Zmenší vstup odoberaním úsekov riadkov, kým rozdiel pretrváva (delta debugging)."""
+    chunk = max(1, len(df) // 2)
+    while chunk >= 1:
+        i, shrunk = 0, False
+        while i < len(df):
+            candidate = df.drop(df.index[i:i + chunk])
+            if fails(candidate):
+                df, shrunk = candidate, True
+            else:
+                i += chunk
+        if not shrunk:
+            chunk //= 2
+    return df
+
+
+def _few_remaining(df: pd.DataFrame) -> pd.DataFrame:
+    """Sezóna so zvyškom rozpisu skráteným na CLINCH_MAX_REMAINING zápasov (podľa id)."""
+    rest = df.index[df["status"] != "played"]
+    drop = df.loc[rest].sort_values("id").index[CLINCH_MAX_REMAINING:]
+    return df.drop(drop)
+
+
+def check_case(
+    df: pd.DataFrame,
+    team_set: TeamSet,
+    report: Report,
+    do_shrink: bool = True,
+    scoring: ScoringRules = DEFAULT_SCORING,
+    edits: tuple[dict, dict] | None = None,
+) -> None:
+    for name, oracle, optimized in season_checks(team_set, scoring):
+        expected = report.time(name, "oracle", lambda: oracle(df))
+        for variant, inp in _inputs(df, team_set):
+            actual = report.time(name, variant, lambda: optimized(inp))
+            diffs = diff_frames(expected, actual)
+            if diffs:
+                def fails(sub: pd.DataFrame) -> bool:
+                    sub_inp = dict(_inputs(sub, team_set))[variant]
+                    return bool(diff_frames(oracle(sub), optimized(sub_inp)))
+                report.record(name, variant, diffs, shrink(df, fails) if do_shrink else df)
+
+    if scoring.splits is not None:
+        clinch_df = _few_remaining(df)
+        for scope in ("ALL", "M", "V"):
+            name = f"clinch[{scope}]"
+            expected = report.time(name, "oracle", lambda: reference.clinch(
+                clinch_df, scope, CLINCH_THRESHOLDS, team_set=team_set, scoring=scoring))
+            for variant, inp in (
+                ("frame", clinch_df),
+                ("store", MatchStore.from_frame(clinch_df, team_set.all)),
+            ):
+                actual = report.time(name, variant, lambda: compute_clinch(
+                    inp, scope, CLINCH_THRESHOLDS, team_set=team_set, scoring=scoring))
+                diffs = diff_frames(expected, actual)
+                if diffs:
+                    report.record(name, variant, diffs, clinch_df)
+
+    if edits is not None:
+        overrides, additions = edits
+        edited = edited_season(df, overrides, additions)
+        scenarios = [
+            (variant, Scenario(inp, team_set=team_set, scoring=scoring))
+            for variant, inp in (("frame", df), ("store", MatchStore.from_frame(df, team_set.all)))
+        ]
+        for scope in ("ALL", "M", "V"):
+            expected = report.time("scenario", "oracle", lambda: (
+                reference.standings(edited, scope, team_set=team_set, scoring=scoring),
+                reference.elo_ratings(edited, team_set=team_set),
+            ))
+            for variant, scenario in scenarios:
+                actual = report.time("scenario", variant, lambda: scenario.apply(overrides, additions, scope))
+                diffs = [f"tabuľka[{scope}]: {d}" for d in diff_frames(expected[0], actual.standings)]
+                diffs += [f"elo: {d}" for d in diff_frames(expected[1], actual.elo)]
+                if diffs:
+                    report.record("scenario", variant, diffs, edited)
+
+    idx = SeasonIndex(df, team_set)
+    for team in team_set.all:
+        team_df = idx.team_frame(team)
+        for name, oracle, optimized, need_games in (
+            ("team_progression", reference.team_progression, team_progression, True),
+            ("points_progression", reference.points_progression, points_progression, False),
+        ):
+            if need_games and team_df.empty:
+                continue  # aplikácia prázdny tím nezobrazuje
+            expected = report.time(name, "oracle", lambda: oracle(team_df, team, scoring))
+            actual = report.time(name, "team_frame", lambda: optimized(team_df, team, scoring))
+            diffs = diff_frames(expected, actual)
+            if diffs:
+                report.record(name, "team_frame", [f"tím {team}: {d}" for d in diffs], team_df)
+
+
+def run(cases: int, seed: int, max_rounds: int, do_shrink: bool = True, verbose: bool = False) -> Report:
+    rng = np.random.default_rng(seed)
+    report = Report()
+    for n in range(cases):
+        kind = CASE_KINDS[n % len(CASE_KINDS)]
+        scoring = SCORING_VARIANTS[n // len(CASE_KINDS) % len(SCORING_VARIANTS)]
+        team_set = random_team_set(rng)
+        df = random_season(rng, team_set, kind, max_rounds)
+        if verbose:
+            print(f"prípad {n}: {kind}, {len(team_set.m)}×{len(team_set.v)} tímov, "
+                  f"{len(df)} zápasov, body {scoring.label}")
+        edits = random_edits(np.random.default_rng((seed, n)), df, team_set)
+        check_case(df, team_set, report, do_shrink, scoring, edits)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Ekvivalencia optimalizovaných výpočtov s referenčnými.")
+    parser.add_argument("--cases", type=int, default=120, help="počet náhodných sezón")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=40, help="najviac kôl v sezóne")
+    parser.add_argument("--no-shrink", action="store_true", help="nezmenšovať vstup pri rozdiele")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = run(args.cases, args.seed, args.max_rounds, not args.no_shrink, args.verbose)
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(report.table().to_string(index=False))
+    if not report.failures:
+        print(f"\nBez rozdielov ({args.cases} sezón, seed {args.seed}).")
+        return 0
+    for name, variant, diffs, df in report.failures:
+        print(f"\nROZDIEL {name} ({variant}):")
+        for d in diffs:
+            print("  " + d)
+        print(f"  minimálny vstup ({len(df)} zápasov):")
+        print("    " + df.to_string(index=False).replace("\n", "\n    "))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
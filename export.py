@@ -0,0 +1,319 @@
+# export.py
+#
+# Export ligy (všetky sezóny, prípadne všetky ligy) – zápasy, tabuľky, Elo a H2H matice.
+# Zápasy sa streamujú z DB po dávkach (cursor.fetchmany) a zapisujú sa hneď,
+# v pamäti je naraz najviac jedna sezóna, takže spotreba pamäte nerastie
+# s dĺžkou histórie.
+#
+# Použitie bez UI:
+#   python export.py liga.xlsx
+#   python export.py liga_csv.zip --format csv --db hockey_league_fixed.db
+#   python export.py liga2.xlsx --league 2
+
+import argparse
+import csv
+import glob
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zipfile
+from typing import BinaryIO
+
+import pandas as pd
+
+from config import DB_DEFAULT
+from db import MATCH_COLUMNS, get_conn, ensure_schema, load_leagues, load_seasons, iter_matches
+from stats import compute_standings, compute_elo_ratings, compute_h2h_matrix, load_team_set, TeamSet
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+# súbory pre stiahnutie v UI (export_file): koľko posledných ostáva v adresári
+# a koľko sekúnd sa nemaže ani starší – sedenie ho ešte môže sťahovať
+EXPORT_KEEP = 4
+EXPORT_MIN_AGE = 3600.0
+
+# názov tabuľky -> názov hárku v xlsx / súboru v zip archíve
+TABLES = {
+    "matches": "Zápasy",
+    "standings": "Tabuľky",
+    "elo": "Elo",
+    "h2h": "H2H",
+}
+
+
+def _records(df: pd.DataFrame) -> list[list]:
+    """Riadky DataFrame ako zoznamy natívnych Python hodnôt (bez numpy typov)."""
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+class _XlsxSink:
+    """xlsx cez xlsxwriter v režime constant_memory – riadky sa hneď flushujú na disk."""
+
+    def __init__(self, path: "str | BinaryIO"):
+        import xlsxwriter
+
+        self.wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.sheets: dict[str, list] = {}
+
+    def write(self, table: str, columns: list[str], rows: list) -> None:
+        if table not in self.sheets:
+            ws = self.wb.add_worksheet(TABLES[table])
+            ws.write_row(0, 0, columns)
+            self.sheets[table] = [ws, 1]
+        ws, r = self.sheets[table]
+        for row in rows:
+            ws.write_row(r, 0, row)
+            r += 1
+        self.sheets[table][1] = r
+
+    def close(self) -> None:
+        self.wb.close()
+
+
+class _CsvSink:
+    """Jeden CSV súbor na tabuľku, na konci zbalené do zip archívu."""
+
+    def __init__(self, path: "str | BinaryIO"):
+        self.path = path
+        self.tmpdir = tempfile.mkdtemp(prefix="hokej_export_")
+        self.files: dict[str, tuple] = {}
+
+    def write(self, table: str, columns: list[str], rows: list) -> None:
+        if table not in self.files:
+            fpath = os.path.join(self.tmpdir, f"{TABLES[table]}.csv")
+            f = open(fpath, "w", newline="", encoding="utf-8")
+            w = csv.writer(f)
+            w.writerow(columns)
+            self.files[table] = (f, w, fpath)
+        self.files[table][1].writerows(rows)
+
+    def close(self) -> None:
+        try:
+            for f, _, _ in self.files.values():
+                f.close()
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as zf:
+                for _, _, fpath in self.files.values():
+                    zf.write(fpath, os.path.basename(fpath))
+        finally:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class _ParquetSink:
+    """Jeden Parquet súbor na tabuľku (row group na dávku), zbalené do zip archívu."""
+
+    def __init__(self, path: "str | BinaryIO"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Export do Parquet vyžaduje balík pyarrow (pip install pyarrow).") from e
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.tmpdir = tempfile.mkdtemp(prefix="hokej_export_")
+        self.writers: dict[str, tuple] = {}
+        self.columns: dict[str, list[str]] = {}
+
+    def write(self, table: str, columns: list[str], rows: list) -> None:
+        if not rows:
+            # typy stĺpcov určí prvá neprázdna dávka; tabuľka bez riadkov ostane len so stĺpcami
+            self.columns.setdefault(table, columns)
+            return
+        data = {c: [row[i] for row in rows] for i, c in enumerate(columns)}
+        if table not in self.writers:
+            batch = self.pa.table(data)
+            fpath = os.path.join(self.tmpdir, f"{TABLES[table]}.parquet")
+            self.writers[table] = (self.pq.ParquetWriter(fpath, batch.schema), fpath)
+        else:
+            batch = self.pa.table(data, schema=self.writers[table][0].schema)
+        self.writers[table][0].write_table(batch)
+
+    def close(self) -> None:
+        try:
+            for table, columns in self.columns.items():
+                if table not in self.writers:
+                    fpath = os.path.join(self.tmpdir, f"{TABLES[table]}.parquet")
+                    self.pq.write_table(self.pa.table({c: [] for c in columns}), fpath)
+                    self.writers[table] = (None, fpath)
+            for w, _ in self.writers.values():
+                if w is not None:
+                    w.close()
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED) as zf:
+                for _, fpath in self.writers.values():
+                    zf.write(fpath, os.path.basename(fpath))
+        finally:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+_SINKS = {"xlsx": _XlsxSink, "csv": _CsvSink, "parquet": _ParquetSink}
+
+
+def _write_season_stats(
+    sink, league: str, label: str, season_id: int, season_df: pd.DataFrame, team_set: TeamSet
+) -> None:
+    """Tabuľka, Elo a H2H pre jednu sezónu (sezóna je jediný celok držaný v pamäti)."""
+    standings = compute_standings(season_df, "ALL", detailed=True, team_set=team_set)
+    standings.insert(0, "Poradie", standings.index)
+    elo = compute_elo_ratings(season_df, team_set=team_set)
+    h2h = compute_h2h_matrix(season_df, team_set=team_set)
+
+    for table, df in (("standings", standings), ("elo", elo), ("h2h", h2h)):
+        df.insert(0, "season", season_id)
+        df.insert(0, "Sezóna", label)
+        df.insert(0, "Liga", league)
+        sink.write(table, list(df.columns), _records(df))
+
+
+def export_league(
+    conn: sqlite3.Connection,
+    out_path: "str | BinaryIO",
+    fmt: str = "xlsx",
+    batch_size: int = 1000,
+    league_id: int | None = None,
+) -> "str | BinaryIO":
+    """
+    Exportuje všetky sezóny ligy (league_id=None -> všetkých líg) do jedného súboru:
+      - xlsx: jeden zošit s hárkami Zápasy / Tabuľky / Elo / H2H
+      - csv, parquet: zip archív s jedným súborom na tabuľku
+    out_path môže byť aj binárny súborový objekt.
+    Sezóny bez zápasov majú v tabuľkách, Elo a H2H riadky tímov s nulami.
+    Vracia out_path.
+    """
+    if fmt not in _SINKS:
+        raise ValueError(f"Neznámy formát exportu: {fmt} (povolené: {', '.join(EXPORT_FORMATS)})")
+
+    seasons = load_seasons(conn, league_id)
+    labels = dict(seasons[["id", "label"]].itertuples(index=False, name=None))
+    season_league = dict(seasons[["id", "league_id"]].itertuples(index=False, name=None))
+    league_names = dict(load_leagues(conn).itertuples(index=False, name=None))
+    team_sets: dict[int, TeamSet] = {}
+
+    def write_stats(season_id: int, rows: list[tuple], columns: list[str]) -> None:
+        lid = season_league.get(season_id)
+        if lid not in team_sets:
+            team_sets[lid] = load_team_set(conn, lid)
+        _write_season_stats(
+            sink,
+            league_names.get(lid, ""),
+            labels.get(season_id, str(season_id)),
+            season_id,
+            pd.DataFrame.from_records(rows, columns=columns),
+            team_sets[lid],
+        )
+
+    # sezóny bez zápasov (v poradí id) dostanú tabuľku s nulami, Elo a H2H tiež
+    without_matches = sorted(labels)
+
+    def write_empty(before: int | None = None) -> None:
+        while without_matches and (before is None or without_matches[0] < before):
+            write_stats(without_matches.pop(0), [], MATCH_COLUMNS)
+
+    sink = _SINKS[fmt](out_path)
+
+    try:
+        current_season = None
+        season_rows: list[tuple] = []
+        columns: list[str] = MATCH_COLUMNS
+        sink.write("matches", ["Liga", "Sezóna"] + columns, [])
+
+        for columns, rows in iter_matches(conn, batch_size=batch_size, league_id=league_id):
+            season_idx = columns.index("season")
+            sink.write(
+                "matches",
+                ["Liga", "Sezóna"] + columns,
+                [
+                    [
+                        league_names.get(season_league.get(r[season_idx]), ""),
+                        labels.get(r[season_idx], str(r[season_idx])),
+                    ] + list(r)
+                    for r in rows
+                ],
+            )
+
+            for row in rows:
+                if row[season_idx] != current_season:
+                    if season_rows:
+                        write_stats(current_season, season_rows, columns)
+                    current_season = row[season_idx]
+                    season_rows = []
+                    write_empty(current_season)
+                    if without_matches and without_matches[0] == current_season:
+                        without_matches.pop(0)
+                season_rows.append(row)
+
+        if season_rows:
+            write_stats(current_season, season_rows, columns)
+        write_empty()
+    finally:
+        sink.close()
+
+    return out_path
+
+
+def export_file(
+    conn: sqlite3.Connection,
+    db_path: str,
+    version: int,
+    directory: str,
+    fmt: str = "xlsx",
+    league_id: int | None = None,
+) -> str:
+    """
+    Export ligy do súboru v adresári directory pre verziu dát version – zapisuje
+    sa priebežne na disk (export_league), v pamäti ostáva len cesta. Rovnaká DB,
+    liga, verzia a formát sa neexportuje znova. Staršie súbory tej istej DB sa
+    mažú, až keď sú za poslednými EXPORT_KEEP a staršie ako EXPORT_MIN_AGE s.
+    Vracia cestu k súboru.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    scope = "vsetky" if league_id is None else f"liga{league_id}"
+    suffix = ".xlsx" if fmt == "xlsx" else f"_{fmt}.zip"
+    path = os.path.join(directory, f"{stem}.{scope}.v{version}{suffix}")
+    if os.path.exists(path):
+        return path
+
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        export_league(conn, tmp, fmt=fmt, league_id=league_id)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    exports = sorted(
+        (f for f in glob.glob(os.path.join(directory, f"{glob.escape(stem)}.*.v*")) if not f.endswith(".tmp")),
+        key=os.path.getmtime,
+    )
+    cutoff = time.time() - EXPORT_MIN_AGE
+    for old in exports[:-EXPORT_KEEP]:
+        try:
+            if os.path.getmtime(old) < cutoff:
+                os.remove(old)
+        except OSError:
+            pass
+    return path
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export ligy (všetky sezóny).")
+    parser.add_argument("out", help="výstupný súbor (.xlsx alebo .zip)")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None,
+                        help="formát exportu (predvolene podľa prípony: .xlsx -> xlsx, inak csv)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--league", type=int, default=None, help="ID ligy (predvolene všetky ligy)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("xlsx" if args.out.lower().endswith(".xlsx") else "csv")
+    conn = get_conn(args.db)
+    ensure_schema(conn)
+    export_league(conn, args.out, fmt=fmt, batch_size=args.batch_size, league_id=args.league)
+    print(f"Export hotový: {args.out} ({fmt})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# integrity.py
+#
+# Kontrola uložených dát voči pravidlám, ktoré vynucuje formulár zápisu:
+#   - draw          odohraný zápas nesmie skončiť remízou (0:0 je nevyplnený rozpis)
+#   - same_team     domáci a hostia nesmú byť ten istý tím
+#   - duplicate     každý tím najviac raz v (sezóna, kolo)
+#   - home_side     domáci tím musí byť z M skupiny (strana podľa tímov ligy sezóny)
+#   - away_side     hosťujúci tím musí byť z V skupiny
+#   - orphan_season zápas odkazuje na neexistujúcu sezónu
+# Všetko beží ako niekoľko agregačných SQL dotazov nad celou tabuľkou (jeden
+# prechod na pravidlo po indexoch, bez načítania riadkov do pandas), takže aj
+# milióny zápasov sa skontrolujú za pár sekúnd. Funguje aj nad staršími tabuľkami
+# ako matches_backup.
+#
+# Použitie bez UI:
+#   python integrity.py
+#   python integrity.py --db hockey_league_fixed.db --table matches_backup
+
+import argparse
+import sqlite3
+import sys
+
+import pandas as pd
+
+from config import DB_DEFAULT
+from db import get_conn, ensure_schema
+
+RULES = {
+    "draw": "Remíza v odohranom zápase",
+    "same_team": "Domáci a hostia sú ten istý tím",
+    "duplicate": "Tím hrá v kole viackrát",
+    "home_side": "Domáci tím nie je z M skupiny",
+    "away_side": "Hosťujúci tím nie je z V skupiny",
+    "orphan_season": "Zápas odkazuje na neexistujúcu sezónu",
+}
+
+REPORT_COLUMNS = ["rule", "season", "round", "team", "ids", "detail"]
+
+
+def match_tables(conn: sqlite3.Connection) -> list[str]:
+    """Tabuľky so schémou zápasov (matches, matches_backup, ...), ktoré sa dajú kontrolovať."""
+    needed = {"home_team", "away_team", "home_goals", "away_goals", "round", "season"}
+    out = []
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'matches%' ORDER BY name;"
+    ):
+        cols = {r[1] for r in conn.execute(f'PRAGMA table_info("{name}");')}
+        if needed <= cols:
+            out.append(name)
+    return out
+
+
+def _on_side(season: str, code: str, side: str) -> str:
+    """Tím s kódom patrí v lige sezóny na stranu side (M/V)."""
+    return (
+        "EXISTS (SELECT 1 FROM teams AS tm JOIN seasons AS sn ON sn.league_id = tm.league_id "
+        f"WHERE sn.id = {season} AND tm.code = {code} AND tm.side = '{side}')"
+    )
+
+
+def check_integrity(conn: sqlite3.Connection, table: str = "matches") -> pd.DataFrame:
+    """
+    Vráti všetky porušenia pravidiel v tabuľke zápasov ako DataFrame
+    (rule, season, round, team, ids, detail); ids sú ID riadkov oddelené čiarkou.
+    Prázdny výsledok = dáta sú v poriadku.
+    """
+    if table not in match_tables(conn):
+        raise ValueError(f"Tabuľka {table!r} neexistuje alebo nemá schému zápasov.")
+    t = f'"{table}"'
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({t});")}
+    has_status = "status" in cols
+    # tím v kole sa páruje cez celočíselné team_id (indexy), v starších tabuľkách cez kód
+    if {"home_team_id", "away_team_id"} <= cols:
+        hk, ak = "home_team_id", "away_team_id"
+        team_out = "(SELECT code FROM teams WHERE id = k.team)"
+    else:
+        hk, ak = "home_team", "away_team"
+        team_out = "k.team"
+    # odohraný zápas: podľa stĺpca status, v starších tabuľkách podľa výsledku (0:0 = rozpis)
+    played_sql = (
+        "status = 'played'" if has_status else "NOT (home_goals = 0 AND away_goals = 0)"
+    )
+
+    queries: list[tuple[str, str, list]] = [
+        (
+            "draw",
+            f"""SELECT season, round, NULL AS team, CAST(id AS TEXT) AS ids,
+                       home_team || ' ' || home_goals || ' : ' || away_goals || ' ' || away_team AS detail
+                FROM {t}
+                WHERE home_goals = away_goals AND {played_sql}""",
+            [],
+        ),
+        (
+            "same_team",
+            f"""SELECT season, round, home_team AS team, CAST(id AS TEXT) AS ids, NULL AS detail
+                FROM {t} WHERE home_team = away_team""",
+            [],
+        ),
+        (
+            # tím dvakrát doma / dvakrát vonku v kole – GROUP BY ide po indexe
+            # (season, home_team_id|away_team_id, round) bez triedenia celej tabuľky;
+            # tím doma v jednom a vonku v inom zápase kola je možný len pri
+            # porušenej orientácii M/V, takže sa dohľadáva len pre tie riadky
+            "duplicate",
+            f"""WITH keys AS (
+                    SELECT season, round, {hk} AS team FROM {t}
+                    WHERE {hk} IS NOT NULL
+                    GROUP BY season, {hk}, round HAVING count(*) > 1
+                    UNION
+                    SELECT season, round, {ak} AS team FROM {t}
+                    WHERE {ak} IS NOT NULL
+                    GROUP BY season, {ak}, round HAVING count(*) > 1
+                    UNION
+                    SELECT a.season, a.round, a.{ak} FROM {t} AS a
+                    JOIN {t} AS b ON b.season = a.season AND b.{hk} = a.{ak}
+                                 AND b.round = a.round AND b.id <> a.id
+                    WHERE NOT {_on_side("a.season", "a.away_team", "V")}
+                    UNION
+                    SELECT a.season, a.round, a.{hk} FROM {t} AS a
+                    JOIN {t} AS b ON b.season = a.season AND b.{ak} = a.{hk}
+                                 AND b.round = a.round AND b.id <> a.id
+                    WHERE NOT {_on_side("a.season", "a.home_team", "M")}
+                )
+                SELECT k.season, k.round, {team_out} AS team, group_concat(m.id) AS ids,
+                       count(*) || ' zápasy v kole' AS detail
+                FROM keys AS k
+                JOIN {t} AS m ON m.season = k.season AND m.round = k.round
+                             AND (m.{hk} = k.team OR m.{ak} = k.team)
+                GROUP BY k.season, k.round, k.team""",
+            [],
+        ),
+        (
+            "home_side",
+            f"""SELECT m.season, m.round, m.home_team AS team, CAST(m.id AS TEXT) AS ids,
+                       m.home_team || ' – ' || m.away_team AS detail
+                FROM {t} AS m JOIN seasons AS s ON s.id = m.season
+                WHERE NOT {_on_side("m.season", "m.home_team", "M")}""",
+            [],
+        ),
+        (
+            "away_side",
+            f"""SELECT m.season, m.round, m.away_team AS team, CAST(m.id AS TEXT) AS ids,
+                       m.home_team || ' – ' || m.away_team AS detail
+                FROM {t} AS m JOIN seasons AS s ON s.id = m.season
+                WHERE NOT {_on_side("m.season", "m.away_team", "V")}""",
+            [],
+        ),
+        (
+            "orphan_season",
+            f"""SELECT m.season, NULL AS round, NULL AS team, group_concat(m.id) AS ids,
+                       count(*) || ' zápasov bez sezóny' AS detail
+                FROM {t} AS m LEFT JOIN seasons AS s ON s.id = m.season
+                WHERE s.id IS NULL
+                GROUP BY m.season""",
+            [],
+        ),
+    ]
+
+    frames = []
+    for rule, sql, params in queries:
+        df = pd.read_sql_query(sql, conn, params=params)
+        if not df.empty:
+            df.insert(0, "rule", rule)
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[REPORT_COLUMNS]
+
+
+def summarize(report: pd.DataFrame) -> pd.DataFrame:
+    """Počet porušení na pravidlo (aj nulové), pre prehľad v UI / výpis."""
+    counts = report["rule"].value_counts() if not report.empty else pd.Series(dtype=int)
+    return pd.DataFrame(
+        [{"rule": r, "popis": RULES[r], "počet": int(counts.get(r, 0))} for r in RULES]
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Kontrola integrity zápasov v DB.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--table", default=None, help="tabuľka zápasov (predvolene všetky matches*)")
+    args = parser.parse_args(argv)
+
+    conn = get_conn(args.db)
+    ensure_schema(conn)
+    tables = [args.table] if args.table else match_tables(conn)
+    total = 0
+    for table in tables:
+        report = check_integrity(conn, table)
+        total += len(report)
+        print(f"== {table}: {len(report)} porušení")
+        print(summarize(report).to_string(index=False))
+        if not report.empty:
+            print(report.to_string(index=False, max_rows=200))
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
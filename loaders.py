@@ -0,0 +1,166 @@
+# loaders.py
+#
+# Načítanie a výpočet pohľadov (tabuľky, Elo, H2H, história ligy) mimo UI
+# a ich predvýpočet na pozadí po štarte servera (Warmup).
+#
+# Cache v app.py sú kľúčované verziou dát (db.data_version). Verzia sa vždy
+# prečíta PRED načítaním dát a počítadlo zmien len rastie, takže záznam pod
+# verziou v nikdy neobsahuje dáta staršie ako v – zápis počas výpočtu teda
+# nemôže do cache dostať zastaraný výsledok pre aktuálnu verziu. Warmup len
+# zahodí zvyšok práce pre starú verziu a začne znova s novou.
+#
+# Každé vlákno má vlastné SQLite spojenie (thread_conn) – zdieľané spojenie
+# UI sa z pozadia nepoužíva.
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pandas as pd
+
+from db import get_conn, load_seasons, played_matches
+from stats import (
+    MatchStore,
+    SeasonIndex,
+    TeamSet,
+    compute_elo_history,
+    compute_elo_ratings,
+    compute_h2h_matrix,
+    compute_standings,
+)
+from snapshots import load_snapshots, standings_from_snapshot
+
+_local = threading.local()
+
+
+def thread_conn(
+    db_path: str, opener: Callable[[str], sqlite3.Connection] = get_conn
+) -> sqlite3.Connection:
+    """Spojenie na db_path patriace aktuálnemu vláknu (otvorí sa pri prvom použití)."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = conns[db_path] = opener(db_path)
+    return conn
+
+
+# --- pohľady sezóny: uzavretá sezóna zo snapshotu, otvorená sa prepočíta ---
+
+def season_standings(
+    idx: SeasonIndex, snap: dict | None, scope: str = "ALL", detailed: bool = False
+) -> pd.DataFrame:
+    if snap:
+        return standings_from_snapshot(snap, scope, detailed)
+    return compute_standings(idx.played, scope, detailed=detailed, team_set=idx.teams)
+
+
+def season_elo(idx: SeasonIndex, snap: dict | None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(Elo ratingy, vývoj ratingu po kolách)."""
+    if snap:
+        return snap["elo"], snap["elo_history"]
+    return (
+        compute_elo_ratings(idx.played, team_set=idx.teams),
+        compute_elo_history(idx.played, team_set=idx.teams),
+    )
+
+
+def season_h2h(idx: SeasonIndex, snap: dict | None) -> pd.DataFrame:
+    return snap["h2h"] if snap else compute_h2h_matrix(idx.played, team_set=idx.teams)
+
+
+def league_history(conn: sqlite3.Connection, league_id: int, team_set: TeamSet) -> MatchStore:
+    """Všetky odohrané zápasy ligy (aj archív) ako kompaktné polia."""
+    return MatchStore.from_frame(played_matches(conn, league_id=league_id), team_set.all)
+
+
+def league_season_standings(
+    conn: sqlite3.Connection, league_id: int, history: MatchStore, team_set: TeamSet
+) -> dict[int, pd.DataFrame]:
+    """
+    Základná tabuľka (ALL) každej sezóny ligy, ktorá má odohrané zápasy:
+    uzavreté sezóny zo snapshotov (jeden dotaz), ostatné z histórie ligy.
+    """
+    seasons = load_seasons(conn, league_id)
+    snaps = load_snapshots(conn, seasons.loc[seasons["closed"] == 1, "id"].tolist())
+    out = {}
+    for sid in seasons["id"].astype(int):
+        view = history.season_view(sid)
+        if view.empty:
+            continue
+        if sid in snaps:
+            out[sid] = standings_from_snapshot(snaps[sid], "ALL")
+        else:
+            out[sid] = compute_standings(view, "ALL", detailed=False, team_set=team_set)
+    return out
+
+
+class Warmup:
+    """
+    Predvýpočet cache na pozadí: jobs(version) vráti zoznam (názov, funkcia)
+    pre danú verziu dát, funkcie bežia paralelne v ThreadPoolExecutor. Pred
+    každou úlohou sa overí verzia; ak sa dáta medzitým zmenili, zvyšok sa
+    preskočí a warm-up sa spustí znova pre novú verziu (najviac max_rounds krát).
+    UI medzitým normálne beží – chýbajúci záznam si dopočíta samo.
+    """
+
+    def __init__(
+        self,
+        version: Callable[[], int],
+        jobs: Callable[[int], list[tuple[str, Callable[[], object]]]],
+        workers: int = 4,
+        max_rounds: int = 3,
+    ):
+        self._version = version
+        self._jobs = jobs
+        self._workers = workers
+        self._max_rounds = max_rounds
+        self._lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+        self.errors: list[str] = []
+        self.finished = False
+        self.seconds = 0.0
+
+    def start(self) -> "Warmup":
+        threading.Thread(target=self._run, name="cache-warmup", daemon=True).start()
+        return self
+
+    def progress(self) -> float:
+        with self._lock:
+            return 1.0 if self.finished or not self.total else self.done / self.total
+
+    def _step(self, version: int, name: str, fn: Callable[[], object]) -> bool:
+        try:
+            if self._version() != version:
+                return False
+            fn()
+        except Exception as exc:  # warm-up nesmie zhodiť server, chyba sa len zobrazí
+            with self._lock:
+                self.errors.append(f"{name}: {exc}")
+        with self._lock:
+            self.done += 1
+        return True
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        try:
+            for _ in range(self._max_rounds):
+                version = self._version()
+                jobs = self._jobs(version)
+                with self._lock:
+                    self.total, self.done = len(jobs), 0
+                with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="warmup") as pool:
+                    ran = list(pool.map(lambda job: self._step(version, *job), jobs))
+                if all(ran) and self._version() == version:
+                    break
+        except Exception as exc:
+            with self._lock:
+                self.errors.append(str(exc))
+        finally:
+            with self._lock:
+                self.finished = True
+                self.seconds = time.perf_counter() - start
@@ -0,0 +1,242 @@
+# loadtest.py
+#
+# Záťažový test aplikácie: N súbežných relácií (streamlit.testing AppTest,
+# každá vo vlastnom vlákne) nad syntetickou DB (synthetic.py). Relácie
+# náhodne prepínajú sekcie, zapisujú výsledky celých kôl a pripravujú
+# exporty. Všetky bežia v jednom procese, takže zdieľajú st.cache_resource
+# (spojenia, pohľady) presne ako relácie jedného Streamlit servera – test
+# meria správanie spojení a cache pri súbehu, nie jednotlivé funkcie.
+#
+# Výstup: p50 / p95 / p99 / max latencie prekreslenia pre každú akciu
+# (sekciu, zápis kola, export) a čakanie na zápisový zámok DB. Zámok meria
+# sonda vo vedľajšom vlákne: v pravidelných intervaloch otvorí BEGIN IMMEDIATE
+# na vlastnom spojení a zaznamená, ako dlho čakala.
+#
+# DB sa vytvorí v pracovnom adresári pod menom DB_DEFAULT (aplikácia ju tak
+# otvorí bez zmeny cesty v sidebare).
+#
+# Použitie:
+#   python loadtest.py
+#   python loadtest.py --sessions 16 --actions 30 --seasons 8 --json vysledky.json
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from config import DB_DEFAULT
+from synthetic import build_synthetic_db, random_result
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+READ_SECTIONS = ["Prehľad zápasov", "Tabuľky", "Grafy", "Viac sezón", "Head-to-Head"]
+PERCENTILES = (50, 95, 99)
+
+# váhy akcií relácie: prepnutie sekcie / zápis kola / export
+ACTION_WEIGHTS = {"tab": 0.7, "results": 0.2, "export": 0.1}
+
+
+class LockProbe:
+    """Periodicky meria čakanie na zápisový zámok (BEGIN IMMEDIATE) vo vlastnom vlákne."""
+
+    def __init__(self, db_path: str, interval: float = 0.05):
+        self._conn = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._interval = interval
+        self._stop = threading.Event()
+        self.waits_ms: list[float] = []
+        self._thread = threading.Thread(target=self._run, name="lock-probe", daemon=True)
+
+    def start(self) -> "LockProbe":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            t0 = time.perf_counter()
+            self._conn.execute("BEGIN IMMEDIATE;")
+            self.waits_ms.append((time.perf_counter() - t0) * 1000)
+            self._conn.execute("ROLLBACK;")
+
+
+class Session:
+    """Jedna simulovaná relácia – zaznamenáva (akcia, ms, chyba) do spoločného zoznamu."""
+
+    def __init__(self, n: int, records: list, lock: threading.Lock, seed: int, timeout: float):
+        self.n = n
+        self._records = records
+        self._lock = lock
+        self._rng = np.random.default_rng(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def _timed(self, action: str, widget) -> None:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            widget.run()
+            if self.at.exception:
+                error = self.at.exception[0].value
+            elif self.at.error:
+                error = self.at.error[0].value
+        except Exception as exc:  # timeout / pád skriptu – zaráta sa ako chyba akcie
+            error = str(exc)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._records.append((self.n, action, ms, error))
+
+    def _section(self, name: str) -> None:
+        if not self.at.sidebar.radio:
+            # predošlé prekreslenie spadlo skôr, než vykreslilo sidebar – nová relácia
+            self._timed("štart", self.at)
+            if not self.at.sidebar.radio:
+                return
+        self._timed(name, self.at.sidebar.radio[0].set_value(name))
+
+    def _button(self, label: str):
+        return next((b for b in self.at.button if b.label == label), None)
+
+    def enter_round(self) -> None:
+        self._section("Zadávanie zápasov")
+        goals = {w.key: w for w in self.at.number_input if w.key and w.key.startswith(("hg_round", "ag_round"))}
+        submit = self._button("Uložiť výsledky kola")
+        if not goals or submit is None:
+            return
+        for key in [k for k in goals if k.startswith("hg_round")]:
+            hg, ag, ot = random_result(self._rng)
+            mid = key.split("_id", 1)[1]
+            goals[key].set_value(hg)
+            goals[key.replace("hg_round", "ag_round", 1)].set_value(ag)
+            ot_box = next((c for c in self.at.checkbox if c.key and c.key.endswith(f"_id{mid}")), None)
+            if ot_box is not None:
+                ot_box.set_value(bool(ot))
+        self._timed("zápis kola", submit.click())
+
+    def export(self) -> None:
+        if self._rng.random() < 0.5:
+            self._section("Prehľad zápasov")
+            button = self._button("Pripraviť export všetkých zápasov sezóny")
+            action = "export: zápasy sezóny"
+        else:
+            self._section("Viac sezón")
+            button = self._button("Pripraviť export")
+            action = "export: liga"
+        if button is not None:
+            self._timed(action, button.click())
+
+    def run(self, actions: int, think: float) -> None:
+        self._timed("štart", self.at)
+        names, weights = list(ACTION_WEIGHTS), list(ACTION_WEIGHTS.values())
+        for _ in range(actions):
+            kind = self._rng.choice(names, p=weights)
+            if kind == "tab":
+                self._section(str(self._rng.choice(READ_SECTIONS)))
+            elif kind == "results":
+                self.enter_round()
+            else:
+                self.export()
+            if think:
+                time.sleep(self._rng.uniform(0, think))
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    arr = np.asarray(values)
+    out = {"n": len(arr)}
+    for p in PERCENTILES:
+        out[f"p{p} [ms]"] = round(float(np.percentile(arr, p)), 1)
+    out["max [ms]"] = round(float(arr.max()), 1)
+    return out
+
+
+def run_load_test(
+    workdir: str,
+    sessions: int = 8,
+    actions: int = 20,
+    think: float = 0.0,
+    seasons: int = 4,
+    leagues: int = 1,
+    seed: int = 0,
+    timeout: float = 120.0,
+) -> dict:
+    """Pripraví syntetickú DB vo workdir, spustí relácie a vráti štatistiky."""
+    db_path = os.path.join(workdir, DB_DEFAULT)
+    info = build_synthetic_db(db_path, leagues=leagues, seasons=seasons, seed=seed)
+
+    records: list[tuple[int, str, float, str | None]] = []
+    lock = threading.Lock()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    probe = LockProbe(db_path).start()
+    t0 = time.perf_counter()
+    try:
+        runners = [Session(n, records, lock, seed + n, timeout) for n in range(sessions)]
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+            for fut in [pool.submit(s.run, actions, think) for s in runners]:
+                fut.result()
+    finally:
+        wall = time.perf_counter() - t0
+        probe.stop()
+        os.chdir(cwd)
+
+    df = pd.DataFrame(records, columns=["session", "action", "ms", "error"])
+    per_action = {
+        action: {**summarize(g["ms"].tolist()), "chyby": int(g["error"].notna().sum())}
+        for action, g in df.groupby("action", sort=True)
+    }
+    errors = df.loc[df["error"].notna(), ["session", "action", "error"]]
+    return {
+        "db": info,
+        "sessions": sessions,
+        "wall_s": round(wall, 2),
+        "renders": len(df),
+        "actions": per_action,
+        "lock_wait": summarize(probe.waits_ms),
+        "errors": errors.head(20).to_dict(orient="records"),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Záťažový test – súbežné relácie nad syntetickou DB.")
+    parser.add_argument("--sessions", type=int, default=8, help="počet súbežných relácií")
+    parser.add_argument("--actions", type=int, default=20, help="akcií na reláciu")
+    parser.add_argument("--think", type=float, default=0.0, help="najviac s pauzy medzi akciami")
+    parser.add_argument("--seasons", type=int, default=4, help="sezón na ligu v syntetickej DB")
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="timeout jedného prekreslenia (s)")
+    parser.add_argument("--workdir", default=None, help="adresár pre syntetickú DB (predvolene dočasný)")
+    parser.add_argument("--json", default=None, help="uložiť výsledky ako JSON")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="hokej_load_")
+    os.makedirs(workdir, exist_ok=True)
+    result = run_load_test(
+        workdir, args.sessions, args.actions, args.think, args.seasons, args.leagues, args.seed, args.timeout
+    )
+
+    print(f"{result['sessions']} relácií, {result['renders']} prekreslení za {result['wall_s']} s "
+          f"({result['db']['matches']} zápasov v {workdir})")
+    print(pd.DataFrame(result["actions"]).T.to_string())
+    print("Čakanie na zápisový zámok:", result["lock_wait"])
+    for err in result["errors"]:
+        print(f"  chyba (relácia {err['session']}, {err['action']}): {err['error']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
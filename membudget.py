@@ -0,0 +1,369 @@
+# membudget.py
+#
+# Rozpočty pamäte pre veľké histórie: na syntetických ligách rastúcej
+# veľkosti (synthetic.py) zmeria tracemalloc špičku (peak) a zadržanú pamäť
+# (retained – čo ostane alokované po zahodení výsledku a gc) pre
+#   - každú hlavnú funkciu stats.py (vstup = celá história ligy),
+#   - každé čítanie z db.py,
+#   - export ligy (export.py) do každého formátu,
+#   - úplné prekreslenie každej sekcie aplikácie (AppTest; zadržaná pamäť
+#     zahŕňa cache a session_state – napr. schedule_preview v Rozpise).
+#
+# Každé meranie sa porovná s rozpočtom v BUDGETS (pevná časť + KiB na 1000
+# zápasov ligy); prekročenie alebo chýbajúci rozpočet = chyba, skript skončí
+# s kódom 1, takže sa dá zaradiť do CI ako regresný test.
+#
+# Streamované prípady (STREAMING: iter_matches, export) majú plochý rozpočet
+# bez časti na 1000 zápasov – merajú sa s dávkou STREAM_BATCH menšou než
+# najmenšia liga, takže návrat k načítaniu celej histórie naraz rozpočet prekročí.
+#
+# Po zámernej zmene pamäťovej náročnosti vypíše --suggest nové rozpočty
+# (namerané hodnoty s rezervou) na skopírovanie do BUDGETS.
+#
+# Použitie:
+#   python membudget.py
+#   python membudget.py --sizes 2 8 --no-tabs
+#   python membudget.py --suggest
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+from config import DB_DEFAULT
+from export import EXPORT_FORMATS, export_league
+from db import (
+    count_matches_filtered,
+    data_version,
+    fetch_match_by_id,
+    fetch_matches,
+    fetch_matches_page,
+    get_conn,
+    iter_matches,
+    load_leagues,
+    load_seasons,
+    load_teams,
+    pending_rounds,
+    played_matches,
+    season_rounds,
+)
+from stats import (
+    MatchStore,
+    SeasonIndex,
+    compute_elo_history,
+    compute_elo_ratings,
+    compute_h2h_matrix,
+    compute_season_records,
+    compute_standings,
+    load_team_set,
+)
+from synthetic import build_synthetic_db
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# počet sezón syntetickej ligy pre jednotlivé veľkosti (256 zápasov na sezónu)
+DEFAULT_SIZES = (2, 8, 24)
+# zahrievací beh (nemeria sa): prvé importy knižníc (grafy, Excel) by inak
+# vyzerali ako zadržaná pamäť prvej sekcie, ktorá ich použije
+WARMUP_SIZE = 1
+
+# streamované prípady: plochý rozpočet (peak_per_1k = retained_per_1k = 0)
+STREAMING = {
+    "db.iter_matches[league]",
+    *(f"export.export_league[{fmt}]" for fmt in EXPORT_FORMATS),
+}
+# veľkosť dávky streamovaných prípadov – menšia než najmenšia liga (1 sezóna = 256 zápasov)
+STREAM_BATCH = 100
+
+# rezerva pri --suggest
+SUGGEST_HEADROOM = 1.5
+SUGGEST_SLACK_KIB = 64.0
+
+KIB = 1024
+
+
+class Budget(NamedTuple):
+    """Limity v KiB: pevná časť + časť úmerná počtu zápasov ligy (na 1000 zápasov)."""
+
+    peak_kib: float
+    peak_per_1k: float
+    retained_kib: float
+    retained_per_1k: float
+
+    def limits(self, matches: int) -> tuple[float, float]:
+        k = matches / 1000
+        return (
+            (self.peak_kib + self.peak_per_1k * k) * KIB,
+            (self.retained_kib + self.retained_per_1k * k) * KIB,
+        )
+
+
+# namerané cez --suggest (CPython 3.11, pandas 3); pri zámernej zmene pregenerovať
+BUDGETS: dict[str, Budget] = {
+    "stats.load_team_set": Budget(94, 0.1, 64, 0.1),
+    "stats.MatchStore.from_frame": Budget(64, 284.1, 67, 0.0),
+    "stats.SeasonIndex": Budget(64, 407.3, 64, 0.1),
+    "stats.compute_standings[ALL]": Budget(64, 238.7, 68, 0.0),
+    "stats.compute_standings[M]": Budget(64, 224.1, 68, 0.0),
+    "stats.compute_standings[V]": Budget(64, 224.1, 68, 0.0),
+    "stats.compute_standings[detailed]": Budget(103, 233.9, 68, 0.0),
+    "stats.compute_standings[store]": Budget(105, 85.2, 65, 0.0),
+    "stats.compute_elo_ratings": Budget(64, 224.1, 68, 0.0),
+    "stats.compute_elo_history": Budget(108, 240.3, 68, 0.0),
+    "stats.compute_h2h_matrix": Budget(82, 224.1, 67, 0.1),
+    "stats.compute_season_records": Budget(71, 259.3, 69, 0.1),
+    "db.data_version": Budget(65, 0.0, 64, 0.0),
+    "db.load_leagues": Budget(82, 0.0, 64, 0.0),
+    "db.load_seasons": Budget(87, 1.8, 65, 0.0),
+    "db.load_teams": Budget(90, 0.0, 64, 0.0),
+    "db.fetch_matches[league]": Budget(79, 914.2, 65, 0.0),
+    "db.fetch_matches[season]": Budget(325, 0.0, 65, 0.0),
+    "db.played_matches[league]": Budget(64, 914.1, 65, 0.0),
+    "db.iter_matches[league]": Budget(163, 0.0, 64, 0.0),
+    "db.season_rounds": Budget(69, 0.0, 65, 0.0),
+    "db.pending_rounds": Budget(67, 0.0, 64, 0.0),
+    "db.count_matches_filtered": Budget(67, 0.0, 65, 0.0),
+    "db.fetch_matches_page": Budget(143, 0.1, 65, 0.0),
+    "db.fetch_match_by_id": Budget(94, 0.0, 65, 0.0),
+    "export.export_league[xlsx]": Budget(1429, 0.0, 72, 0.0),
+    "export.export_league[csv]": Budget(1886, 0.0, 69, 0.0),
+    "export.export_league[parquet]": Budget(872, 0.0, 68, 0.0),
+    "app: štart + warm-up": Budget(9208, 0.0, 223, 132.5),
+    "app: Sezóny": Budget(9183, 0.1, 282, 213.8),
+    "app: Zadávanie zápasov": Budget(9173, 0.4, 233, 0.0),
+    "app: Prehľad zápasov": Budget(9175, 0.0, 64, 0.0),
+    "app: Tabuľky": Budget(9173, 0.0, 291, 0.0),
+    "app: Grafy": Budget(9167, 0.0, 64, 0.0),
+    "app: Viac sezón": Budget(9164, 0.2, 68, 20.4),
+    "app: Head-to-Head": Budget(9166, 0.0, 116, 0.0),
+    "app: Rozpis (náhľad)": Budget(9651, 214.8, 190, 213.7),
+}
+
+
+def measure(fn: Callable[[], object]) -> tuple[int, int]:
+    """(peak, retained) v bajtoch pre jedno volanie fn – výsledok sa hneď zahodí."""
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    return peak, max(retained, 0)
+
+
+def stats_cases(conn, league_id: int) -> list[tuple[str, Callable[[], object]]]:
+    history = played_matches(conn, league_id=league_id)
+    team_set = load_team_set(conn, league_id)
+    store = MatchStore.from_frame(history, team_set.all)
+    return [
+        ("stats.load_team_set", lambda: load_team_set(conn, league_id)),
+        ("stats.MatchStore.from_frame", lambda: MatchStore.from_frame(history, team_set.all)),
+        ("stats.SeasonIndex", lambda: SeasonIndex(store, team_set)),
+        ("stats.compute_standings[ALL]", lambda: compute_standings(history, "ALL", team_set=team_set)),
+        ("stats.compute_standings[M]", lambda: compute_standings(history, "M", team_set=team_set)),
+        ("stats.compute_standings[V]", lambda: compute_standings(history, "V", team_set=team_set)),
+        ("stats.compute_standings[detailed]",
+         lambda: compute_standings(history, "ALL", detailed=True, team_set=team_set)),
+        ("stats.compute_standings[store]", lambda: compute_standings(store, "ALL", team_set=team_set)),
+        ("stats.compute_elo_ratings", lambda: compute_elo_ratings(history, team_set=team_set)),
+        ("stats.compute_elo_history", lambda: compute_elo_history(history, team_set=team_set)),
+        ("stats.compute_h2h_matrix", lambda: compute_h2h_matrix(history, team_set=team_set)),
+        ("stats.compute_season_records", lambda: compute_season_records(history)),
+    ]
+
+
+def _drain(batches) -> int:
+    return sum(len(rows) for _, rows in batches)
+
+
+def db_cases(conn, league_id: int, season_id: int) -> list[tuple[str, Callable[[], object]]]:
+    first_id = int(fetch_matches_page(conn, season_id, limit=1)["id"].iloc[0])
+    return [
+        ("db.data_version", lambda: data_version(conn)),
+        ("db.load_leagues", lambda: load_leagues(conn)),
+        ("db.load_seasons", lambda: load_seasons(conn, league_id)),
+        ("db.load_teams", lambda: load_teams(conn, league_id)),
+        ("db.fetch_matches[league]", lambda: fetch_matches(conn, league_id=league_id)),
+        ("db.fetch_matches[season]", lambda: fetch_matches(conn, season_id)),
+        ("db.played_matches[league]", lambda: played_matches(conn, league_id=league_id)),
+        ("db.iter_matches[league]",
+         lambda: _drain(iter_matches(conn, batch_size=STREAM_BATCH, league_id=league_id))),
+        ("db.season_rounds", lambda: season_rounds(conn, season_id)),
+        ("db.pending_rounds", lambda: pending_rounds(conn, season_id)),
+        ("db.count_matches_filtered", lambda: count_matches_filtered(conn, season_id, "FIN")),
+        ("db.fetch_matches_page", lambda: fetch_matches_page(conn, season_id, limit=50)),
+        ("db.fetch_match_by_id", lambda: fetch_match_by_id(conn, first_id)),
+    ]
+
+
+def export_cases(conn, league_id: int, workdir: str) -> list[tuple[str, Callable[[], object]]]:
+    def export(fmt: str):
+        path = os.path.join(workdir, f"export.{fmt}")
+        return lambda: export_league(conn, path, fmt=fmt, batch_size=STREAM_BATCH, league_id=league_id)
+
+    return [(f"export.export_league[{fmt}]", export(fmt)) for fmt in EXPORT_FORMATS]
+
+
+def _wait_for_warmup() -> None:
+    while any(t.name == "cache-warmup" for t in threading.enumerate()):
+        time.sleep(0.05)
+
+
+def tab_cases(at) -> list[tuple[str, Callable[[], object]]]:
+    """Prekreslenia sekcií v jednej relácii (poradie ako v sidebare)."""
+
+    def start():
+        at.run()
+        _wait_for_warmup()
+
+    def section(name: str):
+        return lambda: at.sidebar.radio[0].set_value(name).run()
+
+    def schedule_preview():
+        at.sidebar.radio[0].set_value("Rozpis").run()
+        next(b for b in at.button if b.label.startswith("Vygenerovať rozpis")).click().run()
+
+    cases = [("app: štart + warm-up", start)]
+    sections = ["Sezóny", "Zadávanie zápasov", "Prehľad zápasov", "Tabuľky", "Grafy", "Viac sezón", "Head-to-Head"]
+    cases += [(f"app: {name}", section(name)) for name in sections]
+    cases.append(("app: Rozpis (náhľad)", schedule_preview))
+    return cases
+
+
+def run_size(workdir: str, seasons: int, tabs: bool = True) -> tuple[int, list[tuple[str, int, int]]]:
+    """Zmeria všetky prípady pre ligu so seasons sezónami; vráti (zápasy, merania)."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    db_path = os.path.join(workdir, DB_DEFAULT)
+    info = build_synthetic_db(db_path, seasons=seasons)
+    league_id, season_id = info["leagues"][0], info["open_seasons"][0]
+    conn = get_conn(db_path)
+    out = []
+    try:
+        cases = stats_cases(conn, league_id) + db_cases(conn, league_id, season_id)
+        for name, fn in cases + export_cases(conn, league_id, workdir):
+            out.append((name, *measure(fn)))
+    finally:
+        conn.close()
+
+    if tabs:
+        # cache sú kľúčované cestou a verziou – nová DB pod rovnakou cestou ich nesmie zdediť
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            at = AppTest.from_file(APP_PATH, default_timeout=300)
+            for name, fn in tab_cases(at):
+                out.append((name, *measure(fn)))
+                if at.exception:
+                    raise RuntimeError(f"{name}: {at.exception[0].value}")
+        finally:
+            os.chdir(cwd)
+            st.cache_resource.clear()
+            st.cache_data.clear()
+    return info["matches"], out
+
+
+def check(results: list[tuple[int, str, int, int]]) -> pd.DataFrame:
+    """Tabuľka meraní s limitmi; stĺpec ok = v rozpočte."""
+    rows = []
+    for matches, name, peak, retained in results:
+        budget = BUDGETS.get(name)
+        peak_lim, ret_lim = budget.limits(matches) if budget else (None, None)
+        rows.append({
+            "meranie": name,
+            "zápasy": matches,
+            "peak [KiB]": round(peak / KIB, 1),
+            "limit peak": round(peak_lim / KIB, 1) if budget else None,
+            "retained [KiB]": round(retained / KIB, 1),
+            "limit retained": round(ret_lim / KIB, 1) if budget else None,
+            "ok": bool(budget) and peak <= peak_lim and retained <= ret_lim,
+        })
+    return pd.DataFrame(rows)
+
+
+def suggest(results: list[tuple[int, str, int, int]]) -> dict[str, Budget]:
+    """
+    Rozpočty z meraní: sklon = najväčší nárast medzi susednými veľkosťami,
+    pevná časť = najväčší zvyšok; oboje s rezervou SUGGEST_HEADROOM.
+    Pre STREAMING je sklon vždy 0 – pevná časť pokryje najväčšie meranie.
+    """
+    by_name: dict[str, list[tuple[int, int, int]]] = {}
+    for matches, name, peak, retained in results:
+        by_name.setdefault(name, []).append((matches, peak, retained))
+
+    def fit(points: list[tuple[int, int]], flat: bool) -> tuple[float, float]:
+        points = sorted(points)
+        slope = 0.0 if flat else max(
+            [(b[1] - a[1]) / ((b[0] - a[0]) / 1000) for a, b in zip(points, points[1:]) if b[0] > a[0]] + [0.0]
+        )
+        slope = max(slope, 0.0) / KIB
+        fixed = max(v / KIB - slope * m / 1000 for m, v in points)
+        return (
+            round(max(fixed, 0.0) * SUGGEST_HEADROOM + SUGGEST_SLACK_KIB),
+            round(slope * SUGGEST_HEADROOM, 1),
+        )
+
+    out = {}
+    for name, pts in by_name.items():
+        flat = name in STREAMING
+        peak = fit([(m, p) for m, p, _ in pts], flat)
+        retained = fit([(m, r) for m, _, r in pts], flat)
+        out[name] = Budget(peak[0], peak[1], retained[0], retained[1])
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Regresný test pamäťových rozpočtov (tracemalloc).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="počty sezón syntetickej ligy")
+    parser.add_argument("--no-tabs", action="store_true", help="bez prekreslení sekcií (len db/stats)")
+    parser.add_argument("--suggest", action="store_true", help="vypísať rozpočty z aktuálnych meraní")
+    parser.add_argument("--json", default=None, help="uložiť merania ako JSON")
+    args = parser.parse_args(argv)
+
+    results: list[tuple[int, str, int, int]] = []
+    tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="hokej_mem_") as workdir:
+            run_size(workdir, WARMUP_SIZE, tabs=not args.no_tabs)
+            for seasons in sorted(args.sizes):
+                matches, measured = run_size(workdir, seasons, tabs=not args.no_tabs)
+                results += [(matches, name, peak, retained) for name, peak, retained in measured]
+    finally:
+        tracemalloc.stop()
+
+    if args.suggest:
+        print("BUDGETS: dict[str, Budget] = {")
+        for name, b in suggest(results).items():
+            print(f'    "{name}": Budget({b.peak_kib}, {b.peak_per_1k}, {b.retained_kib}, {b.retained_per_1k}),')
+        print("}")
+        return 0
+
+    df = check(results)
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(df.to_string(index=False))
+    if args.json:
+        df.to_json(args.json, orient="records", force_ascii=False, indent=2)
+    failed = df[~df["ok"]]
+    if not failed.empty:
+        print(f"\nMimo rozpočtu: {len(failed)} meraní", file=sys.stderr)
+        for _, row in failed.iterrows():
+            print(f"  {row['meranie']} ({row['zápasy']} zápasov)", file=sys.stderr)
+        return 1
+    print(f"\nVšetkých {len(df)} meraní v rozpočte.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+# reference.py
+#
+# Referenčné implementácie (orákulá) v čistom Pythone: tabuľka, Elo (ratingy
+# aj vývoj po kolách), H2H matica a vývoj bodov tímu z Grafov – riadok po
+# riadku cez iterrows, tak ako ich aplikácia počítala pred optimalizáciou.
+# Istota postupu / vyradenie (clinch) prechádza všetky dokončenia sezóny.
+# Aplikácia ich nepoužíva; equivalence.py porovnáva s nimi optimalizované
+# verzie zo stats.py bunku po bunke. Pri zmene pravidiel (body, poradie, Elo)
+# treba zmeniť obe strany.
+#
+# Vstup je DataFrame zápasov ako z db.fetch_matches. Odohraný zápas = status
+# 'played' (bez stĺpca status: výsledok iný ako 0:0, ako db.match_status).
+# Body sa rátajú vetvením cez polia ScoringRules, nie cez jeho vyhľadávacie pole.
+
+from itertools import product
+
+import pandas as pd
+
+from stats import DEFAULT_SCORING, ScoringRules, TeamSet
+
+
+def _played(matches: pd.DataFrame) -> pd.DataFrame:
+    if "status" in matches.columns:
+        return matches[matches["status"] == "played"]
+    return matches[(matches["home_goals"] != 0) | (matches["away_goals"] != 0)]
+
+
+def _sorted(matches: pd.DataFrame) -> pd.DataFrame:
+    sort_cols = ["round", "id"] if "id" in matches.columns else ["round"]
+    return matches.sort_values(sort_cols, kind="stable")
+
+
+def _points(gf: int, ga: int, ot: bool, scoring: ScoringRules) -> int:
+    if gf == ga:
+        return 0
+    ot = ot and scoring.overtime
+    if gf > ga:
+        return scoring.ot_win if ot else scoring.win
+    return scoring.ot_loss if ot else scoring.loss
+
+
+def _result_code_for_team(hg: int, ag: int, ot: bool, is_home: bool) -> str:
+    win = (hg > ag) if is_home else (ag > hg)
+    if win:
+        return "W-OT" if ot else "W"
+    return "L-OT" if ot else "L"
+
+
+def standings(
+    matches: pd.DataFrame,
+    scope: str = "ALL",
+    detailed: bool = False,
+    *,
+    team_set: TeamSet,
+    scoring: ScoringRules = DEFAULT_SCORING,
+) -> pd.DataFrame:
+    if scope == "M":
+        teams = list(team_set.m)
+    elif scope == "V":
+        teams = list(team_set.v)
+    else:
+        teams = team_set.all
+
+    data: dict[str, dict] = {
+        t: {
+            "Team": t, "GP": 0, "W": 0, "W-OT": 0, "L-OT": 0, "L": 0,
+            "GF": 0, "GA": 0, "PTS": 0,
+            "_1G_W": 0, "_1G_L": 0,
+            "_BLOW_W": 0, "_BLOW_L": 0,
+            "_SO_FOR": 0, "_SO_AGAINST": 0,
+            "_OT_GAMES": 0,
+            "_TENPLUS_FOR": 0, "_TENPLUS_AGAINST": 0,
+        } for t in teams
+    }
+    form_seq: dict[str, list[str]] = {t: [] for t in teams}
+
+    for _, m in _sorted(_played(matches)).iterrows():
+        h, a = m["home_team"], m["away_team"]
+        hg, ag = int(m["home_goals"]), int(m["away_goals"])
+        ot = bool(m["overtime"]) and scoring.overtime
+        if hg == ag:
+            continue
+
+        for team, gf, ga, is_home in ((h, hg, ag, True), (a, ag, hg, False)):
+            if team not in data:
+                continue
+            d = data[team]
+            d["GP"] += 1
+            d["GF"] += gf
+            d["GA"] += ga
+            win = gf > ga
+            if win:
+                d["W-OT" if ot else "W"] += 1
+            else:
+                d["L-OT" if ot else "L"] += 1
+            if ga == 0:
+                d["_SO_FOR"] += 1
+            if gf == 0:
+                d["_SO_AGAINST"] += 1
+            diff = abs(gf - ga)
+            if diff == 1:
+                d["_1G_W" if win else "_1G_L"] += 1
+            elif diff >= 3:
+                d["_BLOW_W" if win else "_BLOW_L"] += 1
+            if gf >= 10:
+                d["_TENPLUS_FOR"] += 1
+            if ga >= 10:
+                d["_TENPLUS_AGAINST"] += 1
+            if ot:
+                d["_OT_GAMES"] += 1
+            d["PTS"] += _points(gf, ga, ot, scoring)
+            form_seq[team].append(_result_code_for_team(hg, ag, ot, is_home))
+
+    df = pd.DataFrame([data[t] for t in teams])
+    df["GD"] = df["GF"] - df["GA"]
+
+    def safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
+        s = num / den
+        return s.replace([float("inf"), float("-inf")], 0).fillna(0)
+
+    df["P/GP"] = safe_div(df["PTS"], df["GP"]).round(3)
+
+    if scope == "ALL" and detailed:
+        df["Side"] = df["Team"].apply(team_set.side)
+        df["PTS%"] = (safe_div(df["PTS"], df["GP"] * scoring.max_points) * 100).round(1)
+        df["GF/GP"] = safe_div(df["GF"], df["GP"]).round(3)
+        df["GA/GP"] = safe_div(df["GA"], df["GP"]).round(3)
+        df["AVG GD"] = safe_div(df["GD"], df["GP"]).round(3)
+        df["OT%"] = (safe_div(df["_OT_GAMES"], df["GP"]) * 100).round(1)
+        df["OT body"] = (scoring.ot_win * df["W-OT"] + scoring.ot_loss * df["L-OT"]).astype(int)
+        df["1G W"] = df["_1G_W"].astype(int)
+        df["1G L"] = df["_1G_L"].astype(int)
+        df["Blowout W"] = df["_BLOW_W"].astype(int)
+        df["Blowout L"] = df["_BLOW_L"].astype(int)
+        df["SO For"] = df["_SO_FOR"].astype(int)
+        df["SO Against"] = df["_SO_AGAINST"].astype(int)
+        df["10+ For"] = df["_TENPLUS_FOR"].astype(int)
+        df["10+ Against"] = df["_TENPLUS_AGAINST"].astype(int)
+
+        def streak_str(seq: list[str]) -> str:
+            if not seq:
+                return ""
+            n = 0
+            for r in reversed(seq):
+                if r != seq[-1]:
+                    break
+                n += 1
+            return f"{seq[-1]}{n}"
+
+        df["Last5"] = df["Team"].map(lambda t: ", ".join(form_seq[t][-5:]))
+        df["Streak"] = df["Team"].map(lambda t: streak_str(form_seq[t]))
+        order = [
+            "Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "P/GP", "PTS", "PTS%",
+            "GF/GP", "GA/GP", "AVG GD", "OT%", "OT body",
+            "1G W", "1G L", "Blowout W", "Blowout L",
+            "SO For", "SO Against", "10+ For", "10+ Against",
+            "Last5", "Streak",
+        ]
+    elif scope == "ALL":
+        df["Side"] = df["Team"].apply(team_set.side)
+        order = ["Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
+    else:
+        order = ["Team", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
+    df = df[order]
+
+    df = df.sort_values(
+        by=["PTS", "W", "W-OT", "GD", "GF"], ascending=[False] * 5
+    ).reset_index(drop=True)
+    df.index = df.index + 1
+    return df
+
+
+def _elo_step(ratings: dict, games: dict, m: pd.Series, k: float) -> None:
+    h, a = m["home_team"], m["away_team"]
+    hg, ag = int(m["home_goals"]), int(m["away_goals"])
+    if hg == ag or h not in ratings or a not in ratings:
+        return
+    Rh, Ra = ratings[h], ratings[a]
+    Sh, Sa = (1.0, 0.0) if hg > ag else (0.0, 1.0)
+    Eh = 1.0 / (1.0 + 10 ** ((Ra - Rh) / 400.0))
+    Ea = 1.0 - Eh
+    ratings[h] = Rh + k * (Sh - Eh)
+    ratings[a] = Ra + k * (Sa - Ea)
+    games[h] += 1
+    games[a] += 1
+
+
+def elo_ratings(
+    matches: pd.DataFrame, base_rating: float = 1500.0, k: float = 20.0, *, team_set: TeamSet
+) -> pd.DataFrame:
+    all_teams = list(dict.fromkeys(team_set.all))
+    ratings = {t: float(base_rating) for t in all_teams}
+    games = {t: 0 for t in all_teams}
+    for _, m in _sorted(_played(matches)).iterrows():
+        _elo_step(ratings, games, m, k)
+    df = pd.DataFrame(
+        [{"Team": t, "Side": team_set.side(t), "Rating": ratings[t], "Games": games[t]} for t in all_teams]
+    )
+    df["Rating"] = df["Rating"].round(1)
+    return df
+
+
+def elo_history(
+    matches: pd.DataFrame, base_rating: float = 1500.0, k: float = 20.0, *, team_set: TeamSet
+) -> pd.DataFrame:
+    all_teams = list(dict.fromkeys(team_set.all))
+    ratings = {t: float(base_rating) for t in all_teams}
+    games = {t: 0 for t in all_teams}
+    rows = []
+    current = None
+    for _, m in _sorted(_played(matches)).iterrows():
+        rnd = int(m["round"])
+        if current is not None and rnd != current:
+            rows.extend({"Round": current, "Team": t, "Rating": ratings[t]} for t in all_teams)
+        current = rnd
+        _elo_step(ratings, games, m, k)
+    if current is not None:
+        rows.extend({"Round": current, "Team": t, "Rating": ratings[t]} for t in all_teams)
+    df = pd.DataFrame(rows, columns=["Round", "Team", "Rating"])
+    df["Rating"] = df["Rating"].round(1)
+    return df
+
+
+def h2h_matrix(
+    matches: pd.DataFrame, *, team_set: TeamSet, scoring: ScoringRules = DEFAULT_SCORING
+) -> pd.DataFrame:
+    matrix = {
+        (m, v): {"M": m, "V": v, "GP": 0, "PTS_M": 0, "PTS_V": 0, "GF_M": 0, "GA_M": 0}
+        for m in team_set.m
+        for v in team_set.v
+    }
+    for _, mrow in _played(matches).iterrows():
+        h, a = mrow["home_team"], mrow["away_team"]
+        hg, ag = int(mrow["home_goals"]), int(mrow["away_goals"])
+        ot = bool(mrow["overtime"])
+        if hg == ag:
+            continue
+        pts_home, pts_away = _points(hg, ag, ot, scoring), _points(ag, hg, ot, scoring)
+        if h in team_set.m and a in team_set.v:
+            cell = matrix[(h, a)]
+            cell["GP"] += 1
+            cell["PTS_M"] += pts_home
+            cell["PTS_V"] += pts_away
+            cell["GF_M"] += hg
+            cell["GA_M"] += ag
+        elif h in team_set.v and a in team_set.m:
+            cell = matrix[(a, h)]
+            cell["GP"] += 1
+            cell["PTS_M"] += pts_away
+            cell["PTS_V"] += pts_home
+            cell["GF_M"] += ag
+            cell["GA_M"] += hg
+    return pd.DataFrame(list(matrix.values()))
+
+
+def team_progression(
+    team_df: pd.DataFrame, team: str, scoring: ScoringRules = DEFAULT_SCORING
+) -> pd.DataFrame:
+    """Grafy, režim „Jeden tím“: zápas po zápase (vrátane nevyplnených 0:0 ako „?“)."""
+    rows = []
+    pts_cum = 0
+    games = 0
+    for _, m in team_df.iterrows():
+        h, a = m["home_team"], m["away_team"]
+        hg, ag = int(m["home_goals"]), int(m["away_goals"])
+        ot = bool(m["overtime"]) and scoring.overtime
+        pts_home, pts_away = _points(hg, ag, ot, scoring), _points(ag, hg, ot, scoring)
+        if h == team:
+            gf, ga, opp, pts_this, ha = hg, ag, a, pts_home, "D"
+        else:
+            gf, ga, opp, pts_this, ha = ag, hg, h, pts_away, "V"
+        if gf == ga:
+            result_code = "?"
+        elif gf > ga:
+            result_code = "W-OT" if ot else "W"
+        else:
+            result_code = "L-OT" if ot else "L"
+        games += 1
+        pts_cum += pts_this
+        rows.append(
+            {
+                "Round": int(m["round"]),
+                "Opponent": opp,
+                "H/V": ha,
+                "GF": gf,
+                "GA": ga,
+                "Result": result_code,
+                "Points": pts_this,
+                "GP": games,
+                "PTS_total": pts_cum,
+                "PTS_per_game": round(pts_cum / games, 3),
+            }
+        )
+    prog_df = pd.DataFrame(rows).sort_values("Round")
+    prog_df.reset_index(drop=True, inplace=True)
+    return prog_df
+
+
+def points_progression(
+    team_df: pd.DataFrame, team: str, scoring: ScoringRules = DEFAULT_SCORING
+) -> pd.DataFrame:
+    """Grafy, režim „Porovnanie“: PTS_total a PTS_per_game po kolách (bez remíz)."""
+    rows = []
+    pts_cum = 0
+    games = 0
+    for _, m in team_df.iterrows():
+        h = m["home_team"]
+        hg, ag = int(m["home_goals"]), int(m["away_goals"])
+        ot = bool(m["overtime"]) and scoring.overtime
+        pts_home, pts_away = _points(hg, ag, ot, scoring), _points(ag, hg, ot, scoring)
+        pts_this = pts_home if h == team else pts_away
+        if hg == ag:
+            continue
+        games += 1
+        pts_cum += pts_this
+        rows.append(
+            {"Round": int(m["round"]), "PTS_total": pts_cum, "PTS_per_game": round(pts_cum / games, 3)}
+        )
+    if not rows:
+        return pd.DataFrame(columns=["PTS_total", "PTS_per_game"], index=pd.Index([], name="Round"))
+    return pd.DataFrame(rows).drop_duplicates("Round").set_index("Round")
+
+
+def clinch(
+    matches: pd.DataFrame,
+    scope: str = "ALL",
+    thresholds: tuple[int, ...] = (1,),
+    *,
+    team_set: TeamSet,
+    scoring: ScoringRules = DEFAULT_SCORING,
+) -> pd.DataFrame:
+    """
+    Istota / vyradenie hrubou silou: všetky dokončenia sezóny (každý zvyšný zápas
+    všetkými výsledkami). Len pre pár zvyšných zápasov – počet dokončení rastie
+    ako 4^zápasy.
+    """
+    table = standings(matches, scope, team_set=team_set, scoring=scoring)
+    pts = {t: int(p) for t, p in zip(table["Team"], table["PTS"])}
+    if "status" in matches.columns:
+        rest = matches[matches["status"] != "played"]
+    else:
+        rest = matches[(matches["home_goals"] == 0) & (matches["away_goals"] == 0)]
+    games = [
+        (h, a) for h, a in zip(rest["home_team"], rest["away_team"])
+        if (h in pts or a in pts) and h != a
+    ]
+    splits = sorted({
+        (_points(gf, ga, ot, scoring), _points(ga, gf, ot, scoring))
+        for gf, ga in ((1, 0), (0, 1))
+        for ot in (False, True)
+    })
+
+    finals, earned = [], []
+    for combo in product(splits, repeat=len(games)):
+        final, got = dict(pts), dict.fromkeys(pts, 0)
+        for (h, a), (ph, pa) in zip(games, combo):
+            if h in final:
+                final[h] += ph
+                got[h] += ph
+            if a in final:
+                final[a] += pa
+                got[a] += pa
+        finals.append(final)
+        earned.append(got)
+
+    out = table[["Team", "PTS"]].copy()
+    out["PTS"] = out["PTS"].astype("int64")
+    out["Zostáva"] = [sum(t in g for g in games) for t in out["Team"]]
+    out["Max"] = [max(f[t] for f in finals) for t in out["Team"]]
+    out["Min"] = [min(f[t] for f in finals) for t in out["Team"]]
+    out = out.astype({"Zostáva": "int64", "Max": "int64", "Min": "int64"})
+    for k in thresholds:
+        status, magic = [], []
+        for t in out["Team"]:
+            above = [sum(f[o] >= f[t] for o in f if o != t) for f in finals]
+            over = [sum(f[o] > f[t] for o in f if o != t) for f in finals]
+            if all(c >= k for c in over):
+                status.append("vyradený")
+            elif all(c < k for c in above):
+                status.append("istý")
+            else:
+                status.append("otvorené")
+            need = None
+            for p in sorted({g[t] for g in earned}, reverse=True):
+                if all(c < k for c, g in zip(above, earned) if g[t] >= p):
+                    need = p
+                else:
+                    break
+            magic.append(need)
+        out[f"Top {k}"] = status
+        out[f"Magic {k}"] = pd.array(magic, dtype="Int64")
+    return out
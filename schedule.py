@@ -0,0 +1,202 @@
+# schedule.py
+#
+# Generovanie a kontrola rozpisov. Rozpis je dvojica polí (kolá × zápasy
+# v kole) s indexmi tímov, rotácie sa počítajú naraz pre všetky kolá
+# (vysielanie numpy), takže aj tisíce kôl sú otázkou milisekúnd.
+#   bipartite_schedule – M proti V (každý M s každým V), ľubovoľné počty tímov
+#   round_robin        – každý s každým (kruhová metóda, pri nepárnom počte voľno),
+#                        viac kôl súťaže (legs) s vyváženým domácim prostredím
+#   league_schedule    – rozpis pôvodnej ligy (M doma, pevné poradie V v 1. kole)
+# check_schedule overí obmedzenia vektorovo: tím najviac raz v kole, nikto
+# nehrá sám so sebou, len povolené dvojice a rovnaký počet stretnutí
+# každej dvojice (± 1 pri neúplnom cykle); voliteľne aj vyváženosť D/V.
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from stats import TeamSet
+
+# poradie V tímov v 1. kole pôvodnej ligy
+CLASSIC_V_START = ["SLO", "KAZ", "NOR", "LOT", "SVK", "SUI", "CES", "KAN"]
+
+
+class Schedule(NamedTuple):
+    """
+    teams – kódy tímov, home/away – polia (kolá, zápasy v kole) indexov do teams.
+    side – pri bipartitnom rozpise strana tímu (0 = M, 1 = V), inak None.
+    """
+    teams: list[str]
+    home: np.ndarray
+    away: np.ndarray
+    side: np.ndarray | None = None
+
+    @property
+    def rounds(self) -> int:
+        return self.home.shape[0]
+
+    def pairings(self) -> list[list[tuple[str, str]]]:
+        """Kolá ako zoznamy dvojíc (domáci, hostia)."""
+        names = np.asarray(self.teams, dtype=object)
+        return [
+            list(zip(h, a))
+            for h, a in zip(names[self.home].tolist(), names[self.away].tolist())
+        ]
+
+    def to_frame(self, season_id: int) -> pd.DataFrame:
+        """Zápasy rozpisu s nulovými výsledkami (tvar pre insert_match), po stĺpcoch."""
+        rounds, per_round = self.home.shape
+        n = rounds * per_round
+        names = np.asarray(self.teams, dtype=object)
+        zeros = np.zeros(n, dtype=np.int64)
+        return pd.DataFrame(
+            {
+                "home_team": names[self.home.ravel()].tolist(),
+                "away_team": names[self.away.ravel()].tolist(),
+                "home_goals": zeros,
+                "away_goals": zeros,
+                "overtime": zeros,
+                "round": np.repeat(np.arange(1, rounds + 1, dtype=np.int64), per_round),
+                "season": np.full(n, season_id, dtype=np.int64),
+                "is_playoff": zeros,
+            }
+        )
+
+
+def bipartite_schedule(
+    m_teams: list[str], v_teams: list[str], rounds: int | None = None, balanced: bool = False
+) -> Schedule:
+    """
+    M proti V: v kole r hrá i-ty tím menšej strany s tímom (i + r) väčšej strany,
+    takže za max(#M, #V) kôl sa každá dvojica M–V stretne práve raz a cyklus sa
+    ďalej opakuje. rounds predvolene = jeden celý cyklus. Domáci je M; balanced
+    strieda domáce prostredie po cykloch (2. cyklus V doma, ...).
+    """
+    nm, nv = len(m_teams), len(v_teams)
+    if not nm or not nv:
+        raise ValueError("Bipartitný rozpis potrebuje aspoň jeden M a jeden V tím.")
+    cycle = max(nm, nv)
+    rounds = cycle if rounds is None else rounds
+    r = np.arange(rounds)[:, None]
+    i = np.arange(min(nm, nv))[None, :]
+    rotated = (i + r) % cycle
+    fixed = np.broadcast_to(i, rotated.shape)
+    m_idx, v_idx = (fixed, rotated) if nm <= nv else (rotated, fixed)
+    home, away = m_idx, v_idx + nm
+    if balanced:
+        swap = np.broadcast_to((r // cycle) % 2 == 1, home.shape)
+        home, away = np.where(swap, away, home), np.where(swap, home, away)
+    side = np.repeat(np.array([0, 1], dtype=np.int8), [nm, nv])
+    return Schedule(
+        list(m_teams) + list(v_teams), np.ascontiguousarray(home), np.ascontiguousarray(away), side
+    )
+
+
+def round_robin(teams: list[str], legs: int = 1) -> Schedule:
+    """
+    Každý s každým (kruhová metóda): n - 1 kôl na jedno kolo súťaže (n párne),
+    pri nepárnom n sa pridá voľno a v každom kole jeden tím nehrá. Domáci
+    v dvojici x < y je x, ak je y - x nepárne, inak y – každý tím má doma
+    polovicu zápasov (± 1); v párnych kolách súťaže (legs) sa D/V vymení.
+    """
+    n = len(teams)
+    if n < 2:
+        raise ValueError("Rozpis každý s každým potrebuje aspoň dva tímy.")
+    size = n + n % 2  # s voľnom
+    cycle = size - 1
+    r = np.arange(cycle)[:, None]
+    # pozícia 0 stojí, ostatné sa otáčajú o jedno miesto za kolo
+    ring = np.concatenate(
+        (np.zeros((cycle, 1), dtype=np.int64), 1 + (np.arange(cycle)[None, :] + r) % cycle), axis=1
+    )
+    a = ring[:, : size // 2]
+    b = ring[:, ::-1][:, : size // 2]
+    if size != n:
+        # dvojica s voľnom (index n) vypadne – v každom kole práve jedna
+        keep = (a != n) & (b != n)
+        a = a[keep].reshape(cycle, -1)
+        b = b[keep].reshape(cycle, -1)
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    odd = (hi - lo) % 2 == 1
+    home = np.where(odd, lo, hi)
+    away = np.where(odd, hi, lo)
+
+    leg = np.arange(legs)[:, None, None] % 2 == 1
+    home_all = np.where(leg, away[None], home[None]).reshape(legs * cycle, -1)
+    away_all = np.where(leg, home[None], away[None]).reshape(legs * cycle, -1)
+    return Schedule(list(teams), home_all, away_all)
+
+
+def league_schedule(team_set: TeamSet, rounds: int = 32) -> Schedule:
+    """
+    Rozpis ligy: M tímy v poradí z tabuľky teams, V tímy v 1. kole v poradí
+    pôvodnej ligy (SLO, KAZ, NOR, LOT, SVK, SUI, CES, KAN), ak ide o týchto
+    8 tímov, inak v poradí z tabuľky; ďalej sa V posúvajú „hore“ o 1.
+    """
+    v_start = CLASSIC_V_START if set(CLASSIC_V_START) == set(team_set.v) else list(team_set.v)
+    return bipartite_schedule(team_set.m, v_start, rounds)
+
+
+def check_schedule(
+    schedule: Schedule, meetings: int | None = None, balanced: bool = False
+) -> list[str]:
+    """
+    Zoznam porušených obmedzení (prázdny = rozpis je v poriadku):
+      - tím hrá sám so sebou / viac ako raz v kole,
+      - stretnutie nepovolenej dvojice (pri bipartitnom rozpise M–M alebo V–V),
+      - dvojice sa stretávajú nerovnako často (rozdiel > 1), resp. nie presne
+        meetings-krát, ak je zadané,
+      - balanced: tím má doma o viac ako 1 zápas viac / menej ako vonku.
+    """
+    teams = schedule.teams
+    n = len(teams)
+    home, away = schedule.home, schedule.away
+    problems: list[str] = []
+
+    same = np.flatnonzero((home == away).any(axis=1))
+    for r in same[:5].tolist():
+        problems.append(f"Kolo {r + 1}: tím hrá sám so sebou.")
+
+    # tím najviac raz v kole – zoradené účasti kola, rovnaké susedné = duplicita
+    slots = np.sort(np.concatenate((home, away), axis=1), axis=1)
+    dup = slots[:, 1:] == slots[:, :-1]
+    dup_rounds = np.flatnonzero(dup.any(axis=1))
+    for r in dup_rounds[:5].tolist():
+        twice = sorted({teams[t] for t in slots[r, 1:][dup[r]].tolist()})
+        problems.append(f"Kolo {r + 1}: {', '.join(twice)} hrá viac ako raz.")
+    if len(dup_rounds) > 5:
+        problems.append(f"… a ďalších {len(dup_rounds) - 5} kôl s tímom hrajúcim viackrát.")
+
+    # počty stretnutí neusporiadaných dvojíc (matica n × n, horný trojuholník)
+    lo = np.minimum(home, away).ravel()
+    hi = np.maximum(home, away).ravel()
+    counts = np.bincount(lo * n + hi, minlength=n * n).reshape(n, n)
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    allowed = upper.copy()
+    if schedule.side is not None:
+        allowed &= schedule.side[:, None] != schedule.side[None, :]
+    bad = np.argwhere(upper & ~allowed & (counts > 0))
+    for x, y in bad[:5].tolist():
+        problems.append(f"Nepovolená dvojica {teams[x]} – {teams[y]} ({counts[x, y]}×).")
+
+    pair_counts = counts[allowed]
+    if len(pair_counts):
+        lo_c, hi_c = int(pair_counts.min()), int(pair_counts.max())
+        if meetings is not None and (lo_c != meetings or hi_c != meetings):
+            off = np.argwhere(allowed & (counts != meetings))
+            x, y = off[0].tolist()
+            problems.append(
+                f"Dvojice sa majú stretnúť {meetings}×, ale počty sú {lo_c}–{hi_c} "
+                f"(napr. {teams[x]} – {teams[y]} {counts[x, y]}×)."
+            )
+        elif meetings is None and hi_c - lo_c > 1:
+            problems.append(f"Dvojice sa stretávajú nerovnako často ({lo_c}–{hi_c}×).")
+
+    if balanced:
+        home_games = np.bincount(home.ravel(), minlength=n)
+        away_games = np.bincount(away.ravel(), minlength=n)
+        for t in np.flatnonzero(np.abs(home_games - away_games) > 1).tolist():
+            problems.append(f"{teams[t]}: doma {home_games[t]}, vonku {away_games[t]} zápasov.")
+
+    return problems
@@ -0,0 +1,322 @@
+# schedule_opt.py
+#
+# Optimalizácia rozpisu podľa sily tímov. Pevná rotácia (schedule.league_schedule)
+# nerieši, kto je silný – M tím tak môže dostať silné V tímy v niekoľkých
+# kolách za sebou. Tu sa rozpis hodnotí podľa aktuálnej sily tímov (Elo alebo
+# Poissonov model gólov) a hľadá sa lepší simulovaným žíhaním:
+#   clusters – rozptyl sily súperov v kĺzavom okne kôl (zhluky silných súperov)
+#   fairness – rozdiely priebežnej sily súperov medzi tímami jednej strany
+#              po každom kole (priebežná tabuľka je porovnateľná)
+#   spacing  – opakovanie tej istej dvojice skôr, než je rovnomerný odstup
+#              (relatívny deficit odstupu, 0 = rovnomerne rozložené)
+# Ťahy zachovávajú všetky obmedzenia rozpisu (počty stretnutí dvojíc, každý
+# tím raz v kole, domáci/hostia): výmena dvoch kôl a výmena Kempeho reťazca
+# medzi dvoma kolami (komponent zjednotenia ich dvojíc sa presunie z kola do
+# kola). Nezávislé žíhania bežia paralelne v procesoch (ProcessPoolExecutor,
+# rôzne seedy) so spoločným časovým limitom; vráti sa najlepší rozpis.
+#
+# Použitie bez UI:
+#   python schedule_opt.py --league 1 --seconds 10
+#   python schedule_opt.py --db liga.db --source poisson --workers 4
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from config import DB_DEFAULT
+from db import DEFAULT_LEAGUE_ID, ensure_schema, get_conn, played_matches
+from schedule import Schedule, check_schedule, league_schedule
+from stats import MatchStore, TeamSet, compute_elo_ratings, compute_standings, load_team_set
+
+STRENGTH_SOURCES = {"elo": "Elo", "poisson": "Poisson (góly)"}
+
+# kĺzavé okno kôl pre zhluky silných súperov
+WINDOW = 4
+# váha (v zápasoch) ligového priemeru v Poissonovom modeli – tímy s málo zápasmi
+# sa neposúvajú k extrémom
+POISSON_PRIOR_GAMES = 5.0
+
+
+class Weights(NamedTuple):
+    clusters: float = 1.0
+    fairness: float = 1.0
+    spacing: float = 1.0
+
+
+class OptimizeResult(NamedTuple):
+    schedule: Schedule
+    cost: float
+    initial_cost: float
+    iterations: int
+    workers: int
+
+
+# --- sila tímov ---
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def elo_strengths(matches: "pd.DataFrame | MatchStore", team_set: TeamSet) -> dict[str, float]:
+    """Elo rating z odohraných zápasov."""
+    elo = compute_elo_ratings(matches, team_set=team_set)
+    return dict(zip(elo["Team"], elo["Rating"].astype(float).tolist()))
+
+
+def poisson_strengths(matches: "pd.DataFrame | MatchStore", team_set: TeamSet) -> dict[str, float]:
+    """
+    Poissonov model gólov: útok = strelené / priemer, obrana = inkasované /
+    priemer (vyhladené ligovým priemerom), sila = log útok − log obrana.
+    """
+    table = compute_standings(matches, "ALL", team_set=team_set)
+    gp = table["GP"].to_numpy(dtype=float)
+    gf = table["GF"].to_numpy(dtype=float)
+    ga = table["GA"].to_numpy(dtype=float)
+    avg = gf.sum() / gp.sum() if gp.sum() else 1.0
+    attack = (gf + POISSON_PRIOR_GAMES * avg) / (gp + POISSON_PRIOR_GAMES) / avg
+    defence = (ga + POISSON_PRIOR_GAMES * avg) / (gp + POISSON_PRIOR_GAMES) / avg
+    return dict(zip(table["Team"], (np.log(attack) - np.log(defence)).tolist()))
+
+
+def team_strengths(matches: "pd.DataFrame | MatchStore", team_set: TeamSet, source: str = "elo") -> dict[str, float]:
+    if source == "poisson":
+        return poisson_strengths(matches, team_set)
+    return elo_strengths(matches, team_set)
+
+
+def strength_vector(schedule: Schedule, strengths: dict[str, float]) -> np.ndarray:
+    """
+    Sila tímov v poradí schedule.teams, štandardizovaná (priemer 0, odchýlka 1)
+    v rámci strany – pri bipartitnom rozpise M hrajú len proti V, takže
+    kritériá závisia od rozdielov medzi súpermi, nie od rozdielu strán.
+    Elo aj Poisson tak majú rovnakú mierku. Tím bez sily = priemer strany.
+    """
+    raw = np.array([strengths.get(t, np.nan) for t in schedule.teams], dtype=float)
+    side = np.zeros(len(raw), dtype=np.int8) if schedule.side is None else schedule.side
+    out = np.zeros(len(raw))
+    for s in np.unique(side):
+        group = np.flatnonzero((side == s) & ~np.isnan(raw))
+        if len(group):
+            out[group] = _standardize(raw[group])
+    return out
+
+
+# --- hodnotenie rozpisu ---
+
+def cost_breakdown(
+    schedule: Schedule, strength: np.ndarray, window: int = WINDOW
+) -> dict[str, float]:
+    """Jednotlivé kritériá (menej = lepšie) pre daný rozpis a silu tímov."""
+    home, away = schedule.home, schedule.away
+    rounds, per_round = home.shape
+    n = len(schedule.teams)
+
+    # súper tímu v každom kole (voľno = priemerný súper, sila 0)
+    opp = np.full((n, rounds), -1, dtype=np.int64)
+    rr = np.repeat(np.arange(rounds), per_round)
+    opp[home.ravel(), rr] = away.ravel()
+    opp[away.ravel(), rr] = home.ravel()
+    faced = np.where(opp >= 0, strength[np.maximum(opp, 0)], 0.0)
+    running = np.cumsum(faced, axis=1)
+
+    w = min(window, rounds)
+    padded = np.concatenate((np.zeros((n, 1)), running), axis=1)
+    windows = (padded[:, w:] - padded[:, :-w]) / w
+    clusters = float(windows.var(axis=1).mean())
+
+    groups = [np.arange(n)] if schedule.side is None else [
+        np.flatnonzero(schedule.side == s) for s in np.unique(schedule.side)
+    ]
+    fairness = float(np.mean([running[g].var(axis=0).mean() for g in groups if len(g) > 1] or [0.0]))
+
+    # odstupy opakovaných dvojíc: zoradiť podľa (dvojica, kolo), susedné rovnaké dvojice
+    keys = (np.minimum(home, away) * n + np.maximum(home, away)).ravel()
+    order = np.lexsort((rr, keys))
+    k_sorted, r_sorted = keys[order], rr[order]
+    repeat = k_sorted[1:] == k_sorted[:-1]
+    gaps = np.diff(r_sorted)[repeat]
+    ideal = rounds / np.bincount(keys)[k_sorted[1:][repeat]]
+    spacing = float((np.maximum(1 - gaps / ideal, 0) ** 2).mean()) if len(gaps) else 0.0
+
+    return {"clusters": clusters, "fairness": fairness, "spacing": spacing}
+
+
+def schedule_cost(
+    schedule: Schedule, strength: np.ndarray, weights: Weights = Weights(), window: int = WINDOW
+) -> float:
+    parts = cost_breakdown(schedule, strength, window)
+    return sum(getattr(weights, name) * value for name, value in parts.items())
+
+
+# --- ťahy (zachovávajú obmedzenia rozpisu) ---
+
+def _swap_rounds(home: np.ndarray, away: np.ndarray, r1: int, r2: int) -> None:
+    home[[r1, r2]] = home[[r2, r1]]
+    away[[r1, r2]] = away[[r2, r1]]
+
+
+def _kempe_swap(home: np.ndarray, away: np.ndarray, r1: int, r2: int, start: int, n: int) -> bool:
+    """
+    Komponent zjednotenia dvojíc kôl r1 a r2 obsahujúci zápas start z r1 sa
+    vymení medzi kolami. Každý tím ostane najviac raz v kole a multimnožina
+    zápasov sa nemení. False, ak by sa zmenil počet zápasov v kolách alebo
+    komponent je celé kolo (to je výmena kôl).
+    """
+    slot = np.full((2, n), -1, dtype=np.int64)
+    for side, r in enumerate((r1, r2)):
+        idx = np.arange(home.shape[1])
+        slot[side, home[r]] = idx
+        slot[side, away[r]] = idx
+
+    rows = (r1, r2)
+    taken = [{start}, set()]
+    stack = [(0, start)]
+    while stack:
+        side, s = stack.pop()
+        r, other = rows[side], 1 - side
+        for team in (home[r, s], away[r, s]):
+            t = slot[other, team]
+            if t >= 0 and t not in taken[other]:
+                taken[other].add(t)
+                stack.append((other, t))
+
+    s1, s2 = sorted(taken[0]), sorted(taken[1])
+    if len(s1) != len(s2) or len(s1) == home.shape[1]:
+        return False
+    h1, a1 = home[r1, s1].copy(), away[r1, s1].copy()
+    home[r1, s1], away[r1, s1] = home[r2, s2], away[r2, s2]
+    home[r2, s2], away[r2, s2] = h1, a1
+    return True
+
+
+def anneal(
+    schedule: Schedule,
+    strength: np.ndarray,
+    deadline: float,
+    seed: int = 0,
+    weights: Weights = Weights(),
+    window: int = WINDOW,
+) -> tuple[float, Schedule, int]:
+    """
+    Simulované žíhanie do času deadline (time.time()): (najlepšia cena,
+    najlepší rozpis, počet iterácií). Počiatočná teplota = medián zhoršenia
+    pri náhodných ťahoch (zhruba tretina zhoršení sa na začiatku prijme),
+    potom klesá exponenciálne s časom na tisícinu.
+    """
+    rng = np.random.default_rng(seed)
+    home, away = schedule.home.copy(), schedule.away.copy()
+    rounds, per_round = home.shape
+    n = len(schedule.teams)
+
+    def cost_of(h: np.ndarray, a: np.ndarray) -> float:
+        return schedule_cost(schedule._replace(home=h, away=a), strength, weights, window)
+
+    def neighbour(h: np.ndarray, a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        r1, r2 = (int(x) for x in rng.choice(rounds, size=2, replace=False))
+        h, a = h.copy(), a.copy()
+        if rng.random() < 0.5 or not _kempe_swap(h, a, r1, r2, int(rng.integers(per_round)), n):
+            _swap_rounds(h, a, r1, r2)
+        return h, a
+
+    current = best = cost_of(home, away)
+    best_home, best_away = home.copy(), away.copy()
+    if rounds < 2:
+        return best, schedule, 0
+
+    uphill = [d for d in (cost_of(*neighbour(home, away)) - current for _ in range(30)) if d > 0]
+    t_start = float(np.median(uphill)) if uphill else 1e-6
+    t_end = t_start * 1e-3
+    start = time.time()
+    span = max(deadline - start, 1e-9)
+    iterations = 0
+    while True:
+        now = time.time()
+        if now >= deadline:
+            break
+        temp = t_start * (t_end / t_start) ** ((now - start) / span)
+        h, a = neighbour(home, away)
+        cand = cost_of(h, a)
+        iterations += 1
+        if cand <= current or rng.random() < np.exp((current - cand) / temp):
+            home, away, current = h, a, cand
+            if cand < best:
+                best, best_home, best_away = cand, h.copy(), a.copy()
+    return best, schedule._replace(home=best_home, away=best_away), iterations
+
+
+def _anneal_worker(args: tuple) -> tuple[float, Schedule, int]:
+    return anneal(*args)
+
+
+def optimize_schedule(
+    schedule: Schedule,
+    strengths: dict[str, float],
+    seconds: float = 5.0,
+    workers: int | None = None,
+    seed: int = 0,
+    weights: Weights = Weights(),
+    window: int = WINDOW,
+) -> OptimizeResult:
+    """
+    Paralelné žíhanie (workers procesov, predvolene počet CPU) so spoločným
+    limitom seconds od zavolania; vráti najlepší nájdený rozpis. Rozpis
+    zachová počty stretnutí dvojíc aj domáce prostredie pôvodného.
+    """
+    strength = strength_vector(schedule, strengths)
+    initial = schedule_cost(schedule, strength, weights, window)
+    workers = max(1, workers or os.cpu_count() or 1)
+    deadline = time.time() + seconds
+    jobs = [(schedule, strength, deadline, seed + i, weights, window) for i in range(workers)]
+    if workers == 1:
+        results = [_anneal_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_anneal_worker, jobs))
+
+    cost, best, _ = min(results, key=lambda res: res[0])
+    if cost >= initial:
+        cost, best = initial, schedule
+    return OptimizeResult(best, cost, initial, sum(res[2] for res in results), workers)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Optimalizácia rozpisu podľa sily tímov.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--league", type=int, default=DEFAULT_LEAGUE_ID)
+    parser.add_argument("--rounds", type=int, default=32)
+    parser.add_argument("--source", choices=list(STRENGTH_SOURCES), default="elo")
+    parser.add_argument("--seconds", type=float, default=5.0, help="časový limit hľadania")
+    parser.add_argument("--workers", type=int, default=None, help="počet procesov (predvolene počet CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    conn = get_conn(args.db)
+    ensure_schema(conn)
+    team_set = load_team_set(conn, args.league)
+    history = MatchStore.from_frame(played_matches(conn, league_id=args.league), team_set.all)
+    strengths = team_strengths(history, team_set, args.source)
+
+    base = league_schedule(team_set, args.rounds)
+    result = optimize_schedule(base, strengths, args.seconds, args.workers, args.seed)
+    strength = strength_vector(base, strengths)
+    print(f"Cena rozpisu: {result.initial_cost:.4f} -> {result.cost:.4f} "
+          f"({result.iterations} iterácií, {result.workers} procesov)")
+    for name, before, after in zip(
+        Weights._fields,
+        cost_breakdown(base, strength).values(),
+        cost_breakdown(result.schedule, strength).values(),
+    ):
+        print(f"  {name}: {before:.4f} -> {after:.4f}")
+    problems = check_schedule(result.schedule, meetings=None)
+    for p in problems:
+        print("  " + p)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# service.py
+#
+# Asyncio vrstva nad api.py pre nárazovú záťaž (koniec kola – všetci naraz
+# obnovujú tabuľku). Blokujúca práca (SQLite, pandas) beží v ohraničenom
+# ThreadPoolExecutor, event loop len čaká.
+#
+#   - coalescing: súbežné rovnaké požiadavky (cesta + verzia dát) čakajú na
+#     jediný rozbehnutý výpočet, takže N rovnakých čítaní = 1 výpočet
+#   - timeout na požiadavku: čakateľ po timeoute dostane 504, zdieľaný
+#     výpočet beží ďalej pre ostatných (asyncio.shield) a uloží sa do cache
+#   - backpressure: najviac max_pending rozbehnutých rôznych výpočtov, ďalšie
+#     sa hneď odmietnu (503 + Retry-After) namiesto hromadenia vo fronte
+#
+# Endpointy a formát odpovedí sú rovnaké ako v api.py (aj ETag / 304).
+#
+# Použitie:
+#   python service.py
+#   python service.py --port 8503 --workers 4 --max-pending 64 --timeout 5
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from api import ResponseCache, etag_for, not_modified, render
+from config import DB_DEFAULT
+from db import data_version, get_readonly_conn, migrate
+from loaders import thread_conn
+
+
+class ServiceOverloaded(Exception):
+    """Priveľa rozbehnutých výpočtov – požiadavka sa odmieta (backpressure)."""
+
+
+class LeagueService:
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = 4,
+        max_pending: int = 64,
+        timeout: float = 5.0,
+        cache_entries: int = 1024,
+    ):
+        # spojenia sú len na čítanie – nemigrovaná DB by nemala change_seq
+        migrate(db_path)
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.cache = ResponseCache(cache_entries)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqlite")
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        # počítadlá pre prehľad / testy
+        self.computed = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def _conn(self):
+        return thread_conn(self.db_path, get_readonly_conn)
+
+    def _version(self) -> int:
+        return data_version(self._conn())
+
+    def _compute(self, version: int, target: str) -> tuple[int, bytes]:
+        return render(self._conn(), version, target)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def get(self, target: str) -> tuple[int, int, bytes]:
+        """
+        (verzia dát, status, telo) pre cestu. Vyhodí ServiceOverloaded pri plnom
+        ohraničení a TimeoutError, ak výsledok nepríde do timeoutu.
+        """
+        version = await asyncio.wait_for(self._run(self._version), self.timeout)
+        item = self.cache.get(version, target)
+        if item is not None:
+            return version, item[0], item[1]
+
+        key = (version, target)
+        fut = self._inflight.get(key)
+        if fut is None:
+            if len(self._inflight) >= self.max_pending:
+                self.rejected += 1
+                raise ServiceOverloaded(f"{len(self._inflight)} rozbehnutých výpočtov")
+            fut = asyncio.ensure_future(self._run(self._compute, version, target))
+            self._inflight[key] = fut
+            self.computed += 1
+            fut.add_done_callback(lambda f, key=key: self._finish(key, f))
+        else:
+            self.coalesced += 1
+        item = await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        return version, item[0], item[1]
+
+    def _finish(self, key: tuple[int, str], fut: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not fut.cancelled() and fut.exception() is None:
+            self.cache.put(key[0], key[1], fut.result())
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- minimálny HTTP/1.1 server (keep-alive, len GET) ---
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    break
+                method, target, _ = parts
+                writer.write(await self._response(method, target, headers))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _response(self, method: str, target: str, headers: dict) -> bytes:
+        extra: dict[str, str] = {}
+        if method != "GET":
+            status, body = 405, json.dumps({"error": "Povolené je len GET."}).encode("utf-8")
+        else:
+            try:
+                version, status, body = await self.get(target)
+                if status == 200:
+                    extra = {"ETag": etag_for(version), "Cache-Control": "no-cache"}
+                    if not_modified(version, status, headers.get("if-none-match")):
+                        status, body = 304, b""
+            except ServiceOverloaded as exc:
+                status, body = 503, json.dumps({"error": str(exc)}, ensure_ascii=False).encode("utf-8")
+                extra = {"Retry-After": "1"}
+            except TimeoutError:
+                status, body = 504, json.dumps({"error": "Vypršal čas na odpoveď."}, ensure_ascii=False).encode("utf-8")
+            except Exception as exc:
+                status, body = 500, json.dumps({"error": str(exc)}, ensure_ascii=False).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        if status != 304:
+            head.append("Content-Type: application/json; charset=utf-8")
+        head.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def serve(service: LeagueService, host: str, port: int) -> None:
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Služba beží na http://{host}:{port} (DB: {service.db_path})")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Asyncio JSON služba nad dátami ligy.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8503)
+    parser.add_argument("--workers", type=int, default=4, help="vlákna pre SQLite / pandas")
+    parser.add_argument("--max-pending", type=int, default=64, help="najviac rozbehnutých výpočtov")
+    parser.add_argument("--timeout", type=float, default=5.0, help="timeout požiadavky (s)")
+    args = parser.parse_args(argv)
+
+    service = LeagueService(args.db, args.workers, args.max_pending, args.timeout)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
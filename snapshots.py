@@ -0,0 +1,202 @@
+# snapshots.py
+#
+# Uzavreté sezóny: ich zápasy sa už nemenia (triggre v db.ensure_schema), takže
+# tabuľka s detailnými metrikami, Elo (aj vývoj po kolách), H2H matica a rekordy
+# sa vypočítajú raz a uložia ako zlib-komprimovaný JSON do season_snapshots.
+# Čítanie uzavretej sezóny je potom jeden riadok z DB namiesto prepočtu.
+#
+# Použitie bez UI:
+#   python snapshots.py                  # doplní chýbajúce snapshoty (paralelne)
+#   python snapshots.py --close 3        # uzavrie sezónu s ID 3
+#   python snapshots.py --rebuild --workers 4
+
+import argparse
+import json
+import sqlite3
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from config import DB_DEFAULT
+from db import get_conn, get_readonly_conn, ensure_schema, fetch_matches, season_league
+from stats import (
+    TeamSet,
+    SeasonIndex,
+    load_team_set,
+    compute_standings,
+    compute_elo_ratings,
+    compute_elo_history,
+    compute_h2h_matrix,
+    compute_season_records,
+    sort_standings,
+    STANDINGS_COLUMNS_ALL,
+    STANDINGS_COLUMNS_SIDE,
+)
+
+# pri zmene obsahu snapshotu zvýšiť – staršie snapshoty sa ignorujú a prepočítajú
+SNAPSHOT_FORMAT = 1
+
+# časti snapshotu uložené ako DataFrame
+_FRAMES = ("standings", "elo", "elo_history", "h2h")
+
+
+def compute_snapshot(matches: pd.DataFrame, team_set: TeamSet) -> dict:
+    """Všetky vypočítané výsledky sezóny (DataFrame časti + rekordy)."""
+    idx = SeasonIndex(matches, team_set)
+    played = idx.played
+    return {
+        "teams": {"m": list(team_set.m), "v": list(team_set.v)},
+        "standings": compute_standings(played, "ALL", detailed=True, team_set=team_set),
+        "elo": compute_elo_ratings(played, team_set=team_set),
+        "elo_history": compute_elo_history(played, team_set=team_set),
+        "h2h": compute_h2h_matrix(played, team_set=team_set),
+        "records": compute_season_records(idx.frame),
+    }
+
+
+def encode_snapshot(snap: dict) -> bytes:
+    data = dict(snap)
+    for key in _FRAMES:
+        split = snap[key].to_dict(orient="split")
+        data[key] = {"index": split["index"], "columns": split["columns"], "data": split["data"]}
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 9)
+
+
+def decode_snapshot(blob: bytes) -> dict:
+    snap = json.loads(zlib.decompress(blob).decode("utf-8"))
+    for key in _FRAMES:
+        part = snap[key]
+        snap[key] = pd.DataFrame(part["data"], index=part["index"], columns=part["columns"])
+    return snap
+
+
+def build_snapshot(conn: sqlite3.Connection, season_id: int) -> bytes:
+    league_id = season_league(conn, season_id)
+    snap = compute_snapshot(fetch_matches(conn, season_id), load_team_set(conn, league_id))
+    return encode_snapshot(snap)
+
+
+def save_snapshot(conn: sqlite3.Connection, season_id: int, blob: bytes, commit: bool = True) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO season_snapshots(season_id, format, created, data) VALUES(?,?,?,?);",
+        (season_id, SNAPSHOT_FORMAT, datetime.now().isoformat(timespec="seconds"), blob),
+    )
+    if commit:
+        conn.commit()
+
+
+def load_snapshot(conn: sqlite3.Connection, season_id: int) -> dict | None:
+    """Snapshot sezóny (jeden riadok), None ak chýba alebo je v starom formáte."""
+    row = conn.execute(
+        "SELECT data FROM season_snapshots WHERE season_id=? AND format=?;",
+        (season_id, SNAPSHOT_FORMAT),
+    ).fetchone()
+    return decode_snapshot(row[0]) if row else None
+
+
+def load_snapshots(conn: sqlite3.Connection, season_ids: list[int]) -> dict[int, dict]:
+    """Snapshoty viacerých sezón jedným dotazom: season_id -> snapshot."""
+    if not season_ids:
+        return {}
+    marks = ", ".join("?" for _ in season_ids)
+    rows = conn.execute(
+        f"SELECT season_id, data FROM season_snapshots WHERE format=? AND season_id IN ({marks});",
+        [SNAPSHOT_FORMAT] + [int(s) for s in season_ids],
+    ).fetchall()
+    return {sid: decode_snapshot(blob) for sid, blob in rows}
+
+
+def standings_from_snapshot(snap: dict, scope: str = "ALL", detailed: bool = False) -> pd.DataFrame:
+    """
+    Tabuľka zo snapshotu v rovnakom tvare ako compute_standings(scope, detailed).
+    Uložená je len detailná tabuľka všetkých tímov; M/V a základný pohľad sú
+    jej výrezy, zoradené rovnako ako pri výpočte (z pôvodného poradia tímov).
+    """
+    full = snap["standings"]
+    if scope == "ALL" and detailed:
+        return full
+    teams = snap["teams"]["m"] if scope == "M" else snap["teams"]["v"] if scope == "V" else (
+        snap["teams"]["m"] + snap["teams"]["v"]
+    )
+    columns = STANDINGS_COLUMNS_ALL if scope == "ALL" else STANDINGS_COLUMNS_SIDE
+    df = full.set_index("Team", drop=False).loc[teams, columns].reset_index(drop=True)
+    return sort_standings(df)
+
+
+def close_season(conn: sqlite3.Connection, season_id: int) -> None:
+    """
+    Uzavrie sezónu: v jednej transakcii vypočíta a uloží snapshot a nastaví
+    closed=1 – od tej chvíle triggre blokujú zmeny jej zápasov.
+    """
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        blob = build_snapshot(conn, season_id)
+        save_snapshot(conn, season_id, blob, commit=False)
+        conn.execute("UPDATE seasons SET closed = 1 WHERE id=?;", (season_id,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _build_worker(args: tuple[str, int]) -> tuple[int, bytes]:
+    db_path, season_id = args
+    conn = get_readonly_conn(db_path)
+    try:
+        return season_id, build_snapshot(conn, season_id)
+    finally:
+        conn.close()
+
+
+def build_snapshots(db_path: str, workers: int | None = None, rebuild: bool = False) -> list[int]:
+    """
+    Snapshoty pre všetky uzavreté sezóny, ktorým chýbajú (rebuild=True: všetky).
+    Sezóny sa počítajú paralelne v procesoch (každý s vlastným read-only
+    spojením), zapisuje len hlavný proces. Vracia ID prepočítaných sezón.
+    """
+    conn = get_conn(db_path)
+    ensure_schema(conn)
+    q = (
+        "SELECT s.id FROM seasons AS s "
+        "LEFT JOIN season_snapshots AS p ON p.season_id = s.id "
+        "WHERE s.closed = 1"
+    )
+    params: list = []
+    if not rebuild:
+        q += " AND (p.season_id IS NULL OR p.format <> ?)"
+        params.append(SNAPSHOT_FORMAT)
+    season_ids = [r[0] for r in conn.execute(q + " ORDER BY s.id;", params)]
+    if not season_ids:
+        return []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for season_id, blob in pool.map(_build_worker, [(db_path, s) for s in season_ids]):
+            save_snapshot(conn, season_id, blob, commit=False)
+    conn.commit()
+    return season_ids
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Snapshoty uzavretých sezón.")
+    parser.add_argument("--db", default=DB_DEFAULT, help="cesta k SQLite databáze")
+    parser.add_argument("--close", type=int, action="append", default=[], metavar="SEASON_ID",
+                        help="uzavrie sezónu (dá sa zopakovať)")
+    parser.add_argument("--workers", type=int, default=None, help="počet procesov (predvolene počet CPU)")
+    parser.add_argument("--rebuild", action="store_true", help="prepočíta aj existujúce snapshoty")
+    args = parser.parse_args(argv)
+
+    conn = get_conn(args.db)
+    ensure_schema(conn)
+    for season_id in args.close:
+        close_season(conn, season_id)
+        print(f"Sezóna {season_id} uzavretá.")
+
+    built = build_snapshots(args.db, workers=args.workers, rebuild=args.rebuild)
+    print(f"Snapshoty: {len(built)} sezón" + (f" ({', '.join(map(str, built))})" if built else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,296 +1,701 @@
 # stats.py
 
+import sqlite3
+from bisect import bisect_left
+from fractions import Fraction
+from typing import NamedTuple
+
+import numpy as np
 import pandas as pd
-from config import M_TEAMS, V_TEAMS
+from db import DEFAULT_LEAGUE_ID, load_teams, match_status
+from tracing import traced
 
 
-def result_points(home_g: int, away_g: int, ot: bool) -> tuple[int, int]:
-    if home_g > away_g:
-        return (2 if ot else 3, 1 if ot else 0)
-    elif away_g > home_g:
-        return (1 if ot else 0, 2 if ot else 3)
-    else:
+class TeamSet(NamedTuple):
+    """
+    Tímy ligy podľa strany: m hrajú doma, v vonku (poradie podľa id v tabuľke teams).
+    Každá liga má vlastnú sadu – compute_* funkcie ju dostávajú ako parameter.
+    """
+    m: list[str]
+    v: list[str]
+
+    @property
+    def all(self) -> list[str]:
+        return self.m + self.v
+
+    def side(self, team: str) -> str:
+        return "M" if team in self.m else "V"
+
+
+@traced
+def load_team_set(conn: sqlite3.Connection, league_id: int = DEFAULT_LEAGUE_ID) -> TeamSet:
+    """Tímy ligy z tabuľky teams."""
+    teams = load_teams(conn, league_id)
+    return TeamSet(
+        teams.loc[teams["side"] == "M", "code"].tolist(),
+        teams.loc[teams["side"] == "V", "code"].tolist(),
+    )
+
+
+# výsledok z pohľadu tímu -> kód 2 * výhra + OT (index do ScoringRules.table)
+OUTCOMES = ("L", "L-OT", "W", "W-OT")
+
+
+class ScoringRules(NamedTuple):
+    """
+    Bodovanie ligy: body za výhru, výhru v predĺžení, prehru v predĺžení a prehru.
+    overtime=False – liga predĺženie nepozná, príznak OT sa ignoruje (výhra
+    v predĺžení je obyčajná výhra). Pravidlá sa skompilujú na vyhľadávacie pole
+    table indexované kódom výsledku (OUTCOMES), takže body ľubovoľného počtu
+    zápasov sú jeden gather: rules.table[rules.outcome_codes(gf, ga, ot)].
+    """
+    win: int = 3
+    ot_win: int = 2
+    ot_loss: int = 1
+    loss: int = 0
+    overtime: bool = True
+
+    @property
+    def table(self) -> np.ndarray:
+        return np.array([self.loss, self.ot_loss, self.win, self.ot_win], dtype=np.int64)
+
+    @property
+    def max_points(self) -> int:
+        """Najviac bodov za jeden zápas (menovateľ PTS%)."""
+        return max(self.win, self.ot_win) if self.overtime else self.win
+
+    @property
+    def label(self) -> str:
+        if self.overtime:
+            return f"{self.win}/{self.ot_win}/{self.ot_loss}/{self.loss}"
+        return f"{self.win}/{self.loss}"
+
+    def outcome_codes(self, gf, ga, ot) -> np.ndarray:
+        """Kódy výsledkov z pohľadu tímu; remízy treba odfiltrovať vopred."""
+        codes = (np.asarray(gf) > np.asarray(ga)).astype(np.int32) * 2
+        if self.overtime:
+            codes += np.asarray(ot, dtype=bool)
+        return codes
+
+    def points(self, gf, ga, ot) -> np.ndarray:
+        return self.table[self.outcome_codes(gf, ga, ot)]
+
+    @property
+    def splits(self) -> tuple[int, int, int] | None:
+        """
+        (base, step, spread): tím dostane za zápas base + step * j bodov, j = 0..spread,
+        a súper zvyšok do konštantného súčtu (3/2/1/0: 0, 1, 3 – každé delenie 3 bodov).
+        None, ak súčet bodov v zápase nie je konštantný alebo hodnoty netvoria
+        aritmetickú postupnosť (napr. 2/2/1/0) – vtedy sa zvyšok sezóny nedá
+        modelovať ako tok bodov (compute_clinch).
+        """
+        values = {self.win, self.loss}
+        if self.overtime:
+            if self.ot_win + self.ot_loss != self.win + self.loss:
+                return None
+            values |= {self.ot_win, self.ot_loss}
+        values = sorted(values)
+        steps = set(np.diff(values).tolist())
+        if len(steps) > 1:
+            return None
+        step = steps.pop() if steps else 1
+        return values[0], step, (values[-1] - values[0]) // step
+
+
+DEFAULT_SCORING = ScoringRules()
+
+
+def result_points(
+    home_g: int, away_g: int, ot: bool, scoring: ScoringRules = DEFAULT_SCORING
+) -> tuple[int, int]:
+    if home_g == away_g:
         return (0, 0)  # remízy nepovoľujeme; validátor ich blokuje
+    home, away = scoring.points([home_g, away_g], [away_g, home_g], [ot, ot]).tolist()
+    return (home, away)
+
+
+# bity v MatchStore.flags
+FLAG_OT = 1
+FLAG_PLAYOFF = 2
+FLAG_PLAYED = 4  # status='played' (0 = nevyplnený zápas z rozpisu)
+
+_NO_TEAM = 255  # kód pre tím mimo zoznamu (napr. staré riadky s neznámym kódom)
 
 
-def _result_code_for_team(hg: int, ag: int, ot: bool, is_home: bool) -> str:
+def _checked(name: str, values: np.ndarray, dtype) -> np.ndarray:
+    """Pretypovanie stĺpca na úzky typ; hodnota mimo rozsahu je chyba, nie pretečenie."""
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"Stĺpec {name} má hodnoty mimo rozsahu {info.min}–{info.max}.")
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+class MatchStore:
     """
-    Vráti kód výsledku z pohľadu tímu: 'W', 'W-OT', 'L-OT', 'L'
+    Kompaktné uloženie zápasov ako súvislé typované polia (numpy):
+      home/away – uint8 kódy tímov (index do self.teams, 255 = neznámy tím)
+      home_goals/away_goals – uint8, round – uint16, season – uint32, id – uint32
+      flags – uint8 bitovo: FLAG_OT | FLAG_PLAYOFF | FLAG_PLAYED
+    Hodnoty mimo rozsahu týchto typov (napr. viac ako 255 gólov) a viac ako
+    254 tímov from_frame odmietne ValueError-om namiesto tichého pretečenia.
+    Riadky sú zoradené podľa (season, round, id), takže sezóna a kolo v rámci
+    sezóny sú súvislé úseky – season() / round() vracajú view bez kopírovania.
+    Všetky compute_* funkcie prijímajú MatchStore aj DataFrame.
     """
-    win = (hg > ag) if is_home else (ag > hg)
-    if win:
-        return "W-OT" if ot else "W"
+
+    __slots__ = ("teams", "id", "home", "away", "home_goals", "away_goals", "round", "season", "flags")
+
+    def __init__(self, teams, id, home, away, home_goals, away_goals, round, season, flags):
+        self.teams = teams
+        self.id = id
+        self.home = home
+        self.away = away
+        self.home_goals = home_goals
+        self.away_goals = away_goals
+        self.round = round
+        self.season = season
+        self.flags = flags
+
+    @classmethod
+    @traced
+    def from_frame(cls, df: pd.DataFrame, teams: list[str]) -> "MatchStore":
+        teams = list(teams)
+        if len(teams) >= _NO_TEAM:
+            raise ValueError(f"MatchStore zvládne najviac {_NO_TEAM - 1} tímov, zadaných je {len(teams)}.")
+        codes = {t: i for i, t in enumerate(teams)}
+        if df.empty:
+            n = 0
+            cols = {c: np.zeros(0, dtype=np.int64) for c in ("id", "round", "season", "home_goals", "away_goals", "overtime", "is_playoff")}
+            home = away = []
+        else:
+            n = len(df)
+            cols = {c: df[c].to_numpy() for c in ("id", "round", "season", "home_goals", "away_goals", "overtime")}
+            cols["is_playoff"] = df["is_playoff"].to_numpy() if "is_playoff" in df.columns else np.zeros(n, dtype=np.int64)
+            home = df["home_team"].tolist()
+            away = df["away_team"].tolist()
+
+        order = np.lexsort((cols["id"], cols["round"], cols["season"])) if n else np.zeros(0, dtype=np.intp)
+        home_codes = np.fromiter((codes.get(t, _NO_TEAM) for t in home), dtype=np.uint8, count=n)
+        away_codes = np.fromiter((codes.get(t, _NO_TEAM) for t in away), dtype=np.uint8, count=n)
+        if n and "status" in df.columns:
+            played = df["status"].to_numpy() == "played"
+        else:
+            played = (cols["home_goals"] != 0) | (cols["away_goals"] != 0)
+        flags = (
+            (cols["overtime"].astype(np.uint8) * FLAG_OT)
+            | (cols["is_playoff"].astype(np.uint8) * FLAG_PLAYOFF)
+            | (np.asarray(played, dtype=np.uint8) * FLAG_PLAYED)
+        )
+
+        return cls(
+            teams,
+            _checked("id", cols["id"][order], np.uint32),
+            np.ascontiguousarray(home_codes[order]),
+            np.ascontiguousarray(away_codes[order]),
+            _checked("home_goals", cols["home_goals"][order], np.uint8),
+            _checked("away_goals", cols["away_goals"][order], np.uint8),
+            _checked("round", cols["round"][order], np.uint16),
+            _checked("season", cols["season"][order], np.uint32),
+            np.ascontiguousarray(flags[order], dtype=np.uint8),
+        )
+
+    def _take(self, sel) -> "MatchStore":
+        # slice -> view (bez kópie), pole indexov -> kópia len vybraných k riadkov
+        return MatchStore(
+            self.teams, self.id[sel], self.home[sel], self.away[sel],
+            self.home_goals[sel], self.away_goals[sel], self.round[sel],
+            self.season[sel], self.flags[sel],
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.id) == 0
+
+    @property
+    def overtime(self) -> np.ndarray:
+        return (self.flags & FLAG_OT).astype(bool)
+
+    @property
+    def is_playoff(self) -> np.ndarray:
+        return (self.flags & FLAG_PLAYOFF).astype(bool)
+
+    @property
+    def played(self) -> np.ndarray:
+        return (self.flags & FLAG_PLAYED).astype(bool)
+
+    def played_view(self) -> "MatchStore":
+        """Len odohrané zápasy (bez nevyplneného rozpisu)."""
+        return self._take(np.flatnonzero(self.flags & FLAG_PLAYED))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, c).nbytes for c in self.__slots__[1:])
+
+    def code(self, team: str) -> int:
+        return self.teams.index(team) if team in self.teams else _NO_TEAM
+
+    def team_names(self, codes: np.ndarray) -> list:
+        lookup = list(self.teams) + [None] * (256 - len(self.teams))
+        return [lookup[c] for c in codes.tolist()]
+
+    def season_view(self, season_id: int) -> "MatchStore":
+        """Zápasy jednej sezóny – súvislý úsek polí (view)."""
+        lo = int(np.searchsorted(self.season, season_id, side="left"))
+        hi = int(np.searchsorted(self.season, season_id, side="right"))
+        return self._take(slice(lo, hi))
+
+    def round_view(self, rnd: int) -> "MatchStore":
+        """Zápasy jedného kola; pre store jednej sezóny je to view, inak kópia k riadkov."""
+        if len(self) and self.season[0] == self.season[-1]:
+            lo = int(np.searchsorted(self.round, rnd, side="left"))
+            hi = int(np.searchsorted(self.round, rnd, side="right"))
+            return self._take(slice(lo, hi))
+        return self._take(np.flatnonzero(self.round == rnd))
+
+    def team_view(self, team: str) -> "MatchStore":
+        """Zápasy tímu (doma aj vonku) v pôvodnom poradí."""
+        c = self.code(team)
+        return self._take(np.flatnonzero((self.home == c) | (self.away == c)))
+
+    def seasons(self) -> list[int]:
+        return np.unique(self.season).tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Späť na DataFrame v tvare fetch_matches (pre zobrazenie)."""
+        return pd.DataFrame(
+            {
+                "id": self.id.astype(np.int64),
+                "home_team": self.team_names(self.home),
+                "away_team": self.team_names(self.away),
+                "home_goals": self.home_goals.astype(np.int64),
+                "away_goals": self.away_goals.astype(np.int64),
+                "overtime": (self.flags & FLAG_OT).astype(np.int64),
+                "round": self.round.astype(np.int64),
+                "season": self.season.astype(np.int64),
+                "is_playoff": ((self.flags & FLAG_PLAYOFF) > 0).astype(np.int64),
+                "status": np.where(self.flags & FLAG_PLAYED, "played", "scheduled"),
+            }
+        )
+
+
+def _group_positions(keys: np.ndarray, positions: np.ndarray) -> dict[int, np.ndarray]:
+    """kľúč -> zoradené pozície riadkov (jedno triedenie, potom len delenie poľa)."""
+    if len(keys) == 0:
+        return {}
+    order = np.lexsort((positions, keys))
+    keys_sorted = keys[order]
+    pos_sorted = positions[order]
+    bounds = np.flatnonzero(np.diff(keys_sorted)) + 1
+    starts = np.concatenate(([0], bounds))
+    return {
+        int(keys_sorted[st]): chunk
+        for st, chunk in zip(starts, np.split(pos_sorted, bounds))
+    }
+
+
+class SeasonIndex:
+    """
+    Invertovaný index nad zápasmi sezóny (stavia sa raz na verziu dát):
+      tím -> pozície riadkov, kolo -> úsek riadkov, (domáci, hostia) -> pozície.
+    Výber zápasov tímu / kola / dvojice stojí O(k) v počte vybraných riadkov
+    namiesto masky cez celú sezónu. Pozície sú v poradí (round, id).
+    """
+
+    def __init__(self, matches: "pd.DataFrame | MatchStore", teams: TeamSet):
+        store = (
+            matches if isinstance(matches, MatchStore)
+            else MatchStore.from_frame(matches, teams.all)
+        )
+        self.teams = teams
+        self.store = store
+        self.frame = store.to_frame()
+        self._played: MatchStore | None = None
+
+        n = len(store)
+        pos = np.arange(n, dtype=np.int64)
+        self._team_pos = _group_positions(
+            np.concatenate((store.home, store.away)).astype(np.int64),
+            np.concatenate((pos, pos)),
+        )
+        self._pair_pos = _group_positions(
+            store.home.astype(np.int64) * 256 + store.away.astype(np.int64), pos
+        )
+        # store je zoradený podľa (season, round, id) – pre jednu sezónu je kolo súvislý úsek
+        rounds, starts, counts = np.unique(store.round, return_index=True, return_counts=True)
+        self._round_range = {
+            int(r): (int(st), int(st + c)) for r, st, c in zip(rounds, starts, counts)
+        }
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def empty(self) -> bool:
+        return self.store.empty
+
+    @property
+    def played(self) -> MatchStore:
+        """Odohrané zápasy sezóny (vstup pre compute_*), počíta sa raz."""
+        if self._played is None:
+            self._played = self.store.played_view()
+        return self._played
+
+    @property
+    def played_frame(self) -> pd.DataFrame:
+        return self.frame[self.frame["status"] == "played"]
+
+    def rounds(self) -> list[int]:
+        return sorted(self._round_range)
+
+    def team(self, team: str) -> np.ndarray:
+        """Pozície zápasov tímu (doma aj vonku)."""
+        return self._team_pos.get(self.store.code(team), np.zeros(0, dtype=np.int64))
+
+    def round(self, rnd: int) -> np.ndarray:
+        lo, hi = self._round_range.get(int(rnd), (0, 0))
+        return np.arange(lo, hi, dtype=np.int64)
+
+    def pair(self, t1: str, t2: str) -> np.ndarray:
+        """Pozície vzájomných zápasov t1 a t2 (v oboch orientáciách)."""
+        c1, c2 = self.store.code(t1), self.store.code(t2)
+        empty = np.zeros(0, dtype=np.int64)
+        a = self._pair_pos.get(c1 * 256 + c2, empty)
+        b = self._pair_pos.get(c2 * 256 + c1, empty) if c1 != c2 else empty
+        return np.sort(np.concatenate((a, b))) if len(b) else a
+
+    def team_in_round(self, team: str, rnd: int) -> np.ndarray:
+        """Pozície zápasov tímu v danom kole – binárne vyhľadanie v pozíciách tímu."""
+        lo, hi = self._round_range.get(int(rnd), (0, 0))
+        tpos = self.team(team)
+        return tpos[np.searchsorted(tpos, lo):np.searchsorted(tpos, hi)]
+
+    def team_frame(self, team: str) -> pd.DataFrame:
+        return self.frame.iloc[self.team(team)]
+
+    def round_frame(self, rnd: int) -> pd.DataFrame:
+        lo, hi = self._round_range.get(int(rnd), (0, 0))
+        return self.frame.iloc[lo:hi]
+
+    def pair_frame(self, t1: str, t2: str) -> pd.DataFrame:
+        return self.frame.iloc[self.pair(t1, t2)]
+
+
+def _match_columns(matches, sort: bool = True, with_round: bool = False) -> tuple[list, ...]:
+    """
+    Stĺpce zápasov ako Python zoznamy (home, away, hg, ag, ot) zoradené podľa
+    (round, id) – spoločný vstup pre DataFrame aj MatchStore, bez iterrows a kópií.
+    Nevyplnené zápasy z rozpisu (status='scheduled') sa odfiltrujú jednou maskou,
+    takže ich slučky v compute_* vôbec nevidia. with_round pridá aj zoznam kôl.
+    """
+    if isinstance(matches, MatchStore):
+        keep = np.flatnonzero(matches.flags & FLAG_PLAYED)
+        if len(keep) != len(matches):
+            matches = matches._take(keep)
+        order = np.lexsort((matches.id, matches.round)) if sort else slice(None)
+        cols = (
+            matches.team_names(matches.home[order]),
+            matches.team_names(matches.away[order]),
+            matches.home_goals[order].astype(np.int64).tolist(),
+            matches.away_goals[order].astype(np.int64).tolist(),
+            (matches.flags[order] & FLAG_OT).astype(bool).tolist(),
+        )
+        return cols + (matches.round[order].astype(np.int64).tolist(),) if with_round else cols
+
+    if "status" in matches.columns:
+        matches = matches[matches["status"].to_numpy() == "played"]
+    if sort:
+        sort_cols = ["round", "id"] if "id" in matches.columns else ["round"]
+        order = np.lexsort(tuple(matches[c].to_numpy() for c in reversed(sort_cols)))
+    else:
+        order = np.arange(len(matches))
+    cols = (
+        matches["home_team"].to_numpy()[order].tolist(),
+        matches["away_team"].to_numpy()[order].tolist(),
+        matches["home_goals"].to_numpy().astype(np.int64)[order].tolist(),
+        matches["away_goals"].to_numpy().astype(np.int64)[order].tolist(),
+        matches["overtime"].to_numpy().astype(bool)[order].tolist(),
+    )
+    if with_round:
+        return cols + (matches["round"].to_numpy().astype(np.int64)[order].tolist(),)
+    return cols
+
+
+def _store_lookup(store: MatchStore, teams: list[str]) -> np.ndarray:
+    """Prevod kódov tímov MatchStore na indexy do teams (-1 = tím mimo zoznamu)."""
+    lookup = np.full(256, -1, dtype=np.int32)
+    for i, t in enumerate(teams):
+        code = store.code(t)
+        if code != _NO_TEAM:
+            lookup[code] = i
+    return lookup
+
+
+def _match_arrays(matches, teams: list[str], sort: bool = True) -> tuple[np.ndarray, ...]:
+    """
+    Odohrané zápasy ako numpy polia (home, away, hg, ag, ot; int32) zoradené podľa
+    (round, id); home/away sú indexy do teams (bez duplicít), -1 = tím mimo
+    zoznamu. Vstup pre vektorové compute_* – DataFrame aj MatchStore.
+    """
+    if matches.empty:
+        empty = np.zeros(0, dtype=np.int32)
+        return empty, empty, empty, empty, np.zeros(0, dtype=bool)
+
+    if isinstance(matches, MatchStore):
+        keep = np.flatnonzero(matches.flags & FLAG_PLAYED)
+        if len(keep) != len(matches):
+            matches = matches._take(keep)
+        order = np.lexsort((matches.id, matches.round)) if sort else slice(None)
+        lookup = _store_lookup(matches, teams)
+        return (
+            lookup[matches.home[order]],
+            lookup[matches.away[order]],
+            matches.home_goals[order].astype(np.int32),
+            matches.away_goals[order].astype(np.int32),
+            (matches.flags[order] & FLAG_OT).astype(bool),
+        )
+
+    if "status" in matches.columns:
+        matches = matches[matches["status"].to_numpy() == "played"]
+    if sort:
+        sort_cols = ["round", "id"] if "id" in matches.columns else ["round"]
+        order = np.lexsort(tuple(matches[c].to_numpy() for c in reversed(sort_cols)))
+    else:
+        order = np.arange(len(matches))
+    index = pd.Index(teams)
+    return (
+        index.get_indexer(matches["home_team"].to_numpy()[order]).astype(np.int32),
+        index.get_indexer(matches["away_team"].to_numpy()[order]).astype(np.int32),
+        matches["home_goals"].to_numpy().astype(np.int32)[order],
+        matches["away_goals"].to_numpy().astype(np.int32)[order],
+        matches["overtime"].to_numpy().astype(bool)[order],
+    )
+
+
+# poradie stĺpcov tabuľky podľa rozsahu (používa aj snapshots pri čítaní uložených tabuliek)
+STANDINGS_COLUMNS_DETAILED = [
+    "Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "P/GP", "PTS", "PTS%",
+    "GF/GP", "GA/GP", "AVG GD", "OT%", "OT body",
+    "1G W", "1G L", "Blowout W", "Blowout L",
+    "SO For", "SO Against", "10+ For", "10+ Against",
+    "Last5", "Streak",
+]
+STANDINGS_COLUMNS_ALL = ["Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
+STANDINGS_COLUMNS_SIDE = ["Team", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
+STANDINGS_SORT = ["PTS", "W", "W-OT", "GD", "GF"]
+
+
+def sort_standings(df: pd.DataFrame) -> pd.DataFrame:
+    """Poradie v tabuľke (PTS, W, W-OT, GD, GF), index od 1."""
+    df = df.sort_values(by=STANDINGS_SORT, ascending=[False] * len(STANDINGS_SORT)).reset_index(drop=True)
+    df.index = df.index + 1
+    return df
+
+
+def _team_totals(team: np.ndarray, values: np.ndarray, k: int) -> np.ndarray:
+    """Súčet hodnôt po tímoch (indexy 0..k-1)."""
+    return np.bincount(team, weights=values, minlength=k).astype(np.int64)
+
+
+def _streak(codes: np.ndarray) -> str:
+    if not len(codes):
+        return ""
+    breaks = np.flatnonzero(codes != codes[-1])
+    n = len(codes) - (int(breaks[-1]) + 1 if len(breaks) else 0)
+    return f"{OUTCOMES[codes[-1]]}{n}"
+
+
+def _safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
+    s = num / den
+    return s.replace([float("inf"), float("-inf")], 0).fillna(0)
+
+
+def _standings_columns(
+    unique: list[str],
+    teams: list[str],
+    counts: np.ndarray,
+    gf: np.ndarray,
+    ga: np.ndarray,
+    scoring: ScoringRules,
+) -> dict[str, np.ndarray]:
+    """
+    Stĺpce tabuľky (Team … GD, P/GP) ako polia z počtov výsledkov (k × 4 podľa
+    OUTCOMES) a súčtov gólov tímov v poradí unique; riadky v poradí teams.
+    """
+    row = pd.Index(unique).get_indexer(teams) if len(unique) != len(teams) else slice(None)
+    counts, gf, ga = counts[row], gf[row], ga[row]
+    gp = counts.sum(axis=1)
+    pts = counts @ scoring.table
+    per_game = np.zeros(len(gp), dtype=np.float64)
+    np.divide(pts, gp, out=per_game, where=gp > 0)
+    return {
+        "Team": np.asarray(unique, dtype=object)[row],
+        "GP": gp,
+        "W": counts[:, 2],
+        "W-OT": counts[:, 3],
+        "L-OT": counts[:, 1],
+        "L": counts[:, 0],
+        "GF": gf,
+        "GA": ga,
+        "PTS": pts,
+        "GD": gf - ga,
+        "P/GP": np.round(per_game, 3),
+    }
+
+
+def _standings_table(cols: dict[str, np.ndarray], scope: str, team_set: TeamSet) -> pd.DataFrame:
+    """
+    Základná (nie detailná) tabuľka podľa rozsahu, zoradená ako sort_standings –
+    stabilné lexsort poradie priamo nad poliami, DataFrame sa stavia raz.
+    """
+    if scope == "ALL":
+        cols["Side"] = np.asarray([team_set.side(t) for t in cols["Team"]], dtype=object)
+        columns = STANDINGS_COLUMNS_ALL
     else:
-        return "L-OT" if ot else "L"
+        columns = STANDINGS_COLUMNS_SIDE
+    order = np.lexsort(tuple(-cols[c] for c in reversed(STANDINGS_SORT)))
+    return pd.DataFrame(
+        {c: cols[c][order] for c in columns}, index=pd.RangeIndex(1, len(order) + 1)
+    )
 
 
-def compute_standings(matches: pd.DataFrame, scope: str = "ALL", detailed: bool = False) -> pd.DataFrame:
+@traced
+def compute_standings(
+    matches: "pd.DataFrame | MatchStore",
+    scope: str = "ALL",
+    detailed: bool = False,
+    *,
+    team_set: TeamSet,
+    scoring: ScoringRules = DEFAULT_SCORING,
+) -> pd.DataFrame:
     """
     scope: "ALL" | "M" | "V"
     detailed: ak True a scope == "ALL", zobrazia sa rozšírené metriky:
       PTS%, GF/GP, GA/GP, AVG GD, OT%, OT body,
       1G/Blowout/SHO, Last5, Streak, 10+ For/Against
+    team_set: tímy ligy (load_team_set)
+    scoring: bodovanie (ScoringRules), predvolene 3/2/1/0
     """
     # Tímy podľa rozsahu
     if scope == "M":
-        teams = M_TEAMS
+        teams = team_set.m
     elif scope == "V":
-        teams = V_TEAMS
+        teams = team_set.v
     else:
-        teams = M_TEAMS + V_TEAMS  # ALL
-
-    data: dict[str, dict] = {
-        t: {
-            "Team": t, "GP": 0, "W": 0, "W-OT": 0, "L-OT": 0, "L": 0,
-            "GF": 0, "GA": 0, "PTS": 0,
-            "_1G_W": 0, "_1G_L": 0,
-            "_BLOW_W": 0, "_BLOW_L": 0,
-            "_SO_FOR": 0, "_SO_AGAINST": 0,
-            "_OT_GAMES": 0,
-            "_TENPLUS_FOR": 0, "_TENPLUS_AGAINST": 0,
-        } for t in teams
-    }
-    # na formu – chronologický zoznam výsledkov
-    form_seq: dict[str, list[str]] = {t: [] for t in teams}
+        teams = team_set.all  # ALL
+    unique = list(dict.fromkeys(teams))
+    k = len(unique)
+    extended = scope == "ALL" and detailed
 
-    if not matches.empty:
-        matches_sorted = matches.sort_values(["round", "id"])
-        for _, m in matches_sorted.iterrows():
-            h, a = m["home_team"], m["away_team"]
-            hg, ag = int(m["home_goals"]), int(m["away_goals"])
-            ot = bool(m["overtime"])
-
-            if hg == ag:
-                continue  # remízy ignorujeme
-
-            # domáci
-            if h in data:
-                d = data[h]
-                d["GP"] += 1
-                d["GF"] += hg
-                d["GA"] += ag
-
-                # W / L / W-OT / L-OT
-                if hg > ag:
-                    if ot:
-                        d["W-OT"] += 1
-                    else:
-                        d["W"] += 1
-                else:
-                    if ot:
-                        d["L-OT"] += 1
-                    else:
-                        d["L"] += 1
-
-                # shutouts
-                if ag == 0:
-                    d["_SO_FOR"] += 1
-                if hg == 0:
-                    d["_SO_AGAINST"] += 1
-
-                # one-goal / blowout
-                diff = abs(hg - ag)
-                if diff == 1:
-                    if hg > ag:
-                        d["_1G_W"] += 1
-                    else:
-                        d["_1G_L"] += 1
-                elif diff >= 3:
-                    if hg > ag:
-                        d["_BLOW_W"] += 1
-                    else:
-                        d["_BLOW_L"] += 1
-
-                # 10+ góly
-                if hg >= 10:
-                    d["_TENPLUS_FOR"] += 1
-                if ag >= 10:
-                    d["_TENPLUS_AGAINST"] += 1
-
-                # OT zápas
-                if ot:
-                    d["_OT_GAMES"] += 1
-
-                # body
-                d["PTS"] += (2 if ot else 3) if hg > ag else (1 if ot else 0)
-
-                # forma
-                form_seq[h].append(_result_code_for_team(hg, ag, ot, True))
-
-            # hostia
-            if a in data:
-                d = data[a]
-                d["GP"] += 1
-                d["GF"] += ag
-                d["GA"] += hg
-
-                # W / L / W-OT / L-OT
-                if ag > hg:
-                    if ot:
-                        d["W-OT"] += 1
-                    else:
-                        d["W"] += 1
-                else:
-                    if ot:
-                        d["L-OT"] += 1
-                    else:
-                        d["L"] += 1
-
-                # shutouts
-                if hg == 0:
-                    d["_SO_FOR"] += 1
-                if ag == 0:
-                    d["_SO_AGAINST"] += 1
-
-                # one-goal / blowout
-                diff = abs(hg - ag)
-                if diff == 1:
-                    if ag > hg:
-                        d["_1G_W"] += 1
-                    else:
-                        d["_1G_L"] += 1
-                elif diff >= 3:
-                    if ag > hg:
-                        d["_BLOW_W"] += 1
-                    else:
-                        d["_BLOW_L"] += 1
-
-                # 10+ góly
-                if ag >= 10:
-                    d["_TENPLUS_FOR"] += 1
-                if hg >= 10:
-                    d["_TENPLUS_AGAINST"] += 1
-
-                # OT zápas
-                if ot:
-                    d["_OT_GAMES"] += 1
-
-                # body
-                d["PTS"] += (2 if ot else 3) if ag > hg else (1 if ot else 0)
-
-                # forma
-                form_seq[a].append(_result_code_for_team(hg, ag, ot, False))
-
-    df = pd.DataFrame([data[t] for t in teams])
-    df["GD"] = df["GF"] - df["GA"]
-
-    def safe_div(num: pd.Series, den: pd.Series) -> pd.Series:
-        s = num / den
-        return s.replace([float("inf"), float("-inf")], 0).fillna(0)
-
-    df["P/GP"] = safe_div(df["PTS"], df["GP"]).round(3)
-
-    if scope == "ALL" and detailed:
-        df["Side"] = df["Team"].apply(lambda x: "M" if x in M_TEAMS else "V")
-        df["PTS%"] = (safe_div(df["PTS"], df["GP"] * 3) * 100).round(1)
-        df["GF/GP"] = safe_div(df["GF"], df["GP"]).round(3)
-        df["GA/GP"] = safe_div(df["GA"], df["GP"]).round(3)
-        df["AVG GD"] = safe_div(df["GD"], df["GP"]).round(3)
-        df["OT%"] = (safe_div(df["_OT_GAMES"], df["GP"]) * 100).round(1)
-        df["OT body"] = (2 * df["W-OT"] + 1 * df["L-OT"]).astype(int)
-        df["1G W"] = df["_1G_W"].astype(int)
-        df["1G L"] = df["_1G_L"].astype(int)
-        df["Blowout W"] = df["_BLOW_W"].astype(int)
-        df["Blowout L"] = df["_BLOW_L"].astype(int)
-        df["SO For"] = df["_SO_FOR"].astype(int)
-        df["SO Against"] = df["_SO_AGAINST"].astype(int)
-        df["10+ For"] = df["_TENPLUS_FOR"].astype(int)
-        df["10+ Against"] = df["_TENPLUS_AGAINST"].astype(int)
-
-        def last5_str(seq: list[str]) -> str:
-            if not seq:
-                return ""
-            return ", ".join(seq[-5:])
-
-        def streak_str(seq: list[str]) -> str:
-            if not seq:
-                return ""
-            last = seq[-1]
-            n = 0
-            for r in reversed(seq):
-                if r == last:
-                    n += 1
-                else:
-                    break
-            return f"{last}{n}"
+    # jeden riadok na (zápas, strana): domáci pred hosťami, v poradí (round, id)
+    home, away, hg, ag, ot = _match_arrays(matches, unique)
+    team = np.column_stack((home, away)).ravel()
+    gf = np.column_stack((hg, ag)).ravel()
+    ga = np.column_stack((ag, hg)).ravel()
+    ots = np.repeat(ot, 2)
+    keep = (team >= 0) & (gf != ga)  # remízy ignorujeme
+    team, gf, ga, ots = team[keep], gf[keep], ga[keep], ots[keep]
 
-        df["Last5"] = df["Team"].map(lambda t: last5_str(form_seq.get(t, [])))
-        df["Streak"] = df["Team"].map(lambda t: streak_str(form_seq.get(t, [])))
+    codes = scoring.outcome_codes(gf, ga, ots)
+    # počty výsledkov tímu podľa kódu; body = súčet table[kód] = počty @ table
+    counts = np.bincount(team * 4 + codes, minlength=4 * k).reshape(k, 4)
+    cols = _standings_columns(
+        unique, teams, counts, _team_totals(team, gf, k), _team_totals(team, ga, k), scoring
+    )
+    if not extended:
+        return _standings_table(cols, scope, team_set)
 
-        order = [
-            "Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "P/GP", "PTS", "PTS%",
-            "GF/GP", "GA/GP", "AVG GD", "OT%", "OT body",
-            "1G W", "1G L", "Blowout W", "Blowout L",
-            "SO For", "SO Against", "10+ For", "10+ Against",
-            "Last5", "Streak",
-        ]
-        df = df[order]
+    df = pd.DataFrame(cols)
+    win = gf > ga
+    diff = np.abs(gf - ga)
+    extra = {
+        "1G W": (diff == 1) & win,
+        "1G L": (diff == 1) & ~win,
+        "Blowout W": (diff >= 3) & win,
+        "Blowout L": (diff >= 3) & ~win,
+        "SO For": ga == 0,
+        "SO Against": gf == 0,
+        "10+ For": gf >= 10,
+        "10+ Against": ga >= 10,
+    }
+    row = pd.Index(unique).get_indexer(df["Team"])
+    ot_games = counts[:, 1] + counts[:, 3]
+    df["Side"] = df["Team"].apply(team_set.side)
+    df["PTS%"] = (_safe_div(df["PTS"], df["GP"] * scoring.max_points) * 100).round(1)
+    df["GF/GP"] = _safe_div(df["GF"], df["GP"]).round(3)
+    df["GA/GP"] = _safe_div(df["GA"], df["GP"]).round(3)
+    df["AVG GD"] = _safe_div(df["GD"], df["GP"]).round(3)
+    df["OT%"] = (_safe_div(pd.Series(ot_games[row]), df["GP"]) * 100).round(1)
+    df["OT body"] = (scoring.ot_win * df["W-OT"] + scoring.ot_loss * df["L-OT"]).astype(int)
+    for col, mask in extra.items():
+        df[col] = np.bincount(team[mask], minlength=k)[row].astype(int)
 
-    elif scope == "ALL":
-        df["Side"] = df["Team"].apply(lambda x: "M" if x in M_TEAMS else "V")
-        order = ["Team", "Side", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
-        df = df[order]
-    else:
-        order = ["Team", "GP", "W", "W-OT", "L-OT", "L", "GF", "GA", "GD", "PTS", "P/GP"]
-        df = df[order]
+    # forma – kódy výsledkov tímu chronologicky (stabilné triedenie podľa tímu)
+    order = np.argsort(team, kind="stable")
+    bounds = np.searchsorted(team[order], np.arange(k + 1))
+    form = [codes[order[bounds[i]:bounds[i + 1]]] for i in range(k)]
+    df["Last5"] = [", ".join(OUTCOMES[c] for c in form[i][-5:].tolist()) for i in row]
+    df["Streak"] = [_streak(form[i]) for i in row]
 
-    df = df.sort_values(
-        by=["PTS", "W", "W-OT", "GD", "GF"],
-        ascending=[False, False, False, False, False],
-    ).reset_index(drop=True)
-    df.index = df.index + 1
-    return df
+    return sort_standings(df[STANDINGS_COLUMNS_DETAILED])
 
 
-def generate_bipartite_schedule(rounds: int = 32):
-    """
-    M tímy sú stále v poradí:
-      FIN, SWE, USA, NEM, DAN, FRA, RAK, MAD
+def _elo_update(ratings: dict, games: dict, h: str, a: str, hg: int, ag: int, k: float) -> None:
+    """Jedna Elo aktualizácia po zápase (mení ratings a games na mieste)."""
+    # len odohrané zápasy (nie čisté 0:0 z rozpisu); pre istotu ignorujeme remízy
+    if hg == ag:
+        return
 
-    V tímy v 1. kole:
-      SLO, KAZ, NOR, LOT, SVK, SUI, CES, KAN
+    if h not in ratings or a not in ratings:
+        return
 
-    V ďalších kolách sa V tímy posúvajú „hore“ o 1:
-      nový zoznam = [2., 3., ..., 8., 1.]
-    """
-    M = M_TEAMS.copy()
-    v_start = ["SLO", "KAZ", "NOR", "LOT", "SVK", "SUI", "CES", "KAN"]
-    # voliteľná kontrola, že je to len rotácia V_TEAMS
-    # assert set(v_start) == set(V_TEAMS)
+    Rh = ratings[h]
+    Ra = ratings[a]
 
-    V = v_start.copy()
-    schedule: list[list[tuple[str, str]]] = []
+    # výsledok z pohľadu domácich (Matúšove tímy sú vždy doma, ale Elo to nerieši špeciálne)
+    if hg > ag:
+        Sh = 1.0
+        Sa = 0.0
+    else:
+        Sh = 0.0
+        Sa = 1.0
 
-    for _ in range(rounds):
-        pairings = []
-        for i in range(8):
-            pairings.append((M[i], V[i]))
-        schedule.append(pairings)
-        # posun „hore“ – prvý ide na koniec
-        V = V[1:] + V[:1]
+    Eh = 1.0 / (1.0 + 10 ** ((Ra - Rh) / 400.0))
+    Ea = 1.0 - Eh
 
-    return schedule
+    Rh_new = Rh + k * (Sh - Eh)
+    Ra_new = Ra + k * (Sa - Ea)
 
+    ratings[h] = Rh_new
+    ratings[a] = Ra_new
+    games[h] += 1
+    games[a] += 1
 
-def schedule_to_df(schedule, season_id: int) -> pd.DataFrame:
-    rows = []
-    for rnd, pairings in enumerate(schedule, start=1):
-        for home, away in pairings:
-            rows.append(
-                {
-                    "home_team": home,
-                    "away_team": away,
-                    "home_goals": 0,
-                    "away_goals": 0,
-                    "overtime": 0,
-                    "round": rnd,
-                    "season": season_id,
-                    "is_playoff": 0,
-                }
-            )
-    return pd.DataFrame(rows)
 
-def compute_elo_ratings(matches: pd.DataFrame, base_rating: float = 1500.0, k: float = 20.0) -> pd.DataFrame:
+def _elo_frame(all_teams: list[str], ratings: dict, games: dict, team_set: TeamSet) -> pd.DataFrame:
+    """Výstup compute_elo_ratings: Team, Side, Rating (na 0,1), Games."""
+    df = pd.DataFrame(
+        {
+            "Team": all_teams,
+            "Side": [team_set.side(t) for t in all_teams],
+            "Rating": [ratings[t] for t in all_teams],
+            "Games": [games[t] for t in all_teams],
+        }
+    )
+    df["Rating"] = df["Rating"].round(1)
+    return df
+
+
+@traced
+def compute_elo_ratings(
+    matches: "pd.DataFrame | MatchStore",
+    base_rating: float = 1500.0,
+    k: float = 20.0,
+    *,
+    team_set: TeamSet,
+) -> pd.DataFrame:
     """
     Vypočíta Elo ratingy pre všetky tímy na základe odohraných zápasov v sezóne.
     Ignoruje:
@@ -298,7 +703,7 @@ def compute_elo_ratings(matches: pd.DataFrame, base_rating: float = 1500.0, k: f
       - remízy (nemali by existovať, ale pre istotu)
     Výstup: DataFrame s Team, Side (M/V), Rating, Games
     """
-    all_teams = list(dict.fromkeys(M_TEAMS + V_TEAMS))  # zachová poradie
+    all_teams = list(dict.fromkeys(team_set.all))  # zachová poradie
     ratings = {t: float(base_rating) for t in all_teams}
     games = {t: 0 for t in all_teams}
 
@@ -308,81 +713,906 @@ def compute_elo_ratings(matches: pd.DataFrame, base_rating: float = 1500.0, k: f
             rows.append(
                 {
                     "Team": t,
-                    "Side": "M" if t in M_TEAMS else "V",
+                    "Side": team_set.side(t),
                     "Rating": ratings[t],
                     "Games": games[t],
                 }
             )
         return pd.DataFrame(rows)
 
-    m = matches.copy()
-    m["home_goals"] = m["home_goals"].astype(int)
-    m["away_goals"] = m["away_goals"].astype(int)
+    homes, aways, hgs, ags, _ = _match_columns(matches)
 
-    # len odohrané zápasy (nie čisté 0:0 z rozpisu)
-    played = m[(m["home_goals"] != 0) | (m["away_goals"] != 0)].copy()
-    # pre istotu ignorujeme remízy
-    played = played[played["home_goals"] != played["away_goals"]]
+    for h, a, hg, ag in zip(homes, aways, hgs, ags):
+        _elo_update(ratings, games, h, a, hg, ag, k)
 
-    if played.empty:
-        rows = []
-        for t in all_teams:
-            rows.append(
-                {
-                    "Team": t,
-                    "Side": "M" if t in M_TEAMS else "V",
-                    "Rating": ratings[t],
-                    "Games": games[t],
-                }
-            )
-        return pd.DataFrame(rows)
+    return _elo_frame(all_teams, ratings, games, team_set)
+
+
+@traced
+def compute_elo_history(
+    matches: "pd.DataFrame | MatchStore",
+    base_rating: float = 1500.0,
+    k: float = 20.0,
+    *,
+    team_set: TeamSet,
+) -> pd.DataFrame:
+    """
+    Vývoj Elo počas sezóny: rating každého tímu po každom odohranom kole.
+    Výstup (dlhý formát): Round, Team, Rating – rovnaké pravidlá ako compute_elo_ratings,
+    posledné kolo sa zhoduje s jeho výsledkom.
+    """
+    all_teams = list(dict.fromkeys(team_set.all))
+    ratings = {t: float(base_rating) for t in all_teams}
+    games = {t: 0 for t in all_teams}
+    rows: list[tuple[int, str, float]] = []
 
-    sort_cols = ["round"]
-    if "id" in played.columns:
-        sort_cols.append("id")
-    played = played.sort_values(sort_cols)
+    if not matches.empty:
+        current = None
+        for h, a, hg, ag, _, rnd in zip(*_match_columns(matches, with_round=True)):
+            if rnd != current:
+                if current is not None:
+                    rows.extend((current, t, ratings[t]) for t in all_teams)
+                current = rnd
+            _elo_update(ratings, games, h, a, hg, ag, k)
+        if current is not None:
+            rows.extend((current, t, ratings[t]) for t in all_teams)
 
-    for _, row in played.iterrows():
-        h = row["home_team"]
-        a = row["away_team"]
-        hg = int(row["home_goals"])
-        ag = int(row["away_goals"])
+    df = pd.DataFrame(rows, columns=["Round", "Team", "Rating"])
+    df["Rating"] = df["Rating"].round(1)
+    return df
 
-        if h not in ratings or a not in ratings:
-            continue
 
-        Rh = ratings[h]
-        Ra = ratings[a]
+@traced
+def compute_season_records(matches: pd.DataFrame) -> dict | None:
+    """
+    Rekordy sezóny a súhrn typov zápasov (pre sekciu Rekordy / Awards).
+      biggest_win, most_goals, most_single – zápasy (dict) s najväčším rozdielom,
+        najviac gólmi spolu a najviac gólmi jedného tímu; most_single_team/goals
+      summary – počty odohraných zápasov: games, ot, one_goal, blowout, ten_plus
+    None, ak sezóna nemá žiadne zápasy.
+    """
+    if matches.empty:
+        return None
+    df_rec = matches.copy()
+    df_rec["total_goals"] = df_rec["home_goals"] + df_rec["away_goals"]
+    df_rec["diff_abs"] = (df_rec["home_goals"] - df_rec["away_goals"]).abs()
+    df_rec["max_single"] = df_rec[["home_goals", "away_goals"]].max(axis=1)
 
-        # výsledok z pohľadu domácich (Matúšove tímy sú vždy doma, ale Elo to nerieši špeciálne)
-        if hg > ag:
-            Sh = 1.0
-            Sa = 0.0
-        else:
-            Sh = 0.0
-            Sa = 1.0
+    cols = ["id", "home_team", "away_team", "home_goals", "away_goals", "round"]
 
-        Eh = 1.0 / (1.0 + 10 ** ((Ra - Rh) / 400.0))
-        Ea = 1.0 - Eh
+    def pick(col: str) -> dict:
+        row = df_rec.sort_values(col, ascending=False).iloc[0]
+        return {c: (row[c] if isinstance(row[c], str) else int(row[c])) for c in cols}
 
-        Rh_new = Rh + k * (Sh - Eh)
-        Ra_new = Ra + k * (Sa - Ea)
+    biggest_win = pick("diff_abs")
+    most_goals = pick("total_goals")
+    most_single = pick("max_single")
+    if most_single["home_goals"] >= most_single["away_goals"]:
+        single_team, single_goals = most_single["home_team"], most_single["home_goals"]
+    else:
+        single_team, single_goals = most_single["away_team"], most_single["away_goals"]
 
-        ratings[h] = Rh_new
-        ratings[a] = Ra_new
-        games[h] += 1
-        games[a] += 1
+    if "status" in matches.columns:
+        played = matches[matches["status"] == "played"]
+    else:
+        played = matches[(matches["home_goals"] != 0) | (matches["away_goals"] != 0)]
+    hg = played["home_goals"].astype(int)
+    ag = played["away_goals"].astype(int)
+    diff = (hg - ag).abs()
 
-    rows = []
-    for t in all_teams:
-        rows.append(
-            {
-                "Team": t,
-                "Side": "M" if t in M_TEAMS else "V",
-                "Rating": ratings[t],
-                "Games": games[t],
-            }
+    return {
+        "biggest_win": biggest_win,
+        "most_goals": most_goals,
+        "most_goals_total": most_goals["home_goals"] + most_goals["away_goals"],
+        "most_single": most_single,
+        "most_single_team": single_team,
+        "most_single_goals": single_goals,
+        "summary": {
+            "games": int(len(played)),
+            "ot": int(played["overtime"].astype(bool).sum()),
+            "one_goal": int((diff == 1).sum()),
+            "blowout": int((diff >= 3).sum()),
+            "ten_plus": int(((hg >= 10) | (ag >= 10)).sum()),
+        },
+    }
+
+
+@traced
+def compute_h2h_matrix(
+    matches: "pd.DataFrame | MatchStore",
+    *,
+    team_set: TeamSet,
+    scoring: ScoringRules = DEFAULT_SCORING,
+) -> pd.DataFrame:
+    """
+    Agregácia vzájomných zápasov M × V v sezóne.
+    Výstup (dlhý formát): M, V, GP, PTS_M, PTS_V, GF_M, GA_M – jeden riadok na dvojicu.
+    Remízy (a teda aj 0:0 z rozpisu) sa ignorujú, rovnako ako v standings.
+    """
+    m_teams = list(dict.fromkeys(team_set.m))
+    v_teams = [t for t in dict.fromkeys(team_set.v) if t not in m_teams]
+    nm, nv = len(m_teams), len(v_teams)
+    home, away, hg, ag, ot = _match_arrays(matches, m_teams + v_teams, sort=False)
+
+    # M doma proti V, inak V doma proti M; zvyšok (M–M, V–V, neznáme tímy) sa vynechá
+    m_home = (home >= 0) & (home < nm) & (away >= nm)
+    v_home = (home >= nm) & (away >= 0) & (away < nm)
+    keep = (m_home | v_home) & (hg != ag)
+    m_home = m_home[keep]
+    m_idx = np.where(m_home, home[keep], away[keep])
+    v_idx = np.where(m_home, away[keep], home[keep]) - nm
+    gf_m = np.where(m_home, hg[keep], ag[keep])
+    ga_m = np.where(m_home, ag[keep], hg[keep])
+
+    cell = m_idx * nv + v_idx
+    size = nm * nv
+    return pd.DataFrame(
+        {
+            "M": [m for m in m_teams for _ in v_teams],
+            "V": v_teams * nm,
+            "GP": np.bincount(cell, minlength=size),
+            "PTS_M": _team_totals(cell, scoring.points(gf_m, ga_m, ot[keep]), size),
+            "PTS_V": _team_totals(cell, scoring.points(ga_m, gf_m, ot[keep]), size),
+            "GF_M": _team_totals(cell, gf_m, size),
+            "GA_M": _team_totals(cell, ga_m, size),
+        }
+    )
+
+
+# --- vývoj bodov tímu (Grafy) ---
+
+_PROGRESSION_EMPTY_COLUMNS = ["PTS_total", "PTS_per_game"]
+
+
+def _team_points(team_df: pd.DataFrame, team: str, scoring: ScoringRules) -> tuple[np.ndarray, ...]:
+    """(doma?, góly tímu, góly súpera, kód výsledku, body tímu) pre zápasy tímu; remíza = 0 bodov."""
+    home = team_df["home_team"].to_numpy() == team
+    hg = team_df["home_goals"].to_numpy().astype(np.int64)
+    ag = team_df["away_goals"].to_numpy().astype(np.int64)
+    ot = team_df["overtime"].to_numpy().astype(bool)
+    gf = np.where(home, hg, ag)
+    ga = np.where(home, ag, hg)
+    codes = scoring.outcome_codes(gf, ga, ot)
+    points = np.where(gf == ga, 0, scoring.table[codes])
+    return home, gf, ga, codes, points
+
+
+def _per_game(total: np.ndarray, games: np.ndarray) -> list[float]:
+    # Python round (nie np.round) – rovnaké zaokrúhlenie ako pôvodná slučka
+    return [round(p / g, 3) for p, g in zip(total.tolist(), games.tolist())]
+
+
+@traced
+def team_progression(
+    team_df: pd.DataFrame, team: str, scoring: ScoringRules = DEFAULT_SCORING
+) -> pd.DataFrame:
+    """
+    Vývoj bodov tímu zápas po zápase (Grafy, režim „Jeden tím“): súper, D/V,
+    skóre, výsledok, body a priebežné PTS_total / PTS_per_game. team_df sú
+    zápasy tímu v poradí (round, id); nevyplnené 0:0 sa rátajú ako „?“ za 0 bodov.
+    """
+    home, gf, ga, codes, points = _team_points(team_df, team, scoring)
+    games = np.arange(1, len(team_df) + 1, dtype=np.int64)
+    total = np.cumsum(points)
+    result = np.where(gf == ga, "?", np.array(OUTCOMES)[codes])
+    prog_df = pd.DataFrame(
+        {
+            "Round": team_df["round"].to_numpy().astype(np.int64),
+            "Opponent": np.where(home, team_df["away_team"].to_numpy(), team_df["home_team"].to_numpy()).tolist(),
+            "H/V": np.where(home, "D", "V").tolist(),
+            "GF": gf,
+            "GA": ga,
+            "Result": result.tolist(),
+            "Points": points,
+            "GP": games,
+            "PTS_total": total,
+            "PTS_per_game": _per_game(total, games),
+        }
+    ).sort_values("Round")
+    prog_df.reset_index(drop=True, inplace=True)
+    return prog_df
+
+
+@traced
+def points_progression(
+    team_df: pd.DataFrame, team: str, scoring: ScoringRules = DEFAULT_SCORING
+) -> pd.DataFrame:
+    """
+    PTS_total a PTS_per_game tímu po kolách (Grafy, režim „Porovnanie“), index
+    Round; remízy (aj 0:0 z rozpisu) sa vynechajú, z kola sa berie prvý zápas.
+    """
+    _, gf, ga, _, points = _team_points(team_df, team, scoring)
+    keep = gf != ga
+    if not keep.any():
+        return pd.DataFrame(columns=_PROGRESSION_EMPTY_COLUMNS, index=pd.Index([], name="Round"))
+    total = np.cumsum(points[keep])
+    games = np.arange(1, len(total) + 1, dtype=np.int64)
+    df = pd.DataFrame(
+        {
+            "Round": team_df["round"].to_numpy().astype(np.int64)[keep],
+            "PTS_total": total,
+            "PTS_per_game": _per_game(total, games),
+        }
+    )
+    return df.drop_duplicates("Round").set_index("Round")
+
+
+# --- postup a vypadnutie (istota / vyradenie, magické čísla) ---
+
+CLINCHED = "istý"
+ELIMINATED = "vyradený"
+OPEN = "otvorené"
+UNDECIDED = "?"  # prekročený limit prehľadávania (CLINCH_MAX_STEPS)
+
+# najviac krokov prehľadávania množín súperov na jedno rozhodnutie (tím, hranica, body)
+CLINCH_MAX_STEPS = 2000
+
+
+def _fixture_arrays(matches, teams: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nevyplnené zápasy z rozpisu (home, away; int32 indexy do teams, -1 = tím mimo
+    zoznamu). Zvyšok sezóny = status iný ako 'played' (bez stĺpca status: 0:0).
+    """
+    if matches.empty:
+        empty = np.zeros(0, dtype=np.int32)
+        return empty, empty
+    if isinstance(matches, MatchStore):
+        keep = np.flatnonzero((matches.flags & FLAG_PLAYED) == 0)
+        lookup = _store_lookup(matches, teams)
+        return lookup[matches.home[keep]], lookup[matches.away[keep]]
+    if "status" in matches.columns:
+        rest = matches["status"].to_numpy() != "played"
+    else:
+        rest = (matches["home_goals"].to_numpy() == 0) & (matches["away_goals"].to_numpy() == 0)
+    index = pd.Index(teams)
+    return (
+        index.get_indexer(matches["home_team"].to_numpy()[rest]).astype(np.int32),
+        index.get_indexer(matches["away_team"].to_numpy()[rest]).astype(np.int32),
+    )
+
+
+class _FlowNetwork:
+    """
+    Reziduálna sieť pre maximálny tok (Dinic): uzol 0 = zdroj, 1 = cieľ. Kapacity
+    hrán sa medzi výpočtami môžu zvyšovať (cap[e]) a augment tok len doplní;
+    snapshot / restore vracajú stav pri prehľadávaní s návratom.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.graph: list[list[int]] = [[] for _ in range(n)]
+        self.head: list[int] = []
+        self.cap: list[int] = []
+        self.flow = 0
+
+    def add_edge(self, u: int, v: int, c: int) -> int:
+        e = len(self.head)
+        self.graph[u].append(e)
+        self.head.append(v)
+        self.cap.append(c)
+        self.graph[v].append(e + 1)
+        self.head.append(u)
+        self.cap.append(0)
+        return e
+
+    def snapshot(self) -> tuple[list[int], int]:
+        return self.cap[:], self.flow
+
+    def restore(self, state: tuple[list[int], int]) -> None:
+        self.cap, self.flow = state[0][:], state[1]
+
+    def augment(self) -> int:
+        """Doplní tok na maximálny; vracia, o koľko sa zvýšil."""
+        graph, head, cap, n = self.graph, self.head, self.cap, self.n
+        limit = 1 << 62
+
+        def push(u: int, f: int, level: list[int], it: list[int]) -> int:
+            """Blokujúci tok z u (najviac f) po hranách do ďalšej úrovne."""
+            if u == 1:
+                return f
+            adj = graph[u]
+            nxt = level[u] + 1
+            done = 0
+            for p in range(it[u], len(adj)):
+                e = adj[p]
+                c = cap[e]
+                if c > 0 and level[head[e]] == nxt:
+                    pushed = push(head[e], min(f - done, c), level, it)
+                    if pushed:
+                        cap[e] = c - pushed
+                        cap[e ^ 1] += pushed
+                        done += pushed
+                        if done == f:
+                            it[u] = p  # hrana môže mať ešte kapacitu
+                            return done
+            level[u] = -1  # zablokovaný uzol už v tejto fáze nenavštevujeme
+            return done
+
+        added = 0
+        while True:
+            level = [-1] * n
+            level[0] = 0
+            queue = [0]
+            for u in queue:
+                for e in graph[u]:
+                    if cap[e] > 0 and level[head[e]] < 0:
+                        level[head[e]] = level[u] + 1
+                        queue.append(head[e])
+            if level[1] < 0:
+                self.flow += added
+                return added
+            added += push(0, limit, level, [0] * n)
+
+
+class _Race:
+    """
+    Zvyšok sezóny v rozsahu tabuľky ako tok bodov: každý zostávajúci zápas
+    rozdelí medzi súperov spread jednotiek po step bodoch (nad istý základ
+    base). Otázky „môže t skončiť v top k“ a „je t v top k isto“ sú toky
+    po zvyšných zápasoch medzi tímami; množiny súperov sa vyberajú
+    prehľadávaním s orezávaním hranicami z toku.
+    """
+
+    def __init__(self, cur: np.ndarray, games: np.ndarray, outside: np.ndarray,
+                 splits: tuple[int, int, int], max_steps: int):
+        base, step, spread = splits
+        self.n = len(cur)
+        self.step, self.spread = step, spread
+        self.games = games  # počty zostávajúcich zápasov dvojíc v rozsahu (n × n)
+        self.outside = outside  # zostávajúce zápasy so súperom mimo rozsahu
+        self.rem = games.sum(axis=1) + outside
+        self.low = (cur + base * self.rem).tolist()  # body pri samých prehrách
+        self.pairs = [
+            (int(i), int(j), spread * int(games[i, j]))
+            for i, j in zip(*np.nonzero(np.triu(games, k=1)))
+        ]
+        self.max_steps = max_steps
+
+    def _network(self, t: int, sink_cap: dict[int, int]) -> tuple[_FlowNetwork, dict[int, int]]:
+        """
+        Sieť bez uzlov pre zápasy: jednotky zápasu (i, j), i < j, sú najprv celé
+        u tímu i (zdroj → i) a hrana i → j s kapacitou zápasu ich presúva
+        súperovi; tím → cieľ s kapacitou sink_cap. Uzol 2 je pool (body, ktoré
+        t stratí). Vracia sieť a hrany tímov do cieľa.
+        """
+        net = _FlowNetwork(3 + self.n)
+        supply = [0] * self.n
+        for i, j, u in self.pairs:
+            if i != t and j != t:
+                supply[i] += u
+                net.add_edge(3 + i, 3 + j, u)
+        for i, u in enumerate(supply):
+            if u:
+                net.add_edge(0, 3 + i, u)
+        edges = {i: net.add_edge(3 + i, 1, c) for i, c in sink_cap.items()}
+        return net, edges
+
+    def _twins(self, t: int, with_t: bool) -> list[tuple]:
+        """
+        Trieda tímu: tímy s rovnakými zvyšnými súpermi (bez t, with_t – aj so
+        zápasmi proti t) sú zameniteľné, z triedy stačí skúšať najvýhodnejšie.
+        """
+        rows = np.delete(self.games, t, axis=1)
+        return [
+            tuple(rows[i].tolist()) + ((int(self.games[i, t]),) if with_t else ())
+            for i in range(self.n)
+        ]
+
+    def _potential(self, t: int) -> list[int]:
+        """Jednotky, ktoré môže tím získať v zápasoch bez t."""
+        pot = [0] * self.n
+        for i, j, u in self.pairs:
+            if i != t and j != t:
+                pot[i] += u
+                pot[j] += u
+        return pot
+
+    def can_reach(self, t: int, k: int) -> bool | None:
+        """
+        Môže t skončiť medzi prvými k (remízy v bodoch v prospech t)? t vyhrá
+        všetko; zvyšok zápasov sa musí rozdeliť tak, aby nad t bolo najviac k - 1
+        tímov – tie (množina A) body pohltia bez obmedzenia, ostatní nanajvýš
+        do bodov t. Uvoľnenie tímu zvýši tok najviac o jeho prebytok, čo oreže
+        množiny A, ktoré nemôžu stačiť.
+        """
+        target = self.low[t] + self.step * self.spread * int(self.rem[t])
+        others = [i for i in range(self.n) if i != t]
+        forced = [i for i in others if self.low[i] > target]
+        slots = k - 1 - len(forced)
+        if slots < 0:
+            return False
+        pot = self._potential(t)
+        cap = {i: min((target - self.low[i]) // self.step, pot[i]) for i in others}
+        for i in forced:
+            cap[i] = pot[i]
+        gain = {i: pot[i] - cap[i] for i in others if i not in forced and pot[i] > cap[i]}
+        if len(gain) <= slots:
+            return True
+        order = sorted(gain, key=lambda i: -gain[i])
+        twin = self._twins(t, with_t=False)
+        net, edges = self._network(t, cap)
+        total = sum(u for i, j, u in self.pairs if i != t and j != t)
+        net.augment()
+        steps = 0
+
+        def best(start: int, left: int, banned: set) -> int:
+            gains = [gain[i] for i in order[start:] if twin[i] not in banned]
+            return sum(gains[:left])
+
+        def extend(start: int, left: int, banned: set) -> bool | None:
+            nonlocal steps
+            if net.flow == total:
+                return True
+            if not left:
+                return False
+            banned = set(banned)
+            for idx in range(start, len(order)):
+                i = order[idx]
+                if twin[i] in banned:
+                    continue
+                if net.flow + best(idx, left, banned) < total:
+                    break
+                steps += 1
+                if steps > self.max_steps:
+                    return None
+                state = net.snapshot()
+                net.cap[edges[i]] += gain[i]
+                net.augment()
+                found = extend(idx + 1, left - 1, banned)
+                if found is not False:
+                    return found
+                net.restore(state)
+                # zameniteľný tím s menším prebytkom nepomôže viac
+                banned.add(twin[i])
+            return False
+
+        return extend(0, slots, set())
+
+    def _demands(self, t: int, x: int) -> tuple[dict[int, int], int]:
+        """
+        Jednotky, ktoré súper potrebuje zo zápasov v rozsahu, aby mal aspoň body t
+        (t zo zvyšku získa x jednotiek; zápasy so súpermi mimo rozsahu idú súperovi),
+        a pool – jednotky, ktoré t stratí.
+        """
+        step = self.step
+        target = self.low[t] + step * x
+        demand = {}
+        for i in range(self.n):
+            if i != t:
+                level = self.low[i] + step * self.spread * int(self.outside[i])
+                demand[i] = -((level - target) // step)  # ceil
+        return demand, self.spread * int(self.rem[t]) - x
+
+    def _rival_network(self, t: int, teams, pool: int) -> tuple[_FlowNetwork, dict[int, int]]:
+        net, edges = self._network(t, dict.fromkeys(teams, 0))
+        net.add_edge(0, 2, pool)
+        for i in teams:
+            if self.games[i, t]:
+                net.add_edge(2, 3 + i, self.spread * int(self.games[i, t]))
+        return net, edges
+
+    def rivals(self, t: int, k: int, x: int = 0) -> tuple[int, ...] | None:
+        """
+        k súperov, ktorí môžu naraz dosiahnuť aspoň body t, ak t zo zvyšku získa
+        x jednotiek (remízy v bodoch v neprospech t); () = takí nie sú, t je isto
+        v top k; None = prekročený limit prehľadávania. Dosiahnuteľné vektory
+        bodov tvoria polymatroid, takže hladné plnenie od najmenších požiadaviek
+        dá hornú hranicu (LP) počtu tímov, ktoré to zvládnu naraz; prehľadávajú
+        sa len množiny, ktoré sa dajú uspokojiť celé (podmnožina uspokojiteľnej
+        je uspokojiteľná).
+        """
+        demand, pool = self._demands(t, x)
+        pot = self._potential(t)
+        for i in demand:
+            pot[i] += min(self.spread * int(self.games[i, t]), pool)
+        sure = [i for i in demand if demand[i] <= 0]
+        if len(sure) >= k:
+            return tuple(sure[:k])
+        need = k - len(sure)
+        order = sorted((i for i in demand if 0 < demand[i] <= pot[i]), key=lambda i: demand[i])
+        if len(order) < need:
+            return ()
+
+        net, edges = self._rival_network(t, order, pool)
+        twin = self._twins(t, with_t=True)
+        chosen: list[int] = []
+        steps = 0
+
+        def enough(begin: int, banned: set, more: int) -> bool:
+            """
+            Môže z order[begin:] pribudnúť ešte more tímov? Hladné (LP) plnenie
+            od najmenších požiadaviek, končí hneď, ako je výsledok jasný; stav
+            siete sa vráti.
+            """
+            rest = [i for i in order[begin:] if twin[i] not in banned]
+            if len(rest) < more:
+                return False
+            state = net.snapshot()
+            # najprv jeden tok: more najmenších požiadaviek sa musí zmestiť do všetkého
+            for i in rest:
+                net.cap[edges[i]] = demand[i]
+            if net.augment() < sum(demand[i] for i in rest[:more]):
+                net.restore(state)
+                return False
+            net.restore(state)
+            total = Fraction(0)
+            for left, i in enumerate(rest):
+                if total >= more or total + len(rest) - left < more:
+                    break
+                net.cap[edges[i]] = demand[i]
+                total += Fraction(net.augment(), demand[i])
+            net.restore(state)
+            return total >= more
+
+        def extend(begin: int, banned: set) -> bool | None:
+            nonlocal steps
+            if len(chosen) == need:
+                return True
+            banned_before = len(banned)
+            banned = set(banned)
+            for idx in range(begin, len(order) - (need - len(chosen)) + 1):
+                i = order[idx]
+                if twin[i] in banned:
+                    continue
+                # hranica až po prvom neúspechu na tejto úrovni – hladný pokus je lacnejší
+                if len(banned) > banned_before and not enough(idx, banned, need - len(chosen)):
+                    break
+                steps += 1
+                if steps > self.max_steps:
+                    return None
+                state = net.snapshot()
+                net.cap[edges[i]] = demand[i]
+                if net.augment() == demand[i]:
+                    chosen.append(i)
+                    found = extend(idx + 1, banned)
+                    if found is not False:
+                        return found
+                    chosen.pop()
+                net.restore(state)
+                # zameniteľný tím s vyššou požiadavkou to tiež nezvládne
+                banned.add(twin[i])
+            return False
+
+        found = extend(0, set())
+        if found is None:
+            return None
+        return tuple(sure + chosen) if found else ()
+
+    def _still_rivals(self, t: int, rivals: tuple[int, ...], x: int) -> bool:
+        """Dosiahnu títo súperi naraz body t aj pri x jednotkách t? (jeden tok)"""
+        demand, pool = self._demands(t, x)
+        need = {i: demand[i] for i in rivals if demand[i] > 0}
+        net, edges = self._rival_network(t, need, pool)
+        for i, d in need.items():
+            net.cap[edges[i]] = d
+        return net.augment() == sum(need.values())
+
+    def magic(self, t: int, k: int) -> int | None:
+        """
+        Najmenej jednotiek zo zvyšku, ktoré t isto zaručia top k; None, ak nestačí
+        ani všetko vyhrať (alebo prekročený limit). Binárne hľadanie; nájdenú
+        k-ticu súperov sa oplatí posunúť čo najvyššie (jeden tok na krok), čím
+        sa preskočí viac hodnôt než polovica intervalu.
+        """
+        top = self.spread * int(self.rem[t])
+        lo, hi = 0, top + 1  # pod lo súperi sú; pri hi (top + 1 = nikdy) t je isté
+        while lo < hi:
+            mid = (lo + hi) // 2 if hi <= top else top
+            found = self.rivals(t, k, mid)
+            if found is None:
+                return None
+            if not found:
+                hi = mid
+                continue
+            lo = mid + 1
+            while lo < hi and lo <= top and self._still_rivals(t, found, lo):
+                lo += 1
+        return lo if lo <= top else None
+
+
+@traced
+def compute_clinch(
+    matches: "pd.DataFrame | MatchStore",
+    scope: str = "ALL",
+    thresholds: tuple[int, ...] = (1,),
+    *,
+    team_set: TeamSet,
+    scoring: ScoringRules = DEFAULT_SCORING,
+    max_steps: int = CLINCH_MAX_STEPS,
+) -> pd.DataFrame:
+    """
+    Istota postupu a vyradenie zo zvyšku sezóny (nevyplnené zápasy z rozpisu).
+    matches: všetky zápasy sezóny vrátane rozpisu; scope: "ALL" | "M" | "V".
+    Výstup v poradí tabuľky: Team, PTS, Zostáva, Max, Min a pre každú hranicu k
+      Top k   – istý (v každom dokončení sezóny medzi prvými k, aj pri rovnosti
+                bodov), vyradený (v žiadnom), otvorené, ? (prekročený limit),
+      Magic k – najmenej bodov zo zvyšných zápasov, ktoré top k zaručia
+                bez ohľadu na ostatné výsledky (0 = istý, prázdne = nestačí ani
+                vyhrať všetko).
+    Presné pre bodovanie s rovnakým súčtom bodov v každom zápase a ľubovoľným
+    delením (3/2/1/0), inak ValueError. Rovnosť bodov sa rieši v neprospech tímu.
+    """
+    splits = scoring.splits
+    if splits is None:
+        raise ValueError(f"Bodovanie {scoring.label} sa nedá modelovať ako tok bodov.")
+    base, step, spread = splits
+
+    table = compute_standings(matches, scope, team_set=team_set, scoring=scoring)
+    teams = list(dict.fromkeys(table["Team"]))
+    n = len(teams)
+    home, away = _fixture_arrays(matches, teams)
+    inside = (home >= 0) & (away >= 0) & (home != away)
+    games = np.zeros((n, n), dtype=np.int64)
+    np.add.at(games, (home[inside], away[inside]), 1)
+    games += games.T
+    outside = (
+        np.bincount(home[(home >= 0) & (away < 0)], minlength=n)
+        + np.bincount(away[(away >= 0) & (home < 0)], minlength=n)
+    )
+    row = pd.Index(teams).get_indexer(table["Team"])
+    cur = table.groupby("Team", sort=False)["PTS"].first().reindex(teams).to_numpy(dtype=np.int64)
+    race = _Race(cur, games, outside, splits, max_steps)
+    rem = race.rem
+    top = base + step * spread
+
+    out = pd.DataFrame(
+        {
+            "Team": table["Team"].to_numpy(),
+            "PTS": table["PTS"].to_numpy(dtype=np.int64),
+            "Zostáva": rem[row],
+            "Max": (cur + top * rem)[row],
+            "Min": (cur + base * rem)[row],
+        },
+        index=table.index,
+    )
+    for k in thresholds:
+        status, magic = [], []
+        for t in range(n):
+            reach = race.can_reach(t, k)
+            rivals = race.rivals(t, k) if reach is not False else None
+            units = None
+            if reach is False:
+                status.append(ELIMINATED)
+            elif rivals == ():
+                status.append(CLINCHED)
+                units = 0
+            else:
+                status.append(OPEN if reach and rivals else UNDECIDED)
+                units = race.magic(t, k) if rivals else None
+            magic.append(None if units is None else base * int(rem[t]) + step * units)
+        out[f"Top {k}"] = [status[t] for t in row]
+        out[f"Magic {k}"] = pd.array([magic[t] for t in row], dtype="Int64")
+    return out
+
+
+# --- scenáre (čo ak) ---
+
+
+class ScenarioResult(NamedTuple):
+    standings: pd.DataFrame
+    elo: pd.DataFrame
+
+
+def _scenario_overrides(overrides: dict | None) -> dict[int, tuple[int, int, bool]]:
+    """{id: (hg, ag[, ot])} -> {int id: (int, int, bool)}; OT predvolene False."""
+    return {
+        int(mid): (int(v[0]), int(v[1]), bool(v[2]) if len(v) > 2 else False)
+        for mid, v in (overrides or {}).items()
+    }
+
+
+class Scenario:
+    """
+    Hypotetické výsledky nad sezónou bez zápisu do DB (panel „čo ak“).
+    Základ sa počíta raz: počty výsledkov a góly tímov (ako compute_standings)
+    a Elo stav pred každým kolom. apply() len odpočíta príspevky zmenených
+    zápasov a pripočíta nové – O(počet zmien) – a Elo prepočíta od
+    najskoršieho kola, v ktorom sa zmenil víťaz. Výsledok je bunka po bunke
+    rovnaký ako compute_standings / compute_elo_ratings nad upravenou sezónou
+    (to_frame).
+      overrides – {id zápasu: (góly domácich, góly hostí, OT)}; 0:0 = nevyplnený
+      additions – {nové id: riadok} s home_team, away_team, round, home_goals,
+                  away_goals a voliteľne overtime (tvar insert_match)
+    matches: všetky zápasy jednej sezóny vrátane rozpisu (DataFrame / MatchStore).
+    """
+
+    def __init__(
+        self,
+        matches: "pd.DataFrame | MatchStore",
+        *,
+        team_set: TeamSet,
+        scoring: ScoringRules = DEFAULT_SCORING,
+        base_rating: float = 1500.0,
+        k: float = 20.0,
+    ):
+        store = (
+            matches if isinstance(matches, MatchStore)
+            else MatchStore.from_frame(matches, team_set.all)
         )
-    df = pd.DataFrame(rows)
-    df["Rating"] = df["Rating"].round(1)
-    return df
+        self.store = store
+        self.team_set = team_set
+        self.scoring = scoring
+        self.k = k
+        self.teams = list(dict.fromkeys(team_set.all))
+
+        # zápasy v poradí (round, id) – poradie Elo aktualizácií
+        order = np.lexsort((store.id, store.round))
+        lookup = _store_lookup(store, self.teams)
+        self._home = lookup[store.home[order]]
+        self._away = lookup[store.away[order]]
+        self._hg = store.home_goals[order].astype(np.int64)
+        self._ag = store.away_goals[order].astype(np.int64)
+        self._ot = (store.flags[order] & FLAG_OT).astype(bool)
+        self._played = (store.flags[order] & FLAG_PLAYED).astype(bool)
+        ids = store.id[order].astype(np.int64).tolist()
+        self._pos = {mid: p for p, mid in enumerate(ids)}
+        self._rows = list(zip(
+            store.round[order].astype(np.int64).tolist(), ids,
+            store.team_names(store.home[order]), store.team_names(store.away[order]),
+            self._hg.tolist(), self._ag.tolist(), self._played.tolist(),
+        ))
+
+        self._totals = self._tally(self._home, self._away, self._hg, self._ag, self._ot, self._played)
+
+        # Elo: stav (ratings, games) pred každým kolom a na konci sezóny
+        ratings = {t: float(base_rating) for t in self.teams}
+        games = {t: 0 for t in self.teams}
+        self._round_ids: list[int] = []
+        self._round_start: list[int] = []
+        self._checkpoints: list[tuple[dict, dict]] = []
+        for p, (rnd, _, h, a, hg, ag, played) in enumerate(self._rows):
+            if not self._round_ids or rnd != self._round_ids[-1]:
+                self._round_ids.append(rnd)
+                self._round_start.append(p)
+                self._checkpoints.append((dict(ratings), dict(games)))
+            if played:
+                _elo_update(ratings, games, h, a, hg, ag, k)
+        self._round_start.append(len(self._rows))
+        self._checkpoints.append((ratings, games))
+        self._elo = _elo_frame(self.teams, ratings, games, team_set)
+
+    def _tally(self, home, away, hg, ag, ot, played) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Počty výsledkov (k × 4), strelené a inkasované góly tímov za dané zápasy."""
+        team = np.column_stack((home, away)).ravel()
+        gf = np.column_stack((hg, ag)).ravel()
+        ga = np.column_stack((ag, hg)).ravel()
+        ots = np.repeat(ot, 2)
+        keep = np.repeat(played, 2) & (team >= 0) & (gf != ga)
+        team, gf, ga, ots = team[keep], gf[keep], ga[keep], ots[keep]
+        n = len(self.teams)
+        codes = self.scoring.outcome_codes(gf, ga, ots)
+        counts = np.bincount(team * 4 + codes, minlength=4 * n).reshape(n, 4)
+        return counts, _team_totals(team, gf, n), _team_totals(team, ga, n)
+
+    def _edits(self, overrides: dict, additions: dict) -> tuple[list[int], list[tuple], int | None]:
+        """
+        Kontrola úprav: pozície prepísaných zápasov, nové zápasy ako riadky
+        (round, id, home, away, hg, ag, played, ot) a najskoršie kolo, v ktorom
+        sa mení víťaz niektorého zápasu (od neho sa prepočíta Elo; None = nikde).
+        """
+        positions, added = [], []
+        first_round = None
+        for mid, (hg, ag, _) in overrides.items():
+            p = self._pos.get(mid)
+            if p is None:
+                raise ValueError(f"Zápas {mid} v sezóne nie je.")
+            if hg == ag and hg:
+                raise ValueError(f"Zápas {mid}: remízy nie sú povolené.")
+            positions.append(p)
+            old = np.sign(self._hg[p] - self._ag[p]) if self._played[p] else 0
+            if np.sign(hg - ag) != old:
+                rnd = self._rows[p][0]
+                first_round = rnd if first_round is None else min(first_round, rnd)
+        for mid, row in additions.items():
+            mid = int(mid)
+            if mid in self._pos:
+                raise ValueError(f"Zápas {mid} už v sezóne je.")
+            for team in (row["home_team"], row["away_team"]):
+                if team not in self.teams:
+                    raise ValueError(f"Zápas {mid}: neznámy tím {team}.")
+            hg, ag = int(row["home_goals"]), int(row["away_goals"])
+            if hg == ag and hg:
+                raise ValueError(f"Zápas {mid}: remízy nie sú povolené.")
+            rnd = int(row["round"])
+            played = hg != ag
+            added.append((rnd, mid, row["home_team"], row["away_team"], hg, ag, played,
+                          bool(row.get("overtime", False))))
+            if played:
+                first_round = rnd if first_round is None else min(first_round, rnd)
+        return positions, added, first_round
+
+    def _replay(self, overrides: dict, added: list[tuple], first_round: int) -> tuple[dict, dict]:
+        """Elo od stavu pred first_round po koniec sezóny s úpravami (poradie (round, id))."""
+        i = bisect_left(self._round_ids, first_round)
+        ratings, games = (dict(d) for d in self._checkpoints[i])
+        rows = self._rows[self._round_start[i]:]
+        if overrides:
+            rows = [
+                r if r[1] not in overrides
+                else (r[0], r[1], r[2], r[3], overrides[r[1]][0], overrides[r[1]][1],
+                      overrides[r[1]][0] != overrides[r[1]][1])
+                for r in rows
+            ]
+        if added:
+            rows = sorted(rows + [r[:7] for r in added if r[0] >= first_round])
+        for _, _, h, a, hg, ag, played in rows:
+            if played:
+                _elo_update(ratings, games, h, a, hg, ag, self.k)
+        return ratings, games
+
+    @traced
+    def apply(
+        self, overrides: dict | None = None, additions: dict | None = None, scope: str = "ALL"
+    ) -> ScenarioResult:
+        """Tabuľka (scope: "ALL" | "M" | "V", ako compute_standings) a Elo po úpravách."""
+        overrides = _scenario_overrides(overrides)
+        additions = additions or {}
+        positions, added, first_round = self._edits(overrides, additions)
+
+        counts, gf, ga = self._totals
+        if positions or added:
+            pos = np.asarray(positions, dtype=np.int64)
+            new = [overrides[self._rows[p][1]] for p in positions]
+            old_c, old_gf, old_ga = self._tally(
+                self._home[pos], self._away[pos], self._hg[pos], self._ag[pos], self._ot[pos], self._played[pos]
+            )
+            index = pd.Index(self.teams)
+            new_c, new_gf, new_ga = self._tally(
+                np.concatenate((self._home[pos], index.get_indexer([r[2] for r in added]))),
+                np.concatenate((self._away[pos], index.get_indexer([r[3] for r in added]))),
+                np.array([v[0] for v in new] + [r[4] for r in added], dtype=np.int64),
+                np.array([v[1] for v in new] + [r[5] for r in added], dtype=np.int64),
+                np.array([v[2] for v in new] + [r[7] for r in added], dtype=bool),
+                np.array([v[0] != v[1] for v in new] + [r[6] for r in added], dtype=bool),
+            )
+            counts = counts - old_c + new_c
+            gf = gf - old_gf + new_gf
+            ga = ga - old_ga + new_ga
+
+        if scope == "M":
+            teams = self.team_set.m
+        elif scope == "V":
+            teams = self.team_set.v
+        else:
+            teams = self.team_set.all
+        unique = list(dict.fromkeys(teams))
+        row = pd.Index(self.teams).get_indexer(unique)
+        cols = _standings_columns(unique, teams, counts[row], gf[row], ga[row], self.scoring)
+        standings = _standings_table(cols, scope, self.team_set)
+
+        if first_round is None:
+            elo = self._elo
+        else:
+            ratings, games = self._replay(overrides, added, first_round)
+            elo = _elo_frame(self.teams, ratings, games, self.team_set)
+        return ScenarioResult(standings, elo)
+
+    def to_frame(self, overrides: dict | None = None, additions: dict | None = None) -> pd.DataFrame:
+        """Upravená sezóna v tvare fetch_matches (zobrazenie, kontrola plným výpočtom)."""
+        df = self.store.to_frame()
+        for mid, (hg, ag, ot) in _scenario_overrides(overrides).items():
+            sel = df["id"].to_numpy() == mid
+            df.loc[sel, ["home_goals", "away_goals", "overtime"]] = [hg, ag, int(ot)]
+            df.loc[sel, "status"] = match_status({"home_goals": hg, "away_goals": ag})
+        if additions:
+            season = int(df["season"].iloc[0]) if len(df) else 0
+            extra = pd.DataFrame(
+                [
+                    {
+                        "id": int(mid),
+                        "home_team": row["home_team"],
+                        "away_team": row["away_team"],
+                        "home_goals": int(row["home_goals"]),
+                        "away_goals": int(row["away_goals"]),
+                        "overtime": int(bool(row.get("overtime", False))),
+                        "round": int(row["round"]),
+                        "season": season,
+                        "is_playoff": 0,
+                        "status": match_status(row),
+                    }
+                    for mid, row in additions.items()
+                ],
+                columns=df.columns,
+            )
+            df = pd.concat((df, extra), ignore_index=True)
+        return df
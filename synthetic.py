@@ -0,0 +1,107 @@
+# synthetic.py
+#
+# Syntetická databáza pre záťažové testy a merania: ligy, sezóny s rozpisom
+# (schedule.league_schedule) a náhodnými výsledkami bez remíz. Staršie
+# sezóny sa uzavrú (snapshoty), posledná ostane otvorená s odohranou len
+# časťou kôl – v zvyšku sa dajú zapisovať výsledky ako v skutočnej lige.
+#
+# Použitie:
+#   python synthetic.py --out synth.db
+#   python synthetic.py --out synth.db --leagues 3 --seasons 10 --played-rounds 20
+
+import argparse
+import os
+
+import numpy as np
+
+from config import M_TEAMS, V_TEAMS
+from db import (
+    DEFAULT_LEAGUE_ID,
+    create_league,
+    ensure_schema,
+    get_conn,
+    get_or_create_season,
+    insert_match,
+)
+from schedule import league_schedule
+from snapshots import close_season
+from stats import load_team_set
+
+
+def random_result(rng: np.random.Generator) -> tuple[int, int, int]:
+    """(góly domáci, góly hostia, OT) – remíza sa rozhodne v predĺžení o gól."""
+    hg, ag = (int(g) for g in rng.integers(0, 7, size=2))
+    if hg != ag:
+        return hg, ag, 0
+    if rng.random() < 0.5:
+        return hg + 1, ag, 1
+    return hg, ag + 1, 1
+
+
+def build_synthetic_db(
+    path: str,
+    leagues: int = 1,
+    seasons: int = 4,
+    rounds: int = 32,
+    played_rounds: int | None = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Vytvorí novú DB na path (existujúci súbor prepíše) a vráti prehľad
+    {"leagues": [...], "open_seasons": [...], "matches": počet}.
+    played_rounds = počet odohraných kôl otvorenej sezóny (predvolene polovica).
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    if played_rounds is None:
+        played_rounds = rounds // 2
+    rng = np.random.default_rng(seed)
+
+    conn = get_conn(path)
+    # syntetické dáta – trvanlivosť netreba, plnenie bez fsync po každom zápase
+    conn.execute("PRAGMA synchronous = OFF;")
+    ensure_schema(conn)
+
+    league_ids = [DEFAULT_LEAGUE_ID]
+    for n in range(2, leagues + 1):
+        league_ids.append(create_league(conn, f"Syntetická liga {n}", M_TEAMS, V_TEAMS))
+
+    open_seasons, total = [], 0
+    for lid in league_ids:
+        team_set = load_team_set(conn, lid)
+        for n in range(1, seasons + 1):
+            sid = get_or_create_season(conn, f"Sezóna {n}", lid)
+            last = n == seasons
+            schedule = league_schedule(team_set, rounds).to_frame(sid)
+            for row in schedule.to_dict(orient="records"):
+                if not last or row["round"] <= played_rounds:
+                    row["home_goals"], row["away_goals"], row["overtime"] = random_result(rng)
+                insert_match(conn, row)
+                total += 1
+            if last:
+                open_seasons.append(sid)
+            else:
+                close_season(conn, sid)
+    conn.close()
+    return {"leagues": league_ids, "open_seasons": open_seasons, "matches": total}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Syntetická DB ligy pre záťažové testy.")
+    parser.add_argument("--out", required=True, help="cesta k novej SQLite databáze")
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--seasons", type=int, default=4, help="sezón na ligu (posledná ostane otvorená)")
+    parser.add_argument("--rounds", type=int, default=32)
+    parser.add_argument("--played-rounds", type=int, default=None, help="odohrané kolá otvorenej sezóny")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    info = build_synthetic_db(
+        args.out, args.leagues, args.seasons, args.rounds, args.played_rounds, args.seed
+    )
+    print(f"{args.out}: {info['matches']} zápasov, ligy {info['leagues']}, otvorené sezóny {info['open_seasons']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# API a služba otvárajú DB len na čítanie – nad nemigrovanou DB (pribalená
+# hockey_league_fixed.db) musia odpovedať, nie vracať 500.
+
+import asyncio
+import os
+import shutil
+
+from api import ApiServer
+from config import DB_DEFAULT
+from service import LeagueService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_api_serves_unmigrated_db(tmp_path):
+    path = str(tmp_path / DB_DEFAULT)
+    shutil.copy(os.path.join(ROOT, DB_DEFAULT), path)
+    server = ApiServer(("127.0.0.1", 0), path)
+    try:
+        version, status, body = server.respond("/leagues")
+    finally:
+        server.server_close()
+    assert (version, status) == (0, 200)
+    assert b"name" in body
+
+
+def test_service_serves_unmigrated_db(tmp_path):
+    path = str(tmp_path / DB_DEFAULT)
+    shutil.copy(os.path.join(ROOT, DB_DEFAULT), path)
+    service = LeagueService(path, workers=1)
+    try:
+        version, status, _ = asyncio.run(service.get("/leagues"))
+    finally:
+        service.close()
+    assert (version, status) == (0, 200)
@@ -0,0 +1,61 @@
+# Archivácia sezón: zlyhanie medzi výmenou archívu a commitom v hlavnej DB
+# nesmie spôsobiť dvojité započítanie zápasov v čítaniach cez celú ligu.
+
+import pytest
+
+import archive
+import db
+from synthetic import build_synthetic_db
+
+
+@pytest.fixture
+def league_db(tmp_path):
+    path = str(tmp_path / "liga.db")
+    build_synthetic_db(path, seasons=3, rounds=8, played_rounds=4)
+    return path
+
+
+def _league_reads(path: str) -> tuple[int, int, int]:
+    conn = db.get_conn(path)
+    try:
+        return (
+            len(db.fetch_matches(conn, league_id=db.DEFAULT_LEAGUE_ID)),
+            len(db.played_matches(conn)),
+            sum(len(rows) for _, rows in db.iter_matches(conn)),
+        )
+    finally:
+        conn.close()
+
+
+def test_failure_after_archive_swap_keeps_reads_consistent(league_db, monkeypatch):
+    before = _league_reads(league_db)
+    archive.archive_seasons(league_db, [1])  # archív už existuje a je pripojený
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("zlyhanie medzi krokmi")
+
+    monkeypatch.setattr(archive, "_mark_archived", fail)
+    with pytest.raises(RuntimeError):
+        archive.archive_seasons(league_db, [2])
+
+    # archív už má riadky sezóny 1, hlavná DB tiež – čítajú sa len raz
+    conn = db.get_conn(league_db)
+    assert conn.execute("SELECT archived FROM seasons WHERE id = 2;").fetchone()[0] == 0
+    assert db.attach_archive(conn)
+    assert conn.execute("SELECT COUNT(*) FROM archive.matches WHERE season = 2;").fetchone()[0] > 0
+    conn.close()
+    assert _league_reads(league_db) == before
+
+    # opakovaná archivácia presun dokončí
+    monkeypatch.undo()
+    assert archive.archive_seasons(league_db, [2]) > 0
+    assert _league_reads(league_db) == before
+    conn = db.get_conn(league_db)
+    assert conn.execute("SELECT COUNT(*) FROM main.matches WHERE season = 2;").fetchone()[0] == 0
+    conn.close()
+
+
+def test_archived_season_read_from_archive_only(league_db):
+    before = _league_reads(league_db)
+    archive.archive_seasons(league_db, [1, 2])
+    assert _league_reads(league_db) == before
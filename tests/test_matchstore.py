@@ -0,0 +1,30 @@
+# MatchStore: hodnoty mimo úzkych typov polí musia skončiť chybou, nie tichým pretečením.
+
+import pandas as pd
+import pytest
+
+from stats import MatchStore
+
+
+def _frame(**overrides) -> pd.DataFrame:
+    row = dict(id=1, home_team="FIN", away_team="KAN", home_goals=3, away_goals=1,
+               overtime=0, round=1, season=1, is_playoff=0, status="played")
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+def test_from_frame_roundtrip():
+    store = MatchStore.from_frame(_frame(), ["FIN", "KAN"])
+    assert store.to_frame().iloc[0][["home_team", "home_goals", "round"]].tolist() == ["FIN", 3, 1]
+
+
+@pytest.mark.parametrize("column, value", [("home_goals", 256), ("away_goals", -1), ("round", 70000)])
+def test_from_frame_rejects_out_of_range(column, value):
+    with pytest.raises(ValueError, match=column):
+        MatchStore.from_frame(_frame(**{column: value}), ["FIN", "KAN"])
+
+
+def test_from_frame_rejects_team_code_collision():
+    teams = [f"T{i}" for i in range(255)]
+    with pytest.raises(ValueError):
+        MatchStore.from_frame(_frame(home_team="T0", away_team="T254"), teams)
@@ -0,0 +1,34 @@
+# Obsadenosť kôl: zápis iného procesu medzi vlastným zápisom a mark_written
+# sa nesmie potichu prevziať – bitmapy by jeho zápas nevideli.
+
+import db
+from stats import load_team_set
+from validation import RoundOccupancy, validate_match
+
+
+def _row(home: str, away: str, season: int, round_no: int) -> dict:
+    return dict(home_team=home, away_team=away, home_goals=3, away_goals=1,
+                overtime=0, round=round_no, season=season, is_playoff=0)
+
+
+def test_foreign_write_before_mark_written_resets_occupancy(tmp_path):
+    path = str(tmp_path / "liga.db")
+    conn = db.get_conn(path)
+    db.ensure_schema(conn)
+    season = db.get_or_create_season(conn, "2026", db.DEFAULT_LEAGUE_ID)
+    team_set = load_team_set(conn, db.DEFAULT_LEAGUE_ID)
+    occ = RoundOccupancy()
+
+    row = _row("FIN", "KAN", season, 1)
+    assert validate_match(conn, occ, row, team_set=team_set) is None
+    row["id"] = db.insert_match(conn, row)
+    # iný proces zapíše zápas, kým ten náš ešte nie je premietnutý
+    other = db.get_conn(path)
+    db.insert_match(other, _row("SWE", "CES", season, 2))
+    other.close()
+    occ.add(row)
+    occ.mark_written(conn, 1)
+
+    err = validate_match(conn, occ, _row("SWE", "SVK", season, 2), team_set=team_set)
+    assert err is not None and "SWE" in err
+    conn.close()
@@ -0,0 +1,32 @@
+# Režim náhľadu otvára DB len na čítanie – nemigrovaná DB (bez change_seq,
+# napr. pribalená hockey_league_fixed.db) sa musí pri štarte raz zmigrovať.
+
+import os
+import shutil
+import sys
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import db
+from config import DB_DEFAULT
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_viewer_starts_on_unmigrated_db(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(ROOT, DB_DEFAULT), tmp_path / DB_DEFAULT)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", [sys.argv[0], "--viewer"])
+    st.cache_resource.clear()
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    at.run()
+
+    assert not at.exception
+    assert "Zadávanie zápasov" not in at.sidebar.radio[0].options
+    conn = db.get_readonly_conn(DB_DEFAULT)
+    try:
+        assert db.data_version(conn) == 0
+    finally:
+        conn.close()
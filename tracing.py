@@ -0,0 +1,254 @@
+# tracing.py
+#
+# Ľahké meranie horúcich ciest jedného prekreslenia (rerunu): funkcie db.py a
+# hlavné výpočty stats.py sú obalené @traced, ďalšie bloky (export ligy,
+# tvorba Excelu) sa merajú cez `with span(...)`. Každý úsek (span) má čas,
+# hĺbku vnorenia, počet vrátených riadkov a objem dát (bajty DataFrame /
+# poľa / súboru).
+#
+# Meranie je zapnuté len vo vlákne, ktoré zavolalo begin(True) – app.py to
+# robí podľa prepínača ladiaceho panela. Kým nemeria žiadne vlákno, stojí
+# obalená funkcia jednu kontrolu globálneho počítadla, takže vypnuté meranie
+# je takmer zadarmo; vlákna na pozadí (warm-up, API) sa nemerajú nikdy.
+#
+# Pomalé dotazy: najvonkajší úsek s SQLite spojením (prvý argument) zachytí
+# cez set_trace_callback všetky vykonané SQL príkazy (už s dosadenými
+# parametrami). Spojenie z get_conn_cached zdieľajú všetky sedenia, preto
+# callback (_dispatch_sql) zapisuje len do trace vlákna, ktoré príkaz
+# vykonalo, a zo spojenia sa odoberie až po skončení posledného zachytávania
+# (počítadlo na spojenie). Ak úsek trvá aspoň SLOW_QUERY_MS, príkazy sa zalogujú
+# (logger "hokej.slow_query") spolu s EXPLAIN QUERY PLAN a plán sa uloží aj
+# do úseku pre panel.
+#
+# Generátory (db.iter_matches) sa neobaľujú – čas by zahŕňal aj spotrebiteľa.
+
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+# prah pre log pomalých dotazov (milisekundy)
+SLOW_QUERY_MS = 50.0
+
+log = logging.getLogger("hokej.slow_query")
+
+
+class _State(threading.local):
+    # predvolená hodnota na triede – čítanie bez výnimky aj vo vlákne bez trace
+    trace: "Trace | None" = None
+
+
+_local = _State()
+# počet vlákien s aktívnym trace – kým je 0, obalená funkcia nečíta ani _local
+_active = 0
+_active_lock = threading.Lock()
+
+# spojenie (id) -> počet vlákien, ktoré na ňom práve zachytávajú SQL
+_captures: dict[int, int] = {}
+_captures_lock = threading.Lock()
+
+# príkazy, pre ktoré má zmysel EXPLAIN QUERY PLAN
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class Span:
+    __slots__ = ("name", "depth", "start_ms", "ms", "rows", "nbytes", "sql", "plans")
+
+    def __init__(self, name: str, depth: int, start_ms: float):
+        self.name = name
+        self.depth = depth
+        self.start_ms = start_ms
+        self.ms = 0.0
+        self.rows: int | None = None
+        self.nbytes: int | None = None
+        self.sql: list[str] = []
+        self.plans: list[tuple[str, str]] = []  # (SQL, EXPLAIN QUERY PLAN) pomalého úseku
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Trace:
+    """Úseky jedného rerunu v poradí, v akom začali."""
+
+    def __init__(self, label: str = "rerun", slow_ms: float = SLOW_QUERY_MS):
+        self.label = label
+        self.slow_ms = slow_ms
+        self.spans: list[Span] = []
+        self._t0 = time.perf_counter()
+        self._depth = 0
+        self._sql: list[str] | None = None
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def _open(self, name: str) -> Span:
+        s = Span(name, self._depth, (time.perf_counter() - self._t0) * 1000)
+        self.spans.append(s)
+        self._depth += 1
+        return s
+
+    def _close(self, s: Span, t0: float) -> None:
+        s.ms = (time.perf_counter() - t0) * 1000
+        self._depth -= 1
+
+    def call(self, name: str, fn: Callable, args: tuple, kwargs: dict):
+        conn = args[0] if args and isinstance(args[0], sqlite3.Connection) else None
+        capture = conn is not None and self._sql is None
+        if capture:
+            self._sql = []
+            _capture(conn, True)
+        s = self._open(name)
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            self._close(s, t0)
+            if capture:
+                _capture(conn, False)
+                s.sql, self._sql = self._sql, None
+        s.rows, s.nbytes = measure(result)
+        if capture and s.ms >= self.slow_ms:
+            self._log_slow(conn, s)
+        return result
+
+    def _log_slow(self, conn: sqlite3.Connection, s: Span) -> None:
+        for sql in s.sql:
+            if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+                continue
+            try:
+                rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                plan = "\n".join(str(r[-1]) for r in rows)
+            except sqlite3.Error as exc:
+                plan = f"(plán nedostupný: {exc})"
+            s.plans.append((sql, plan))
+            log.warning("pomalý dotaz v %s (%.1f ms): %s\n%s", s.name, s.ms, sql, plan)
+
+    def frame(self) -> pd.DataFrame:
+        """Úseky ako tabuľka pre panel (názov odsadený podľa vnorenia)."""
+        return pd.DataFrame(
+            {
+                "úsek": ["  " * s.depth + s.name for s in self.spans],
+                "začiatok [ms]": [round(s.start_ms, 1) for s in self.spans],
+                "trvanie [ms]": [round(s.ms, 2) for s in self.spans],
+                "riadky": pd.array([s.rows for s in self.spans], dtype="Int64"),
+                "bajty": pd.array([s.nbytes for s in self.spans], dtype="Int64"),
+                "SQL": [len(s.sql) for s in self.spans],
+            }
+        )
+
+    def slow_spans(self) -> list[Span]:
+        return [s for s in self.spans if s.plans]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "label": self.label,
+                "total_ms": round(self.total_ms, 3),
+                "slow_query_ms": self.slow_ms,
+                "spans": [s.as_dict() for s in self.spans],
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def _dispatch_sql(sql: str) -> None:
+    """Trace callback spojenia: príkaz patrí trace vlákna, ktoré ho vykonalo."""
+    trace = _local.trace
+    if trace is not None and trace._sql is not None:
+        trace._sql.append(sql)
+
+
+def _capture(conn: sqlite3.Connection, on: bool) -> None:
+    """Zapne / vypne zachytávanie SQL na spojení pre aktuálne vlákno."""
+    with _captures_lock:
+        key = id(conn)
+        n = _captures.get(key, 0) + (1 if on else -1)
+        if on and n == 1:
+            conn.set_trace_callback(_dispatch_sql)
+        elif not on and n == 0:
+            conn.set_trace_callback(None)
+        if n:
+            _captures[key] = n
+        else:
+            _captures.pop(key, None)
+
+
+def measure(result: object) -> tuple[int | None, int | None]:
+    """(počet riadkov, bajty) výsledku – len lacné odhady bez hlbokého prechodu."""
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=True).sum())
+    if isinstance(result, np.ndarray):
+        return len(result), int(result.nbytes)
+    if isinstance(result, (bytes, bytearray)):
+        return None, len(result)
+    if isinstance(result, (list, tuple, dict)):
+        return len(result), None
+    return None, None
+
+
+def _set(trace: Trace | None) -> None:
+    global _active
+    with _active_lock:
+        _active += (trace is not None) - (_local.trace is not None)
+        _local.trace = trace
+
+
+def begin(enabled: bool, label: str = "rerun") -> Trace | None:
+    """Začne nový trace v aktuálnom vlákne (alebo zruší starý, ak enabled=False)."""
+    _set(Trace(label) if enabled else None)
+    return _local.trace
+
+
+def end() -> Trace | None:
+    """Ukončí meranie v aktuálnom vlákne a vráti zozbierané úseky."""
+    trace = _local.trace
+    _set(None)
+    return trace
+
+
+def current() -> Trace | None:
+    return _local.trace
+
+
+def traced(fn: Callable) -> Callable:
+    """Dekorátor: pri aktívnom trace zmeria volanie ako úsek modul.funkcia."""
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return fn(*args, **kwargs)
+        trace = _local.trace
+        if trace is None:
+            return fn(*args, **kwargs)
+        return trace.call(name, fn, args, kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span | None]:
+    """
+    Meranie ľubovoľného bloku. Vráti Span (alebo None, ak sa nemeria), do
+    ktorého môže volajúci doplniť rows / nbytes.
+    """
+    trace = _local.trace
+    if trace is None:
+        yield None
+        return
+    s = trace._open(name)
+    t0 = time.perf_counter()
+    try:
+        yield s
+    finally:
+        trace._close(s, t0)
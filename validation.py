@@ -0,0 +1,244 @@
+# validation.py
+#
+# Validácia zápasov pred zápisom: orientácia M doma / V vonku, zákaz remíz
+# a každý tím najviac raz v (sezóna, kolo). Obsadenosť kôl sa drží ako
+# bitmapa tímov na (sezóna, kolo), takže kontrola konfliktu je O(1)
+# a nevyžaduje načítanie celej sezóny. Strany tímov (M/V) sú z tímov
+# ligy (stats.load_team_set); obsadenosť je podľa sezóny, ktorá patrí
+# práve jednej lige.
+
+import sqlite3
+import threading
+
+from db import data_version
+from stats import TeamSet
+
+ERR_SAME_TEAM = "Domáci a hostia nemôžu byť ten istý tím."
+ERR_HOME_SIDE = "Domáci tím musí byť z M skupiny."
+ERR_AWAY_SIDE = "Hosťujúci tím musí byť z V skupiny."
+ERR_DRAW_INSERT = "Remízy nie sú povolené. Uprav výsledok alebo označ OT a uprav góly."
+ERR_DRAW_EDIT = "Remízy nie sú povolené. Uprav góly."
+
+
+def conflict_message(round_no: int, team: str, other: dict) -> str:
+    return (
+        f"V kole {round_no} už hrá tím {team} "
+        f"({other['home_team']} {other['home_goals']} : "
+        f"{other['away_goals']} {other['away_team']})."
+    )
+
+
+def draw_message_round(row: dict) -> str:
+    return f"Zápas {row['home_team']} – {row['away_team']}: remíza nie je povolená."
+
+
+class RoundOccupancy:
+    """
+    Obsadenosť kôl: (sezóna, kolo) -> bitmapa tímov, ktoré v kole už hrajú,
+    plus (sezóna, kolo, tím) -> zápasy (len kvôli podrobnej chybovej hláške).
+    Sezóna sa načíta jedným dotazom pri prvom použití a potom sa udržiava
+    cez add()/remove() pri zápisoch. Ak sa dáta zmenia mimo tohto objektu
+    (iný proces), zmena data_version spôsobí opätovné načítanie.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bits: dict[tuple[int, int], int] = {}
+        self._slots: dict[tuple[int, int, str], list[dict]] = {}
+        self._seasons: set[int] = set()
+        self._team_bit: dict[str, int] = {}
+        self.version: int | None = None
+
+    def bit(self, team: str) -> int:
+        """Bit tímu v bitmape kola (pridelí sa pri prvom výskyte kódu)."""
+        with self._lock:
+            b = self._team_bit.get(team)
+            if b is None:
+                b = self._team_bit[team] = 1 << len(self._team_bit)
+            return b
+
+    def _reset(self) -> None:
+        self._bits.clear()
+        self._slots.clear()
+        self._seasons.clear()
+
+    def sync(self, conn: sqlite3.Connection) -> None:
+        """Zahodí stav, ak sa dáta v DB zmenili mimo add()/remove()."""
+        with self._lock:
+            version = data_version(conn)
+            if version != self.version:
+                self._reset()
+                self.version = version
+
+    def mark_written(self, conn: sqlite3.Connection, changes: int) -> None:
+        """
+        Po vlastnom zápise (už premietnutom cez add/remove) prevezme novú verziu
+        dát – len ak od poslednej synchronizácie (validácia pred zápisom) narástla
+        presne o changes zmenených riadkov volajúceho. Inak medzitým zapisoval aj
+        niekto iný a bitmapy by jeho zmenu nevideli, preto sa stav zahodí.
+        """
+        with self._lock:
+            version = data_version(conn)
+            if self.version is None or version != self.version + changes:
+                self._reset()
+            self.version = version
+
+    def invalidate_season(self, season_id: int) -> None:
+        with self._lock:
+            season_id = int(season_id)
+            self._seasons.discard(season_id)
+            for key in [k for k in self._bits if k[0] == season_id]:
+                del self._bits[key]
+            for key in [k for k in self._slots if k[0] == season_id]:
+                del self._slots[key]
+
+    def _ensure_season(self, conn: sqlite3.Connection, season_id: int) -> None:
+        if season_id in self._seasons:
+            return
+        cur = conn.execute(
+            "SELECT id, home_team, away_team, home_goals, away_goals, round, season "
+            "FROM matches WHERE season=? ORDER BY round, id;",
+            (season_id,),
+        )
+        cols = [d[0] for d in cur.description]
+        for r in cur.fetchall():
+            self._add(dict(zip(cols, r)))
+        self._seasons.add(season_id)
+
+    def _add(self, row: dict) -> None:
+        s, r = int(row["season"]), int(row["round"])
+        for team in (row["home_team"], row["away_team"]):
+            self._bits[(s, r)] = self._bits.get((s, r), 0) | self.bit(team)
+            self._slots.setdefault((s, r, team), []).append(row)
+
+    def add(self, row: dict) -> None:
+        """Zaznamená zapísaný zápas (row musí obsahovať id)."""
+        with self._lock:
+            if int(row["season"]) in self._seasons:
+                self._add(dict(row))
+
+    def remove(self, row: dict) -> None:
+        """Odstráni zápas (podľa id) z obsadenosti jeho kola."""
+        with self._lock:
+            s, r = int(row["season"]), int(row["round"])
+            if s not in self._seasons:
+                return
+            mid = int(row["id"])
+            for team in (row["home_team"], row["away_team"]):
+                slot = [m for m in self._slots.get((s, r, team), []) if int(m["id"]) != mid]
+                if slot:
+                    self._slots[(s, r, team)] = slot
+                else:
+                    self._slots.pop((s, r, team), None)
+                    self._bits[(s, r)] = self._bits.get((s, r), 0) & ~self.bit(team)
+
+    def occupied(self, conn: sqlite3.Connection, season_id: int, round_no: int) -> int:
+        """Bitmapa tímov, ktoré v kole už hrajú."""
+        with self._lock:
+            self._ensure_season(conn, int(season_id))
+            return self._bits.get((int(season_id), int(round_no)), 0)
+
+    def conflict(
+        self,
+        conn: sqlite3.Connection,
+        season_id: int,
+        round_no: int,
+        team: str,
+        exclude_ids=(),
+    ) -> dict | None:
+        """Zápas, v ktorom tím v kole už hrá (okrem exclude_ids), alebo None."""
+        with self._lock:
+            s, r = int(season_id), int(round_no)
+            self._ensure_season(conn, s)
+            if not self._bits.get((s, r), 0) & self.bit(team):
+                return None
+            for m in self._slots.get((s, r, team), []):
+                if int(m["id"]) not in exclude_ids:
+                    return m
+            return None
+
+
+def _side_error(home: str, away: str, team_set: TeamSet) -> str | None:
+    if home == away:
+        return ERR_SAME_TEAM
+    if home not in team_set.m:
+        return ERR_HOME_SIDE
+    if away not in team_set.v:
+        return ERR_AWAY_SIDE
+    return None
+
+
+def validate_match(
+    conn: sqlite3.Connection,
+    occ: RoundOccupancy,
+    row: dict,
+    exclude_id: int | None = None,
+    draw_error: str = ERR_DRAW_INSERT,
+    *,
+    team_set: TeamSet,
+) -> str | None:
+    """
+    Kontrola jedného zápasu pred insert/update. Vracia prvú chybu (rovnaké
+    poradie a texty ako formuláre doteraz) alebo None.
+    exclude_id – pri editácii ID upravovaného zápasu (nekonfliktuje sám so sebou).
+    team_set – tímy ligy, do ktorej zápas patrí.
+    """
+    err = _side_error(row["home_team"], row["away_team"], team_set)
+    if err:
+        return err
+    if int(row["home_goals"]) == int(row["away_goals"]):
+        return draw_error
+
+    occ.sync(conn)
+    exclude = (int(exclude_id),) if exclude_id is not None else ()
+    for team in (row["home_team"], row["away_team"]):
+        other = occ.conflict(conn, row["season"], row["round"], team, exclude)
+        if other is not None:
+            return conflict_message(int(row["round"]), team, other)
+    return None
+
+
+def validate_round_batch(
+    conn: sqlite3.Connection,
+    occ: RoundOccupancy,
+    rows: list[dict],
+    *,
+    team_set: TeamSet,
+) -> list[tuple[int | None, str]]:
+    """
+    Kontrola celej dávky zápasov naraz (napr. výsledky kola): orientácia M/V,
+    remízy, tím dvakrát v rámci dávky a konflikty so zápasmi mimo dávky.
+    Vracia zoznam (id zápasu, chyba); prázdny zoznam = dávka je v poriadku.
+    """
+    errors: list[tuple[int | None, str]] = []
+    occ.sync(conn)
+    batch_ids = tuple(int(r["id"]) for r in rows if r.get("id") is not None)
+
+    # bitmapa tímov v dávke pre každé (sezóna, kolo)
+    batch_bits: dict[tuple[int, int], int] = {}
+    batch_slot: dict[tuple[int, int, str], dict] = {}
+
+    for row in rows:
+        mid = int(row["id"]) if row.get("id") is not None else None
+        err = _side_error(row["home_team"], row["away_team"], team_set)
+        if err:
+            errors.append((mid, f"Zápas {row['home_team']} – {row['away_team']}: {err}"))
+            continue
+        if int(row["home_goals"]) == int(row["away_goals"]):
+            errors.append((mid, draw_message_round(row)))
+            continue
+
+        s, r = int(row["season"]), int(row["round"])
+        for team in (row["home_team"], row["away_team"]):
+            bit = occ.bit(team)
+            if batch_bits.get((s, r), 0) & bit:
+                errors.append((mid, conflict_message(r, team, batch_slot[(s, r, team)])))
+                continue
+            other = occ.conflict(conn, s, r, team, batch_ids)
+            if other is not None:
+                errors.append((mid, conflict_message(r, team, other)))
+                continue
+            batch_bits[(s, r)] = batch_bits.get((s, r), 0) | bit
+            batch_slot[(s, r, team)] = row
+
+    return errors